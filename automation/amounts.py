@@ -0,0 +1,198 @@
+"""
+Fixed-point token amounts: integer base units plus the token's decimals.
+
+Quotes, loan sizes, profits and thresholds stay exact integers from the RPC
+reply to the threshold check. Floats only appear when an amount is shown or
+ranked, and `Decimal` never does. `TokenScales` keeps `10 ** decimals` per
+token, computed once from the token registry, so the hot loop does an int
+multiply instead of a conversion per pair.
+"""
+from functools import total_ordering
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+Number = Union[str, int, float]
+
+
+def parse_units(value: Number, decimals: int) -> int:
+    """
+    Exact base units of a decimal amount ("1.5", "1e-6", 2, 0.25). Digits
+    past `decimals` are truncated toward zero; floats are read through
+    their shortest repr, so 0.1 is 10 ** (decimals - 1), not 0.1000000000000000055...
+    """
+    if isinstance(value, int):
+        return value * 10 ** decimals
+    text = (repr(value) if isinstance(value, float) else str(value)).strip().lower().replace('_', '')
+    sign = -1 if text.startswith('-') else 1
+    text = text.lstrip('+-')
+    mantissa, _, exponent = text.partition('e')
+    if exponent:
+        shift = decimals + int(exponent)
+        if shift >= 0:
+            return sign * parse_units(mantissa, shift)
+        return sign * (parse_units(mantissa, 0) // 10 ** -shift)
+    whole, _, fraction = mantissa.partition('.')
+    if not (whole or fraction) or not (whole + fraction).isdigit():
+        raise ValueError("Not a decimal amount: %r" % (value,))
+    return sign * (int(whole or '0') * 10 ** decimals + int(fraction[:decimals].ljust(decimals, '0') or '0'))
+
+
+def format_units(raw: int, decimals: int, places: Optional[int] = None) -> str:
+    """Base units as a decimal string, exact, or truncated to `places` fraction digits"""
+    sign = '-' if raw < 0 else ''
+    whole, fraction = divmod(abs(raw), 10 ** decimals)
+    digits = str(fraction).rjust(decimals, '0') if decimals else ''
+    digits = digits[:places] if places is not None else digits.rstrip('0')
+    return sign + str(whole) + ('.' + digits if digits else '')
+
+
+def rescale(raw: int, from_decimals: int, to_decimals: int) -> int:
+    """The same number of whole units at another precision (truncating when precision drops)"""
+    if to_decimals >= from_decimals:
+        return raw * 10 ** (to_decimals - from_decimals)
+    return raw // 10 ** (from_decimals - to_decimals)
+
+
+@total_ordering
+class Amount:
+    """
+    `raw` base units of a token with `decimals` decimals. Adding,
+    subtracting and comparing need matching decimals; scaling by an integer
+    ratio (`mul_div`) stays exact up to the final truncation.
+    """
+    __slots__ = ('raw', 'decimals')
+
+    def __init__(self, raw: int, decimals: int):
+        self.raw = int(raw)
+        self.decimals = decimals
+
+    @classmethod
+    def of(cls, value: Number, decimals: int) -> 'Amount':
+        """Amount of `value` whole units ("1.25" -> 1250000 at 6 decimals)"""
+        return cls(parse_units(value, decimals), decimals)
+
+    def rescale(self, decimals: int) -> 'Amount':
+        return Amount(rescale(self.raw, self.decimals, decimals), decimals)
+
+    def mul_div(self, numerator: int, denominator: int) -> 'Amount':
+        return Amount(self.raw * numerator // denominator, self.decimals)
+
+    def _check(self, other: 'Amount') -> int:
+        if not isinstance(other, Amount):
+            raise TypeError("Expected an Amount, got %s" % type(other).__name__)
+        if other.decimals != self.decimals:
+            raise ValueError("Amounts with %d and %d decimals do not mix" % (self.decimals, other.decimals))
+        return other.raw
+
+    def __add__(self, other: 'Amount') -> 'Amount':
+        return Amount(self.raw + self._check(other), self.decimals)
+
+    def __sub__(self, other: 'Amount') -> 'Amount':
+        return Amount(self.raw - self._check(other), self.decimals)
+
+    def __mul__(self, factor: int) -> 'Amount':
+        return Amount(self.raw * factor, self.decimals)
+
+    __rmul__ = __mul__
+
+    def __floordiv__(self, divisor: int) -> 'Amount':
+        return Amount(self.raw // divisor, self.decimals)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Amount):
+            return NotImplemented
+        return self.decimals == other.decimals and self.raw == other.raw
+
+    def __lt__(self, other: 'Amount') -> bool:
+        return self.raw < self._check(other)
+
+    def __hash__(self) -> int:
+        return hash((self.raw, self.decimals))
+
+    def __bool__(self) -> bool:
+        return self.raw != 0
+
+    def __int__(self) -> int:
+        return self.raw
+
+    def __float__(self) -> float:
+        return self.raw / 10 ** self.decimals
+
+    def __format__(self, spec: str) -> str:
+        return format(float(self), spec) if spec else str(self)
+
+    def __str__(self) -> str:
+        return format_units(self.raw, self.decimals)
+
+    def __repr__(self) -> str:
+        return 'Amount(%s, decimals=%d)' % (self, self.decimals)
+
+
+class TokenScales:
+    """`10 ** decimals` per token address (case-insensitive), built once from the token registry"""
+
+    def __init__(self, decimals: Dict[str, int]):
+        self.decimals = {token.lower(): places for token, places in decimals.items()}
+        self.scales = {token: 10 ** places for token, places in self.decimals.items()}
+
+    @classmethod
+    def from_pairs(cls, pairs: Iterable) -> 'TokenScales':
+        """From TokenPair-like records (token_a/token_b with decimals_a/decimals_b)"""
+        decimals = {}
+        for pair in pairs:
+            decimals[pair.token_a] = pair.decimals_a
+            decimals[pair.token_b] = pair.decimals_b
+        return cls(decimals)
+
+    def __contains__(self, token: str) -> bool:
+        return token.lower() in self.decimals
+
+    def amount(self, token: str, raw: int) -> Amount:
+        return Amount(raw, self.decimals[token.lower()])
+
+    def units(self, token: str, value: Number) -> int:
+        """Base units of `value` whole tokens"""
+        return parse_units(value, self.decimals[token.lower()])
+
+    def convert(self, raw: int, from_decimals: int, token: str) -> int:
+        """`raw` at `from_decimals` expressed in `token`'s base units, unit for unit"""
+        return rescale(raw, from_decimals, self.decimals[token.lower()])
+
+    def to_float(self, token: str, raw: int) -> float:
+        """For display and ranking only"""
+        return raw / self.scales[token.lower()]
+
+
+class NativePrices:
+    """
+    Exact exchange rates into the chain's wrapped native token: `rate(token)`
+    is (native base units, token base units), e.g. a pool's two reserves.
+    Gas, paid in native, and profits in any token are compared after
+    converting through these, never by reading another token's base units as
+    if they were native. Tokens without a rate cannot be valued (None).
+    """
+
+    def __init__(self, native_token: str):
+        self.native_token = native_token.lower()
+        self.rates: Dict[str, Tuple[int, int]] = {self.native_token: (1, 1)}
+        self.block: Optional[int] = None
+
+    def set_rate(self, token: str, native_units: int, token_units: int):
+        if native_units > 0 and token_units > 0:
+            self.rates[token.lower()] = (native_units, token_units)
+
+    def rate(self, token: str) -> Optional[Tuple[int, int]]:
+        return self.rates.get(token.lower())
+
+    def to_native(self, token: str, raw: int) -> Optional[int]:
+        rate = self.rates.get(token.lower())
+        return None if rate is None else raw * rate[0] // rate[1]
+
+    def from_native(self, token: str, native_raw: int) -> Optional[int]:
+        """`native_raw` in `token` base units, rounded up: used for costs"""
+        rate = self.rates.get(token.lower())
+        return None if rate is None else -(-native_raw * rate[1] // rate[0])
+
+    def native_rate(self, token: str) -> Optional[float]:
+        """Token base units per native base unit, for float cost estimates"""
+        rate = self.rates.get(token.lower())
+        return None if rate is None else rate[1] / rate[0]
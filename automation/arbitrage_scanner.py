@@ -1,30 +1,45 @@
 import asyncio
+import functools
 import json
 import logging
 import time
-from typing import Dict, List, Tuple, Optional
-from decimal import Decimal
-from web3 import Web3
-from web3.middleware import geth_poa_middleware
-import requests
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, FrozenSet, List, Tuple, Optional
 from dataclasses import dataclass
 import os
-from dotenv import load_dotenv
-import aiohttp
-
-load_dotenv()
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('arbitrage.log'),
-        logging.StreamHandler()
-    ]
+
+from automation.amounts import Amount, NativePrices, TokenScales, parse_units
+from automation.chains import ChainConfig
+from automation.direct_swap import (
+    UNISWAP_V2_FACTORY_ABI, UNISWAP_V2_PAIR_ABI, PairState, get_amount_out, pack_leg
 )
+from automation.executors import Sender, SenderPool
+from automation.failures import TRANSIENT, FailureTracker, failures
+from automation.lenders import LENDERS, AaveSource, BalancerSource, LenderSelector
+from automation.lens import ARBITRAGE_LENS_ABI, iter_lens_results
+from automation.logging_pipeline import configure_logging
+from automation.mempool import PendingStateEngine, PendingTxPoller
+from automation.pair_scheduler import AdaptivePairScheduler, price_and_spread
+from automation.registry_cache import RegistryCache
+from automation.rpc_pool import RpcPool, nonce_too_low, web3_provider
+from automation.scheduler import OpportunityScheduler, route_pools
+from automation.sharded_scan import ShardedScanner
+from automation.tracing import tracer
+from automation.trade_store import get_trade_store
+from automation.uniswap_v3 import UNISWAP_V3_FACTORY_ABI, V3PoolCache, load_pool_from_chain
+
 logger = logging.getLogger(__name__)
 
+# Solidity ArbitrageParams(tokenA, tokenB, dexA, dexB, amountIn, minProfitBps)
+ARBITRAGE_PARAMS_TYPE = '(address,address,address,address,uint256,uint256)'
+
+NATIVE_DECIMALS = 18
+# Loan sizes tried per pair by the lens and reserve-table scans, in bps of the loan budget
+SIZE_BPS = (500, 1000, 2000)
+
+# Scanner counters persisted in the trade store
+COUNTERS = ('scan_count', 'opportunities_found', 'v3_opportunities_found', 'trades_executed', 'total_profit')
+
 @dataclass
 class TokenPair:
     token_a: str
@@ -43,13 +58,35 @@ class ArbitrageOpportunity:
     expected_profit: int
     profit_percentage: float
     gas_estimate: int
+    lender: str = 'balancer'
+    loan_fee: int = 0
+
+def token_pairs(tokens: List[Dict]) -> List[TokenPair]:
+    """Every pair of a token list ({'address', 'symbol', 'decimals'} each)"""
+    pairs = []
+    for i, token_a in enumerate(tokens):
+        for token_b in tokens[i+1:]:
+            pairs.append(TokenPair(
+                token_a=token_a['address'],
+                token_b=token_b['address'],
+                symbol_a=token_a['symbol'],
+                symbol_b=token_b['symbol'],
+                decimals_a=token_a['decimals'],
+                decimals_b=token_b['decimals']
+            ))
+    return pairs
 
 class PolygonArbitrageScanner:
-    def __init__(self):
-        # Load environment variables
+    def __init__(self, chain: Optional[ChainConfig] = None):
+        # One chain per scanner: without a ChainConfig it comes from the environment variables
+        self.chain = chain or ChainConfig.from_env()
         self.private_key = os.getenv('PRIVATE_KEY')
-        self.rpc_url = os.getenv('ALCHEMY_API_URL_MAINNET')
-        self.contract_address = os.getenv('ARBITRAGE_CONTRACT_ADDRESS')
+        self.rpc_url = self.chain.rpc_urls[0] if self.chain.rpc_urls else None
+        self.contract_address = self.chain.contract_address
+        self.balancer_vault_address = self.chain.balancer_vault_address
+        self.aave_pool_address = self.chain.aave_pool_address
+        # Optional ArbitrageLens deployment: quote every pair in one eth_call
+        self.lens_address = self.chain.lens_address
 
         # API Keys for aggregators
         self.oneinch_api_key = os.getenv('ONEINCH_API_KEY')
@@ -60,41 +97,140 @@ class PolygonArbitrageScanner:
         if not self.private_key or not self.rpc_url:
             raise ValueError("Missing required environment variables: PRIVATE_KEY and ALCHEMY_API_URL_MAINNET")
 
-        # Initialize Web3
-        self.w3 = Web3(Web3.HTTPProvider(self.rpc_url))
+        # Initialize Web3 (imported here so importing this module stays cheap)
+        from web3 import Web3
+        from web3.middleware import geth_poa_middleware
+        # Circuits and dead routes are per chain so one chain's outage never pauses another
+        self.failures = failures if chain is None else FailureTracker(
+            failures.routes.base_backoff, failures.routes.max_backoff, failures.failure_threshold,
+            failures.reset_timeout
+        )
+        # With more than one RPC URL, reads go through a latency-routed pool
+        self.rpc_urls = self.chain.rpc_urls
+        self.rpc_pool: Optional[RpcPool] = None
+        if len(self.rpc_urls) > 1:
+            self.rpc_pool = RpcPool(self.rpc_urls, hedge_after=float(os.getenv('RPC_HEDGE_MS', '250')) / 1000)
+            self.rpc_pool.start()
+            self.w3 = Web3(web3_provider(self.rpc_pool))
+            self.failures.add_source('rpc_endpoints', self.rpc_pool.quarantined)
+        else:
+            self.w3 = Web3(Web3.HTTPProvider(self.rpc_url))
         self.w3.middleware_onion.inject(geth_poa_middleware, layer=0)
         self.account = self.w3.eth.account.from_key(self.private_key)
 
+        # Executor keys approved on the contract: trades then go out in parallel, one nonce
+        # sequence per sender, and PRIVATE_KEY only funds their gas
+        executor_keys = [key.strip() for key in os.getenv('EXECUTOR_PRIVATE_KEYS', '').split(',') if key.strip()]
+        self.senders: Optional[SenderPool] = None
+        if executor_keys:
+            self.senders = SenderPool(
+                self.w3, executor_keys, funder_key=self.private_key,
+                min_balance=parse_units(os.getenv('EXECUTOR_MIN_BALANCE_MATIC', '1'), NATIVE_DECIMALS),
+                target_balance=parse_units(os.getenv('EXECUTOR_TARGET_BALANCE_MATIC', '3'), NATIVE_DECIMALS),
+                funder_reserve=parse_units(os.getenv('MIN_WALLET_BALANCE_MATIC', '10'), NATIVE_DECIMALS)
+            )
+        self.sender_refresh_interval = float(os.getenv('EXECUTOR_REFRESH_SECONDS', '15'))
+        self._senders_refreshed = 0.0
+        self._in_flight: Dict[asyncio.Task, FrozenSet] = {}
+        # This chain's blocking RPC work (scans, receipt waits) runs here and nowhere else;
+        # one worker is kept for the scan, the rest bound the trades in flight
+        self.max_tasks = max(2, self.chain.max_tasks)
+        self._executor = ThreadPoolExecutor(self.max_tasks, thread_name_prefix='chain-%s' % self.chain.name)
+
         # Trading parameters
         self.min_profit_usd = float(os.getenv('MIN_PROFIT_USD', '1.0'))
         self.min_profit_percentage = float(os.getenv('MIN_PROFIT_PERCENTAGE', '0.30'))
         self.max_gas_price = int(os.getenv('MAX_GAS_PRICE_GWEI', '50')) * 10**9
-        self.scan_interval = int(os.getenv('SCAN_INTERVAL_SECONDS', '1'))
+        self.scan_interval = self.chain.scan_interval
         self.monitoring_interval = int(os.getenv('MONITORING_INTERVAL', '13146'))
 
         # Strategy parameters
         self.loan_fee_percentage = float(os.getenv('LOAN_FEE_PERCENTAGE', '60'))
         self.gas_buffer_percentage = float(os.getenv('GAS_BUFFER_PERCENTAGE', '40'))
         self.arbitrage_threshold = float(os.getenv('ARBITRAGE_THRESHOLD_PERCENT', '0.30'))
+        self.max_batch_legs = int(os.getenv('MAX_BATCH_LEGS', '3'))
+        # 'router' swaps through DEX routers, 'direct' swaps against pairs with packed calldata
+        self.execution_mode = os.getenv('EXECUTION_MODE', 'router')
+        # >0 scans pairs in that many worker processes over a shared reserve table
+        self.scan_workers = int(os.getenv('SCAN_WORKERS', '0'))
+        self._sharded_scanner: Optional[ShardedScanner] = None
+        # Pair addresses never change, so they survive restarts in an on-disk registry
+        self.registry = RegistryCache(self.chain.registry_file, self.chain.chain_id)
+        self._contracts: Dict[Tuple[str, int], object] = {}
+        # Scan against reserves projected from pending router swaps (reserve-table scans only)
+        self.mempool_mode = os.getenv('MEMPOOL_MODE', 'false').lower() == 'true'
+        self.pending_engine: Optional[PendingStateEngine] = None
+        self._pending_poller: Optional[PendingTxPoller] = None
+        # >0 caps RPC calls per block; pairs are then scanned by volatility, spread and hit history
+        self.pair_scan_budget = int(os.getenv('PAIR_SCAN_BUDGET', '0'))
+        self.pair_max_idle_blocks = int(os.getenv('PAIR_MAX_IDLE_BLOCKS', '50'))
+        self.price_refresh_blocks = int(os.getenv('PRICE_REFRESH_BLOCKS', '20'))
+        self.pair_scheduler: Optional[AdaptivePairScheduler] = None
+        # Uniswap V3 pools are simulated from a local tick cache (detection only)
+        self.v3_enabled = os.getenv('UNISWAP_V3_ENABLED', 'false').lower() == 'true'
+        self.v3_fee_tiers = [int(fee) for fee in os.getenv('UNISWAP_V3_FEE_TIERS', '500,3000').split(',')]
+        self.v3_cache_file = os.getenv('V3_CACHE_FILE', 'v3_pools.json')
+        self.v3_cache = V3PoolCache.load(self.v3_cache_file) if self.v3_enabled else V3PoolCache()
+        self.v3_pools: Dict[Tuple[str, str, int], str] = {}
 
         # Performance tracking
         self.scan_count = 0
         self.opportunities_found = 0
+        self.v3_opportunities_found = 0
         self.trades_executed = 0
-        self.total_profit = 0
+        self.total_profit = 0.0
+
+        # Opportunity and trade history; counters carry over restarts (kept per chain when several run)
+        self.store = get_trade_store()
+        self._counter_prefix = '' if chain is None else self.chain.name + '.'
+        # Reports the dashboard reads from the store, since it may run in another process
+        self._report_scope = '' if chain is None else self.chain.name
+        if self.store is not None:
+            for name, value in self.store.counters().items():
+                name = name[len(self._counter_prefix):] if name.startswith(self._counter_prefix) else None
+                if name in COUNTERS:
+                    setattr(self, name, type(getattr(self, name))(value))
 
         # Configuration
         self.min_profit_usd = 1.0  # Minimum $1 profit
         self.max_gas_price_gwei = 50
-        self.scan_interval = 1  # 1 second between scans
 
         # Load token pairs and DEX configurations
-        self.tokens = self._load_token_list()
-        self.dex_configs = self._load_dex_configs()
+        self.tokens = token_pairs(self.chain.tokens) if self.chain.tokens else self._load_token_list()
+        # Decimals of every token, so amounts and thresholds stay in integer base units
+        self.scales = TokenScales.from_pairs(self.tokens)
+        # Every token's rate into the gas token, from its V2 pool against it
+        self.prices = NativePrices(self.chain.wrapped_native)
+        self.dex_configs = self.chain.dexes or self._load_dex_configs()
+        # V2-style DEXes quoted by the lens and reserve-table scans
+        self.v2_dexes = [name for name in self.dex_configs if name != 'uniswap_v3']
 
         # Load contract ABI
         self.contract_abi = self._load_contract_abi()
 
+        if self.mempool_mode:
+            if self.scan_workers <= 0:
+                logger.warning("MEMPOOL_MODE needs SCAN_WORKERS > 0; projected reserves are unused")
+            self.pending_engine = PendingStateEngine(
+                {config['router']: dex for dex, config in self.dex_configs.items() if dex != 'uniswap_v3'},
+                max_age_blocks=int(os.getenv('MEMPOOL_MAX_AGE_BLOCKS', '20'))
+            )
+
+        # Net-profit ranking, route dedup and pool-conflict resolution across scans, all valued in MATIC
+        self.scheduler = OpportunityScheduler(
+            self.chain.wrapped_native,
+            ttl_blocks=int(os.getenv('OPPORTUNITY_TTL_BLOCKS', '2')),
+            max_legs=self.max_batch_legs,
+            gas_buffer_percentage=self.gas_buffer_percentage,
+            prices=self.prices
+        )
+
+        # Flash loan sources, cheapest one picked per opportunity
+        self.lender_selector = LenderSelector({
+            'balancer': BalancerSource(self.w3, self.balancer_vault_address),
+            'aave': AaveSource(self.w3, self.aave_pool_address)
+        })
+
     def _load_token_list(self) -> List[TokenPair]:
         """Load popular Polygon token pairs for arbitrage scanning"""
         # Popular Polygon tokens
@@ -131,19 +267,7 @@ class PolygonArbitrageScanner:
             }
         ]
 
-        pairs = []
-        for i, token_a in enumerate(tokens):
-            for token_b in tokens[i+1:]:
-                pairs.append(TokenPair(
-                    token_a=token_a['address'],
-                    token_b=token_b['address'],
-                    symbol_a=token_a['symbol'],
-                    symbol_b=token_b['symbol'],
-                    decimals_a=token_a['decimals'],
-                    decimals_b=token_b['decimals']
-                ))
-
-        return pairs
+        return token_pairs(tokens)
 
     def _load_dex_configs(self) -> Dict:
         """Load DEX router configurations for Polygon"""
@@ -193,23 +317,125 @@ class PolygonArbitrageScanner:
                 "outputs": [],
                 "stateMutability": "nonpayable",
                 "type": "function"
+            },
+            {
+                "inputs": [
+                    {"name": "tokens", "type": "address[]"},
+                    {"name": "amounts", "type": "uint256[]"},
+                    {
+                        "name": "legs",
+                        "type": "tuple[]",
+                        "components": [
+                            {"name": "tokenA", "type": "address"},
+                            {"name": "tokenB", "type": "address"},
+                            {"name": "dexA", "type": "address"},
+                            {"name": "dexB", "type": "address"},
+                            {"name": "amountIn", "type": "uint256"},
+                            {"name": "minProfitBps", "type": "uint256"}
+                        ]
+                    }
+                ],
+                "name": "executeBalancerBatchFlashLoan",
+                "outputs": [],
+                "stateMutability": "nonpayable",
+                "type": "function"
+            },
+            {
+                "inputs": [
+                    {"name": "assets", "type": "address[]"},
+                    {"name": "amounts", "type": "uint256[]"},
+                    {"name": "params", "type": "bytes"}
+                ],
+                "name": "executeAaveFlashLoan",
+                "outputs": [],
+                "stateMutability": "nonpayable",
+                "type": "function"
+            },
+            {
+                "inputs": [
+                    {"name": "assets", "type": "address[]"},
+                    {"name": "amounts", "type": "uint256[]"},
+                    {
+                        "name": "legs",
+                        "type": "tuple[]",
+                        "components": [
+                            {"name": "tokenA", "type": "address"},
+                            {"name": "tokenB", "type": "address"},
+                            {"name": "dexA", "type": "address"},
+                            {"name": "dexB", "type": "address"},
+                            {"name": "amountIn", "type": "uint256"},
+                            {"name": "minProfitBps", "type": "uint256"}
+                        ]
+                    }
+                ],
+                "name": "executeAaveBatchFlashLoan",
+                "outputs": [],
+                "stateMutability": "nonpayable",
+                "type": "function"
+            },
+            {
+                "inputs": [
+                    {"name": "token", "type": "address"},
+                    {"name": "amount", "type": "uint256"},
+                    {"name": "legs", "type": "bytes"}
+                ],
+                "name": "executeBalancerFlashLoanPacked",
+                "outputs": [],
+                "stateMutability": "nonpayable",
+                "type": "function"
+            },
+            {
+                "inputs": [],
+                "name": "owner",
+                "outputs": [{"name": "", "type": "address"}],
+                "stateMutability": "view",
+                "type": "function"
+            },
+            {
+                "inputs": [{"name": "", "type": "address"}],
+                "name": "executors",
+                "outputs": [{"name": "", "type": "bool"}],
+                "stateMutability": "view",
+                "type": "function"
+            },
+            {
+                "anonymous": False,
+                "inputs": [
+                    {"indexed": False, "name": "legs", "type": "uint256"},
+                    {"indexed": False, "name": "executed", "type": "uint256"},
+                    {"indexed": False, "name": "timestamp", "type": "uint256"}
+                ],
+                "name": "BatchExecuted",
+                "type": "event"
+            },
+            {
+                "anonymous": False,
+                "inputs": [
+                    {"indexed": True, "name": "tokenA", "type": "address"},
+                    {"indexed": True, "name": "tokenB", "type": "address"},
+                    {"indexed": False, "name": "amountIn", "type": "uint256"},
+                    {"indexed": False, "name": "profit", "type": "uint256"},
+                    {"indexed": False, "name": "timestamp", "type": "uint256"}
+                ],
+                "name": "ArbitrageExecuted",
+                "type": "event"
             }
         ]
 
-    def get_wallet_balance(self) -> Decimal:
+    def get_wallet_balance(self) -> Amount:
         """Get current wallet balance in MATIC"""
         try:
-            balance_wei = self.w3.eth.get_balance(self.account.address)
-            balance_matic = Decimal(self.w3.from_wei(balance_wei, 'ether'))
-            return balance_matic
+            return Amount(self.w3.eth.get_balance(self.account.address), NATIVE_DECIMALS)
         except Exception as e:
             logger.error(f"Error getting wallet balance: {str(e)}")
-            return Decimal('0')
+            return Amount(0, NATIVE_DECIMALS)
 
     async def get_1inch_quote(self, from_token: str, to_token: str, amount: int) -> Optional[Dict]:
         """Get quote from 1inch API"""
+        if not self.failures.allow('1inch'):
+            return None
         try:
-            url = f"{self.oneinch_api_url}/137/quote"
+            url = f"{self.oneinch_api_url}/{self.chain.chain_id}/quote"
             params = {
                 'fromTokenAddress': from_token,
                 'toTokenAddress': to_token,
@@ -220,17 +446,26 @@ class PolygonArbitrageScanner:
                 'accept': 'application/json'
             }
 
+            import aiohttp
             async with aiohttp.ClientSession() as session:
                 async with session.get(url, params=params, headers=headers) as response:
                     if response.status == 200:
-                        return await response.json()
+                        quote = await response.json()
+                        self.failures.record_success('1inch')
+                        return quote
+                    if response.status == 429 or response.status >= 500:
+                        raise ConnectionError("1inch API returned HTTP %d" % response.status)
+            self.failures.circuit('1inch').release()
             return None
         except Exception as e:
-            logger.debug(f"1inch API error: {str(e)}")
+            self.failures.record_failure('1inch', e)
+            logger.debug("1inch API error: %s", e)
             return None
 
     async def get_0x_quote(self, sell_token: str, buy_token: str, sell_amount: int) -> Optional[Dict]:
         """Get quote from 0x API"""
+        if not self.failures.allow('0x'):
+            return None
         try:
             url = f"{self.zerox_api_url}/swap/v1/quote"
             params = {
@@ -243,82 +478,165 @@ class PolygonArbitrageScanner:
                 'accept': 'application/json'
             }
 
+            import aiohttp
             async with aiohttp.ClientSession() as session:
                 async with session.get(url, params=params, headers=headers) as response:
                     if response.status == 200:
-                        return await response.json()
+                        quote = await response.json()
+                        self.failures.record_success('0x')
+                        return quote
+                    if response.status == 429 or response.status >= 500:
+                        raise ConnectionError("0x API returned HTTP %d" % response.status)
+            self.failures.circuit('0x').release()
             return None
         except Exception as e:
-            logger.debug(f"0x API error: {str(e)}")
+            self.failures.record_failure('0x', e)
+            logger.debug("0x API error: %s", e)
             return None
 
-    def calculate_loan_budget(self) -> Tuple[Decimal, bool]:
-        """Calculate available loan budget and determine mode"""
-        balance = self.get_wallet_balance()
+    def calculate_loan_budget(self) -> Tuple[Amount, bool]:
+        """Calculate available loan budget (in MATIC base units) and determine mode"""
+        with tracer.span('balance_fetch'):
+            balance = self.get_wallet_balance()
 
         # Check minimum balance requirement
-        if balance < Decimal('10'):  # $10 minimum
-            return Decimal('0'), False
+        if balance < Amount.of(10, NATIVE_DECIMALS):  # $10 minimum
+            return Amount(0, NATIVE_DECIMALS), False
 
         # Determine mode and allocation
-        is_high_risk = balance >= Decimal('320')  # $320 threshold
+        is_high_risk = balance >= Amount.of(320, NATIVE_DECIMALS)  # $320 threshold
 
         if is_high_risk:
-            loan_percentage = Decimal('0.80')  # 80% for high-risk mode
+            loan_percentage = 80  # 80% for high-risk mode
         else:
-            loan_percentage = Decimal('0.70')  # 70% for safe mode
+            loan_percentage = 70  # 70% for safe mode
 
-        loan_budget = balance * loan_percentage
+        loan_budget = balance.mul_div(loan_percentage, 100)
         return loan_budget, is_high_risk
 
+    @property
+    def min_profit_usd(self) -> float:
+        return self._min_profit_usd
+
+    @min_profit_usd.setter
+    def min_profit_usd(self, value: float):
+        self._min_profit_usd = value
+        # The scanner has no USD feed: the threshold is counted in MATIC, as it always was for WMATIC loans
+        self._min_profit_native = parse_units(value, NATIVE_DECIMALS)
+
+    def _min_profit(self, token: str) -> Optional[int]:
+        """
+        MIN_PROFIT_USD (in MATIC) in `token` base units at the token's current
+        MATIC price. None while the token has no price: its profit cannot be
+        valued, so no opportunity in it passes the threshold.
+        """
+        return self.prices.from_native(token, self._min_profit_native)
+
+    def _loan_amount(self, loan_budget: Amount, bps: int, token: str) -> int:
+        """`bps` of the loan budget's value in `token` base units; unit for unit while the token has no price"""
+        share = loan_budget.raw * bps // 10000
+        rate = self.prices.rate(token) if loan_budget.decimals == NATIVE_DECIMALS else None
+        if rate is not None:
+            return share * rate[1] // rate[0]
+        return self.scales.convert(share, loan_budget.decimals, token)
+
+    def _pair_amounts(self, loan_budget: Amount, pair_indices: List[int]) -> Dict[int, List[int]]:
+        """The SIZE_BPS loan sizes of each pair, in its token_a's base units"""
+        sizes: Dict[str, List[int]] = {}
+        amounts = {}
+        for pair_index in pair_indices:
+            token = self.tokens[pair_index].token_a
+            if token not in sizes:
+                sizes[token] = [self._loan_amount(loan_budget, bps, token) for bps in SIZE_BPS]
+            amounts[pair_index] = sizes[token]
+        return amounts
+
+    def _pairs_to_scan(self, cost_per_pair: int) -> List[int]:
+        """Indexes into self.tokens to scan now: all of them, or the adaptive scheduler's pick for this block"""
+        if self.pair_scan_budget <= 0:
+            return list(range(len(self.tokens)))
+        if self.pair_scheduler is None or self.pair_scheduler.pairs != len(self.tokens):
+            self.pair_scheduler = AdaptivePairScheduler(
+                len(self.tokens), self.pair_scan_budget, cost_per_pair, self.pair_max_idle_blocks
+            )
+        with tracer.span('scheduling'):
+            return self.pair_scheduler.select(self.w3.eth.block_number)
+
+    async def _blocking(self, fn, *args):
+        """Run blocking RPC work on this chain's executor, leaving the event loop to other chains and trades"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(fn, *args))
+
     async def scan_arbitrage_opportunities(self) -> List[ArbitrageOpportunity]:
         """Scan all token pairs across all DEXs for arbitrage opportunities"""
+        return await self._blocking(self._scan_opportunities)
+
+    def _scan_opportunities(self) -> List[ArbitrageOpportunity]:
         opportunities = []
+        # Loan sizes, profit thresholds and gas costs of non-native tokens are converted through these
+        self._refresh_native_prices(self.w3.eth.block_number)
         loan_budget, is_high_risk = self.calculate_loan_budget()
 
-        if loan_budget == 0:
+        if not loan_budget:
             logger.warning("Insufficient balance for arbitrage operations")
             return opportunities
 
-        logger.info(f"Scanning with {loan_budget} MATIC budget ({'High-Risk' if is_high_risk else 'Safe'} mode)")
+        logger.info("Scanning with %s MATIC budget (%s mode)", loan_budget, 'High-Risk' if is_high_risk else 'Safe')
+
+        if self.scan_workers > 0:
+            return self._scan_sharded(loan_budget)
+
+        if self.lens_address:
+            return self._scan_with_lens(loan_budget)
 
         # Create contract instance
         if self.contract_address:
-            contract = self.w3.eth.contract(
-                address=self.contract_address,
-                abi=self.contract_abi
-            )
+            contract = self._contract(self.contract_address, self.contract_abi)
 
-        for pair in self.tokens:
+        for pair_index in self._pairs_to_scan(1):
+            pair = self.tokens[pair_index]
+            route = ('quickswap', 'sushiswap', pair.token_a, pair.token_b)
+            if self.failures.route_blocked(route):
+                continue
+            if not self.failures.allow('rpc'):
+                logger.warning("RPC circuit open, cutting the scan short: %s", self.failures.circuit('rpc').last_error)
+                break
             self.scan_count += 1
 
-            # Calculate test amount (use 10% of available budget)
-            test_amount_matic = loan_budget * Decimal('0.1')
-            test_amount_wei = self.w3.to_wei(test_amount_matic, 'ether')
+            # Calculate test amount (use 10% of available budget), in token_a base units
+            test_amount = self._loan_amount(loan_budget, 1000, pair.token_a)
 
             try:
                 # Check opportunity using smart contract
                 if self.contract_address:
-                    result = contract.functions.getArbitrageOpportunity(
-                        pair.token_a,
-                        pair.token_b,
-                        test_amount_wei
-                    ).call()
-
-                    expected_profit_wei, is_profitable = result
-
-                    if is_profitable and expected_profit_wei > 0:
-                        expected_profit_matic = Decimal(self.w3.from_wei(expected_profit_wei, 'ether'))
-                        profit_percentage = float((expected_profit_matic / test_amount_matic) * 100)
+                    with tracer.span('quoting'):
+                        result = contract.functions.getArbitrageOpportunity(
+                            pair.token_a,
+                            pair.token_b,
+                            test_amount
+                        ).call()
+
+                    expected_profit, is_profitable = result
+                    self.failures.record_success('rpc', route)
+                    if self.pair_scheduler is not None:
+                        self.pair_scheduler.record(
+                            pair_index, bool(is_profitable),
+                            spread_bps=expected_profit * 10000 / test_amount if is_profitable else None
+                        )
+
+                    if is_profitable and expected_profit > 0:
+                        with tracer.span('filtering'):
+                            profit_percentage = expected_profit * 100 / test_amount
+                            threshold = self._min_profit(pair.token_a)
+                            meets_threshold = threshold is not None and expected_profit >= threshold
 
                         # Check if profit meets minimum threshold
-                        if expected_profit_matic >= Decimal(str(self.min_profit_usd)):
+                        if meets_threshold:
                             opportunity = ArbitrageOpportunity(
                                 token_pair=pair,
                                 dex_a='quickswap',
                                 dex_b='sushiswap',
-                                amount_in=int(test_amount_wei),
-                                expected_profit=int(expected_profit_wei),
+                                amount_in=test_amount,
+                                expected_profit=expected_profit,
                                 profit_percentage=profit_percentage,
                                 gas_estimate=200000  # Estimated gas
                             )
@@ -326,16 +644,438 @@ class PolygonArbitrageScanner:
                             opportunities.append(opportunity)
                             self.opportunities_found += 1
 
-                            logger.info(f"Found opportunity: {pair.symbol_a}/{pair.symbol_b} - "
-                                      f"Profit: {expected_profit_matic:.4f} MATIC ({profit_percentage:.2f}%)")
+                            logger.info("Found opportunity: %s/%s - Profit: %.4f %s (%.2f%%)",
+                                        pair.symbol_a, pair.symbol_b,
+                                        self.scales.to_float(pair.token_a, expected_profit), pair.symbol_a,
+                                        profit_percentage)
+
+            except Exception as e:
+                kind = self.failures.record_failure('rpc', e, route)
+                log = logger.warning if kind == TRANSIENT else logger.debug
+                log("Error scanning %s/%s (%s): %s", pair.symbol_a, pair.symbol_b, kind, e)
+                continue
+
+        return opportunities
+
+    def apply_lender_costs(self, opportunities: List[ArbitrageOpportunity],
+                           gas_price: int, block_number: int) -> List[ArbitrageOpportunity]:
+        """
+        Assign each opportunity its cheapest flash loan source and drop those
+        whose loan fee exceeds LOAN_FEE_PERCENTAGE of the gross profit or
+        whose profit does not cover the fee plus gas padded by
+        GAS_BUFFER_PERCENTAGE.
+        """
+        self.lender_selector.refresh(block_number)
+        gas_multiplier = 1 + self.gas_buffer_percentage / 100
+        packed = self.execution_mode == 'direct'
+
+        viable = []
+        for opportunity in opportunities:
+            pair = opportunity.token_pair
+            # Gas is paid in MATIC: lender overhead and trade gas are converted to the loan token at its price
+            native_rate = self.prices.native_rate(pair.token_a)
+            if native_rate is None:
+                logger.debug("No MATIC price for %s; cannot net gas against %s/%s", pair.symbol_a,
+                             pair.symbol_a, pair.symbol_b)
+                continue
+            quote = self.lender_selector.select(
+                pair.token_a, opportunity.amount_in, gas_price, native_rate, packed
+            )
+            if quote is None:
+                logger.debug("No lender can fund %s/%s for %d", pair.symbol_a, pair.symbol_b, opportunity.amount_in)
+                continue
+            if quote.fee * 100 > opportunity.expected_profit * self.loan_fee_percentage:
+                continue
+            gas_cost = self.prices.from_native(pair.token_a, int(opportunity.gas_estimate * gas_price * gas_multiplier))
+            if opportunity.expected_profit - quote.fee - gas_cost <= 0:
+                continue
+
+            opportunity.lender = quote.lender
+            opportunity.loan_fee = quote.fee
+            viable.append(opportunity)
+
+        return viable
+
+    def _arbitrage_leg(self, opportunity: ArbitrageOpportunity, min_profit_bps: int) -> Tuple:
+        """Build the contract's ArbitrageParams tuple for an opportunity"""
+        return (
+            opportunity.token_pair.token_a,
+            opportunity.token_pair.token_b,
+            self.dex_configs[opportunity.dex_a]['router'],
+            self.dex_configs[opportunity.dex_b]['router'],
+            opportunity.amount_in,
+            min_profit_bps
+        )
+
+    def _send_contract_transaction(self, contract_call, opportunities: List[ArbitrageOpportunity] = (),
+                                   kind: str = 'single', lender: Optional[str] = None,
+                                   sender: Optional[Sender] = None) -> Optional[Tuple]:
+        """
+        Estimate, price-check, sign, broadcast and wait for a contract call,
+        from `sender` with a locally allocated nonce, or from PRIVATE_KEY.
+        The transaction is stored as soon as it is broadcast, so one whose
+        receipt never arrives still shows up as pending.
+        """
+        from_address = sender.address if sender is not None else self.account.address
+        # Estimate gas
+        with tracer.span('gas_estimation'):
+            gas_estimate = contract_call.estimate_gas({'from': from_address})
+
+            # Check gas price
+            gas_price = self.w3.eth.gas_price
+        if gas_price > self.max_gas_price_gwei * 10**9:
+            logger.warning("Gas price too high: %.1f gwei", gas_price / 10**9)
+            return None
+
+        # Execute transaction
+        with tracer.span('signing'):
+            transaction = contract_call.build_transaction({
+                'from': from_address,
+                'gas': gas_estimate,
+                'gasPrice': gas_price,
+                'nonce': (self.senders.next_nonce(sender) if sender is not None
+                          else self.w3.eth.get_transaction_count(from_address))
+            })
+
+            # Sign and send transaction
+            signed_txn = self.w3.eth.account.sign_transaction(
+                transaction, sender.key if sender is not None else self.private_key
+            )
 
+        with tracer.span('broadcast'):
+            try:
+                tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
             except Exception as e:
-                logger.debug(f"Error scanning {pair.symbol_a}/{pair.symbol_b}: {str(e)}")
+                if sender is not None and nonce_too_low(e):
+                    self.senders.resync(sender)
+                raise
+        if sender is not None:
+            self.senders.broadcast(sender, tx_hash.hex(), gas_estimate * gas_price)
+        if self.store is not None:
+            self.store.record_transaction(tx_hash.hex(), opportunities, kind, lender, gas_price)
+
+        # Wait for confirmation
+        with tracer.span('receipt_wait'):
+            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+        if sender is not None:
+            self.senders.confirm(sender)
+
+        return tx_hash, receipt
+
+    def _realized_profits(self, contract, receipt) -> List[Tuple[str, int]]:
+        """(tokenA, profit in tokenA base units) per ArbitrageExecuted event of a receipt"""
+        return [(log['args']['tokenA'], log['args']['profit'])
+                for log in contract.events.ArbitrageExecuted().process_receipt(receipt)]
+
+    def _native_value(self, token: str, raw: int) -> Amount:
+        """`raw` base units of `token` valued in the gas token; zero when the token has no known rate"""
+        return Amount(self.prices.to_native(token, raw) or 0, NATIVE_DECIMALS)
+
+    def _refresh_native_prices(self, block_number: int):
+        """Re-read each token's rate into the gas token from its first V2 pool against it"""
+        if self.prices.block is not None and block_number - self.prices.block < self.price_refresh_blocks:
+            return
+        self.prices.block = block_number
+        native = self.chain.wrapped_native
+        for token in {address for pair in self.tokens for address in (pair.token_a, pair.token_b)}:
+            if token.lower() == native.lower():
                 continue
+            for dex in self.v2_dexes:
+                try:
+                    state = self._load_pair_state(dex, native, token)
+                except LookupError:
+                    continue
+                except Exception as e:
+                    logger.debug("Price of %s on %s unavailable: %s", token, dex, e)
+                    continue
+                self.prices.set_rate(token, *state.reserves_for(token)[::-1])
+                break
+
+    def _contract(self, address: str, abi: List):
+        """Contract objects are reused; building one re-parses the whole ABI"""
+        key = (address, id(abi))
+        contract = self._contracts.get(key)
+        if contract is None:
+            contract = self._contracts[key] = self.w3.eth.contract(address=address, abi=abi)
+        return contract
+
+    def _load_pair_state(self, dex: str, token_a: str, token_b: str) -> PairState:
+        """Read a V2 pair's address, token0 and current reserves"""
+        meta = self.registry.get_pair(dex, token_a, token_b)
+        if meta is None:
+            # Pair address and token0 never change, only reserves need re-reading
+            factory = self._contract(self.dex_configs[dex]['factory'], UNISWAP_V2_FACTORY_ABI)
+            pair_address = factory.functions.getPair(token_a, token_b).call()
+            if int(pair_address, 16) == 0:
+                raise LookupError("no pool on %s" % dex)
+            pair = self._contract(pair_address, UNISWAP_V2_PAIR_ABI)
+            meta = (pair_address, pair.functions.token0().call())
+            self.registry.set_pair(dex, token_a, token_b, *meta)
+
+        pair = self._contract(meta[0], UNISWAP_V2_PAIR_ABI)
+        reserve0, reserve1, _ = pair.functions.getReserves().call()
+        return PairState(
+            address=meta[0],
+            token0=meta[1],
+            reserve0=reserve0,
+            reserve1=reserve1
+        )
+
+    def _pool_state(self, dex: str, token_a: str, token_b: str) -> Optional[PairState]:
+        """_load_pair_state, or None for a pool that is missing, quarantined or unreadable right now"""
+        key = (dex, token_a, token_b)
+        if self.failures.route_blocked(key) or not self.failures.allow('rpc'):
+            return None
+        try:
+            state = self._load_pair_state(dex, token_a, token_b)
+        except Exception as e:
+            kind = self.failures.record_failure('rpc', e, key)
+            logger.debug("No %s pair for %s/%s (%s): %s", dex, token_a, token_b, kind, e)
+            return None
+        self.failures.record_success('rpc')
+        return state
+
+    def _packed_call(self, contract, opportunity: ArbitrageOpportunity):
+        """Build the router-free executeBalancerFlashLoanPacked call for an opportunity"""
+        token_a = opportunity.token_pair.token_a
+        token_b = opportunity.token_pair.token_b
+        pair_a = self._load_pair_state(opportunity.dex_a, token_a, token_b)
+        pair_b = self._load_pair_state(opportunity.dex_b, token_a, token_b)
+
+        leg, amount_out = pack_leg(token_a, token_b, pair_a, pair_b, opportunity.amount_in)
+        if amount_out <= opportunity.amount_in:
+            return None
+        return contract.functions.executeBalancerFlashLoanPacked(token_a, opportunity.amount_in, leg)
+
+    def _scan_with_lens(self, loan_budget: Amount) -> List[ArbitrageOpportunity]:
+        """Quote every pair, DEX ordering and size with one ArbitrageLens call per set of loan sizes"""
+        dex_names = self.v2_dexes
+
+        # One eth_call per borrowed token whatever the pair count, so the budget caps the pairs quoted
+        pair_indices = self._pairs_to_scan(1)
+        if not pair_indices:
+            return []
+        amounts = self._pair_amounts(loan_budget, pair_indices)
+        # The lens takes one amounts array per call: pairs borrowing the same sizes share a call
+        groups: Dict[Tuple[int, ...], List[int]] = {}
+        for pair_index in pair_indices:
+            groups.setdefault(tuple(amounts[pair_index]), []).append(pair_index)
+
+        lens = self._contract(self.lens_address, ARBITRAGE_LENS_ABI)
+        self.scan_count += len(pair_indices)
+        results = []
+        for sizes, indices in groups.items():
+            pairs = [self.tokens[i] for i in indices]
+            with tracer.span('quoting'):
+                blob = lens.functions.scan(
+                    [self.dex_configs[name]['factory'] for name in dex_names],
+                    [30] * len(dex_names),
+                    [pair.token_a for pair in pairs],
+                    [pair.token_b for pair in pairs],
+                    list(sizes),
+                    int(self.min_profit_percentage * 100)
+                ).call()
+            results.extend(result._replace(pair_index=indices[result.pair_index])
+                           for result in iter_lens_results(blob))
+
+        with tracer.span('filtering'):
+            self._record_pair_scans(pair_indices, results, amounts)
+            return self._opportunities_from_results(results, dex_names, amounts)
+
+    def _record_pair_scans(self, pair_indices: List[int], results, amounts: Dict[int, List[int]],
+                           prices: Optional[Dict[int, Tuple]] = None):
+        """Feed hits and best spreads of a reserve-table or lens scan back to the pair scheduler"""
+        if self.pair_scheduler is None:
+            return
+        best_bps: Dict[int, float] = {}
+        for result in results:
+            bps = result.profit * 10000 / amounts[result.pair_index][result.amount_index]
+            best_bps[result.pair_index] = max(best_bps.get(result.pair_index, 0.0), bps)
+        for pair_index in pair_indices:
+            price, spread_bps = (prices or {}).get(pair_index, (None, None))
+            hit = pair_index in best_bps
+            self.pair_scheduler.record(pair_index, hit, price, spread_bps if spread_bps is not None
+                                       else best_bps.get(pair_index))
+
+    def _opportunities_from_results(self, results, dex_names: List[str],
+                                    amounts: Dict[int, List[int]]) -> List[ArbitrageOpportunity]:
+        """Turn (pair_index, dex_a, dex_b, amount_index, profit) records into opportunities"""
+        opportunities = []
+        for result in results:
+            pair = self.tokens[result.pair_index]
+            threshold = self._min_profit(pair.token_a)
+            if threshold is None or result.profit < threshold:
+                continue
+            amount_in = amounts[result.pair_index][result.amount_index]
+            opportunities.append(ArbitrageOpportunity(
+                token_pair=pair,
+                dex_a=dex_names[result.dex_a],
+                dex_b=dex_names[result.dex_b],
+                amount_in=amount_in,
+                expected_profit=result.profit,
+                profit_percentage=result.profit * 100 / amount_in,
+                gas_estimate=200000  # Estimated gas
+            ))
+            self.opportunities_found += 1
+            logger.info("Found opportunity: %s/%s %s->%s - Profit: %.4f %s",
+                        pair.symbol_a, pair.symbol_b, dex_names[result.dex_a],
+                        dex_names[result.dex_b], self.scales.to_float(pair.token_a, result.profit), pair.symbol_a)
 
         return opportunities
 
-    async def execute_arbitrage(self, opportunity: ArbitrageOpportunity) -> bool:
+    def _refresh_pending_state(self, dex_names: List[str]):
+        """Rebase the pending-state engine on each new block and feed it new pending swaps"""
+        block_number = self.w3.eth.block_number
+        last_block = self.pending_engine.block_number
+        if block_number != last_block:
+            confirmed = []
+            for pair in self.tokens:
+                for dex in dex_names:
+                    state = self._pool_state(dex, pair.token_a, pair.token_b)
+                    if state is None:
+                        continue
+                    confirmed.append((dex, pair.token_a, pair.token_b, state))
+            # Every block since the last refresh, so swaps mined or replaced in a skipped block are dropped
+            # too; blocks past the age limit are not read, their swaps are evicted by age anyway
+            included, mined_nonces = [], {}
+            first = block_number
+            if last_block:
+                first = max(last_block + 1, block_number - self.pending_engine.max_age_blocks)
+            for number in range(first, block_number + 1):
+                for tx in self.w3.eth.get_block(number, full_transactions=True)['transactions']:
+                    included.append(tx['hash'])
+                    sender = tx['from'].lower()
+                    mined_nonces[sender] = max(mined_nonces.get(sender, -1), tx['nonce'])
+            self.pending_engine.on_block(block_number, confirmed, included, mined_nonces)
+
+            accuracy = self.pending_engine.accuracy
+            if accuracy.blocks and accuracy.blocks % 100 == 0:
+                logger.info("Pending-state accuracy: %s", accuracy.as_dict())
+
+        if self._pending_poller is None:
+            self._pending_poller = PendingTxPoller(self.w3)
+        for tx in self._pending_poller.poll():
+            self.pending_engine.on_pending(tx)
+
+    def _refresh_sharded_reserves(self, dex_names: List[str], pair_indices: List[int]) -> Dict[int, Tuple]:
+        """
+        Push current (or projected) reserves, oriented to each pair's token_a,
+        into the shared table. Returns (mid price, cross-DEX spread bps) per pair.
+        """
+        if self.pending_engine is not None:
+            self._refresh_pending_state(dex_names)
+
+        prices = {}
+        for pair_index in pair_indices:
+            pair = self.tokens[pair_index]
+            reserves = []
+            for dex_index, dex in enumerate(dex_names):
+                if self.pending_engine is not None:
+                    state = self.pending_engine.projected(dex, pair.token_a, pair.token_b)
+                else:
+                    state = self._pool_state(dex, pair.token_a, pair.token_b)
+                reserve_a, reserve_b = state.reserves_for(pair.token_a) if state is not None else (0, 0)
+                self._sharded_scanner.update(pair_index, dex_index, reserve_a, reserve_b)
+                reserves.append((reserve_a, reserve_b))
+            prices[pair_index] = price_and_spread(reserves)
+        return prices
+
+    def _scan_sharded(self, loan_budget: Amount) -> List[ArbitrageOpportunity]:
+        """Quote every pair, DEX ordering and size across SCAN_WORKERS processes"""
+        dex_names = self.v2_dexes
+
+        if self._sharded_scanner is None:
+            self._sharded_scanner = ShardedScanner(len(self.tokens), len(dex_names), self.scan_workers)
+        # Each pair costs one reserve read per DEX
+        pair_indices = self._pairs_to_scan(len(dex_names))
+        if not pair_indices:
+            return []
+        self.scan_count += len(pair_indices)
+        # Sized per borrowed token; pairs skipped this block get no sizes, so workers pass over them
+        amounts = self._pair_amounts(loan_budget, pair_indices)
+
+        with tracer.span('reserve_refresh'):
+            prices = self._refresh_sharded_reserves(dex_names, pair_indices)
+        with tracer.span('quoting'):
+            candidates = self._sharded_scanner.scan(
+                amounts, [30] * len(dex_names), int(self.min_profit_percentage * 100)
+            )
+        with tracer.span('filtering'):
+            self._record_pair_scans(pair_indices, candidates, amounts, prices)
+            return self._opportunities_from_results(candidates, dex_names, amounts)
+
+    def _discover_v3_pools(self):
+        """Find V3 pools for every pair and fee tier, snapshotting any not yet cached"""
+        factory = self._contract(self.dex_configs['uniswap_v3']['factory'], UNISWAP_V3_FACTORY_ABI)
+        snapshot_block = self.w3.eth.block_number
+        if not self.v3_cache.pools:
+            self.v3_cache.last_block = snapshot_block
+
+        for pair in self.tokens:
+            for fee in self.v3_fee_tiers:
+                pool_address = factory.functions.getPool(pair.token_a, pair.token_b, fee).call()
+                if int(pool_address, 16) == 0:
+                    continue
+                self.v3_pools[(pair.token_a, pair.token_b, fee)] = pool_address
+                if self.v3_cache.get(pool_address) is None:
+                    # Snapshot at the cache's block so log replay continues from there
+                    self.v3_cache.add_pool(load_pool_from_chain(
+                        self.w3, pool_address, block_identifier=self.v3_cache.last_block
+                    ))
+        logger.info("Tracking %d Uniswap V3 pools", len(self.v3_pools))
+
+    def _sync_v3_pools(self):
+        """Bring the V3 tick cache up to the chain head from pool logs"""
+        if not self.v3_pools:
+            self._discover_v3_pools()
+        with tracer.span('v3_sync'):
+            if self.v3_cache.sync(self.w3):
+                self.v3_cache.save(self.v3_cache_file)
+
+    def _scan_v3_spreads(self, loan_budget: Amount) -> List[ArbitrageOpportunity]:
+        """
+        Compare V2 <-> V3 round trips in memory. The flash loan contracts only
+        route through V2 routers, so these are reported but not executed.
+        """
+        opportunities = []
+        min_profit_bps = 10000 + int(self.min_profit_percentage * 100)
+
+        with tracer.span('quoting'):
+            for (token_a, token_b, fee), pool_address in self.v3_pools.items():
+                pool = self.v3_cache.get(pool_address)
+                pair = next(p for p in self.tokens if (p.token_a, p.token_b) == (token_a, token_b))
+                amount_in = self._loan_amount(loan_budget, 1000, token_a)
+                min_out = amount_in * min_profit_bps // 10000
+                for dex in ('quickswap', 'sushiswap'):
+                    v2 = self._pool_state(dex, token_a, token_b)
+                    if v2 is None:
+                        continue
+                    try:
+                        via_v3 = pool.quote_exact_input(token_b, get_amount_out(amount_in, *v2.reserves_for(token_a)))
+                        via_v2 = get_amount_out(pool.quote_exact_input(token_a, amount_in), *v2.reserves_for(token_b))
+                    except LookupError as e:
+                        logger.debug("Skipping V3 quote: %s", e)
+                        continue
+                    for dex_a, dex_b, amount_out in ((dex, 'uniswap_v3', via_v3), ('uniswap_v3', dex, via_v2)):
+                        if amount_out <= min_out:
+                            continue
+                        opportunities.append(ArbitrageOpportunity(
+                            token_pair=pair,
+                            dex_a=dex_a,
+                            dex_b=dex_b,
+                            amount_in=amount_in,
+                            expected_profit=amount_out - amount_in,
+                            profit_percentage=(amount_out - amount_in) * 100 / amount_in,
+                            gas_estimate=250000  # Estimated gas
+                        ))
+                        self.v3_opportunities_found += 1
+                        logger.info("V3 spread: %s/%s %s->%s (fee %d) - Profit: %.4f %s",
+                                    pair.symbol_a, pair.symbol_b, dex_a, dex_b, fee,
+                                    self.scales.to_float(token_a, amount_out - amount_in), pair.symbol_a)
+
+        return opportunities
+
+    async def execute_arbitrage(self, opportunity: ArbitrageOpportunity, sender: Optional[Sender] = None) -> bool:
         """Execute arbitrage opportunity using flash loan"""
         try:
             if not self.contract_address:
@@ -343,110 +1083,279 @@ class PolygonArbitrageScanner:
                 return False
 
             # Create contract instance
-            contract = self.w3.eth.contract(
-                address=self.contract_address,
-                abi=self.contract_abi
-            )
+            contract = self._contract(self.contract_address, self.contract_abi)
 
             # Prepare parameters
             tokens = [opportunity.token_pair.token_a]
             amounts = [opportunity.amount_in]
 
-            # Encode arbitrage parameters
-            arbitrage_params = {
-                'tokenA': opportunity.token_pair.token_a,
-                'tokenB': opportunity.token_pair.token_b,
-                'dexA': self.dex_configs['quickswap']['router'],
-                'dexB': self.dex_configs['sushiswap']['router'],
-                'amountIn': opportunity.amount_in,
-                'minProfitBps': int(opportunity.profit_percentage * 100)  # Convert to basis points
-            }
+            if self.execution_mode == 'direct':
+                contract_call = await self._blocking(self._packed_call, contract, opportunity)
+                if contract_call is None:
+                    logger.info("Opportunity no longer profitable at current reserves")
+                    return False
+            else:
+                # ABI-encode the ArbitrageParams struct decoded by receiveFlashLoan
+                leg = self._arbitrage_leg(opportunity, int(opportunity.profit_percentage * 100))
+                from eth_abi import encode as abi_encode
+                user_data = abi_encode([ARBITRAGE_PARAMS_TYPE], [leg])
+                flash_loan = getattr(contract.functions, LENDERS[opportunity.lender].single_method)
+                contract_call = flash_loan(tokens, amounts, user_data)
+
+            # In a thread so other senders' trades and the scan keep going during the receipt wait
+            result = await self._blocking(
+                self._send_contract_transaction, contract_call, [opportunity], 'single', opportunity.lender, sender
+            )
+            if result is None:
+                return False
+            tx_hash, receipt = result
 
-            # This would need proper ABI encoding in production
-            user_data = json.dumps(arbitrage_params).encode()
+            if receipt['status'] == 1:
+                self.trades_executed += 1
+                # What the contract booked, not what the quote promised
+                profits = self._realized_profits(contract, receipt)
+                realized = sum(profit for _, profit in profits)
+                if self.store is not None:
+                    self.store.record_receipt(tx_hash.hex(), receipt, 1, profits)
+                token = opportunity.token_pair.token_a
+                profit = self.scales.amount(token, realized)
+                self.total_profit += float(self._native_value(token, realized))
 
-            # Estimate gas
-            gas_estimate = contract.functions.executeBalancerFlashLoan(
-                tokens, amounts, user_data
-            ).estimate_gas({'from': self.account.address})
+                logger.info(f"✅ Arbitrage executed successfully! "
+                          f"Profit: {profit:.4f} {opportunity.token_pair.symbol_a} "
+                          f"(expected {self.scales.amount(token, opportunity.expected_profit):.4f}) | TX: {tx_hash.hex()}")
+                return True
+            else:
+                if self.store is not None:
+                    self.store.record_receipt(tx_hash.hex(), receipt, 0)
+                logger.error(f"❌ Transaction failed: {tx_hash.hex()}")
+                return False
 
-            # Check gas price
-            gas_price = self.w3.eth.gas_price
-            if self.w3.from_wei(gas_price, 'gwei') > self.max_gas_price_gwei:
-                logger.warning(f"Gas price too high: {self.w3.from_wei(gas_price, 'gwei')} gwei")
+        except Exception as e:
+            logger.error(f"Error executing arbitrage: {str(e)}")
+            return False
+
+    async def execute_batch_arbitrage(self, opportunities: List[ArbitrageOpportunity],
+                                      sender: Optional[Sender] = None) -> bool:
+        """Execute several non-conflicting opportunities inside one flash loan"""
+        try:
+            if not self.contract_address:
+                logger.error("Contract address not configured")
                 return False
 
-            # Execute transaction
-            transaction = contract.functions.executeBalancerFlashLoan(
-                tokens, amounts, user_data
-            ).build_transaction({
-                'from': self.account.address,
-                'gas': gas_estimate,
-                'gasPrice': gas_price,
-                'nonce': self.w3.eth.get_transaction_count(self.account.address)
-            })
+            contract = self._contract(self.contract_address, self.contract_abi)
 
-            # Sign and send transaction
-            signed_txn = self.w3.eth.account.sign_transaction(transaction, self.private_key)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
+            # One loan entry per borrowed asset covering all legs that start in it
+            loan_amounts: Dict[str, int] = {}
+            for opportunity in opportunities:
+                token = opportunity.token_pair.token_a
+                loan_amounts[token] = loan_amounts.get(token, 0) + opportunity.amount_in
 
-            # Wait for confirmation
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+            # Legs below the configured threshold are rolled back on-chain
+            min_profit_bps = int(self.min_profit_percentage * 100)
+            legs = [self._arbitrage_leg(opportunity, min_profit_bps) for opportunity in opportunities]
+
+            quote = await self._blocking(lambda: self.lender_selector.select_batch(
+                loan_amounts, self.w3.eth.gas_price, prices=self.prices))
+            if quote is None:
+                logger.info("No lender can fund the batch at a known cost")
+                return False
+
+            batch_loan = getattr(contract.functions, LENDERS[quote.lender].batch_method)
+            result = await self._blocking(
+                self._send_contract_transaction,
+                batch_loan(list(loan_amounts.keys()), list(loan_amounts.values()), legs),
+                opportunities, 'batch', quote.lender, sender
+            )
+            if result is None:
+                return False
+            tx_hash, receipt = result
 
             if receipt['status'] == 1:
-                self.trades_executed += 1
-                profit_matic = Decimal(self.w3.from_wei(opportunity.expected_profit, 'ether'))
+                executed = len(opportunities)
+                for log in contract.events.BatchExecuted().process_receipt(receipt):
+                    executed = log['args']['executed']
+                self.trades_executed += executed
+                profits = self._realized_profits(contract, receipt)
+                if self.store is not None:
+                    self.store.record_receipt(tx_hash.hex(), receipt, executed, profits)
+                # Legs profit in their own tokens: each is valued in MATIC through its price
+                profit_matic = Amount(0, NATIVE_DECIMALS)
+                for token, profit in profits:
+                    profit_matic += self._native_value(token, profit)
                 self.total_profit += float(profit_matic)
 
-                logger.info(f"✅ Arbitrage executed successfully! "
-                          f"Profit: {profit_matic:.4f} MATIC | TX: {tx_hash.hex()}")
+                logger.info(f"✅ Batch executed: {executed}/{len(opportunities)} legs | "
+                            f"Profit: {profit_matic:.4f} MATIC | TX: {tx_hash.hex()}")
                 return True
             else:
-                logger.error(f"❌ Transaction failed: {tx_hash.hex()}")
+                if self.store is not None:
+                    self.store.record_receipt(tx_hash.hex(), receipt, 0)
+                logger.error(f"❌ Batch transaction failed: {tx_hash.hex()}")
                 return False
 
         except Exception as e:
-            logger.error(f"Error executing arbitrage: {str(e)}")
+            logger.error(f"Error executing batch arbitrage: {str(e)}")
             return False
 
-    async def continuous_scan(self):
-        """Main scanning loop"""
-        logger.info("🚀 Starting continuous arbitrage scanning...")
+    async def drain(self):
+        """Wait for the trades still in flight on senders"""
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+        self._in_flight = {}
+
+    def close(self):
+        """Stop scan worker processes, release the shared reserve table and persist the registry and trade history"""
+        self._executor.shutdown(wait=False)
+        self.registry.save()
+        if self.store is not None:
+            self._save_counters()
+            self._publish_reports()
+            self.store.flush(timeout=10)
+        if self.rpc_pool is not None:
+            self.rpc_pool.close()
+            self.rpc_pool = None
+        if self._sharded_scanner is not None:
+            self._sharded_scanner.close()
+            self._sharded_scanner = None
+
+    def _maintain_senders(self, gas_price: int):
+        """Every EXECUTOR_REFRESH_SECONDS re-sync sender nonces and balances and top up senders low on gas"""
+        if time.time() - self._senders_refreshed < self.sender_refresh_interval:
+            return
+        if not self._senders_refreshed and self.contract_address:
+            self.senders.authorize(self._contract(self.contract_address, self.contract_abi))
+        self._senders_refreshed = time.time()
+        self.senders.refresh()
+        self.senders.rebalance(gas_price)
+
+    def _dispatch_to_senders(self, block_number: int, gas_price: int) -> int:
+        """
+        Start a trade on every idle sender without waiting for it, skipping
+        routes through pools a trade still in flight is moving. Returns the
+        number of trades started.
+        """
+        self._in_flight = {task: pools for task, pools in self._in_flight.items() if not task.done()}
+        started = 0
+        # One executor worker stays free for the next scan
+        while len(self._in_flight) < self.max_tasks - 1:
+            sender = self.senders.acquire(200000 * gas_price)
+            if sender is None:
+                break
+            batch = self.scheduler.next_batch(block_number, frozenset().union(*self._in_flight.values()))
+            if not batch:
+                self.senders.release(sender)
+                break
 
-        while True:
-            try:
-                start_time = time.time()
+            best_opportunity = batch[0]
+            logger.info("🎯 %s/%s - %.2f%% profit (%d legs) on sender %s", best_opportunity.token_pair.symbol_a,
+                        best_opportunity.token_pair.symbol_b, best_opportunity.profit_percentage, len(batch),
+                        sender.address)
+            task = asyncio.create_task(self._execute_on_sender(batch, sender))
+            self._in_flight[task] = frozenset().union(*(route_pools(opportunity) for opportunity in batch))
+            started += 1
+        return started
 
-                # Scan for opportunities
-                opportunities = await self.scan_arbitrage_opportunities()
+    async def _execute_on_sender(self, batch: List[ArbitrageOpportunity], sender: Sender) -> bool:
+        try:
+            if len(batch) > 1:
+                return await self.execute_batch_arbitrage(batch, sender)
+            return await self.execute_arbitrage(batch[0], sender)
+        finally:
+            self.senders.release(sender)
+
+    def _save_counters(self):
+        self.store.save_counters({self._counter_prefix + name: getattr(self, name) for name in COUNTERS})
+
+    def _publish_reports(self):
+        self.store.save_report('trace', tracer.summary_dict(), self._report_scope)
+        self.store.save_report('quarantine', self.failures.quarantine(), self._report_scope)
+
+    def _scan_cycle(self) -> Tuple[int, int]:
+        """Blocking part of a scan loop iteration: quote, record and queue opportunities; returns block and gas price"""
+        with tracer.span('scan'):
+            opportunities = self._scan_opportunities()
+        self.registry.save()
+
+        if self.v3_enabled:
+            try:
+                self._sync_v3_pools()
+                loan_budget, _ = self.calculate_loan_budget()
+                if loan_budget:
+                    self._scan_v3_spreads(loan_budget)
+            except Exception as e:
+                logger.debug("Uniswap V3 scan failed: %s", e)
+
+        block_number = self.w3.eth.block_number
+        gas_price = self.w3.eth.gas_price
+        if opportunities and self.store is not None:
+            self.store.record_opportunities(opportunities, block_number)
+        if opportunities:
+            with tracer.span('filtering'):
+                opportunities = self.apply_lender_costs(opportunities, gas_price, block_number)
+
+        # Queue by net profit; the best non-conflicting set still valid this block is taken by scan_once
+        with tracer.span('scheduling'):
+            self.scheduler.submit(opportunities, block_number, gas_price)
+            if self.senders is not None:
+                self._maintain_senders(gas_price)
+        return block_number, gas_price
+
+    async def scan_once(self) -> int:
+        """One scan loop iteration: scan, then start (or make) the trades it scheduled; returns the block scanned"""
+        start_time = time.time()
+        block_number, gas_price = await self._blocking(self._scan_cycle)
+
+        with tracer.span('scheduling'):
+            if self.senders is not None:
+                # Trades run in the background, one per idle sender
+                started = self._dispatch_to_senders(block_number, gas_price)
+                batch = None
+            else:
+                started = 0
+                batch = self.scheduler.next_batch(block_number)
 
-                # Execute most profitable opportunity
-                if opportunities:
-                    # Sort by profit percentage
-                    opportunities.sort(key=lambda x: x.profit_percentage, reverse=True)
-                    best_opportunity = opportunities[0]
+        if batch:
+            best_opportunity = batch[0]
 
-                    logger.info(f"🎯 Best opportunity: {best_opportunity.token_pair.symbol_a}/"
-                              f"{best_opportunity.token_pair.symbol_b} - "
-                              f"{best_opportunity.profit_percentage:.2f}% profit")
+            logger.info(f"🎯 Best opportunity: {best_opportunity.token_pair.symbol_a}/"
+                      f"{best_opportunity.token_pair.symbol_b} - "
+                      f"{best_opportunity.profit_percentage:.2f}% profit")
 
-                    # Execute the trade
-                    success = await self.execute_arbitrage(best_opportunity)
+            # Execute the trade, batching non-conflicting opportunities into one loan
+            if len(batch) > 1:
+                success = await self.execute_batch_arbitrage(batch)
+            else:
+                success = await self.execute_arbitrage(best_opportunity)
+
+            if success:
+                # Brief pause after successful trade
+                await asyncio.sleep(2)
+        elif not started and not self._in_flight:
+            logger.info("🔍 No profitable opportunities found")
+
+        # Performance logging
+        scan_time = time.time() - start_time
+        logger.info("📊 [%s] Scan completed in %.2fs | Scans: %d | Opportunities: %d | "
+                    "Trades: %d | Profit: %.4f MATIC | Quarantined routes: %d",
+                    self.chain.name, scan_time, self.scan_count, self.opportunities_found,
+                    self.trades_executed, self.total_profit, len(self.failures.routes))
+        if self.store is not None:
+            self._save_counters()
+            self._publish_reports()
+        return block_number
 
-                    if success:
-                        # Brief pause after successful trade
-                        await asyncio.sleep(2)
-                else:
-                    logger.info("🔍 No profitable opportunities found")
+    async def continuous_scan(self):
+        """Main scanning loop"""
+        logger.info("🚀 Starting continuous arbitrage scanning...")
 
-                # Performance logging
-                scan_time = time.time() - start_time
-                logger.info(f"📊 Scan completed in {scan_time:.2f}s | "
-                          f"Scans: {self.scan_count} | Opportunities: {self.opportunities_found} | "
-                          f"Trades: {self.trades_executed} | Profit: {self.total_profit:.4f} MATIC")
+        while True:
+            try:
+                await self.scan_once()
 
                 # Wait before next scan
-                await asyncio.sleep(self.scan_interval)
+                with tracer.span('sleep'):
+                    await asyncio.sleep(self.scan_interval)
 
             except KeyboardInterrupt:
                 logger.info("👋 Shutting down scanner...")
@@ -454,8 +1363,13 @@ class PolygonArbitrageScanner:
             except Exception as e:
                 logger.error(f"Error in main loop: {str(e)}")
                 await asyncio.sleep(5)  # Wait before retrying
-import aiohttp
 
 if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv()
+    configure_logging()
     scanner = PolygonArbitrageScanner()
-    asyncio.run(scanner.continuous_scan())
\ No newline at end of file
+    try:
+        asyncio.run(scanner.continuous_scan())
+    finally:
+        scanner.close()
\ No newline at end of file
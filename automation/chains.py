@@ -0,0 +1,212 @@
+"""
+Per-chain scanner configuration and a runner that drives several chains from
+one asyncio event loop.
+
+Each chain gets its own PolygonArbitrageScanner (token registry, RPC pool,
+gas price reads, contract addresses, failure tracker) and its own thread pool
+of `max_tasks` workers for the blocking RPC work of scans and trades, so a
+slow or stalled chain only ever waits on itself.
+
+CHAINS_FILE points at a JSON list of chains (or {"chains": [...]}); string
+values may reference environment variables as ${NAME}:
+
+    [{"name": "polygon", "chain_id": 137, "rpc_urls": ["${ALCHEMY_API_URL_MAINNET}"],
+      "contract_address": "${ARBITRAGE_CONTRACT_ADDRESS}", "scan_interval": 1},
+     {"name": "mumbai", "chain_id": 80001, "rpc_urls": ["https://rpc-mumbai.maticvigil.com"],
+      "tokens": [...], "dexes": {...}, "scan_interval": 5, "max_tasks": 2}]
+
+    python -m automation.chains
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass, fields
+from typing import Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+WMATIC_ADDRESS = '0x0d500B1d8E8eF31E21C99d1Db9A6444d3ADf1270'
+BALANCER_VAULT_ADDRESS = '0xBA12222222228d8Ba445958a75a0704d566BF2C8'
+AAVE_POOL_ADDRESS = '0x794a61358D6845594F94dc1DB02A252b5b4814aD'
+DEFAULT_MAX_TASKS = 8
+
+_ENV_VAR = re.compile(r'\$\{(\w+)\}')
+
+
+@dataclass
+class ChainConfig:
+    name: str
+    chain_id: int
+    rpc_urls: List[str]
+    contract_address: Optional[str] = None
+    lens_address: Optional[str] = None
+    balancer_vault_address: str = BALANCER_VAULT_ADDRESS
+    aave_pool_address: str = AAVE_POOL_ADDRESS
+    wrapped_native: str = WMATIC_ADDRESS     # gas token, the only one profit is netted against gas in
+    tokens: Optional[List[Dict]] = None      # [{'address', 'symbol', 'decimals'}]; None scans the Polygon list
+    dexes: Optional[Dict[str, Dict]] = None  # name -> {'router', 'factory', 'name'}; None uses the Polygon DEXes
+    scan_interval: float = 1.0
+    max_tasks: int = DEFAULT_MAX_TASKS       # threads for this chain's RPC work: one scan plus trades in flight
+    registry_file: str = 'scanner_registry.json'
+
+    @classmethod
+    def from_env(cls) -> 'ChainConfig':
+        """The single chain configured by the scanner's environment variables"""
+        rpc_url = os.getenv('ALCHEMY_API_URL_MAINNET')
+        rpc_urls = [url.strip() for url in os.getenv('RPC_URLS', '').split(',') if url.strip()]
+        return cls(
+            name=os.getenv('CHAIN_NAME', 'polygon'),
+            chain_id=int(os.getenv('CHAIN_ID', '137')),
+            rpc_urls=rpc_urls or ([rpc_url] if rpc_url else []),
+            contract_address=os.getenv('ARBITRAGE_CONTRACT_ADDRESS'),
+            lens_address=os.getenv('LENS_CONTRACT_ADDRESS'),
+            balancer_vault_address=os.getenv('BALANCER_VAULT_ADDRESS', BALANCER_VAULT_ADDRESS),
+            aave_pool_address=os.getenv('AAVE_POOL_ADDRESS', AAVE_POOL_ADDRESS),
+            scan_interval=float(os.getenv('SCAN_INTERVAL_SECONDS', '1')),
+            max_tasks=int(os.getenv('CHAIN_MAX_TASKS', DEFAULT_MAX_TASKS)),
+            registry_file=os.getenv('REGISTRY_CACHE_FILE', 'scanner_registry.json'),
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ChainConfig':
+        known = {f.name for f in fields(cls)}
+        unknown = set(data) - known
+        if unknown:
+            raise ValueError("Unknown chain settings for %s: %s" % (data.get('name'), ', '.join(sorted(unknown))))
+        values = {key: _expand(value) for key, value in data.items()}
+        if isinstance(values.get('rpc_urls'), str):
+            values['rpc_urls'] = [url.strip() for url in values['rpc_urls'].split(',') if url.strip()]
+        # An unset ${NAME} expands to an empty string: not configured
+        for key in ('contract_address', 'lens_address'):
+            values[key] = values.get(key) or None
+        return cls(**values)
+
+
+def _expand(value):
+    if isinstance(value, str):
+        return _ENV_VAR.sub(lambda match: os.getenv(match.group(1), ''), value)
+    if isinstance(value, list):
+        return [_expand(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _expand(item) for key, item in value.items()}
+    return value
+
+
+def load_chains(path: Optional[str] = None) -> List[ChainConfig]:
+    """Chains from CHAINS_FILE, or the single env-configured chain when no file is set"""
+    path = path if path is not None else os.getenv('CHAINS_FILE', '')
+    if not path:
+        return [ChainConfig.from_env()]
+    with open(path) as f:
+        data = json.load(f)
+    chains = [ChainConfig.from_dict(entry) for entry in (data['chains'] if isinstance(data, dict) else data)]
+    names = [chain.name for chain in chains]
+    if len(set(names)) != len(names):
+        raise ValueError("Chain names must be unique: %s" % ', '.join(names))
+    return chains
+
+
+class MultiChainScanner:
+    """
+    Runs one scan loop per chain as concurrent tasks on the current event
+    loop. Each loop paces itself on its own chain's `scan_interval`; its
+    blocking work runs on that scanner's private executor, so the loops only
+    share the event loop thread, never a worker. `stats` records cycles,
+    errors, cycle times, the longest gap between cycle starts and the blocks
+    seen per chain.
+    """
+
+    def __init__(self, scanners: Sequence, error_backoff: float = 5.0):
+        self.scanners = list(scanners)
+        self.error_backoff = error_backoff
+        self.stats: Dict[str, Dict] = {
+            scanner.chain.name: {'cycles': 0, 'errors': 0, 'last_block': None, 'blocks': 0,
+                                 'last_cycle_s': 0.0, 'max_cycle_s': 0.0, 'max_gap_s': 0.0}
+            for scanner in self.scanners
+        }
+        # Created by run(): before Python 3.10 an Event binds to the loop current at construction
+        self._stop: Optional[asyncio.Event] = None
+
+    def stop(self):
+        if self._stop is not None:
+            self._stop.set()
+
+    async def _drive(self, scanner):
+        stats = self.stats[scanner.chain.name]
+        previous = None
+        while not self._stop.is_set():
+            started = time.monotonic()
+            if previous is not None:
+                stats['max_gap_s'] = max(stats['max_gap_s'], started - previous)
+            previous = started
+            delay = scanner.chain.scan_interval
+            try:
+                block_number = await scanner.scan_once()
+                stats['cycles'] += 1
+                if block_number is not None and block_number != stats['last_block']:
+                    stats['last_block'] = block_number
+                    stats['blocks'] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                stats['errors'] += 1
+                logger.error("[%s] Error in scan loop: %s", scanner.chain.name, e)
+                delay = self.error_backoff
+            elapsed = time.monotonic() - started
+            stats['last_cycle_s'] = elapsed
+            stats['max_cycle_s'] = max(stats['max_cycle_s'], elapsed)
+            try:
+                await asyncio.wait_for(self._stop.wait(), max(0.0, delay - elapsed))
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self, duration: Optional[float] = None):
+        """Scan every chain until `stop()` (or for `duration` seconds); in-flight trades are awaited"""
+        self._stop = asyncio.Event()
+        tasks = [asyncio.create_task(self._drive(scanner), name='scan-%s' % scanner.chain.name)
+                 for scanner in self.scanners]
+        try:
+            if duration is None:
+                await self._stop.wait()
+            else:
+                try:
+                    await asyncio.wait_for(self._stop.wait(), duration)
+                except asyncio.TimeoutError:
+                    self._stop.set()
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for scanner in self.scanners:
+                await scanner.drain()
+
+    def close(self):
+        for scanner in self.scanners:
+            scanner.close()
+
+
+def main():
+    from dotenv import load_dotenv
+
+    from automation.arbitrage_scanner import PolygonArbitrageScanner
+    from automation.logging_pipeline import configure_logging
+
+    load_dotenv()
+    configure_logging()
+    chains = load_chains()
+    logger.info("🚀 Scanning %d chains: %s", len(chains), ', '.join('%s (%d)' % (c.name, c.chain_id) for c in chains))
+    runner = MultiChainScanner([PolygonArbitrageScanner(chain) for chain in chains])
+    try:
+        asyncio.run(runner.run())
+    except KeyboardInterrupt:
+        logger.info("👋 Shutting down scanners...")
+    finally:
+        runner.close()
+
+
+if __name__ == '__main__':
+    main()
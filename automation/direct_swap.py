@@ -0,0 +1,101 @@
+from dataclasses import dataclass
+from typing import List, Tuple
+
+# Must match DirectSwap.LEG_SIZE in contracts/utils/DirectSwap.sol
+LEG_SIZE = 109
+MAX_UINT128 = 2**128 - 1
+
+UNISWAP_V2_FACTORY_ABI = [
+    {
+        "inputs": [
+            {"name": "tokenA", "type": "address"},
+            {"name": "tokenB", "type": "address"}
+        ],
+        "name": "getPair",
+        "outputs": [{"name": "pair", "type": "address"}],
+        "stateMutability": "view",
+        "type": "function"
+    }
+]
+
+UNISWAP_V2_PAIR_ABI = [
+    {
+        "inputs": [],
+        "name": "getReserves",
+        "outputs": [
+            {"name": "reserve0", "type": "uint112"},
+            {"name": "reserve1", "type": "uint112"},
+            {"name": "blockTimestampLast", "type": "uint32"}
+        ],
+        "stateMutability": "view",
+        "type": "function"
+    },
+    {
+        "inputs": [],
+        "name": "token0",
+        "outputs": [{"name": "", "type": "address"}],
+        "stateMutability": "view",
+        "type": "function"
+    }
+]
+
+
+@dataclass
+class PairState:
+    address: str
+    token0: str
+    reserve0: int
+    reserve1: int
+
+    def reserves_for(self, token_in: str) -> Tuple[int, int]:
+        """(reserve_in, reserve_out) when selling `token_in` into this pair"""
+        if token_in.lower() == self.token0.lower():
+            return self.reserve0, self.reserve1
+        return self.reserve1, self.reserve0
+
+
+def get_amount_out(amount_in: int, reserve_in: int, reserve_out: int, fee_bps: int = 30) -> int:
+    """UniswapV2 getAmountOut with integer math identical to the pair's K check"""
+    if amount_in <= 0 or reserve_in <= 0 or reserve_out <= 0:
+        return 0
+    amount_in_with_fee = amount_in * (10000 - fee_bps)
+    return (amount_in_with_fee * reserve_out) // (reserve_in * 10000 + amount_in_with_fee)
+
+
+def get_amount_in(amount_out: int, reserve_in: int, reserve_out: int, fee_bps: int = 30) -> int:
+    """UniswapV2 getAmountIn: input needed for `amount_out`, 0 if the pool cannot pay it"""
+    if amount_out <= 0 or reserve_in <= 0 or amount_out >= reserve_out:
+        return 0
+    return (reserve_in * amount_out * 10000) // ((reserve_out - amount_out) * (10000 - fee_bps)) + 1
+
+
+def pack_leg(token_a: str, token_b: str, pair_a: PairState, pair_b: PairState, amount_in: int) -> Tuple[bytes, int]:
+    """Pack one round trip for DirectSwap and return it with the final tokenA output"""
+    amount_out_a = get_amount_out(amount_in, *pair_a.reserves_for(token_a))
+    amount_out_b = get_amount_out(amount_out_a, *pair_b.reserves_for(token_b))
+    if max(amount_in, amount_out_a, amount_out_b) > MAX_UINT128:
+        raise ValueError("Amount does not fit in uint128")
+
+    flags = 0
+    if token_a.lower() == pair_a.token0.lower():
+        flags |= 1
+    if token_b.lower() == pair_b.token0.lower():
+        flags |= 2
+
+    packed = b''.join((
+        bytes.fromhex(pair_a.address[2:]),
+        bytes.fromhex(pair_b.address[2:]),
+        bytes.fromhex(token_b[2:]),
+        amount_in.to_bytes(16, 'big'),
+        amount_out_a.to_bytes(16, 'big'),
+        amount_out_b.to_bytes(16, 'big'),
+        bytes((flags,))
+    ))
+    return packed, amount_out_b
+
+
+def pack_legs(legs: List[bytes]) -> bytes:
+    data = b''.join(legs)
+    if len(data) % LEG_SIZE:
+        raise ValueError("Packed legs must be a multiple of %d bytes" % LEG_SIZE)
+    return data
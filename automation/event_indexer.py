@@ -0,0 +1,442 @@
+import argparse
+import collections
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from automation.jsonrpc import JsonRpcClient, JsonRpcError
+
+logger = logging.getLogger(__name__)
+
+# PolygonArbitrageEngine events: name -> (signature, indexed params, data params)
+EVENTS = {
+    'ArbitrageExecuted': ('ArbitrageExecuted(address,address,uint256,uint256,uint256)',
+                          [('tokenA', 'address'), ('tokenB', 'address')],
+                          [('amountIn', 'uint256'), ('profit', 'uint256'), ('timestamp', 'uint256')]),
+    'ModeChanged': ('ModeChanged(bool,uint256)',
+                    [], [('isHighRisk', 'bool'), ('timestamp', 'uint256')]),
+    'LegSkipped': ('LegSkipped(uint256,address,address)',
+                   [('index', 'uint256'), ('tokenA', 'address'), ('tokenB', 'address')], []),
+    'BatchExecuted': ('BatchExecuted(uint256,uint256,uint256)',
+                      [], [('legs', 'uint256'), ('executed', 'uint256'), ('timestamp', 'uint256')]),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS contract_events (
+    address TEXT NOT NULL,
+    block INTEGER NOT NULL,
+    block_hash TEXT NOT NULL,
+    tx_hash TEXT NOT NULL,
+    log_index INTEGER NOT NULL,
+    event TEXT NOT NULL,
+    args TEXT NOT NULL,
+    PRIMARY KEY (tx_hash, log_index)
+);
+CREATE INDEX IF NOT EXISTS contract_events_block ON contract_events (address, block);
+CREATE INDEX IF NOT EXISTS contract_events_event ON contract_events (event, block);
+
+CREATE TABLE IF NOT EXISTS indexer_checkpoints (
+    address TEXT PRIMARY KEY,
+    block INTEGER NOT NULL,
+    updated REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS indexer_blocks (
+    address TEXT NOT NULL,
+    block INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    PRIMARY KEY (address, block)
+);
+"""
+
+# Provider replies meaning "ask for a smaller range"
+RANGE_ERROR_MARKERS = ('more than', 'too many', 'range', 'limit', 'exceed', 'response size', 'timeout', 'timed out')
+
+
+@lru_cache(maxsize=1)
+def event_topics() -> Dict[str, str]:
+    """topic0 -> event name"""
+    from eth_utils import keccak
+    return {'0x' + keccak(text=signature).hex(): name for name, (signature, _, _) in EVENTS.items()}
+
+
+def _decode_word(word: str, kind: str):
+    if kind == 'address':
+        return '0x' + word[-40:]
+    if kind == 'bool':
+        return int(word, 16) != 0
+    # uint256 does not fit JSON numbers exactly
+    return str(int(word, 16))
+
+
+def decode_log(log: Dict) -> Optional[Tuple[str, Dict]]:
+    """(event name, args) of a PolygonArbitrageEngine log, None for anything else"""
+    topics = log.get('topics') or []
+    name = event_topics().get(topics[0].lower()) if topics else None
+    if name is None:
+        return None
+    _, indexed, data = EVENTS[name]
+    args = {param: _decode_word(topic[2:], kind) for (param, kind), topic in zip(indexed, topics[1:])}
+    payload = log.get('data', '0x')[2:]
+    for i, (param, kind) in enumerate(data):
+        args[param] = _decode_word(payload[64 * i:64 * (i + 1)], kind)
+    return name, args
+
+
+def _is_range_error(error: Exception) -> bool:
+    text = str(error).lower()
+    return isinstance(error, (JsonRpcError, TimeoutError, ConnectionError)) and \
+        any(marker in text for marker in RANGE_ERROR_MARKERS)
+
+
+class EventIndexer:
+    """
+    Indexes PolygonArbitrageEngine events into the trade store database.
+
+    Backfill splits the history into block ranges fetched with
+    `eth_getLogs` by `workers` threads; ranges the provider refuses (too
+    many results, range too wide, timeout) are halved and retried, quiet
+    ranges let the chunk size grow up to `max_chunk_size`. Results are
+    written in block order and the checkpoint only advances past ranges
+    that are fully stored, so an interrupted backfill resumes where it
+    stopped.
+
+    Backfill stops `reorg_window` blocks below the head. Following the
+    head, the hashes of the last `reorg_window` blocks are kept; when the
+    chain no longer has one of them, everything from that block on is
+    rolled back and indexed again.
+    """
+
+    def __init__(self, client: JsonRpcClient, address: str, db_path: str, start_block: int = 0,
+                 chunk_size: int = 2000, max_chunk_size: int = 100000, min_chunk_size: int = 1,
+                 workers: int = 4, reorg_window: int = 64):
+        self.client = client
+        self.address = address.lower()
+        self.db_path = db_path
+        self.start_block = start_block
+        self.chunk_size = chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.min_chunk_size = min_chunk_size
+        self.workers = workers
+        self.reorg_window = reorg_window
+        self.stats = {'requests': 0, 'splits': 0, 'events': 0, 'reorgs': 0, 'rolled_back': 0}
+        self._stats_lock = threading.Lock()
+
+        self.db = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript(SCHEMA)
+        self.db.commit()
+
+    # -- checkpoint ----------------------------------------------------------
+
+    @property
+    def checkpoint(self) -> int:
+        """Last block whose events are all stored"""
+        row = self.db.execute('SELECT block FROM indexer_checkpoints WHERE address = ?', (self.address,)).fetchone()
+        return row[0] if row else self.start_block - 1
+
+    def _set_checkpoint(self, block: int):
+        self.db.execute(
+            'INSERT INTO indexer_checkpoints (address, block, updated) VALUES (?, ?, ?) '
+            'ON CONFLICT(address) DO UPDATE SET block = excluded.block, updated = excluded.updated',
+            (self.address, block, time.time())
+        )
+
+    # -- fetching ------------------------------------------------------------
+
+    def _count(self, name: str, amount: int = 1):
+        with self._stats_lock:
+            self.stats[name] += amount
+
+    def _get_logs(self, from_block: int, to_block: int) -> List[Dict]:
+        self._count('requests')
+        return self.client.request('eth_getLogs', [{
+            'address': self.address,
+            'fromBlock': hex(from_block),
+            'toBlock': hex(to_block),
+            'topics': [list(event_topics())],
+        }]) or []
+
+    def _fetch_range(self, from_block: int, to_block: int) -> List[Dict]:
+        """Logs in [from_block, to_block], halving the range while the provider refuses it"""
+        try:
+            logs = self._get_logs(from_block, to_block)
+        except Exception as e:
+            if not _is_range_error(e) or to_block - from_block + 1 <= self.min_chunk_size:
+                raise
+            self._count('splits')
+            middle = (from_block + to_block) // 2
+            # Later chunks start at the size that worked
+            self.chunk_size = max(self.min_chunk_size, min(self.chunk_size, (to_block - from_block + 1) // 2))
+            return self._fetch_range(from_block, middle) + self._fetch_range(middle + 1, to_block)
+        if len(logs) < 1000 and to_block - from_block + 1 >= self.chunk_size:
+            self.chunk_size = min(self.max_chunk_size, self.chunk_size * 2)
+        return logs
+
+    def _store(self, logs: Sequence[Dict], checkpoint: int):
+        """Write decoded logs and move the checkpoint in one transaction"""
+        rows = []
+        for log in logs:
+            if log.get('removed'):
+                continue
+            decoded = decode_log(log)
+            if decoded is None:
+                continue
+            name, args = decoded
+            rows.append((self.address, int(log['blockNumber'], 16), log['blockHash'], log['transactionHash'],
+                         int(log['logIndex'], 16), name, json.dumps(args)))
+        with self.db:
+            self.db.executemany(
+                'INSERT OR REPLACE INTO contract_events (address, block, block_hash, tx_hash, log_index, event, args) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)', rows
+            )
+            self._set_checkpoint(checkpoint)
+        self._count('events', len(rows))
+
+    def head(self) -> int:
+        return int(self.client.request('eth_blockNumber'), 16)
+
+    # -- backfill ------------------------------------------------------------
+
+    def backfill(self, to_block: Optional[int] = None,
+                 progress: Optional[Callable[[int, int], None]] = None) -> int:
+        """
+        Index from the checkpoint to `to_block` (default: `reorg_window`
+        below the head) with concurrent chunked requests. Returns the new
+        checkpoint.
+        """
+        if to_block is None:
+            to_block = self.head() - self.reorg_window
+        next_block = self.checkpoint + 1
+        if next_block > to_block:
+            return self.checkpoint
+
+        pending = collections.deque()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while next_block <= to_block or pending:
+                # Keep a bounded window of ranges in flight, stored strictly in order
+                while next_block <= to_block and len(pending) < self.workers * 2:
+                    end = min(to_block, next_block + self.chunk_size - 1)
+                    pending.append((end, pool.submit(self._fetch_range, next_block, end)))
+                    next_block = end + 1
+                end, future = pending.popleft()
+                try:
+                    logs = future.result()
+                except Exception:
+                    for _, other in pending:
+                        other.cancel()
+                    raise
+                self._store(logs, end)
+                if progress is not None:
+                    progress(end, to_block)
+        return self.checkpoint
+
+    # -- following the head --------------------------------------------------
+
+    def _block_hashes(self, blocks: Sequence[int]) -> Dict[int, Optional[str]]:
+        results = self.client.batch(('eth_getBlockByNumber', [hex(block), False]) for block in blocks)
+        return {block: (result or {}).get('hash') for block, result in zip(blocks, results)}
+
+    def _check_reorg(self) -> Optional[int]:
+        """Roll back to the last stored block still on the chain; returns the first rolled-back block"""
+        stored = dict(self.db.execute(
+            'SELECT block, hash FROM indexer_blocks WHERE address = ? ORDER BY block', (self.address,)
+        ).fetchall())
+        if not stored:
+            return None
+        current = self._block_hashes(sorted(stored))
+        forked = next((block for block in sorted(stored) if current[block] != stored[block]), None)
+        if forked is None:
+            return None
+        if forked == min(stored):
+            logger.warning("Reorg deeper than %d blocks below %d; rolling back the whole window",
+                           self.reorg_window, forked)
+        self.rollback(forked)
+        self._count('reorgs')
+        return forked
+
+    def rollback(self, from_block: int):
+        """Forget events and block hashes from `from_block` on and index them again"""
+        with self.db:
+            removed = self.db.execute('DELETE FROM contract_events WHERE address = ? AND block >= ?',
+                                      (self.address, from_block)).rowcount
+            self.db.execute('DELETE FROM indexer_blocks WHERE address = ? AND block >= ?',
+                            (self.address, from_block))
+            self._set_checkpoint(min(self.checkpoint, from_block - 1))
+        self._count('rolled_back', removed)
+        logger.info("Rolled back %d events from block %d", removed, from_block)
+
+    def poll(self) -> int:
+        """
+        One follow step: undo any reorg, then index up to the head. Ranges
+        wider than the reorg window are backfilled first. Returns the number
+        of events stored.
+        """
+        events_before = self.stats['events']
+        self._check_reorg()
+        head = self.head()
+        if head - self.checkpoint > self.reorg_window:
+            self.backfill(head - self.reorg_window)
+        from_block = self.checkpoint + 1
+        if from_block > head:
+            return 0
+
+        logs = self._fetch_range(from_block, head)
+        hashes = self._block_hashes(list(range(from_block, head + 1)))
+        if any(log['blockHash'] != hashes.get(int(log['blockNumber'], 16)) for log in logs
+               if not log.get('removed')) or None in hashes.values():
+            # The chain moved between the two requests; the next poll sees a consistent view
+            logger.debug("Head changed while indexing %d-%d, retrying", from_block, head)
+            return 0
+
+        self._store(logs, head)
+        with self.db:
+            self.db.executemany('INSERT OR REPLACE INTO indexer_blocks (address, block, hash) VALUES (?, ?, ?)',
+                                [(self.address, block, block_hash) for block, block_hash in hashes.items()])
+            self.db.execute('DELETE FROM indexer_blocks WHERE address = ? AND block <= ?',
+                            (self.address, head - self.reorg_window))
+        return self.stats['events'] - events_before
+
+    def run(self, poll_interval: float = 2.0):
+        """Backfill, then follow the head until interrupted"""
+        started = time.time()
+        self.backfill(progress=lambda block, target: logger.info("Backfilled to %d / %d", block, target))
+        logger.info("Backfill done in %.1fs: %s", time.time() - started, self.stats)
+        while True:
+            try:
+                stored = self.poll()
+                if stored:
+                    logger.info("Indexed %d events up to block %d", stored, self.checkpoint)
+            except Exception as e:
+                logger.warning("Indexer poll failed: %s", e)
+            time.sleep(poll_interval)
+
+    def close(self):
+        self.db.close()
+
+
+# -- realized versus expected profit -------------------------------------------
+
+def reconcile_trades(db_path: str, limit: int = 50, before_block: Optional[int] = None) -> Dict:
+    """
+    Per-trade realized profit (ArbitrageExecuted events) next to the profit
+    the bot expected when it sent the transaction (trade store), newest
+    first. Profits are in base units of the loan token (the events'
+    tokenA): a batch across several tokens gives one item per token, and
+    totals are kept per token. Trades with no event realized nothing: the
+    contract only emits it when the profit after the charity share is
+    positive.
+    """
+    db = sqlite3.connect(db_path, timeout=30)
+    db.row_factory = sqlite3.Row
+    try:
+        has_trades = db.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'transactions'").fetchone()
+        filters = 'WHERE event = ?' + (' AND block < ?' if before_block is not None else '')
+        params = ['ArbitrageExecuted'] + ([before_block] if before_block is not None else [])
+        realized: Dict[Tuple[str, str], Dict] = {}
+        for row in db.execute('SELECT block, tx_hash, args FROM contract_events %s ORDER BY block DESC' % filters,
+                              params):
+            args = json.loads(row['args'])
+            trade = realized.setdefault((row['tx_hash'], args['tokenA'].lower()),
+                                        {'block': row['block'], 'legs': 0, 'realized_profit': 0})
+            trade['legs'] += 1
+            trade['realized_profit'] += int(args['profit'])
+
+        sent: Dict[Tuple[str, Optional[str]], Dict] = {}
+        if has_trades:
+            block_filter = 'AND r.block < ?' if before_block is not None else ''
+            for row in db.execute(
+                    'SELECT t.tx_hash, l.token_a, l.expected_profit, r.block, r.status FROM transactions t '
+                    'JOIN receipts r ON r.tx_hash = t.tx_hash JOIN trade_legs l ON l.tx_hash = t.tx_hash '
+                    'WHERE r.block IS NOT NULL %s' % block_filter,
+                    [before_block] if before_block is not None else []):
+                own = sent.setdefault((row['tx_hash'], row['token_a']),
+                                      {'block': row['block'], 'status': row['status'], 'expected_profit': 0})
+                own['expected_profit'] += int(row['expected_profit'])
+
+        trades = []
+        for tx_hash, token in set(realized) | set(sent):
+            event, own = realized.get((tx_hash, token)), sent.get((tx_hash, token))
+            realized_profit = event['realized_profit'] if event else 0
+            expected = own['expected_profit'] if own else None
+            trades.append({
+                'tx_hash': tx_hash,
+                'token_a': token,
+                'block': event['block'] if event else own['block'],
+                'status': own['status'] if own else 1,
+                'legs_realized': event['legs'] if event else 0,
+                'expected_profit': str(expected) if expected is not None else None,
+                'realized_profit': str(realized_profit),
+                'difference': str(realized_profit - expected) if expected is not None else None,
+                'realized_pct': round(100 * realized_profit / expected, 2) if expected else None,
+            })
+        trades.sort(key=lambda trade: (trade['block'] or 0, trade['tx_hash'], trade['token_a'] or ''), reverse=True)
+        page = trades[:max(1, min(int(limit), 500))]
+
+        by_token: Dict[Optional[str], Dict[str, int]] = {}
+        for trade in trades:
+            totals = by_token.setdefault(trade['token_a'], {'realized_profit': 0, 'expected_profit_sent': 0,
+                                                            'realized_profit_sent': 0})
+            totals['realized_profit'] += int(trade['realized_profit'])
+            if trade['expected_profit'] is not None:
+                totals['expected_profit_sent'] += int(trade['expected_profit'])
+                totals['realized_profit_sent'] += int(trade['realized_profit'])
+        return {
+            'items': page,
+            'next_before_block': page[-1]['block'] if len(trades) > len(page) else None,
+            'totals': {
+                'trades': len({trade['tx_hash'] for trade in trades}),
+                'by_token': {token: {name: str(value) for name, value in totals.items()}
+                             for token, totals in sorted(by_token.items(), key=lambda item: item[0] or '')},
+            },
+        }
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Index PolygonArbitrageEngine events into the trade store')
+    parser.add_argument('--rpc-url', default=os.getenv('ALCHEMY_API_URL_MAINNET'))
+    parser.add_argument('--address', default=os.getenv('ARBITRAGE_CONTRACT_ADDRESS'))
+    parser.add_argument('--db', default=os.getenv('TRADE_STORE_PATH', 'arbitrage.db'))
+    parser.add_argument('--start-block', type=int, default=int(os.getenv('EVENT_INDEXER_START_BLOCK', '0')),
+                        help='first block to index, normally the contract deployment block')
+    parser.add_argument('--chunk-size', type=int, default=int(os.getenv('EVENT_INDEXER_CHUNK_BLOCKS', '2000')))
+    parser.add_argument('--workers', type=int, default=int(os.getenv('EVENT_INDEXER_WORKERS', '4')))
+    parser.add_argument('--reorg-window', type=int, default=int(os.getenv('EVENT_INDEXER_REORG_WINDOW', '64')))
+    parser.add_argument('--poll-interval', type=float, default=2.0)
+    parser.add_argument('--backfill-only', action='store_true')
+    args = parser.parse_args()
+    if not args.rpc_url or not args.address:
+        parser.error('an RPC URL and the contract address are required')
+
+    client = JsonRpcClient(args.rpc_url, pool_size=args.workers, timeout=30)
+    indexer = EventIndexer(client, args.address, args.db, args.start_block, args.chunk_size,
+                           workers=args.workers, reorg_window=args.reorg_window)
+    try:
+        if args.backfill_only:
+            started = time.time()
+            indexer.backfill()
+            logger.info("Backfill done in %.1fs: %s", time.time() - started, indexer.stats)
+        else:
+            indexer.run(args.poll_interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        indexer.close()
+        client.close()
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    from automation.logging_pipeline import configure_logging
+    load_dotenv()
+    configure_logging()
+    main()
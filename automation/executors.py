@@ -0,0 +1,202 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Sender:
+    address: str
+    key: str
+    nonce: int = 0                       # next nonce this sender will use
+    balance: int = 0                     # wei, as of the last refresh
+    busy: bool = False
+    in_flight_nonce: Optional[int] = None
+    tx_hash: Optional[str] = None        # last transaction broadcast by the current trade
+    confirmed: bool = False              # its receipt arrived
+    since: float = 0.0
+    last_used: float = 0.0
+    stalled: bool = False                # receipt wait gave up; busy until the nonce is mined
+    funding: bool = False                # top-up sent, not yet seen in the balance
+    sent: int = 0
+    stuck: int = 0
+
+
+class SenderPool:
+    """
+    Executor keys the engine contract accepts (owner plus `executors`),
+    each with its own nonce sequence so trades go out in parallel and one
+    stuck transaction only ties up its own sender.
+
+    `acquire` hands out the idle sender that has waited longest and can pay
+    for the gas; `next_nonce` allocates nonces locally instead of asking the
+    node per transaction. A sender whose transaction outlived the receipt
+    wait stays busy until `refresh` sees that nonce mined. `rebalance`
+    tops senders below `min_balance` back up to `target_balance` from the
+    funder account without taking it under `funder_reserve`.
+    """
+
+    def __init__(self, w3, keys: Sequence[str], funder_key: Optional[str] = None,
+                 min_balance: int = 10 ** 18, target_balance: int = 3 * 10 ** 18,
+                 funder_reserve: int = 10 * 10 ** 18, clock: Callable[[], float] = time.monotonic):
+        self.w3 = w3
+        self.min_balance = min_balance
+        self.target_balance = target_balance
+        self.funder_reserve = funder_reserve
+        self.clock = clock
+        self.senders: List[Sender] = []
+        self.funder = w3.eth.account.from_key(funder_key) if funder_key else None
+        for key in keys:
+            address = w3.eth.account.from_key(key).address
+            # The funder's own transfers would race a trade for its nonces
+            if self.funder is not None and address == self.funder.address:
+                logger.warning("Funder %s is not used as a sender", address)
+            elif all(sender.address != address for sender in self.senders):
+                self.senders.append(Sender(address, key))
+        self.stats = {'acquired': 0, 'exhausted': 0, 'stuck': 0, 'unstuck': 0, 'resynced': 0, 'top_ups': 0}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.senders)
+
+    def authorize(self, contract) -> List[str]:
+        """Drop senders the contract would reject; returns their addresses"""
+        owner = contract.functions.owner().call()
+        rejected = [sender.address for sender in self.senders
+                    if sender.address != owner and not contract.functions.executors(sender.address).call()]
+        self.senders = [sender for sender in self.senders if sender.address not in rejected]
+        for address in rejected:
+            logger.warning("Sender %s is not an executor of %s; call setExecutor from the owner", address,
+                           contract.address)
+        return rejected
+
+    def refresh(self):
+        """Re-read balances and nonces; frees stuck senders whose transaction has since been mined or replaced"""
+        for sender in self.senders:
+            balance = self.w3.eth.get_balance(sender.address)
+            mined = self.w3.eth.get_transaction_count(sender.address, 'latest')
+            pending = self.w3.eth.get_transaction_count(sender.address, 'pending')
+            with self._lock:
+                sender.balance = balance
+                if sender.funding and balance >= self.min_balance:
+                    sender.funding = False
+                if sender.stalled and mined > sender.in_flight_nonce:
+                    self._free(sender)
+                    self.stats['unstuck'] += 1
+                if not sender.busy:
+                    # The node is authoritative once nothing of ours is in flight (dropped txs leave gaps)
+                    sender.nonce = max(mined, pending)
+
+    def resync(self, sender: Sender):
+        """
+        Re-read one sender's nonce after a node rejected it as too low (used
+        by a transaction sent elsewhere); `release` then keeps the new nonce
+        instead of handing back the rejected one.
+        """
+        mined = self.w3.eth.get_transaction_count(sender.address, 'latest')
+        pending = self.w3.eth.get_transaction_count(sender.address, 'pending')
+        with self._lock:
+            sender.nonce = max(mined, pending)
+            sender.in_flight_nonce = None
+            self.stats['resynced'] += 1
+
+    def acquire(self, gas_cost: int = 0) -> Optional[Sender]:
+        """Idle sender able to pay `gas_cost`, longest idle first; None when every sender is busy or broke"""
+        with self._lock:
+            idle = [sender for sender in self.senders if not sender.busy and sender.balance >= gas_cost]
+            if not idle:
+                self.stats['exhausted'] += 1
+                return None
+            sender = min(idle, key=lambda s: s.last_used)
+            sender.busy = True
+            sender.since = self.clock()
+            sender.last_used = sender.since
+            self.stats['acquired'] += 1
+            return sender
+
+    def idle(self) -> int:
+        return sum(1 for sender in self.senders if not sender.busy)
+
+    def next_nonce(self, sender: Sender) -> int:
+        with self._lock:
+            nonce = sender.in_flight_nonce = sender.nonce
+            sender.nonce += 1
+            return nonce
+
+    def broadcast(self, sender: Sender, tx_hash: str, gas_cost: int = 0):
+        """Record a sent transaction; its gas is reserved against the cached balance"""
+        with self._lock:
+            sender.tx_hash = tx_hash
+            sender.sent += 1
+            sender.balance -= gas_cost
+
+    def confirm(self, sender: Sender):
+        with self._lock:
+            sender.confirmed = True
+
+    def release(self, sender: Sender):
+        """
+        Give a sender back after its trade, whatever happened to it. Without
+        a broadcast the unused nonce is returned; a broadcast transaction
+        that was never confirmed keeps the sender busy (stuck) until
+        `refresh` sees the nonce used.
+        """
+        with self._lock:
+            if sender.tx_hash is None:
+                if sender.in_flight_nonce is not None and sender.nonce == sender.in_flight_nonce + 1:
+                    sender.nonce = sender.in_flight_nonce
+                self._free(sender)
+            elif sender.confirmed:
+                self._free(sender)
+            else:
+                sender.stalled = True
+                sender.stuck += 1
+                self.stats['stuck'] += 1
+                logger.warning("Sender %s stuck on nonce %s (%s)", sender.address, sender.in_flight_nonce,
+                               sender.tx_hash)
+
+    @staticmethod
+    def _free(sender: Sender):
+        sender.busy = False
+        sender.stalled = False
+        sender.confirmed = False
+        sender.tx_hash = None
+        sender.in_flight_nonce = None
+
+    def rebalance(self, gas_price: Optional[int] = None) -> List[Tuple[str, int, str]]:
+        """Top up senders low on gas from the funder; returns (address, amount, tx hash) per transfer"""
+        if self.funder is None:
+            return []
+        gas_price = gas_price or self.w3.eth.gas_price
+        available = self.w3.eth.get_balance(self.funder.address) - self.funder_reserve
+        nonce = self.w3.eth.get_transaction_count(self.funder.address, 'pending')
+        transfers = []
+        for sender in sorted(self.senders, key=lambda s: s.balance):
+            if sender.funding or sender.balance >= self.min_balance:
+                continue
+            amount = self.target_balance - sender.balance
+            if amount + 21000 * gas_price > available:
+                logger.warning("Funder %s cannot top up %s: %d wei available", self.funder.address,
+                               sender.address, max(available, 0))
+                break
+            signed = self.funder.sign_transaction({
+                'to': sender.address, 'value': amount, 'gas': 21000, 'gasPrice': gas_price,
+                'nonce': nonce, 'chainId': self.w3.eth.chain_id,
+            })
+            tx_hash = self.w3.eth.send_raw_transaction(signed.rawTransaction)
+            nonce += 1
+            available -= amount + 21000 * gas_price
+            sender.funding = True
+            self.stats['top_ups'] += 1
+            transfers.append((sender.address, amount, tx_hash.hex()))
+            logger.info("Topped up sender %s with %.4f MATIC", sender.address, amount / 10 ** 18)
+        return transfers
+
+    def as_dicts(self) -> List[Dict]:
+        now = self.clock()
+        return [{'address': s.address, 'busy': s.busy, 'nonce': s.nonce, 'balance_wei': str(s.balance),
+                 'in_flight': s.tx_hash, 'busy_for_s': round(now - s.since, 1) if s.busy else 0.0,
+                 'funding': s.funding, 'sent': s.sent, 'stuck': s.stuck} for s in self.senders]
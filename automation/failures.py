@@ -0,0 +1,262 @@
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, List, Optional
+
+# Reverts that repeat until someone creates or funds the pool
+DEAD_ROUTE_MARKERS = (
+    'no pool', 'pool not tracked', 'insufficient_liquidity', 'insufficient liquidity', 'invalid_path',
+    'identical_addresses', 'execution reverted', 'returned no data', 'could not decode contract function call',
+)
+# Failures of the transport or provider rather than the call itself
+TRANSIENT_MARKERS = (
+    'timed out', 'timeout', 'connection', 'limit exceeded', 'too many requests', 'bad gateway',
+    'service unavailable',
+)
+# HTTP status codes a provider returns while overloaded, only as a whole number next to "http"/"status"
+# or in a "503 Server Error" line, never inside an address or amount
+TRANSIENT_STATUSES = (429, 502, 503, 504)
+_TRANSIENT_STATUS = re.compile(
+    r'(?:http|status)\D{0,16}\b(?:429|50[234])\b|\b(?:429|50[234]) (?:client|server) error'
+)
+
+DEAD_ROUTE = 'dead_route'
+TRANSIENT = 'transient'
+OTHER = 'other'
+
+
+def classify(error: BaseException) -> str:
+    """DEAD_ROUTE for "no pool"-type reverts, TRANSIENT for timeouts and provider errors, else OTHER"""
+    if isinstance(error, LookupError):
+        return DEAD_ROUTE
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return TRANSIENT
+    if _http_status(error) in TRANSIENT_STATUSES:
+        return TRANSIENT
+    text = ('%s %s' % (type(error).__name__, error)).lower()
+    # A revert names the route's pair and amounts, which may contain any digits: it is never transient
+    if 'logicerror' in text or 'badfunctioncalloutput' in text or any(m in text for m in DEAD_ROUTE_MARKERS):
+        return DEAD_ROUTE
+    if any(marker in text for marker in TRANSIENT_MARKERS) or _TRANSIENT_STATUS.search(text):
+        return TRANSIENT
+    return OTHER
+
+
+def _http_status(error: BaseException) -> Optional[int]:
+    """Status of an HTTP error from requests (`.response.status_code`) or aiohttp (`.status`)"""
+    response = getattr(error, 'response', None)
+    status = getattr(response, 'status_code', None) or getattr(error, 'status', None)
+    return status if isinstance(status, int) else None
+
+
+@dataclass
+class _Quarantined:
+    until: float
+    failures: int
+    reason: str
+
+
+class NegativeCache:
+    """
+    Keys (pairs, routes, pools) known to fail, skipped until their backoff
+    expires. Each repeat failure doubles the backoff up to `max_backoff`; a
+    success forgets the key.
+    """
+
+    def __init__(self, base_backoff: float = 60.0, max_backoff: float = 3600.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self._entries: Dict[Hashable, _Quarantined] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        now = self.clock()
+        return sum(1 for entry in list(self._entries.values()) if entry.until > now)
+
+    def blocked(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry.until > self.clock()
+
+    def add(self, key: Hashable, reason: str = '') -> float:
+        """Quarantine `key`; returns the backoff applied in seconds"""
+        with self._lock:
+            entry = self._entries.get(key)
+            failures = entry.failures + 1 if entry else 1
+            backoff = min(self.base_backoff * 2 ** (failures - 1), self.max_backoff)
+            self._entries[key] = _Quarantined(self.clock() + backoff, failures, reason[:200])
+        return backoff
+
+    def discard(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def entries(self) -> List[Dict]:
+        now = self.clock()
+        return [{'key': list(key) if isinstance(key, tuple) else key, 'failures': entry.failures,
+                 'retry_in_s': round(entry.until - now, 1), 'reason': entry.reason}
+                for key, entry in sorted(self._entries.items(), key=lambda item: item[1].until)
+                if entry.until > now]
+
+
+class CircuitBreaker:
+    """
+    Stops calls to a dependency (RPC endpoint, aggregator API) after
+    `failure_threshold` consecutive failures. After `reset_timeout` seconds one
+    trial call is let through: success closes the circuit, failure reopens it
+    for twice as long, up to `max_reset_timeout`.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 30.0,
+                 max_reset_timeout: float = 600.0, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened = 0
+        self.last_error = ''
+        self._open_until = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.failures < self.failure_threshold:
+            return self.CLOSED
+        return self.OPEN if self.clock() < self._open_until else self.HALF_OPEN
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; in half-open state only one trial call at a time"""
+        with self._lock:
+            state = self.state
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened = 0
+            self._trial_running = False
+
+    def release(self):
+        """End a trial call that proved nothing either way"""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self, reason: str = ''):
+        with self._lock:
+            self.failures += 1
+            self.last_error = reason[:200]
+            self._trial_running = False
+            if self.failures >= self.failure_threshold:
+                self.opened += 1
+                timeout = min(self.reset_timeout * 2 ** (self.opened - 1), self.max_reset_timeout)
+                self._open_until = self.clock() + timeout
+
+    def as_dict(self) -> Dict:
+        return {'name': self.name, 'state': self.state, 'failures': self.failures,
+                'retry_in_s': round(max(0.0, self._open_until - self.clock()), 1), 'last_error': self.last_error}
+
+
+class FailureTracker:
+    """
+    Negative cache for dead routes plus one circuit breaker per dependency,
+    shared by the scanner and the bots. `quarantine()` reports everything
+    currently being skipped.
+    """
+
+    def __init__(self, route_backoff: float = 60.0, max_route_backoff: float = 3600.0,
+                 failure_threshold: int = 3, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.routes = NegativeCache(route_backoff, max_route_backoff, clock)
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._circuits: Dict[str, CircuitBreaker] = {}
+        self._sources: Dict[str, Callable[[], List[Dict]]] = {}
+        self.stats = {'route_failures': 0, 'transient_failures': 0, 'other_failures': 0,
+                      'skipped_routes': 0, 'skipped_calls': 0}
+
+    def circuit(self, name: str) -> CircuitBreaker:
+        breaker = self._circuits.get(name)
+        if breaker is None:
+            breaker = self._circuits.setdefault(
+                name, CircuitBreaker(name, self.failure_threshold, self.reset_timeout, clock=self.clock)
+            )
+        return breaker
+
+    def allow(self, circuit: str) -> bool:
+        allowed = self.circuit(circuit).allow()
+        if not allowed:
+            self.stats['skipped_calls'] += 1
+        return allowed
+
+    def route_blocked(self, key: Hashable) -> bool:
+        blocked = self.routes.blocked(key)
+        if blocked:
+            self.stats['skipped_routes'] += 1
+        return blocked
+
+    def record_success(self, circuit: str, key: Optional[Hashable] = None):
+        self.circuit(circuit).record_success()
+        if key is not None:
+            self.routes.discard(key)
+
+    def record_failure(self, circuit: str, error: BaseException, key: Optional[Hashable] = None) -> str:
+        """
+        Route `error` to the right place: dead-route reverts quarantine `key`
+        (and prove the dependency answered), transient errors count against
+        the circuit. Returns the classification.
+        """
+        kind = classify(error)
+        if kind == DEAD_ROUTE and key is not None:
+            self.stats['route_failures'] += 1
+            self.routes.add(key, str(error))
+            self.circuit(circuit).record_success()
+        elif kind == TRANSIENT:
+            self.stats['transient_failures'] += 1
+            self.circuit(circuit).record_failure('%s: %s' % (type(error).__name__, error))
+        else:
+            self.stats['other_failures'] += 1
+            self.circuit(circuit).release()
+        return kind
+
+    def add_source(self, name: str, entries: Callable[[], List[Dict]]):
+        """Include another component's quarantined items (e.g. RPC pool endpoints in cooldown)"""
+        self._sources[name] = entries
+
+    def quarantine(self) -> Dict:
+        report = {
+            'routes': self.routes.entries(),
+            'circuits': [breaker.as_dict() for breaker in self._circuits.values()
+                         if breaker.state != CircuitBreaker.CLOSED],
+            'stats': dict(self.stats),
+        }
+        for name, entries in self._sources.items():
+            report[name] = entries()
+        return report
+
+
+# Process-wide tracker shared by the scanner, bots and dashboard
+failures = FailureTracker(
+    route_backoff=float(os.getenv('ROUTE_BACKOFF_SECONDS', '60')),
+    failure_threshold=int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '3')),
+    reset_timeout=float(os.getenv('CIRCUIT_RESET_SECONDS', '30')),
+)
+
+
+def get_failure_tracker() -> FailureTracker:
+    return failures
@@ -0,0 +1,165 @@
+import http.client
+import itertools
+import json
+import os
+import queue
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+# Minimal JSON-RPC over keep-alive HTTP connections, plus just enough ABI
+# handling to call a compiled contract. Used where web3/brownie start-up and
+# per-call overhead are not wanted.
+
+
+class JsonRpcError(Exception):
+    """Error object returned by the node"""
+
+    def __init__(self, code: int, message: str, data: Any = None):
+        super().__init__('%s (code %s)' % (message, code))
+        self.code = code
+        self.message = message
+        self.data = data
+
+
+class JsonRpcClient:
+    """
+    Thread-safe JSON-RPC client over a pool of persistent HTTP connections.
+    A connection the server closed while idle is replaced and the request
+    retried once.
+    """
+
+    def __init__(self, url: str, pool_size: int = 4, timeout: float = 10.0):
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise ValueError('Unsupported RPC URL scheme: %r' % parts.scheme)
+        self.url = url
+        self.timeout = timeout
+        self._connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self._host = parts.hostname
+        self._port = parts.port
+        self._path = (parts.path or '/') + ('?' + parts.query if parts.query else '')
+        self._pool: 'queue.LifoQueue' = queue.LifoQueue(maxsize=pool_size)
+        self._ids = itertools.count(1)
+        self._id_lock = threading.Lock()
+
+    def _next_id(self) -> int:
+        with self._id_lock:
+            return next(self._ids)
+
+    def _connect(self) -> http.client.HTTPConnection:
+        return self._connection_class(self._host, self._port, timeout=self.timeout)
+
+    def _post(self, body: bytes) -> Any:
+        try:
+            connection = self._pool.get_nowait()
+            reused = True
+        except queue.Empty:
+            connection, reused = self._connect(), False
+
+        try:
+            connection.request('POST', self._path, body, {'Content-Type': 'application/json'})
+            response = connection.getresponse()
+            payload = response.read()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            connection.close()
+            if not reused:
+                raise
+            # Idle keep-alive connection dropped by the server: retry on a fresh one
+            connection = self._connect()
+            connection.request('POST', self._path, body, {'Content-Type': 'application/json'})
+            response = connection.getresponse()
+            payload = response.read()
+        except Exception:
+            connection.close()
+            raise
+
+        if response.status != 200:
+            connection.close()
+            raise ConnectionError('HTTP %d from %s' % (response.status, self.url))
+        try:
+            self._pool.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+        return json.loads(payload)
+
+    @staticmethod
+    def _result(reply: Dict) -> Any:
+        if 'error' in reply:
+            error = reply['error']
+            raise JsonRpcError(error.get('code', 0), error.get('message', ''), error.get('data'))
+        return reply.get('result')
+
+    def request(self, method: str, params: Sequence = ()) -> Any:
+        body = json.dumps({'jsonrpc': '2.0', 'id': self._next_id(), 'method': method, 'params': list(params)})
+        return self._result(self._post(body.encode()))
+
+    def batch(self, calls: Iterable[Tuple[str, Sequence]]) -> List[Any]:
+        """Send several calls in one HTTP request; results come back in call order"""
+        requests = [{'jsonrpc': '2.0', 'id': self._next_id(), 'method': method, 'params': list(params)}
+                    for method, params in calls]
+        if not requests:
+            return []
+        replies = {reply.get('id'): reply for reply in self._post(json.dumps(requests).encode())}
+        return [self._result(replies.get(r['id'], {'error': {'code': -32603, 'message': 'missing reply'}}))
+                for r in requests]
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+@lru_cache(maxsize=None)
+def load_artifact_abi(name: str, build_dir: str = 'build/contracts') -> List[Dict]:
+    """ABI of a compiled contract from its build artifact (brownie's build/contracts/<Name>.json)"""
+    with open(os.path.join(build_dir, name + '.json')) as f:
+        return json.load(f)['abi']
+
+
+def abi_type(param: Dict) -> str:
+    """Canonical type of an ABI parameter, expanding tuples into their components"""
+    kind = param['type']
+    if not kind.startswith('tuple'):
+        return kind
+    return '(' + ','.join(abi_type(c) for c in param['components']) + ')' + kind[len('tuple'):]
+
+
+class ContractFunction:
+    def __init__(self, entry: Dict):
+        from eth_utils import keccak
+        self.name = entry['name']
+        self.input_types = [abi_type(p) for p in entry.get('inputs', [])]
+        self.output_types = [abi_type(p) for p in entry.get('outputs', [])]
+        self.selector = keccak(text='%s(%s)' % (self.name, ','.join(self.input_types)))[:4]
+
+    def encode(self, args: Sequence) -> str:
+        from eth_abi import encode
+        return '0x' + (self.selector + encode(self.input_types, list(args))).hex()
+
+    def decode(self, data: str) -> Tuple:
+        from eth_abi import decode
+        return decode(self.output_types, bytes.fromhex(data[2:] if data.startswith('0x') else data))
+
+
+class RpcContract:
+    """Contract bound to an address, calling through a JsonRpcClient"""
+
+    def __init__(self, client: JsonRpcClient, address: str, abi: List[Dict]):
+        self.client = client
+        self.address = address
+        self.functions = {entry['name']: ContractFunction(entry)
+                          for entry in abi if entry.get('type') == 'function'}
+
+    def call(self, name: str, *args, block: str = 'latest', sender: Optional[str] = None) -> Tuple:
+        fn = self.functions[name]
+        tx = {'to': self.address, 'data': fn.encode(args)}
+        if sender:
+            tx['from'] = sender
+        return fn.decode(self.client.request('eth_call', [tx, block]))
+
+    def encode(self, name: str, *args) -> str:
+        return self.functions[name].encode(args)
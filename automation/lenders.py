@@ -0,0 +1,198 @@
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Flash loan sources supported by PolygonArbitrageEngine. Gas overheads are the
+# extra gas each lender's loan/repay path adds on top of the swaps themselves.
+
+
+@dataclass(frozen=True)
+class LenderSpec:
+    name: str
+    single_method: str
+    batch_method: str
+    gas_overhead: int
+    supports_packed: bool
+
+
+LENDERS: Dict[str, LenderSpec] = {
+    'balancer': LenderSpec('balancer', 'executeBalancerFlashLoan', 'executeBalancerBatchFlashLoan', 70000, True),
+    'aave': LenderSpec('aave', 'executeAaveFlashLoan', 'executeAaveBatchFlashLoan', 95000, False),
+}
+
+ERC20_BALANCE_ABI = [
+    {"inputs": [{"name": "account", "type": "address"}], "name": "balanceOf",
+     "outputs": [{"name": "", "type": "uint256"}], "stateMutability": "view", "type": "function"}
+]
+
+BALANCER_VAULT_FEES_ABI = [
+    {"inputs": [], "name": "getProtocolFeesCollector", "outputs": [{"name": "", "type": "address"}],
+     "stateMutability": "view", "type": "function"},
+    {"inputs": [], "name": "getFlashLoanFeePercentage", "outputs": [{"name": "", "type": "uint256"}],
+     "stateMutability": "view", "type": "function"}
+]
+
+_RESERVE_DATA_FIELDS = [
+    ("configuration", "uint256"), ("liquidityIndex", "uint128"), ("currentLiquidityRate", "uint128"),
+    ("variableBorrowIndex", "uint128"), ("currentVariableBorrowRate", "uint128"),
+    ("currentStableBorrowRate", "uint128"), ("lastUpdateTimestamp", "uint40"), ("id", "uint16"),
+    ("aTokenAddress", "address"), ("stableDebtTokenAddress", "address"),
+    ("variableDebtTokenAddress", "address"), ("interestRateStrategyAddress", "address"),
+    ("accruedToTreasury", "uint128"), ("unbacked", "uint128"), ("isolationModeTotalDebt", "uint128")
+]
+
+AAVE_POOL_FEES_ABI = [
+    {"inputs": [], "name": "FLASHLOAN_PREMIUM_TOTAL", "outputs": [{"name": "", "type": "uint128"}],
+     "stateMutability": "view", "type": "function"},
+    {"inputs": [{"name": "asset", "type": "address"}], "name": "getReserveData",
+     "outputs": [{"name": "", "type": "tuple",
+                  "components": [{"name": n, "type": t} for n, t in _RESERVE_DATA_FIELDS]}],
+     "stateMutability": "view", "type": "function"}
+]
+
+
+class BalancerSource:
+    """Fee from the Vault's ProtocolFeesCollector, liquidity is the Vault's token balance"""
+
+    def __init__(self, w3, vault_address: str):
+        self.w3 = w3
+        self.vault_address = vault_address
+        self.vault = w3.eth.contract(address=vault_address, abi=BALANCER_VAULT_FEES_ABI)
+
+    def fee_bps(self) -> int:
+        collector = self.w3.eth.contract(
+            address=self.vault.functions.getProtocolFeesCollector().call(),
+            abi=BALANCER_VAULT_FEES_ABI
+        )
+        # 1e18 == 100%; round up so a fractional bp is never under-charged
+        return -(-collector.functions.getFlashLoanFeePercentage().call() // 10**14)
+
+    def liquidity(self, asset: str) -> int:
+        token = self.w3.eth.contract(address=asset, abi=ERC20_BALANCE_ABI)
+        return token.functions.balanceOf(self.vault_address).call()
+
+
+class AaveSource:
+    """Fee is FLASHLOAN_PREMIUM_TOTAL, liquidity is the underlying held by the asset's aToken"""
+
+    def __init__(self, w3, pool_address: str):
+        self.w3 = w3
+        self.pool = w3.eth.contract(address=pool_address, abi=AAVE_POOL_FEES_ABI)
+        self._a_tokens: Dict[str, str] = {}
+
+    def fee_bps(self) -> int:
+        return self.pool.functions.FLASHLOAN_PREMIUM_TOTAL().call()
+
+    def liquidity(self, asset: str) -> int:
+        a_token = self._a_tokens.get(asset)
+        if a_token is None:
+            reserve = self.pool.functions.getReserveData(asset).call()
+            a_token = self._a_tokens[asset] = reserve[8]
+        if int(a_token, 16) == 0:
+            return 0
+        token = self.w3.eth.contract(address=asset, abi=ERC20_BALANCE_ABI)
+        return token.functions.balanceOf(a_token).call()
+
+
+@dataclass
+class LoanQuote:
+    lender: str
+    fee: int
+    gas_overhead: int
+    gas_cost: int
+
+    @property
+    def total_cost(self) -> int:
+        return self.fee + self.gas_cost
+
+
+class LenderSelector:
+    """
+    Picks the cheapest flash loan source per borrow. Fees and per-asset
+    liquidity are read at most once per block; `sources` maps a `LENDERS`
+    name to anything with `fee_bps()` and `liquidity(asset)`.
+    """
+
+    def __init__(self, sources: Dict[str, object], table: Optional[Dict[str, LenderSpec]] = None):
+        self.table = table or LENDERS
+        unknown = set(sources) - set(self.table)
+        if unknown:
+            raise ValueError("No lender spec for: %s" % ', '.join(sorted(unknown)))
+        self.sources = sources
+        self._block: Optional[int] = None
+        self._fees: Dict[str, int] = {}
+        self._liquidity: Dict[Tuple[str, str], int] = {}
+
+    def refresh(self, block_number: int):
+        """Drop cached fees and liquidity when a new block arrives"""
+        if block_number == self._block:
+            return
+        self._block = block_number
+        self._fees.clear()
+        self._liquidity.clear()
+
+    def fee_bps(self, lender: str) -> int:
+        if lender not in self._fees:
+            self._fees[lender] = self.sources[lender].fee_bps()
+        return self._fees[lender]
+
+    def liquidity(self, lender: str, asset: str) -> int:
+        key = (lender, asset)
+        if key not in self._liquidity:
+            self._liquidity[key] = self.sources[lender].liquidity(asset)
+        return self._liquidity[key]
+
+    def quote(self, lender: str, amount: int, gas_price: int, native_rate: float = 1.0) -> LoanQuote:
+        """Cost of borrowing `amount` from `lender`, gas converted to loan-token units by `native_rate`"""
+        spec = self.table[lender]
+        return LoanQuote(
+            lender=lender,
+            fee=amount * self.fee_bps(lender) // 10000,
+            gas_overhead=spec.gas_overhead,
+            gas_cost=int(spec.gas_overhead * gas_price * native_rate)
+        )
+
+    def candidates(self, asset: str, amount: int, packed: bool = False) -> Iterable[str]:
+        for lender in self.sources:
+            if packed and not self.table[lender].supports_packed:
+                continue
+            if self.liquidity(lender, asset) >= amount:
+                yield lender
+
+    def select(self, asset: str, amount: int, gas_price: int,
+               native_rate: float = 1.0, packed: bool = False) -> Optional[LoanQuote]:
+        """Cheapest lender with enough liquidity, or None if nobody can fund the loan"""
+        quotes: List[LoanQuote] = [
+            self.quote(lender, amount, gas_price, native_rate)
+            for lender in self.candidates(asset, amount, packed)
+        ]
+        if not quotes:
+            return None
+        return min(quotes, key=lambda q: q.total_cost)
+
+    def select_batch(self, loans: Dict[str, int], gas_price: int,
+                     native_rate: float = 1.0, prices=None) -> Optional[LoanQuote]:
+        """
+        Cheapest single lender able to fund every asset of a batched loan.
+        With `prices` (NativePrices) the assets' fees are converted to the
+        gas token before they are added, and the quote is in native units; a
+        lender charging a fee in an asset without a price is skipped, as its
+        cost cannot be compared.
+        """
+        best = None
+        for lender in self.sources:
+            if any(self.liquidity(lender, asset) < amount for asset, amount in loans.items()):
+                continue
+            fees = [(asset, amount * self.fee_bps(lender) // 10000) for asset, amount in loans.items()]
+            if prices is not None:
+                native_fees = [prices.to_native(asset, asset_fee) if asset_fee else 0 for asset, asset_fee in fees]
+                if None in native_fees:
+                    continue
+                fee = sum(native_fees)
+                native_rate = 1.0
+            else:
+                fee = sum(asset_fee for _, asset_fee in fees)
+            spec = self.table[lender]
+            quote = LoanQuote(lender, fee, spec.gas_overhead, int(spec.gas_overhead * gas_price * native_rate))
+            if best is None or quote.total_cost < best.total_cost:
+                best = quote
+        return best
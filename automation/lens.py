@@ -0,0 +1,52 @@
+import struct
+from typing import Iterator, List, NamedTuple, Sequence
+
+# Must match ArbitrageLens.RESULT_SIZE: pairIndex, dexA, dexB, amountIndex, 3 reserved, profit hi/lo
+_RESULT = struct.Struct('>HBBB3xQQ')
+RESULT_SIZE = _RESULT.size
+
+ARBITRAGE_LENS_ABI = [
+    {
+        "inputs": [
+            {"name": "factories", "type": "address[]"},
+            {"name": "feeBps", "type": "uint256[]"},
+            {"name": "tokensA", "type": "address[]"},
+            {"name": "tokensB", "type": "address[]"},
+            {"name": "amounts", "type": "uint256[]"},
+            {"name": "minProfitBps", "type": "uint256"}
+        ],
+        "name": "scan",
+        "outputs": [{"name": "results", "type": "bytes"}],
+        "stateMutability": "view",
+        "type": "function"
+    }
+]
+
+
+class LensResult(NamedTuple):
+    pair_index: int
+    dex_a: int
+    dex_b: int
+    amount_index: int
+    profit: int
+
+
+def iter_lens_results(blob: bytes) -> Iterator[LensResult]:
+    """Decode the packed blob returned by ArbitrageLens.scan without copying it"""
+    view = memoryview(blob)
+    if len(view) % RESULT_SIZE:
+        raise ValueError("Lens result blob is not a multiple of %d bytes" % RESULT_SIZE)
+    for pair_index, dex_a, dex_b, amount_index, profit_hi, profit_lo in _RESULT.iter_unpack(view):
+        yield LensResult(pair_index, dex_a, dex_b, amount_index, (profit_hi << 64) | profit_lo)
+
+
+def decode_lens_results(blob: bytes) -> List[LensResult]:
+    return list(iter_lens_results(blob))
+
+
+def encode_lens_results(results: Sequence[LensResult]) -> bytes:
+    """Inverse of `decode_lens_results`, for tests and replay tooling"""
+    return b''.join(
+        _RESULT.pack(r.pair_index, r.dex_a, r.dex_b, r.amount_index, r.profit >> 64, r.profit & (2**64 - 1))
+        for r in results
+    )
@@ -0,0 +1,118 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+from datetime import datetime, timezone
+from typing import List, Optional
+
+DEFAULT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record, for log shippers and jq"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage()
+        }
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            # Already rendered by _PreparedQueueHandler before the record crossed threads
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class _PreparedQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that defers message formatting to the writer thread
+
+    The stock handler renders `record.msg % record.args` on the calling
+    thread; here the record is only copied so the event loop never pays for
+    string formatting or I/O.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Other handlers on the logger receive the same record, leave theirs untouched
+        record = copy.copy(record)
+        if record.exc_info:
+            # Tracebacks hold frame references, render them before crossing threads
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _build_handlers(log_file: str, json_lines: bool, max_bytes: int, backup_count: int,
+                    console: bool) -> List[logging.Handler]:
+    formatter = JsonLinesFormatter() if json_lines else logging.Formatter(DEFAULT_FORMAT)
+    handlers: List[logging.Handler] = []
+
+    if log_file:
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+        )
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+
+    if console:
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(logging.Formatter(DEFAULT_FORMAT))
+        handlers.append(stream_handler)
+
+    return handlers
+
+
+def configure_logging(level: Optional[str] = None,
+                      log_file: Optional[str] = None,
+                      json_lines: Optional[bool] = None,
+                      max_bytes: Optional[int] = None,
+                      backup_count: Optional[int] = None,
+                      console: bool = True) -> logging.handlers.QueueListener:
+    """Route the root logger through a queue drained by a background writer thread
+
+    Settings default to LOG_LEVEL, LOG_FILE, LOG_JSON, LOG_MAX_BYTES and
+    LOG_BACKUP_COUNT from the environment.
+    """
+    global _listener
+
+    level = level or os.getenv('LOG_LEVEL', 'INFO')
+    log_file = log_file if log_file is not None else os.getenv('LOG_FILE', 'arbitrage.log')
+    if json_lines is None:
+        json_lines = os.getenv('LOG_JSON', 'false').lower() in ('1', 'true', 'yes')
+    max_bytes = max_bytes if max_bytes is not None else int(os.getenv('LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+    backup_count = backup_count if backup_count is not None else int(os.getenv('LOG_BACKUP_COUNT', '5'))
+
+    shutdown_logging()
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    handlers = _build_handlers(log_file, json_lines, max_bytes, backup_count, console)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_PreparedQueueHandler(log_queue))
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,262 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from automation.direct_swap import PairState, get_amount_in, get_amount_out
+
+# UniswapV2-style router entry points the engine understands. `eth_in` marks
+# calls where the input amount is the transaction value.
+_ROUTER_SWAPS = {
+    'swapExactTokensForTokens': ('(uint256,uint256,address[],address,uint256)', True, False),
+    'swapExactTokensForTokensSupportingFeeOnTransferTokens': (
+        '(uint256,uint256,address[],address,uint256)', True, False),
+    'swapExactTokensForETH': ('(uint256,uint256,address[],address,uint256)', True, False),
+    'swapTokensForExactTokens': ('(uint256,uint256,address[],address,uint256)', False, False),
+    'swapTokensForExactETH': ('(uint256,uint256,address[],address,uint256)', False, False),
+    'swapExactETHForTokens': ('(uint256,address[],address,uint256)', True, True),
+    'swapETHForExactTokens': ('(uint256,address[],address,uint256)', False, True),
+}
+
+PoolKey = Tuple[str, FrozenSet[str]]
+
+
+@lru_cache(maxsize=1)
+def router_selectors() -> Dict[bytes, str]:
+    """4-byte selector -> router function name"""
+    from eth_utils import keccak
+    return {keccak(text=name + types)[:4]: name for name, (types, _, _) in _ROUTER_SWAPS.items()}
+
+
+def _to_bytes(value) -> bytes:
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    return bytes.fromhex(value[2:] if value.startswith('0x') else value)
+
+
+def _to_hex(value) -> str:
+    if isinstance(value, (bytes, bytearray)):
+        return '0x' + bytes(value).hex()
+    return value
+
+
+def pool_key(dex: str, token_a: str, token_b: str) -> PoolKey:
+    return dex, frozenset((token_a.lower(), token_b.lower()))
+
+
+@dataclass
+class PendingSwap:
+    tx_hash: str
+    sender: str
+    nonce: int
+    gas_price: int
+    dex: str
+    path: List[str]
+    exact_in: bool
+    amount: int   # amountIn for exact-input calls, amountOut for exact-output calls
+    limit: int    # amountOutMin for exact-input calls, amountInMax for exact-output calls
+    seen_block: int = 0
+
+
+def decode_router_swap(tx: Dict, routers: Dict[str, str]) -> Optional[PendingSwap]:
+    """Decode a pending transaction calling a known router, or None if it is not a swap"""
+    to = tx.get('to')
+    if not to or to.lower() not in routers:
+        return None
+    data = _to_bytes(tx.get('input') or tx.get('data') or b'')
+    name = router_selectors().get(data[:4])
+    if name is None:
+        return None
+
+    from eth_abi import decode
+    types, exact_in, eth_in = _ROUTER_SWAPS[name]
+    try:
+        (args,) = decode([types], data[4:])
+    except Exception:
+        return None
+
+    if eth_in:
+        # (amountOutMin | amountOut, path, to, deadline) with the ETH amount as tx value
+        value = int(tx.get('value', 0))
+        amount, limit = (value, args[0]) if exact_in else (args[0], value)
+        path = list(args[1])
+    else:
+        amount, limit, path = args[0], args[1], list(args[2])
+
+    return PendingSwap(
+        tx_hash=_to_hex(tx['hash']),
+        sender=tx.get('from', ''),
+        nonce=int(tx.get('nonce', 0)),
+        gas_price=int(tx.get('maxPriorityFeePerGas') or tx.get('gasPrice') or 0),
+        dex=routers[to.lower()],
+        path=path,
+        exact_in=exact_in,
+        amount=amount,
+        limit=limit
+    )
+
+
+@dataclass
+class AccuracyReport:
+    """Predicted vs naive (last block) reserve error for pools with pending swaps"""
+    blocks: int = 0
+    pools: int = 0
+    predicted_error_sum: float = 0.0
+    naive_error_sum: float = 0.0
+    improved: int = 0
+
+    def record(self, predicted: int, naive: int, actual: int):
+        if actual <= 0:
+            return
+        predicted_error = abs(predicted - actual) / actual
+        naive_error = abs(naive - actual) / actual
+        self.pools += 1
+        self.predicted_error_sum += predicted_error
+        self.naive_error_sum += naive_error
+        if predicted_error < naive_error:
+            self.improved += 1
+
+    def as_dict(self) -> Dict:
+        pools = max(self.pools, 1)
+        return {
+            'blocks': self.blocks,
+            'pools_evaluated': self.pools,
+            'mean_predicted_error': self.predicted_error_sum / pools,
+            'mean_naive_error': self.naive_error_sum / pools,
+            'improved_ratio': self.improved / pools
+        }
+
+
+class PendingStateEngine:
+    """
+    Speculative copy of tracked V2 reserves with pending router swaps applied
+    in expected inclusion order (priority fee, then sender nonce). Swaps that
+    would break their own slippage limit are assumed to revert and skipped.
+    Swaps leave the projection when mined, when their sender's nonce is used
+    by another mined transaction (replaced or cancelled), or after
+    `max_age_blocks` blocks without being mined (dropped by the node).
+    """
+
+    def __init__(self, routers: Dict[str, str], fee_bps: int = 30, max_age_blocks: int = 20):
+        self.routers = {address.lower(): dex for address, dex in routers.items()}
+        self.fee_bps = fee_bps
+        self.max_age_blocks = max_age_blocks
+        self.block_number = 0
+        self.confirmed: Dict[PoolKey, PairState] = {}
+        self.pending: Dict[str, PendingSwap] = {}
+        self.accuracy = AccuracyReport()
+        self._projected: Optional[Dict[PoolKey, PairState]] = None
+
+    def track(self, dex: str, token_a: str, token_b: str, state: PairState):
+        self.confirmed[pool_key(dex, token_a, token_b)] = state
+        self._projected = None
+
+    def on_pending(self, tx: Dict) -> bool:
+        """Add a pending transaction; returns True if it is a swap through tracked pools"""
+        swap = decode_router_swap(tx, self.routers)
+        if swap is None or swap.tx_hash in self.pending:
+            return False
+        hops = zip(swap.path, swap.path[1:])
+        if not any(pool_key(swap.dex, a, b) in self.confirmed for a, b in hops):
+            return False
+        swap.seen_block = self.block_number
+        self.pending[swap.tx_hash] = swap
+        self._projected = None
+        return True
+
+    def on_block(self, block_number: int, confirmed: Iterable[Tuple[str, str, str, PairState]],
+                 included_hashes: Iterable = (), mined_nonces: Optional[Dict[str, int]] = None):
+        """
+        Score the current projection against the new block's reserves, then
+        rebase on them and drop pending swaps that were mined, superseded or
+        are too old. `included_hashes` and `mined_nonces` (sender -> highest
+        nonce mined) cover every block since the previous call.
+        """
+        updates = {pool_key(dex, a, b): state for dex, a, b, state in confirmed}
+        if self.pending and self.block_number:
+            projected = self.projected_state()
+            touched = self._touched_pools()
+            for key, actual in updates.items():
+                if key not in touched or key not in self.confirmed:
+                    continue
+                predicted, naive = projected[key], self.confirmed[key]
+                self.accuracy.record(predicted.reserve0, naive.reserve0, actual.reserve0)
+            self.accuracy.blocks += 1
+
+        self.confirmed.update(updates)
+        for tx_hash in included_hashes:
+            self.pending.pop(_to_hex(tx_hash), None)
+        mined_nonces = {sender.lower(): nonce for sender, nonce in (mined_nonces or {}).items()}
+        for tx_hash, swap in list(self.pending.items()):
+            if not swap.seen_block:  # seen before the first block
+                swap.seen_block = block_number
+            if block_number - swap.seen_block > self.max_age_blocks or \
+                    swap.nonce <= mined_nonces.get(swap.sender.lower(), -1):
+                del self.pending[tx_hash]
+        self.block_number = block_number
+        self._projected = None
+
+    def _touched_pools(self) -> set:
+        return {pool_key(swap.dex, a, b) for swap in self.pending.values() for a, b in zip(swap.path, swap.path[1:])}
+
+    def _apply(self, state: Dict[PoolKey, PairState], swap: PendingSwap) -> bool:
+        hops = list(zip(swap.path, swap.path[1:]))
+        if any(pool_key(swap.dex, a, b) not in state for a, b in hops):
+            # Untracked hop: apply nothing rather than half a route
+            return False
+
+        amounts = [0] * len(swap.path)
+        if swap.exact_in:
+            amounts[0] = swap.amount
+            for i, (a, b) in enumerate(hops):
+                amounts[i + 1] = get_amount_out(amounts[i], *state[pool_key(swap.dex, a, b)].reserves_for(a), self.fee_bps)
+            if amounts[-1] < swap.limit:
+                return False
+        else:
+            amounts[-1] = swap.amount
+            for i in range(len(hops) - 1, -1, -1):
+                a, b = hops[i]
+                amounts[i] = get_amount_in(amounts[i + 1], *state[pool_key(swap.dex, a, b)].reserves_for(a), self.fee_bps)
+                if amounts[i] == 0:
+                    return False
+            if amounts[0] > swap.limit:
+                return False
+
+        for i, (a, b) in enumerate(hops):
+            key = pool_key(swap.dex, a, b)
+            pair = state[key]
+            delta0, delta1 = (amounts[i], -amounts[i + 1]) if a.lower() == pair.token0.lower() \
+                else (-amounts[i + 1], amounts[i])
+            state[key] = PairState(pair.address, pair.token0, pair.reserve0 + delta0, pair.reserve1 + delta1)
+        return True
+
+    def projected_state(self) -> Dict[PoolKey, PairState]:
+        """Tracked reserves after every pending swap that is expected to succeed"""
+        if self._projected is None:
+            state = dict(self.confirmed)
+            for swap in sorted(self.pending.values(), key=lambda s: (-s.gas_price, s.sender, s.nonce)):
+                self._apply(state, swap)
+            self._projected = state
+        return self._projected
+
+    def projected(self, dex: str, token_a: str, token_b: str) -> Optional[PairState]:
+        return self.projected_state().get(pool_key(dex, token_a, token_b))
+
+
+class PendingTxPoller:
+    """Polls a node's pending-transaction filter and fetches each new transaction once"""
+
+    def __init__(self, w3, max_per_poll: int = 500):
+        self.w3 = w3
+        self.max_per_poll = max_per_poll
+        self._filter = w3.eth.filter('pending')
+
+    def poll(self) -> List[Dict]:
+        transactions = []
+        for tx_hash in self._filter.get_new_entries()[:self.max_per_poll]:
+            try:
+                tx = self.w3.eth.get_transaction(tx_hash)
+            except Exception:
+                continue  # already mined or dropped
+            if tx is not None:
+                transactions.append(dict(tx))
+        return transactions
@@ -0,0 +1,151 @@
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+@dataclass
+class PairActivity:
+    volatility_bps: float = 0.0  # EWMA of |price move| between scans, per block
+    spread_bps: float = 0.0      # EWMA of the cross-DEX price gap
+    hit_rate: float = 0.0        # EWMA of scans that found an opportunity
+    last_price: Optional[float] = None
+    last_block: int = -1
+    previous_block: int = -1
+    scans: int = 0
+    hits: int = 0
+
+
+def price_and_spread(reserves: Sequence[Tuple[int, int]]) -> Tuple[Optional[float], Optional[float]]:
+    """Mid price (token_b per token_a) and widest cross-DEX gap in bps from per-DEX reserves"""
+    prices = [reserve_b / reserve_a for reserve_a, reserve_b in reserves if reserve_a and reserve_b]
+    if not prices:
+        return None, None
+    low, high = min(prices), max(prices)
+    return sum(prices) / len(prices), (high - low) * 10000 / low
+
+
+class AdaptivePairScheduler:
+    """
+    Picks which pairs to scan each block under a fixed budget of RPC calls.
+
+    Each pair gets a priority from its recent volatility, cross-DEX spread and
+    opportunity hit rate. Hot pairs (priority at or above `hot_priority`) are
+    scanned every block using up to `hot_share` of the budget. The rest of the
+    budget goes to overdue pairs (idle `max_idle_blocks` or more), then to
+    pairs by priority times blocks since their last scan, so cold pairs are
+    still rescanned, just rarely. Pairs never scanned count as overdue.
+    """
+
+    def __init__(self, pairs: int, budget: int, cost_per_pair: int = 1, max_idle_blocks: int = 50,
+                 hot_priority: float = 1.0, hot_share: float = 0.5, alpha: float = 0.2,
+                 volatility_scale_bps: float = 10.0, spread_scale_bps: float = 30.0,
+                 hit_weight: float = 2.0, floor: float = 0.02):
+        self.pairs = pairs
+        self.budget = budget
+        self.cost_per_pair = max(1, cost_per_pair)
+        self.max_idle_blocks = max_idle_blocks
+        self.hot_priority = hot_priority
+        self.hot_share = hot_share
+        self.alpha = alpha
+        self.volatility_scale_bps = volatility_scale_bps
+        self.spread_scale_bps = spread_scale_bps
+        self.hit_weight = hit_weight
+        self.floor = floor
+
+        self.activity: List[PairActivity] = [PairActivity() for _ in range(pairs)]
+        self._block = None
+        self._spent = 0
+        self.stats = {'blocks': 0, 'selected': 0, 'hot': 0, 'overdue': 0, 'hits': 0}
+
+    @property
+    def pairs_per_block(self) -> int:
+        return max(1, self.budget // self.cost_per_pair)
+
+    def priority(self, pair_index: int) -> float:
+        activity = self.activity[pair_index]
+        return (self.floor
+                + activity.volatility_bps / self.volatility_scale_bps
+                + activity.spread_bps / self.spread_scale_bps
+                + self.hit_weight * activity.hit_rate)
+
+    def select(self, block_number: int) -> List[int]:
+        """
+        Pairs to scan now. The budget is per block: repeated calls within one
+        block only hand out what is left of it, and never the same pair twice.
+        """
+        if block_number != self._block:
+            self._block = block_number
+            self._spent = 0
+            self.stats['blocks'] += 1
+        slots = (self.budget - self._spent) // self.cost_per_pair
+        if slots <= 0:
+            return []
+
+        priorities = [self.priority(i) for i in range(self.pairs)]
+        hot, overdue, rest = [], [], []
+        for i, activity in enumerate(self.activity):
+            if activity.last_block == block_number:
+                continue
+            idle = block_number - activity.last_block if activity.last_block >= 0 else math.inf
+            if priorities[i] >= self.hot_priority:
+                hot.append((-priorities[i], i))
+            elif idle >= self.max_idle_blocks:
+                overdue.append((-idle, i))
+            else:
+                rest.append((-priorities[i] * idle, i))
+
+        hot.sort()
+        overdue.sort()
+        rest.sort()
+        hot_slots = max(1, int(self.pairs_per_block * self.hot_share))
+        chosen = [i for _, i in hot[:min(hot_slots, slots)]]
+        self.stats['hot'] += len(chosen)
+        # Hot pairs that did not fit their share compete on urgency with the rest
+        rest.extend((-priorities[i] * (block_number - self.activity[i].last_block), i) for _, i in hot[len(chosen):])
+        rest.sort()
+
+        for queue, counter in ((overdue, 'overdue'), (rest, None)):
+            for _, i in queue:
+                if len(chosen) >= slots:
+                    break
+                chosen.append(i)
+                if counter:
+                    self.stats[counter] += 1
+
+        for i in chosen:
+            self.activity[i].previous_block = self.activity[i].last_block
+            self.activity[i].last_block = block_number
+        self._spent += len(chosen) * self.cost_per_pair
+        self.stats['selected'] += len(chosen)
+        return chosen
+
+    def record(self, pair_index: int, hit: bool, price: Optional[float] = None,
+               spread_bps: Optional[float] = None):
+        """
+        Feed back the scan of a pair handed out by `select`. `price` and
+        `spread_bps` are optional as not every scan path sees them; the spread
+        estimate decays when absent.
+        """
+        activity = self.activity[pair_index]
+        alpha = self.alpha
+        activity.scans += 1
+        activity.hits += hit
+        self.stats['hits'] += hit
+        activity.hit_rate += alpha * ((1.0 if hit else 0.0) - activity.hit_rate)
+        activity.spread_bps += alpha * ((spread_bps or 0.0) - activity.spread_bps)
+        if price is not None:
+            if activity.last_price and activity.previous_block >= 0:
+                blocks = max(1, activity.last_block - activity.previous_block)
+                # Random-walk moves grow with the square root of the gap between scans
+                move_bps = abs(math.log(price / activity.last_price)) * 10000 / math.sqrt(blocks)
+                activity.volatility_bps += alpha * (move_bps - activity.volatility_bps)
+            activity.last_price = price
+
+    def summary(self, top: int = 10) -> List[Dict]:
+        """Highest-priority pairs with their activity, for logs and the dashboard"""
+        ranked = sorted(range(self.pairs), key=self.priority, reverse=True)[:top]
+        return [{'pair_index': i, 'priority': round(self.priority(i), 3),
+                 'volatility_bps': round(self.activity[i].volatility_bps, 2),
+                 'spread_bps': round(self.activity[i].spread_bps, 2),
+                 'hit_rate': round(self.activity[i].hit_rate, 3),
+                 'scans': self.activity[i].scans, 'hits': self.activity[i].hits} for i in ranked]
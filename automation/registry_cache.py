@@ -0,0 +1,69 @@
+import json
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+# Scanners for different chains share the file; each save rewrites only its own chain's entry
+_save_lock = threading.Lock()
+
+
+class RegistryCache:
+    """
+    On-disk cache of immutable on-chain lookups (V2 pair address and token0
+    per DEX and token pair), so a restart does not repeat factory calls.
+    Entries are keyed by chain id; writes are atomic and only happen when
+    something new was learned.
+    """
+
+    def __init__(self, path: str, chain_id: int):
+        self.path = path
+        self.chain_id = str(chain_id)
+        self._pairs: Dict[str, Tuple[str, str]] = {}
+        self._dirty = False
+        self._load()
+
+    @staticmethod
+    def _pair_key(dex: str, token_a: str, token_b: str) -> str:
+        return '%s:%s:%s' % (dex, token_a.lower(), token_b.lower())
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return  # a corrupt cache is rebuilt from the chain
+        self._pairs = {key: tuple(value) for key, value in data.get(self.chain_id, {}).get('pairs', {}).items()}
+
+    def get_pair(self, dex: str, token_a: str, token_b: str) -> Optional[Tuple[str, str]]:
+        return self._pairs.get(self._pair_key(dex, token_a, token_b))
+
+    def set_pair(self, dex: str, token_a: str, token_b: str, pair_address: str, token0: str):
+        self._pairs[self._pair_key(dex, token_a, token_b)] = (pair_address, token0)
+        self._dirty = True
+
+    def __len__(self) -> int:
+        return len(self._pairs)
+
+    def save(self):
+        if not self._dirty or not self.path:
+            return
+        with _save_lock:
+            self._save()
+
+    def _save(self):
+        data = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+        data[self.chain_id] = {'pairs': {key: list(value) for key, value in self._pairs.items()}}
+
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
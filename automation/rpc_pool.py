@@ -0,0 +1,249 @@
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from automation.jsonrpc import JsonRpcClient, JsonRpcError
+
+logger = logging.getLogger(__name__)
+
+# Node replies to a broadcast that still mean the transaction is in the mempool
+_ALREADY_KNOWN = ('already known', 'known transaction', 'already imported')
+
+
+def nonce_too_low(error: BaseException) -> bool:
+    """A broadcast rejected because its nonce is already used: the sender's local nonce is stale"""
+    return 'nonce too low' in str(error).lower()
+
+
+class Endpoint:
+    """One RPC URL with its measured latency (EWMA), head block and failure state"""
+
+    def __init__(self, url: str, pool_size: int, timeout: float):
+        self.url = url
+        self.client = JsonRpcClient(url, pool_size=pool_size, timeout=timeout)
+        self.latency: Optional[float] = None
+        self.head = 0
+        self.failures = 0
+        self.down_until = 0.0
+
+    def record_latency(self, seconds: float, alpha: float = 0.3):
+        self.latency = seconds if self.latency is None else (1 - alpha) * self.latency + alpha * seconds
+        self.failures = 0
+
+    def record_failure(self, cooldown: float):
+        self.failures += 1
+        # Back off exponentially, capped at 8x the base cooldown
+        self.down_until = time.monotonic() + cooldown * min(2 ** (self.failures - 1), 8)
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+    def as_dict(self) -> Dict:
+        return {
+            'url': self.url,
+            'latency_ms': None if self.latency is None else round(self.latency * 1000, 2),
+            'head': self.head,
+            'failures': self.failures,
+            'available': self.available
+        }
+
+
+class RpcPool:
+    """
+    Routes JSON-RPC reads to the fastest endpoint within `max_lag_blocks` of
+    the best known head, hedges a read to the next endpoint when the first has
+    not answered after `hedge_after` seconds, fails over on transport errors
+    and broadcasts eth_sendRawTransaction to every endpoint at once.
+
+    Exposes the same request/batch/close interface as JsonRpcClient.
+    """
+
+    def __init__(self, urls: Sequence[str], hedge_after: float = 0.25, max_lag_blocks: int = 2,
+                 probe_interval: float = 5.0, failure_cooldown: float = 2.0,
+                 pool_size: int = 4, timeout: float = 10.0):
+        if not urls:
+            raise ValueError('RpcPool needs at least one endpoint')
+        self.endpoints = [Endpoint(url, pool_size, timeout) for url in urls]
+        self.hedge_after = hedge_after
+        self.max_lag_blocks = max_lag_blocks
+        self.probe_interval = probe_interval
+        self.failure_cooldown = failure_cooldown
+        self.stats = {'requests': 0, 'hedged': 0, 'hedge_wins': 0, 'failovers': 0}
+        self._executor = ThreadPoolExecutor(max_workers=max(4, 2 * len(self.endpoints)),
+                                            thread_name_prefix='rpc-pool')
+        self._stop = threading.Event()
+        self._prober: Optional[threading.Thread] = None
+
+    # -- health ------------------------------------------------------------
+
+    def _probe_one(self, endpoint: Endpoint):
+        start = time.perf_counter()
+        try:
+            head = int(endpoint.client.request('eth_blockNumber'), 16)
+        except Exception as e:
+            endpoint.record_failure(self.failure_cooldown)
+            logger.debug("RPC probe failed for %s: %s", endpoint.url, e)
+            return
+        endpoint.record_latency(time.perf_counter() - start)
+        endpoint.head = head
+
+    def probe(self):
+        """Measure latency and head block of every endpoint in parallel"""
+        list(self._executor.map(self._probe_one, self.endpoints))
+
+    def start(self):
+        """Probe once, then keep probing in a background thread"""
+        self.probe()
+        if self._prober is None:
+            self._prober = threading.Thread(target=self._probe_loop, name='rpc-pool-probe', daemon=True)
+            self._prober.start()
+
+    def _probe_loop(self):
+        while not self._stop.wait(self.probe_interval):
+            self.probe()
+
+    def ranked(self) -> List[Endpoint]:
+        """Endpoints in routing order: available and in sync first, fastest first"""
+        best_head = max(e.head for e in self.endpoints)
+
+        def order(endpoint: Endpoint):
+            in_sync = best_head - endpoint.head <= self.max_lag_blocks
+            latency = endpoint.latency if endpoint.latency is not None else float('inf')
+            return not endpoint.available, not in_sync, latency
+
+        return sorted(self.endpoints, key=order)
+
+    def status(self) -> List[Dict]:
+        return [endpoint.as_dict() for endpoint in self.ranked()]
+
+    def quarantined(self) -> List[Dict]:
+        """Endpoints sitting out a failure cooldown"""
+        return [endpoint.as_dict() for endpoint in self.endpoints if not endpoint.available]
+
+    # -- requests ----------------------------------------------------------
+
+    def _timed(self, endpoint: Endpoint, method: str, params: Sequence) -> Any:
+        start = time.perf_counter()
+        result = endpoint.client.request(method, params)
+        endpoint.record_latency(time.perf_counter() - start)
+        return result
+
+    def request(self, method: str, params: Sequence = ()) -> Any:
+        if method == 'eth_sendRawTransaction':
+            return self.broadcast(params[0])
+        self.stats['requests'] += 1
+
+        candidates = self.ranked()
+        pending = {}
+        primary = candidates.pop(0)
+        pending[self._executor.submit(self._timed, primary, method, params)] = primary
+        last_error: Optional[BaseException] = None
+        hedged = False
+
+        while pending:
+            timeout = None if hedged or not candidates else self.hedge_after
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # Primary is slow: race it against the next endpoint
+                hedged = True
+                self.stats['hedged'] += 1
+                backup = candidates.pop(0)
+                pending[self._executor.submit(self._timed, backup, method, params)] = backup
+                continue
+
+            for future in done:
+                endpoint = pending.pop(future)
+                try:
+                    result = future.result()
+                except JsonRpcError:
+                    raise  # the node answered; another node would answer the same
+                except Exception as e:
+                    last_error = e
+                    endpoint.record_failure(self.failure_cooldown)
+                    if candidates and not pending:
+                        self.stats['failovers'] += 1
+                        backup = candidates.pop(0)
+                        pending[self._executor.submit(self._timed, backup, method, params)] = backup
+                    continue
+                if hedged and endpoint is not primary:
+                    self.stats['hedge_wins'] += 1
+                return result
+
+        raise ConnectionError('All RPC endpoints failed: %s' % last_error)
+
+    def batch(self, calls: Iterable[Tuple[str, Sequence]]) -> List[Any]:
+        calls = list(calls)
+        last_error: Optional[BaseException] = None
+        for endpoint in self.ranked():
+            try:
+                return endpoint.client.batch(calls)
+            except JsonRpcError:
+                raise
+            except Exception as e:
+                last_error = e
+                endpoint.record_failure(self.failure_cooldown)
+                self.stats['failovers'] += 1
+        raise ConnectionError('All RPC endpoints failed: %s' % last_error)
+
+    def broadcast(self, raw_transaction: str) -> str:
+        """Send a signed transaction to every endpoint in parallel; returns the first accepted hash"""
+        futures = {self._executor.submit(e.client.request, 'eth_sendRawTransaction', [raw_transaction]): e
+                   for e in self.endpoints}
+        errors, known = [], False
+        for future in as_completed(futures):
+            try:
+                return future.result()
+            except JsonRpcError as e:
+                if any(marker in e.message.lower() for marker in _ALREADY_KNOWN):
+                    known = True
+                else:
+                    errors.append(e)
+            except Exception as e:
+                futures[future].record_failure(self.failure_cooldown)
+                errors.append(e)
+
+        if known:
+            # Endpoints that already had it do not echo the hash: it is the keccak of the payload
+            from eth_utils import keccak
+            return '0x' + keccak(hexstr=raw_transaction).hex()
+        # A stale nonce outranks an endpoint being down: the caller has to resync before retrying
+        raise next((e for e in errors if nonce_too_low(e)), errors[0])
+
+    def close(self):
+        self._stop.set()
+        if self._prober is not None:
+            self._prober.join(timeout=1)
+            self._prober = None
+        self._executor.shutdown(wait=False)
+        for endpoint in self.endpoints:
+            endpoint.client.close()
+
+
+def rpc_client(urls: Sequence[str], **kwargs):
+    """A JsonRpcClient for a single URL, a started RpcPool for several"""
+    if len(urls) == 1:
+        return JsonRpcClient(urls[0], pool_size=kwargs.get('pool_size', 4))
+    pool = RpcPool(urls, **kwargs)
+    pool.start()
+    return pool
+
+
+def web3_provider(pool: RpcPool):
+    """web3.py provider that sends every request through `pool`"""
+    from web3.providers import JSONBaseProvider
+
+    class RpcPoolProvider(JSONBaseProvider):
+        def make_request(self, method, params):
+            try:
+                return {'jsonrpc': '2.0', 'id': 0, 'result': pool.request(method, list(params or []))}
+            except JsonRpcError as e:
+                return {'jsonrpc': '2.0', 'id': 0,
+                        'error': {'code': e.code, 'message': e.message, 'data': e.data}}
+
+        def is_connected(self, show_traceback: bool = False) -> bool:
+            return any(endpoint.available for endpoint in pool.endpoints)
+
+    return RpcPoolProvider()
@@ -0,0 +1,186 @@
+import heapq
+import itertools
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from automation.amounts import NativePrices
+
+RouteKey = Tuple[str, str, str, str]
+Pool = Tuple[str, FrozenSet[str]]
+
+
+@dataclass
+class ScheduledOpportunity:
+    opportunity: object
+    net_profit: int
+    key: RouteKey
+    pools: FrozenSet[Pool]
+    seen_block: int
+    deadline_block: int
+    seq: int = 0
+
+
+def route_key(opportunity) -> RouteKey:
+    """Same pair through the same two DEXes is the same pool movement, whatever the size"""
+    pair = opportunity.token_pair
+    return pair.token_a, pair.token_b, opportunity.dex_a, opportunity.dex_b
+
+
+def route_pools(opportunity) -> FrozenSet[Pool]:
+    pair_key = frozenset((opportunity.token_pair.token_a, opportunity.token_pair.token_b))
+    return frozenset(((opportunity.dex_a, pair_key), (opportunity.dex_b, pair_key)))
+
+
+def max_weight_disjoint(entries: Sequence[ScheduledOpportunity], limit: int,
+                        node_budget: int = 20000) -> List[ScheduledOpportunity]:
+    """
+    Highest total net profit subset of at most `limit` entries with no pool in
+    common. Branch and bound seeded with the greedy answer; if `node_budget`
+    runs out the best subset found so far is returned.
+    """
+    items = sorted(entries, key=lambda e: e.net_profit, reverse=True)
+    prefix = [0]
+    for item in items:
+        prefix.append(prefix[-1] + item.net_profit)
+
+    best: List[ScheduledOpportunity] = []
+    used: set = set()
+    for item in items:
+        if len(best) < limit and not item.pools & used:
+            best.append(item)
+            used |= item.pools
+    best_value = sum(item.net_profit for item in best)
+    nodes = 0
+
+    def search(i: int, chosen: List[ScheduledOpportunity], pools: FrozenSet[Pool], value: int):
+        nonlocal best, best_value, nodes
+        nodes += 1
+        if value > best_value:
+            best, best_value = list(chosen), value
+        if nodes > node_budget or len(chosen) == limit or i == len(items):
+            return
+        # Optimistic bound: the next best remaining entries all fit
+        if value + prefix[min(len(items), i + limit - len(chosen))] - prefix[i] <= best_value:
+            return
+        item = items[i]
+        if not item.pools & pools:
+            chosen.append(item)
+            search(i + 1, chosen, pools | item.pools, value + item.net_profit)
+            chosen.pop()
+        search(i + 1, chosen, pools, value)
+
+    search(0, [], frozenset(), 0)
+    return best
+
+
+class OpportunityScheduler:
+    """
+    Scores opportunities by net profit after loan fee and gas, keeps the best
+    one per route in a priority queue until its block deadline, and hands out
+    the most valuable set of legs that do not touch the same pool.
+
+    Scores are in the gas token's base units: each profit is converted
+    through `prices`, so legs borrowing tokens with different decimals
+    compete on value. Without a price an opportunity cannot be scored.
+    """
+
+    def __init__(self, native_token: str, ttl_blocks: int = 2, max_legs: int = 3,
+                 gas_buffer_percentage: float = 0.0, max_candidates: int = 64,
+                 prices: Optional[NativePrices] = None):
+        self.native_token = native_token
+        self.prices = prices if prices is not None else NativePrices(native_token)
+        self.ttl_blocks = ttl_blocks
+        self.max_legs = max(1, max_legs)
+        self.gas_multiplier = 1 + gas_buffer_percentage / 100
+        self.max_candidates = max_candidates
+
+        self._heap: List[Tuple[int, int, RouteKey]] = []
+        self._live: Dict[RouteKey, ScheduledOpportunity] = {}
+        self._seq = itertools.count()
+        self.stats = {'submitted': 0, 'unprofitable': 0, 'duplicates': 0, 'expired': 0, 'dispatched': 0}
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def net_profit(self, opportunity, gas_price: int) -> int:
+        """Expected profit minus loan fee, in native units at the borrowed token's price, minus buffered gas"""
+        gross = opportunity.expected_profit - getattr(opportunity, 'loan_fee', 0)
+        value = self.prices.to_native(opportunity.token_pair.token_a, gross)
+        if value is None:
+            return 0
+        return value - int(opportunity.gas_estimate * gas_price * self.gas_multiplier)
+
+    def submit(self, opportunities, block_number: int, gas_price: int) -> int:
+        """Queue a scan's opportunities; returns how many were new or improved a queued route"""
+        accepted = 0
+        for opportunity in opportunities:
+            self.stats['submitted'] += 1
+            net = self.net_profit(opportunity, gas_price)
+            if net <= 0:
+                self.stats['unprofitable'] += 1
+                continue
+
+            key = route_key(opportunity)
+            existing = self._live.get(key)
+            if existing is not None and existing.seen_block >= block_number and existing.net_profit >= net:
+                self.stats['duplicates'] += 1
+                continue
+
+            entry = self._live[key] = ScheduledOpportunity(
+                opportunity=opportunity,
+                net_profit=net,
+                key=key,
+                pools=route_pools(opportunity),
+                seen_block=block_number,
+                deadline_block=block_number + self.ttl_blocks,
+                seq=next(self._seq)
+            )
+            heapq.heappush(self._heap, (-net, entry.seq, key))
+            accepted += 1
+        return accepted
+
+    def _pop_live(self, current_block: int) -> Optional[ScheduledOpportunity]:
+        """Pop the most profitable live entry, discarding superseded and expired ones"""
+        while self._heap:
+            _, seq, key = heapq.heappop(self._heap)
+            entry = self._live.get(key)
+            if entry is None or entry.seq != seq:
+                continue
+            if entry.deadline_block < current_block:
+                del self._live[key]
+                self.stats['expired'] += 1
+                continue
+            return entry
+        return None
+
+    def next_batch(self, current_block: int, busy_pools: FrozenSet[Pool] = frozenset()) -> List[object]:
+        """
+        Take the best non-conflicting opportunities still valid at
+        `current_block`, most profitable first. Routes through `busy_pools`
+        (moved by a trade still in flight) stay queued.
+        """
+        candidates = []
+        while len(candidates) < self.max_candidates:
+            entry = self._pop_live(current_block)
+            if entry is None:
+                break
+            candidates.append(entry)
+
+        chosen = max_weight_disjoint([entry for entry in candidates if not entry.pools & busy_pools], self.max_legs)
+        chosen_keys = {entry.key for entry in chosen}
+        for entry in candidates:
+            if entry.key in chosen_keys:
+                del self._live[entry.key]
+            else:
+                heapq.heappush(self._heap, (-entry.net_profit, entry.seq, entry.key))
+
+        self.stats['dispatched'] += len(chosen)
+        return [entry.opportunity for entry in sorted(chosen, key=lambda e: e.net_profit, reverse=True)]
+
+    def expire(self, current_block: int) -> int:
+        """Drop every queued opportunity past its deadline"""
+        stale = [key for key, entry in self._live.items() if entry.deadline_block < current_block]
+        for key in stale:
+            del self._live[key]
+        self.stats['expired'] += len(stale)
+        return len(stale)
@@ -0,0 +1,168 @@
+import multiprocessing
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from automation.direct_swap import get_amount_out
+
+# One slot per (pair, dex): reserveA (16 bytes) | reserveB (16 bytes), big-endian,
+# oriented to the pair's token_a. An all-zero slot means the pool does not exist.
+SLOT_SIZE = 32
+
+# One size list for every pair, or one per pair index (pairs missing from it are skipped)
+Amounts = Union[Sequence[int], Dict[int, Sequence[int]]]
+
+
+class Candidate(NamedTuple):
+    pair_index: int
+    dex_a: int
+    dex_b: int
+    amount_index: int
+    profit: int
+
+
+class ReserveTable:
+    """Fixed-layout reserve table in shared memory, written by the parent and read by workers"""
+
+    def __init__(self, pairs: int, dexes: int, name: Optional[str] = None):
+        self.pairs = pairs
+        self.dexes = dexes
+        size = max(pairs * dexes * SLOT_SIZE, 1)
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size)
+        self.buf = self.shm.buf
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def _offset(self, pair_index: int, dex: int) -> int:
+        return (pair_index * self.dexes + dex) * SLOT_SIZE
+
+    def set(self, pair_index: int, dex: int, reserve_a: int, reserve_b: int):
+        offset = self._offset(pair_index, dex)
+        self.buf[offset:offset + 16] = reserve_a.to_bytes(16, 'big')
+        self.buf[offset + 16:offset + 32] = reserve_b.to_bytes(16, 'big')
+
+    def get(self, pair_index: int, dex: int) -> Tuple[int, int]:
+        offset = self._offset(pair_index, dex)
+        return (int.from_bytes(self.buf[offset:offset + 16], 'big'),
+                int.from_bytes(self.buf[offset + 16:offset + 32], 'big'))
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def scan_pairs(table: ReserveTable, pair_indices: Iterable[int], amounts: Amounts,
+               fee_bps: Sequence[int], min_profit_bps: int) -> List[Candidate]:
+    """Evaluate every (dexA, dexB, amount) round trip for the given pairs, as ArbitrageLens.scan does"""
+    candidates = []
+    dexes = range(table.dexes)
+    per_pair = isinstance(amounts, dict)
+    for p in pair_indices:
+        pair_amounts = amounts.get(p) if per_pair else amounts
+        if not pair_amounts:
+            continue
+        reserves = [table.get(p, d) for d in dexes]
+        for a in dexes:
+            reserve_a_in, reserve_b_out = reserves[a]
+            if reserve_a_in == 0:
+                continue
+            for b in dexes:
+                reserve_a_out, reserve_b_in = reserves[b]
+                if a == b or reserve_a_out == 0:
+                    continue
+                for i, amount_in in enumerate(pair_amounts):
+                    amount_b = get_amount_out(amount_in, reserve_a_in, reserve_b_out, fee_bps[a])
+                    amount_out = get_amount_out(amount_b, reserve_b_in, reserve_a_out, fee_bps[b])
+                    if amount_out * 10000 > amount_in * (10000 + min_profit_bps):
+                        candidates.append(Candidate(p, a, b, i, amount_out - amount_in))
+    return candidates
+
+
+def _worker_main(conn, table_name: str, pairs: int, dexes: int, shard: range):
+    """Worker loop: attach to the shared table once, then scan its shard on request"""
+    table = ReserveTable(pairs, dexes, name=table_name)
+    try:
+        while True:
+            message = conn.recv()
+            if message is None:
+                break
+            amounts, fee_bps, min_profit_bps = message
+            conn.send(scan_pairs(table, shard, amounts, fee_bps, min_profit_bps))
+    finally:
+        table.close()
+        conn.close()
+
+
+class ShardedScanner:
+    """
+    Partitions pairs across worker processes. Each worker owns a fixed,
+    contiguous slice of pair indices and reads reserves straight from the
+    shared table, so a scan only ships the quote parameters to workers and
+    the profitable candidates back.
+    """
+
+    def __init__(self, pairs: int, dexes: int, workers: int, start_method: Optional[str] = None):
+        if workers < 1:
+            raise ValueError("At least one worker is required")
+        self.table = ReserveTable(pairs, dexes)
+        self.workers = min(workers, max(pairs, 1))
+        context = multiprocessing.get_context(start_method)
+
+        shard_size = -(-pairs // self.workers)
+        self._connections = []
+        self._processes = []
+        for w in range(self.workers):
+            shard = range(w * shard_size, min((w + 1) * shard_size, pairs))
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=_worker_main,
+                args=(child_conn, self.table.name, pairs, dexes, shard),
+                daemon=True
+            )
+            process.start()
+            child_conn.close()
+            self._connections.append(parent_conn)
+            self._processes.append(process)
+
+    def update(self, pair_index: int, dex: int, reserve_a: int, reserve_b: int):
+        self.table.set(pair_index, dex, reserve_a, reserve_b)
+
+    def update_many(self, updates: Iterable[Tuple[int, int, int, int]]):
+        for pair_index, dex, reserve_a, reserve_b in updates:
+            self.table.set(pair_index, dex, reserve_a, reserve_b)
+
+    def scan(self, amounts: Amounts, fee_bps: Sequence[int], min_profit_bps: int) -> List[Candidate]:
+        """Scan all shards in parallel and rank the merged candidates by profit"""
+        amounts = {p: list(a) for p, a in amounts.items()} if isinstance(amounts, dict) else list(amounts)
+        message = (amounts, list(fee_bps), min_profit_bps)
+        for conn in self._connections:
+            conn.send(message)
+        candidates = []
+        for conn in self._connections:
+            candidates.extend(conn.recv())
+        candidates.sort(key=lambda c: c.profit, reverse=True)
+        return candidates
+
+    def close(self):
+        for conn in self._connections:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for conn in self._connections:
+            conn.close()
+        self.table.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
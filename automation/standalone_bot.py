@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+FlashloanV3Polygon bot without the brownie runtime
+
+Loads the compiled ABI from build artifacts once, quotes the route grid in one
+eth_call and sends signed transactions through a pooled JSON-RPC client.
+
+    python -m automation.standalone_bot --contract 0x... [--once]
+
+Configuration comes from the command line or the environment
+(FLASHLOAN_CONTRACT_ADDRESS, RPC_URLS or ALCHEMY_API_URL_MAINNET, PRIVATE_KEY,
+CHAIN_ID).
+"""
+import argparse
+import json
+import logging
+import os
+import time
+import urllib.request
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from automation.amounts import parse_units, rescale
+from automation.failures import FailureTracker, failures as default_failures
+from automation.jsonrpc import RpcContract, load_artifact_abi
+from automation.rpc_pool import rpc_client
+
+logger = logging.getLogger(__name__)
+
+ETHER = 10 ** 18
+GWEI = 10 ** 9
+# Prices and the profit threshold are compared as integer micro-dollars
+USD_DECIMALS = 6
+
+TOKENS = {
+    'WMATIC': '0x0d500B1d8E8eF31E21C99d1Db9A6444d3ADf1270',
+    'USDC': '0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174',
+    'WETH': '0x7ceB23fD6bC0adD59E62ac25578270cFf1b9f619',
+    'DAI': '0x8f3Cf7ad23Cd3CaDbD9735AFf958023239c6A063',
+    'USDT': '0xc2132D05D31c914a87C6611C10748AEb04B58e8F'
+}
+
+DEXES = {
+    'QUICKSWAP': '0xa5E0829CaCEd8fFDD4De3c43696c57F7D7A678ff',
+    'SUSHISWAP': '0x1b02dA8Cb0d097eB8D57A175b88c7D8b47997506'
+}
+
+TOKEN_DECIMALS = {'WMATIC': 18, 'USDC': 6, 'WETH': 18, 'DAI': 18, 'USDT': 6, 'WBTC': 8}
+
+TOKEN_PAIRS = [('WMATIC', 'USDC'), ('WMATIC', 'WETH'), ('USDC', 'WETH'), ('WMATIC', 'DAI'), ('USDC', 'DAI')]
+
+# Whole-token sizes at 18 decimals, rescaled to each borrowed token's decimals in the grid
+TRADE_AMOUNTS = [1000 * ETHER, 3146 * ETHER, 10000 * ETHER]
+
+COINGECKO_IDS = {
+    'WMATIC': 'matic-network', 'USDC': 'usd-coin', 'WETH': 'ethereum', 'DAI': 'dai', 'USDT': 'tether'
+}
+
+
+def build_quote_grid(tokens: Dict[str, str], dexes: Dict[str, str], amounts: Sequence[int],
+                     token_pairs: Sequence = TOKEN_PAIRS, decimals: Optional[Dict[str, int]] = None) -> List[Dict]:
+    """
+    Every (pair, amount, dexA, dexB) combination quoted by a scan. With
+    `decimals`, 18-decimal `amounts` are rescaled to the borrowed token's.
+    """
+    grid = []
+    for token_a_name, token_b_name in token_pairs:
+        places = decimals.get(token_a_name, 18) if decimals is not None else 18
+        for amount in amounts:
+            amount = rescale(amount, 18, places)
+            for dex_a_name, dex_a in dexes.items():
+                for dex_b_name, dex_b in dexes.items():
+                    grid.append({
+                        'token_a': tokens[token_a_name],
+                        'token_b': tokens[token_b_name],
+                        'token_a_name': token_a_name,
+                        'token_b_name': token_b_name,
+                        'amount': amount,
+                        'dex_a': dex_a,
+                        'dex_b': dex_b,
+                        'dex_a_name': dex_a_name,
+                        'dex_b_name': dex_b_name
+                    })
+    return grid
+
+
+class PriceFeed:
+    """CoinGecko USD prices, fetched once per symbol per `ttl` seconds"""
+
+    def __init__(self, ttl: float = 60.0, timeout: float = 5.0, failures: Optional[FailureTracker] = None):
+        self.ttl = ttl
+        self.timeout = timeout
+        self.failures = failures or default_failures
+        self._prices: Dict[str, tuple] = {}
+
+    def usd(self, symbol: str) -> float:
+        cached = self._prices.get(symbol)
+        if cached and time.monotonic() - cached[1] < self.ttl:
+            return cached[0]
+        coin = COINGECKO_IDS.get(symbol)
+        if coin is None:
+            return 0.0
+        if not self.failures.allow('coingecko'):
+            return cached[0] if cached else 0.0
+        url = 'https://api.coingecko.com/api/v3/simple/price?ids=%s&vs_currencies=usd' % coin
+        try:
+            with urllib.request.urlopen(url, timeout=self.timeout) as response:
+                price = float(json.load(response)[coin]['usd'])
+        except Exception as e:
+            self.failures.record_failure('coingecko', e)
+            logger.warning("Error fetching price for %s: %s", symbol, e)
+            return cached[0] if cached else 0.0
+        self.failures.record_success('coingecko')
+        self._prices[symbol] = (price, time.monotonic())
+        return price
+
+
+class StandaloneArbitrageBot:
+    """
+    Same scan/execute loop as scripts/polygon_arbitrage_bot.py, over plain
+    JSON-RPC. `client` is a JsonRpcClient or an RpcPool.
+    """
+
+    def __init__(self, client, contract_address: str, private_key: str,
+                 abi: List[Dict], chain_id: int, tokens: Dict[str, str] = TOKENS,
+                 dexes: Dict[str, str] = DEXES, trade_amounts: Sequence[int] = TRADE_AMOUNTS,
+                 token_pairs: Sequence = TOKEN_PAIRS, decimals: Dict[str, int] = TOKEN_DECIMALS,
+                 min_profit_usd: float = 10.0, max_gas_price: int = 100 * GWEI,
+                 gas_limit: int = 314600, prices: Optional[PriceFeed] = None,
+                 failures: Optional[FailureTracker] = None):
+        from eth_account import Account
+
+        self.client = client
+        self.contract = RpcContract(client, contract_address, abi)
+        self.account = Account.from_key(private_key)
+        self.chain_id = chain_id
+        self.tokens = tokens
+        self.dexes = dexes
+        self.trade_amounts = list(trade_amounts)
+        self.min_profit_usd = min_profit_usd
+        self._min_profit_micros = parse_units(min_profit_usd, USD_DECIMALS)
+        # 10 ** decimals per token, so profits are valued without a float division per route
+        self.scales = {name: 10 ** decimals.get(name, 18) for name in tokens}
+        self.max_gas_price = max_gas_price
+        self.gas_limit = gas_limit
+        self.failures = failures or default_failures
+        self.prices = prices or PriceFeed(failures=self.failures)
+        self.grid = build_quote_grid(tokens, dexes, self.trade_amounts, token_pairs, decimals)
+        self._nonce: Optional[int] = None
+        self.running = False
+
+    def quote(self, grid: Optional[List[Dict]] = None):
+        """(profits, profitable) for every route in the grid, from a single eth_call"""
+        grid = self.grid if grid is None else grid
+        return self.contract.call(
+            'checkArbitrageOpportunities',
+            [(q['token_a'], q['token_b'], q['amount'], q['dex_a'], q['dex_b']) for q in grid]
+        )
+
+    def scan_arbitrage_opportunities(self) -> List[Dict]:
+        """Scan for profitable arbitrage opportunities"""
+        opportunities = []
+        if not self.failures.allow('rpc'):
+            logger.warning("RPC circuit open, skipping scan: %s", self.failures.circuit('rpc').last_error)
+            return opportunities
+        try:
+            profits, profitable = self.quote()
+        except Exception as e:
+            self.failures.record_failure('rpc', e)
+            logger.error("Error quoting %d routes: %s", len(self.grid), e)
+            return opportunities
+        self.failures.record_success('rpc')
+
+        prices: Dict[str, int] = {}
+        for quote, profit, is_profitable in zip(self.grid, profits, profitable):
+            if not is_profitable:
+                continue
+            symbol = quote['token_a_name']
+            price = prices.get(symbol)
+            if price is None:
+                price = prices[symbol] = parse_units(self.prices.usd(symbol), USD_DECIMALS)
+            # profit is in the borrowed token's base units: profit / 10**decimals * price >= threshold
+            scale = self.scales[symbol]
+            if profit * price >= self._min_profit_micros * scale:
+                opportunities.append({**quote, 'profit': profit, 'profit_usd': profit * price / (scale * 10 ** USD_DECIMALS),
+                                      'timestamp': datetime.now()})
+        return opportunities
+
+    def _next_nonce(self) -> int:
+        if self._nonce is None:
+            self._nonce = int(self.client.request('eth_getTransactionCount', [self.account.address, 'pending']), 16)
+        nonce = self._nonce
+        self._nonce += 1
+        return nonce
+
+    def send_transaction(self, data: str, gas_price: int) -> str:
+        transaction = {
+            'to': self.contract.address,
+            'data': data,
+            'value': 0,
+            'gas': self.gas_limit,
+            'gasPrice': gas_price,
+            'nonce': self._next_nonce(),
+            'chainId': self.chain_id
+        }
+        signed = self.account.sign_transaction(transaction)
+        try:
+            return self.client.request('eth_sendRawTransaction', ['0x' + bytes(signed.rawTransaction).hex()])
+        except Exception:
+            self._nonce = None  # re-read from the node on the next send
+            raise
+
+    def wait_for_receipt(self, tx_hash: str, timeout: float = 120.0, poll: float = 1.0) -> Dict:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            receipt = self.client.request('eth_getTransactionReceipt', [tx_hash])
+            if receipt is not None:
+                return receipt
+            time.sleep(poll)
+        raise TimeoutError('Transaction %s not mined after %.0fs' % (tx_hash, timeout))
+
+    def execute_arbitrage(self, opportunity: Dict) -> bool:
+        """Execute profitable arbitrage trade"""
+        try:
+            logger.info("🔥 Executing %s/%s (%s -> %s), amount %.2f, expected profit $%.2f",
+                        opportunity['token_a_name'], opportunity['token_b_name'],
+                        opportunity['dex_a_name'], opportunity['dex_b_name'],
+                        opportunity['amount'] / self.scales[opportunity['token_a_name']], opportunity['profit_usd'])
+
+            gas_price = int(self.client.request('eth_gasPrice'), 16)
+            if gas_price > self.max_gas_price:
+                logger.warning("❌ Gas price too high: %.1f gwei", gas_price / 1e9)
+                return False
+
+            data = self.contract.encode(
+                'startFlashLoanArbitrage',
+                opportunity['token_a'], opportunity['amount'], opportunity['token_a'],
+                opportunity['token_b'], opportunity['dex_a'], opportunity['dex_b'], opportunity['profit']
+            )
+            tx_hash = self.send_transaction(data, gas_price)
+            receipt = self.wait_for_receipt(tx_hash)
+            if int(receipt['status'], 16) != 1:
+                logger.error("❌ Transaction reverted: %s", tx_hash)
+                return False
+            logger.info("✅ Transaction mined: %s, gas used %d", tx_hash, int(receipt['gasUsed'], 16))
+            return True
+
+        except Exception as e:
+            logger.error("❌ Execution failed: %s", e)
+            return False
+
+    def run_once(self) -> bool:
+        opportunities = self.scan_arbitrage_opportunities()
+        if not opportunities:
+            logger.info("⏳ No profitable opportunities found")
+            return False
+        logger.info("🎯 Found %d opportunities", len(opportunities))
+        return self.execute_arbitrage(max(opportunities, key=lambda x: x['profit_usd']))
+
+    def run_continuous_scan(self):
+        """Run continuous arbitrage scanning"""
+        balance = int(self.client.request('eth_getBalance', [self.account.address, 'latest']), 16)
+        logger.info("🚀 Bot started | account %s | balance %.4f MATIC", self.account.address, balance / 1e18)
+
+        self.running = True
+        while self.running:
+            try:
+                if self.run_once():
+                    time.sleep(30)
+                else:
+                    time.sleep(10)
+            except KeyboardInterrupt:
+                logger.info("🛑 Bot stopped by user")
+                break
+            except Exception as e:
+                logger.error("❌ Scan error: %s", e)
+                time.sleep(15)
+        self.running = False
+
+    def stop(self):
+        self.running = False
+
+
+def main(argv=None):
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--contract', default=os.getenv('FLASHLOAN_CONTRACT_ADDRESS'))
+    parser.add_argument('--rpc-url', default=os.getenv('RPC_URLS') or os.getenv('ALCHEMY_API_URL_MAINNET'),
+                        help='comma-separated; several URLs are routed through an RpcPool')
+    parser.add_argument('--chain-id', type=int, default=int(os.getenv('CHAIN_ID', '137')))
+    parser.add_argument('--build-dir', default='build/contracts')
+    parser.add_argument('--min-profit-usd', type=float, default=10.0)
+    parser.add_argument('--max-gas-gwei', type=float, default=100.0)
+    parser.add_argument('--pool-size', type=int, default=4)
+    parser.add_argument('--once', action='store_true', help='scan (and trade) once, then exit')
+    args = parser.parse_args(argv)
+
+    private_key = os.getenv('PRIVATE_KEY')
+    if not args.contract or not args.rpc_url or not private_key:
+        parser.error('contract address, RPC URL and PRIVATE_KEY are required')
+
+    from automation.logging_pipeline import configure_logging
+    configure_logging()
+
+    client = rpc_client([url.strip() for url in args.rpc_url.split(',') if url.strip()], pool_size=args.pool_size)
+    bot = StandaloneArbitrageBot(
+        client, args.contract, private_key, load_artifact_abi('FlashloanV3Polygon', args.build_dir),
+        args.chain_id, min_profit_usd=args.min_profit_usd, max_gas_price=int(args.max_gas_gwei * GWEI)
+    )
+    try:
+        if args.once:
+            bot.run_once()
+        else:
+            bot.run_continuous_scan()
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
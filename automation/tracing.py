@@ -0,0 +1,177 @@
+import math
+import os
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, asdict
+from typing import Deque, Dict, List, Optional
+
+
+@dataclass
+class StageSummary:
+    stage: str
+    count: int
+    total_ms: float
+    mean_ms: float
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+class _NullSpan:
+    """Shared no-op span handed out while tracing is disabled"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('tracer', 'stage', 'start_ns')
+
+    def __init__(self, tracer: 'StageTracer', stage: str):
+        self.tracer = tracer
+        self.stage = stage
+        self.start_ns = 0
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.tracer.record(self.stage, time.perf_counter_ns() - self.start_ns)
+        return False
+
+
+def _percentile(sorted_values: List[int], pct: float) -> int:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0
+    rank = math.ceil(pct / 100 * len(sorted_values)) - 1
+    return sorted_values[max(0, min(rank, len(sorted_values) - 1))]
+
+
+class StackSampler:
+    """Samples Python stacks of running threads into collapsed flamegraph format"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks: Dict[str, int] = defaultdict(int)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample_once(self):
+        own_ident = threading.get_ident()
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_ident:
+                continue
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if frames:
+                self.stacks[';'.join(reversed(frames))] += 1
+
+    def _run(self, duration: float):
+        deadline = time.monotonic() + duration
+        while not self._stop.is_set() and time.monotonic() < deadline:
+            self._sample_once()
+            self._stop.wait(self.interval)
+
+    def start(self, duration: float):
+        """Start sampling in a background thread for `duration` seconds"""
+        self._thread = threading.Thread(target=self._run, args=(duration,), daemon=True)
+        self._thread.start()
+
+    def join(self):
+        if self._thread is not None:
+            self._thread.join()
+
+    def stop(self):
+        self._stop.set()
+        self.join()
+
+    def collapsed(self) -> str:
+        """Render samples as `frame;frame;frame count` lines for flamegraph.pl / speedscope"""
+        return '\n'.join(f"{stack} {count}" for stack, count in sorted(self.stacks.items()))
+
+
+class StageTracer:
+    """Opt-in monotonic-clock spans around the stages of a scan"""
+
+    def __init__(self, enabled: bool = False, window: int = 2048):
+        self.enabled = enabled
+        self.window = window
+        self._samples: Dict[str, Deque[int]] = {}
+        self._lock = threading.Lock()
+
+    def span(self, stage: str):
+        """Context manager timing one stage; a shared no-op when tracing is disabled"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, stage)
+
+    def record(self, stage: str, duration_ns: int):
+        """Record a duration measured elsewhere"""
+        samples = self._samples.get(stage)
+        if samples is None:
+            with self._lock:
+                samples = self._samples.setdefault(stage, deque(maxlen=self.window))
+        samples.append(duration_ns)
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+
+    def summary(self) -> List[StageSummary]:
+        """Per-stage percentile summaries over the sliding window"""
+        with self._lock:
+            snapshot = {stage: sorted(samples) for stage, samples in self._samples.items()}
+
+        summaries = []
+        for stage, values in snapshot.items():
+            if not values:
+                continue
+            total = sum(values)
+            summaries.append(StageSummary(
+                stage=stage,
+                count=len(values),
+                total_ms=total / 1e6,
+                mean_ms=total / len(values) / 1e6,
+                p50_ms=_percentile(values, 50) / 1e6,
+                p90_ms=_percentile(values, 90) / 1e6,
+                p99_ms=_percentile(values, 99) / 1e6,
+                max_ms=values[-1] / 1e6
+            ))
+        summaries.sort(key=lambda s: s.total_ms, reverse=True)
+        return summaries
+
+    def summary_dict(self) -> Dict:
+        return {
+            'enabled': self.enabled,
+            'stages': [asdict(s) for s in self.summary()]
+        }
+
+    def sample_stacks(self, duration: float = 5.0, interval: float = 0.005) -> str:
+        """Block for `duration` seconds sampling stacks and return them collapsed"""
+        sampler = StackSampler(interval=interval)
+        sampler.start(duration)
+        sampler.join()
+        return sampler.collapsed()
+
+
+# Process-wide tracer shared by the scanner and dashboard
+tracer = StageTracer(enabled=os.getenv('SCAN_TRACING', 'false').lower() in ('1', 'true', 'yes'))
+
+
+def get_tracer() -> StageTracer:
+    return tracer
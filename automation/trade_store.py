@@ -0,0 +1,434 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS opportunities (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    block INTEGER,
+    pair TEXT NOT NULL,
+    token_a TEXT NOT NULL,
+    token_b TEXT NOT NULL,
+    dex_a TEXT NOT NULL,
+    dex_b TEXT NOT NULL,
+    amount_in TEXT NOT NULL,
+    expected_profit TEXT NOT NULL,
+    profit_percentage REAL,
+    lender TEXT,
+    loan_fee TEXT
+);
+CREATE INDEX IF NOT EXISTS opportunities_ts ON opportunities (ts);
+CREATE INDEX IF NOT EXISTS opportunities_pair ON opportunities (pair, id);
+
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tx_hash TEXT NOT NULL UNIQUE,
+    ts REAL NOT NULL,
+    kind TEXT NOT NULL,
+    lender TEXT,
+    legs INTEGER NOT NULL,
+    expected_profit TEXT NOT NULL,
+    gas_price TEXT,
+    token_a TEXT
+);
+CREATE INDEX IF NOT EXISTS transactions_ts ON transactions (ts);
+
+CREATE TABLE IF NOT EXISTS trade_legs (
+    tx_hash TEXT NOT NULL,
+    leg INTEGER NOT NULL,
+    pair TEXT NOT NULL,
+    dex_a TEXT NOT NULL,
+    dex_b TEXT NOT NULL,
+    amount_in TEXT NOT NULL,
+    expected_profit TEXT NOT NULL,
+    token_a TEXT,
+    PRIMARY KEY (tx_hash, leg)
+);
+CREATE INDEX IF NOT EXISTS trade_legs_pair ON trade_legs (pair, tx_hash);
+
+CREATE TABLE IF NOT EXISTS receipts (
+    tx_hash TEXT PRIMARY KEY,
+    ts REAL NOT NULL,
+    block INTEGER,
+    status INTEGER NOT NULL,
+    gas_used INTEGER,
+    effective_gas_price TEXT,
+    legs_executed INTEGER,
+    realized_profit TEXT
+);
+CREATE INDEX IF NOT EXISTS receipts_ts ON receipts (ts);
+
+CREATE TABLE IF NOT EXISTS realized_profits (
+    tx_hash TEXT NOT NULL,
+    token_a TEXT NOT NULL,
+    profit TEXT NOT NULL,
+    PRIMARY KEY (tx_hash, token_a)
+);
+
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS reports (
+    kind TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    ts REAL NOT NULL,
+    body TEXT NOT NULL,
+    PRIMARY KEY (kind, scope)
+);
+"""
+
+# Columns added to existing tables since the first schema; CREATE TABLE IF NOT EXISTS skips older files
+_ADDED_COLUMNS = (('transactions', 'token_a', 'TEXT'), ('trade_legs', 'token_a', 'TEXT'))
+
+# Wei amounts overflow SQLite's 64-bit integers, so they are stored as decimal text
+_INSERTS = {
+    'opportunity': "INSERT INTO opportunities (ts, block, pair, token_a, token_b, dex_a, dex_b, amount_in, "
+                   "expected_profit, profit_percentage, lender, loan_fee) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    'transaction': "INSERT OR IGNORE INTO transactions (tx_hash, ts, kind, lender, legs, expected_profit, gas_price, "
+                   "token_a) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+    'leg': "INSERT OR IGNORE INTO trade_legs (tx_hash, leg, pair, dex_a, dex_b, amount_in, expected_profit, token_a) "
+           "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+    'receipt': "INSERT OR REPLACE INTO receipts (tx_hash, ts, block, status, gas_used, effective_gas_price, "
+               "legs_executed, realized_profit) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+    'realized': "INSERT OR REPLACE INTO realized_profits (tx_hash, token_a, profit) VALUES (?, ?, ?)",
+    'counter': "INSERT INTO counters (name, value) VALUES (?, ?) "
+               "ON CONFLICT(name) DO UPDATE SET value = excluded.value",
+    'report': "INSERT OR REPLACE INTO reports (kind, scope, ts, body) VALUES (?, ?, ?, ?)",
+}
+# Parents before children so a batch never holds a leg or receipt ahead of its transaction
+_ORDER = ('opportunity', 'transaction', 'leg', 'receipt', 'realized', 'counter', 'report')
+
+_TRANSACTION_COLUMNS = """
+    t.id, t.tx_hash, t.ts, t.kind, t.lender, t.legs, t.token_a, t.expected_profit, t.gas_price,
+    r.block, r.status, r.gas_used, r.effective_gas_price, r.legs_executed, r.realized_profit
+"""
+
+
+def _pair_name(pair) -> str:
+    return '%s/%s' % (pair.symbol_a, pair.symbol_b)
+
+
+def _token(address: str) -> str:
+    """Token addresses are grouped lowercased, as the event indexer decodes them"""
+    return address.lower()
+
+
+def _wei(value) -> Optional[str]:
+    return None if value is None else str(int(value))
+
+
+def _opportunity_row(ts: float, block_number: Optional[int], o) -> Tuple:
+    return (ts, block_number, _pair_name(o.token_pair), o.token_pair.token_a, o.token_pair.token_b, o.dex_a,
+            o.dex_b, _wei(o.amount_in), _wei(o.expected_profit), o.profit_percentage, o.lender, _wei(o.loan_fee))
+
+
+class TradeStore:
+    """
+    Persistent history of opportunities, submitted transactions, receipts
+    and realized profit in an SQLite database in WAL mode.
+
+    Writers only enqueue rows; a background thread drains the queue and
+    commits up to `batch_size` rows per transaction every `flush_interval`
+    seconds, so the scan loop never waits on disk. Each record call is one
+    queue operation; when `max_queue` calls are pending, rows are dropped
+    and counted rather than blocking. Readers (the
+    dashboard, possibly in another process) use their own connections,
+    which WAL lets run alongside the writer.
+    """
+
+    def __init__(self, path: str, batch_size: int = 1000, flush_interval: float = 0.25,
+                 max_queue: int = 10000):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.stats = {'queued': 0, 'written': 0, 'dropped': 0, 'batches': 0, 'errors': 0}
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._local = threading.local()
+
+        connection = self._connect()
+        connection.executescript(SCHEMA)
+        for table, column, kind in _ADDED_COLUMNS:
+            if column not in {row[1] for row in connection.execute('PRAGMA table_info(%s)' % table)}:
+                connection.execute('ALTER TABLE %s ADD COLUMN %s %s' % (table, column, kind))
+        connection.commit()
+        connection.close()
+
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name='trade-store', daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        connection.execute('PRAGMA journal_mode=WAL')
+        # With WAL, NORMAL only risks the last commits on power loss, never corruption
+        connection.execute('PRAGMA synchronous=NORMAL')
+        return connection
+
+    # -- writes (non-blocking) ------------------------------------------------
+
+    def _put(self, kind: str, rows: List[Tuple]) -> bool:
+        """Hand rows to the writer in one queue operation; drop them if the queue is full"""
+        if self._closed or not rows:
+            return False
+        try:
+            self._queue.put_nowait((kind, rows))
+        except queue.Full:
+            self.stats['dropped'] += len(rows)
+            return False
+        self.stats['queued'] += len(rows)
+        return True
+
+    def record_opportunities(self, opportunities: Iterable, block_number: Optional[int] = None):
+        """Queue a scan's detections; they are turned into rows on the writer thread"""
+        now = time.time()
+        self._put('opportunity', [(now, block_number, o) for o in opportunities])
+
+    def record_transaction(self, tx_hash: str, opportunities: Sequence, kind: str = 'single',
+                           lender: Optional[str] = None, gas_price: Optional[int] = None):
+        """
+        A broadcast transaction and the opportunities it executes, one leg
+        each. Profits are in each leg's token_a. The transaction's token_a is
+        set when all legs share one; a batch across tokens has no token_a and
+        an expected_profit of 0, its legs hold the per-token figures.
+        """
+        tokens = {_token(o.token_pair.token_a) for o in opportunities}
+        token_a = tokens.pop() if len(tokens) == 1 else None
+        self._put('transaction', [(
+            tx_hash, time.time(), kind, lender, len(opportunities),
+            _wei(sum(o.expected_profit for o in opportunities) if token_a else 0), _wei(gas_price), token_a
+        )])
+        self._put('leg', [(
+            tx_hash, leg, _pair_name(o.token_pair), o.dex_a, o.dex_b, _wei(o.amount_in), _wei(o.expected_profit),
+            _token(o.token_pair.token_a)
+        ) for leg, o in enumerate(opportunities)])
+
+    def record_receipt(self, tx_hash: str, receipt, legs_executed: Optional[int] = None,
+                       realized_profits: Sequence[Tuple[str, int]] = ()):
+        """
+        A mined transaction with the (tokenA, profit) the contract booked per
+        executed leg; the receipt's realized_profit is their total when they
+        share one token and NULL when they don't
+        """
+        totals: Dict[str, int] = {}
+        for token, profit in realized_profits:
+            totals[_token(token)] = totals.get(_token(token), 0) + int(profit)
+        self._put('receipt', [(
+            tx_hash, time.time(), receipt.get('blockNumber'), int(receipt['status']), receipt.get('gasUsed'),
+            _wei(receipt.get('effectiveGasPrice')), legs_executed,
+            _wei(sum(totals.values())) if len(totals) <= 1 else None
+        )])
+        self._put('realized', [(tx_hash, token, _wei(profit)) for token, profit in totals.items()])
+
+    def save_counters(self, counters: Dict[str, float]):
+        self._put('counter', [(name, float(value)) for name, value in counters.items()])
+
+    def save_report(self, kind: str, report: Dict, scope: str = ''):
+        """
+        Publish the latest snapshot of a scanner-side report (stage timings,
+        quarantine) for a dashboard in another process; `scope` tells
+        the scanners of a multi-chain run apart
+        """
+        self._put('report', [(kind, scope, time.time(), json.dumps(report, default=str))])
+
+    def _write_loop(self):
+        connection = self._connect()
+        while True:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                if self._closed:
+                    break
+                continue
+            # Gather for up to flush_interval so a commit covers many rows, unless someone waits on a flush
+            batch = [first]
+            size = len(first[1]) if first[0] != 'flush' else 0
+            deadline = time.monotonic() + self.flush_interval
+            while size < self.batch_size and batch[-1][0] != 'flush':
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+                if item[0] != 'flush':
+                    size += len(item[1])
+            self._write_batch(connection, batch)
+        connection.close()
+
+    def _write_batch(self, connection: sqlite3.Connection, batch: List[Tuple]):
+        rows: Dict[str, List[Tuple]] = {}
+        waiters = []
+        for kind, payload in batch:
+            if kind == 'flush':
+                waiters.append(payload)
+            else:
+                rows.setdefault(kind, []).extend(payload)
+        if 'opportunity' in rows:
+            rows['opportunity'] = [_opportunity_row(*item) for item in rows['opportunity']]
+        try:
+            with connection:
+                for kind in _ORDER:
+                    if kind in rows:
+                        connection.executemany(_INSERTS[kind], rows[kind])
+            self.stats['written'] += sum(len(kind_rows) for kind_rows in rows.values())
+            self.stats['batches'] += 1
+        except sqlite3.Error:
+            self.stats['errors'] += 1
+        for event in waiters:
+            event.set()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until everything queued so far is committed"""
+        if self._closed:
+            return True
+        event = threading.Event()
+        self._queue.put(('flush', event))
+        return event.wait(timeout)
+
+    def close(self):
+        self.flush(timeout=30)
+        self._closed = True
+        self._writer.join(timeout=self.flush_interval * 4 + 1)
+
+    # -- reads ---------------------------------------------------------------
+
+    def _reader(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+            connection.row_factory = sqlite3.Row
+        return connection
+
+    def _page(self, sql: str, filters: List[str], params: List, before: Optional[int], limit: int,
+              id_column: str, order: str) -> Dict:
+        limit = max(1, min(int(limit), 500))
+        if before is not None:
+            filters.append('%s < ?' % id_column)
+            params.append(int(before))
+        where = (' WHERE ' + ' AND '.join(filters)) if filters else ''
+        rows = self._reader().execute('%s%s ORDER BY %s DESC LIMIT ?' % (sql, where, order),
+                                      params + [limit + 1]).fetchall()
+        items = [dict(row) for row in rows[:limit]]
+        return {'items': items, 'next_before': items[-1]['id'] if len(rows) > limit else None}
+
+    @staticmethod
+    def _time_filters(column: str, since: Optional[float], until: Optional[float]) -> Tuple[List[str], List]:
+        filters, params = [], []
+        if since is not None:
+            filters.append('%s >= ?' % column)
+            params.append(since)
+        if until is not None:
+            filters.append('%s < ?' % column)
+            params.append(until)
+        return filters, params
+
+    def opportunities(self, limit: int = 50, before: Optional[int] = None, pair: Optional[str] = None,
+                      since: Optional[float] = None, until: Optional[float] = None) -> Dict:
+        """
+        Newest first, keyset-paginated: pass the returned `next_before` as
+        `before` for the next page.
+        """
+        filters, params = self._time_filters('ts', since, until)
+        if pair:
+            filters.append('pair = ?')
+            params.append(pair)
+        return self._page('SELECT * FROM opportunities', filters, params, before, limit, 'id', 'id')
+
+    def transactions(self, limit: int = 50, before: Optional[int] = None, pair: Optional[str] = None,
+                     since: Optional[float] = None, until: Optional[float] = None) -> Dict:
+        """Submitted transactions with their receipt, newest first, paginated like `opportunities`"""
+        filters, params = self._time_filters('t.ts', since, until)
+        if pair:
+            filters.append('t.tx_hash IN (SELECT tx_hash FROM trade_legs WHERE pair = ?)')
+            params.append(pair)
+        sql = 'SELECT %s FROM transactions t LEFT JOIN receipts r ON r.tx_hash = t.tx_hash' % _TRANSACTION_COLUMNS
+        return self._page(sql, filters, params, before, limit, 't.id', 't.id')
+
+    def transaction(self, tx_hash: str) -> Optional[Dict]:
+        connection = self._reader()
+        row = connection.execute(
+            'SELECT %s FROM transactions t LEFT JOIN receipts r ON r.tx_hash = t.tx_hash WHERE t.tx_hash = ?'
+            % _TRANSACTION_COLUMNS, (tx_hash,)
+        ).fetchone()
+        if row is None:
+            return None
+        result = dict(row)
+        result['legs'] = [dict(leg) for leg in connection.execute(
+            'SELECT leg, pair, token_a, dex_a, dex_b, amount_in, expected_profit FROM trade_legs '
+            'WHERE tx_hash = ? ORDER BY leg', (tx_hash,)
+        )]
+        result['realized_profits'] = {row['token_a']: row['profit'] for row in connection.execute(
+            'SELECT token_a, profit FROM realized_profits WHERE tx_hash = ? ORDER BY token_a', (tx_hash,)
+        )}
+        return result
+
+    def counters(self) -> Dict[str, float]:
+        return {row['name']: row['value'] for row in self._reader().execute('SELECT name, value FROM counters')}
+
+    def reports(self, kind: str) -> Dict[str, Dict]:
+        """Latest published report of `kind` per scope, with the time it was published"""
+        return {row['scope']: {**json.loads(row['body']), 'published_at': row['ts']}
+                for row in self._reader().execute('SELECT scope, ts, body FROM reports WHERE kind = ? ORDER BY scope',
+                                                  (kind,))}
+
+    def summary(self) -> Dict:
+        """
+        Totals over the whole history. Profits of successful transactions are
+        exact integers in base units, per token: tokens are never added up.
+        """
+        connection = self._reader()
+        opportunities = connection.execute('SELECT COUNT(*) FROM opportunities').fetchone()[0]
+        submitted = connection.execute('SELECT COUNT(*) FROM transactions').fetchone()[0]
+        succeeded, failed = 0, 0
+        for row in connection.execute('SELECT r.status FROM receipts r JOIN transactions t ON t.tx_hash = r.tx_hash'):
+            if row['status'] == 1:
+                succeeded += 1
+            else:
+                failed += 1
+
+        by_token: Dict[str, Dict[str, int]] = {}
+        for column, sql in (
+                ('expected_profit', 'SELECT l.token_a, l.expected_profit AS profit FROM trade_legs l '
+                                    'JOIN receipts r ON r.tx_hash = l.tx_hash WHERE r.status = 1'),
+                ('realized_profit', 'SELECT p.token_a, p.profit FROM realized_profits p '
+                                    'JOIN receipts r ON r.tx_hash = p.tx_hash WHERE r.status = 1')):
+            for row in connection.execute(sql):
+                totals = by_token.setdefault(row['token_a'], {'expected_profit': 0, 'realized_profit': 0})
+                totals[column] += int(row['profit'])
+        return {
+            'opportunities': opportunities,
+            'transactions': submitted,
+            'succeeded': succeeded,
+            'failed': failed,
+            'pending': submitted - succeeded - failed,
+            'profit_by_token': {token: {name: str(value) for name, value in totals.items()}
+                                for token, totals in sorted(by_token.items(), key=lambda item: item[0] or '')},
+            'writer': dict(self.stats),
+        }
+
+
+_store: Optional[TradeStore] = None
+_store_lock = threading.Lock()
+
+
+def get_trade_store() -> Optional[TradeStore]:
+    """Process-wide store at TRADE_STORE_PATH, opened on first use; None when the variable is set empty"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            path = os.getenv('TRADE_STORE_PATH', 'arbitrage.db')
+            if not path:
+                return None
+            _store = TradeStore(
+                path,
+                batch_size=int(os.getenv('TRADE_STORE_BATCH_SIZE', '1000')),
+                flush_interval=float(os.getenv('TRADE_STORE_FLUSH_MS', '250')) / 1000,
+            )
+        return _store
@@ -0,0 +1,532 @@
+import json
+import os
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+# Integer ports of Uniswap V3 TickMath, SqrtPriceMath, SwapMath, TickBitmap and
+# the UniswapV3Pool.swap loop, so quotes match the on-chain Quoter to the wei.
+
+MIN_TICK = -887272
+MAX_TICK = 887272
+MIN_SQRT_RATIO = 4295128739
+MAX_SQRT_RATIO = 1461446703485210103287273052203988822378723970342
+Q96 = 1 << 96
+MAX_UINT256 = (1 << 256) - 1
+
+# Fee in hundredths of a bip -> tick spacing, as enabled on the V3 factory
+FEE_TIER_TICK_SPACING = {100: 1, 500: 10, 3000: 60, 10000: 200}
+
+_TICK_RATIOS = (
+    (0x2, 0xfff97272373d413259a46990580e213a),
+    (0x4, 0xfff2e50f5f656932ef12357cf3c7fdcc),
+    (0x8, 0xffe5caca7e10e4e61c3624eaa0941cd0),
+    (0x10, 0xffcb9843d60f6159c9db58835c926644),
+    (0x20, 0xff973b41fa98c081472e6896dfb254c0),
+    (0x40, 0xff2ea16466c96a3843ec78b326b52861),
+    (0x80, 0xfe5dee046a99a2a811c461f1969c3053),
+    (0x100, 0xfcbe86c7900a88aedcffc83b479aa3a4),
+    (0x200, 0xf987a7253ac413176f2b074cf7815e54),
+    (0x400, 0xf3392b0822b70005940c7a398e4b70f3),
+    (0x800, 0xe7159475a2c29b7443b29c7fa6e889d9),
+    (0x1000, 0xd097f3bdfd2022b8845ad8f792aa5825),
+    (0x2000, 0xa9f746462d870fdf8a65dc1f90e061e5),
+    (0x4000, 0x70d869a156d2a1b890bb3df62baf32f7),
+    (0x8000, 0x31be135f97d08fd981231505542fcfa6),
+    (0x10000, 0x9aa508b5b7a84e1c677de54f3e99bc9),
+    (0x20000, 0x5d6af8dedb81196699c329225ee604),
+    (0x40000, 0x2216e584f5fa1ea926041bedfe98),
+    (0x80000, 0x48a170391f7dc42444e8fa2),
+)
+
+
+def _mul_div(a: int, b: int, denominator: int) -> int:
+    return a * b // denominator
+
+
+def _mul_div_rounding_up(a: int, b: int, denominator: int) -> int:
+    return -(-a * b // denominator)
+
+
+def _div_rounding_up(a: int, b: int) -> int:
+    return -(-a // b)
+
+
+@lru_cache(maxsize=65536)
+def get_sqrt_ratio_at_tick(tick: int) -> int:
+    """TickMath.getSqrtRatioAtTick"""
+    abs_tick = abs(tick)
+    if abs_tick > MAX_TICK:
+        raise ValueError("Tick out of range")
+
+    ratio = 0xfffcb933bd6fad37aa2d162d1a594001 if abs_tick & 0x1 else 0x100000000000000000000000000000000
+    for bit, multiplier in _TICK_RATIOS:
+        if abs_tick & bit:
+            ratio = (ratio * multiplier) >> 128
+    if tick > 0:
+        ratio = MAX_UINT256 // ratio
+
+    return (ratio >> 32) + (0 if ratio % (1 << 32) == 0 else 1)
+
+
+def get_tick_at_sqrt_ratio(sqrt_price_x96: int) -> int:
+    """TickMath.getTickAtSqrtRatio: the greatest tick whose ratio is <= the price"""
+    if not MIN_SQRT_RATIO <= sqrt_price_x96 < MAX_SQRT_RATIO:
+        raise ValueError("Sqrt price out of range")
+    low, high = MIN_TICK, MAX_TICK
+    while low < high:
+        mid = (low + high + 1) // 2
+        if get_sqrt_ratio_at_tick(mid) <= sqrt_price_x96:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def get_amount0_delta(sqrt_a: int, sqrt_b: int, liquidity: int, round_up: bool) -> int:
+    if sqrt_a > sqrt_b:
+        sqrt_a, sqrt_b = sqrt_b, sqrt_a
+    numerator1 = liquidity << 96
+    numerator2 = sqrt_b - sqrt_a
+    if round_up:
+        return _div_rounding_up(_mul_div_rounding_up(numerator1, numerator2, sqrt_b), sqrt_a)
+    return _mul_div(numerator1, numerator2, sqrt_b) // sqrt_a
+
+
+def get_amount1_delta(sqrt_a: int, sqrt_b: int, liquidity: int, round_up: bool) -> int:
+    if sqrt_a > sqrt_b:
+        sqrt_a, sqrt_b = sqrt_b, sqrt_a
+    if round_up:
+        return _mul_div_rounding_up(liquidity, sqrt_b - sqrt_a, Q96)
+    return _mul_div(liquidity, sqrt_b - sqrt_a, Q96)
+
+
+def _next_sqrt_price_from_amount0_rounding_up(sqrt_price: int, liquidity: int, amount: int, add: bool) -> int:
+    if amount == 0:
+        return sqrt_price
+    numerator1 = liquidity << 96
+    product = amount * sqrt_price
+    if add:
+        # Same overflow fallback as the contract so rounding matches exactly
+        if product <= MAX_UINT256 and numerator1 + product <= MAX_UINT256:
+            return _mul_div_rounding_up(numerator1, sqrt_price, numerator1 + product)
+        return _div_rounding_up(numerator1, numerator1 // sqrt_price + amount)
+    if product > MAX_UINT256 or numerator1 <= product:
+        raise ValueError("Insufficient liquidity for output")
+    return _mul_div_rounding_up(numerator1, sqrt_price, numerator1 - product)
+
+
+def _next_sqrt_price_from_amount1_rounding_down(sqrt_price: int, liquidity: int, amount: int, add: bool) -> int:
+    if add:
+        return sqrt_price + (amount << 96) // liquidity
+    quotient = _div_rounding_up(amount << 96, liquidity)
+    if sqrt_price <= quotient:
+        raise ValueError("Insufficient liquidity for output")
+    return sqrt_price - quotient
+
+
+def get_next_sqrt_price_from_input(sqrt_price: int, liquidity: int, amount_in: int, zero_for_one: bool) -> int:
+    if zero_for_one:
+        return _next_sqrt_price_from_amount0_rounding_up(sqrt_price, liquidity, amount_in, True)
+    return _next_sqrt_price_from_amount1_rounding_down(sqrt_price, liquidity, amount_in, True)
+
+
+def get_next_sqrt_price_from_output(sqrt_price: int, liquidity: int, amount_out: int, zero_for_one: bool) -> int:
+    if zero_for_one:
+        return _next_sqrt_price_from_amount1_rounding_down(sqrt_price, liquidity, amount_out, False)
+    return _next_sqrt_price_from_amount0_rounding_up(sqrt_price, liquidity, amount_out, False)
+
+
+def compute_swap_step(sqrt_current: int, sqrt_target: int, liquidity: int,
+                      amount_remaining: int, fee_pips: int) -> Tuple[int, int, int, int]:
+    """SwapMath.computeSwapStep -> (sqrt_next, amount_in, amount_out, fee_amount)"""
+    zero_for_one = sqrt_current >= sqrt_target
+    exact_in = amount_remaining >= 0
+
+    if exact_in:
+        remaining_less_fee = _mul_div(amount_remaining, 1_000_000 - fee_pips, 1_000_000)
+        amount_in = (get_amount0_delta(sqrt_target, sqrt_current, liquidity, True) if zero_for_one
+                     else get_amount1_delta(sqrt_current, sqrt_target, liquidity, True))
+        if remaining_less_fee >= amount_in:
+            sqrt_next = sqrt_target
+        else:
+            sqrt_next = get_next_sqrt_price_from_input(sqrt_current, liquidity, remaining_less_fee, zero_for_one)
+        amount_out = 0
+    else:
+        amount_out = (get_amount1_delta(sqrt_target, sqrt_current, liquidity, False) if zero_for_one
+                      else get_amount0_delta(sqrt_current, sqrt_target, liquidity, False))
+        if -amount_remaining >= amount_out:
+            sqrt_next = sqrt_target
+        else:
+            sqrt_next = get_next_sqrt_price_from_output(sqrt_current, liquidity, -amount_remaining, zero_for_one)
+        amount_in = 0
+
+    reached_target = sqrt_target == sqrt_next
+    if zero_for_one:
+        if not (reached_target and exact_in):
+            amount_in = get_amount0_delta(sqrt_next, sqrt_current, liquidity, True)
+        if not (reached_target and not exact_in):
+            amount_out = get_amount1_delta(sqrt_next, sqrt_current, liquidity, False)
+    else:
+        if not (reached_target and exact_in):
+            amount_in = get_amount1_delta(sqrt_current, sqrt_next, liquidity, True)
+        if not (reached_target and not exact_in):
+            amount_out = get_amount0_delta(sqrt_current, sqrt_next, liquidity, False)
+
+    if not exact_in and amount_out > -amount_remaining:
+        amount_out = -amount_remaining
+
+    if exact_in and sqrt_next != sqrt_target:
+        fee_amount = amount_remaining - amount_in
+    else:
+        fee_amount = _mul_div_rounding_up(amount_in, fee_pips, 1_000_000 - fee_pips)
+
+    return sqrt_next, amount_in, amount_out, fee_amount
+
+
+@dataclass
+class TickInfo:
+    liquidity_gross: int = 0
+    liquidity_net: int = 0
+
+
+@dataclass
+class V3PoolState:
+    address: str
+    token0: str
+    token1: str
+    fee: int
+    tick_spacing: int
+    sqrt_price_x96: int = 0
+    tick: int = 0
+    liquidity: int = 0
+    ticks: Dict[int, TickInfo] = field(default_factory=dict)
+    tick_bitmap: Dict[int, int] = field(default_factory=dict)
+    # Inclusive range of bitmap words loaded from chain; None when every tick is known
+    word_range: Optional[Tuple[int, int]] = None
+
+    # --- TickBitmap -----------------------------------------------------
+
+    def _flip_tick(self, tick: int):
+        word_pos, bit_pos = (tick // self.tick_spacing) >> 8, (tick // self.tick_spacing) % 256
+        word = self.tick_bitmap.get(word_pos, 0) ^ (1 << bit_pos)
+        if word:
+            self.tick_bitmap[word_pos] = word
+        else:
+            self.tick_bitmap.pop(word_pos, None)
+
+    def next_initialized_tick_within_one_word(self, tick: int, lte: bool) -> Tuple[int, bool]:
+        compressed = tick // self.tick_spacing
+        if lte:
+            word_pos, bit_pos = compressed >> 8, compressed % 256
+            masked = self.tick_bitmap.get(word_pos, 0) & ((1 << (bit_pos + 1)) - 1)
+            if masked:
+                return (compressed - (bit_pos - (masked.bit_length() - 1))) * self.tick_spacing, True
+            return (compressed - bit_pos) * self.tick_spacing, False
+
+        word_pos, bit_pos = (compressed + 1) >> 8, (compressed + 1) % 256
+        masked = self.tick_bitmap.get(word_pos, 0) & ~((1 << bit_pos) - 1) & MAX_UINT256
+        if masked:
+            lsb = (masked & -masked).bit_length() - 1
+            return (compressed + 1 + (lsb - bit_pos)) * self.tick_spacing, True
+        return (compressed + 1 + (255 - bit_pos)) * self.tick_spacing, False
+
+    # --- Liquidity updates (Mint / Burn) --------------------------------
+
+    def tick_loaded(self, tick: int) -> bool:
+        """Whether `tick` lies in a bitmap word the local state holds"""
+        if self.word_range is None:
+            return True
+        return self.word_range[0] <= (tick // self.tick_spacing) >> 8 <= self.word_range[1]
+
+    def _update_tick(self, tick: int, liquidity_delta: int, upper: bool):
+        # Outside the loaded words the tick's prior liquidity is unknown: applying only the
+        # delta would invent an initialized tick with the wrong net liquidity
+        if not self.tick_loaded(tick):
+            return
+        info = self.ticks.get(tick)
+        if info is None:
+            info = self.ticks[tick] = TickInfo()
+        gross_before = info.liquidity_gross
+        info.liquidity_gross += liquidity_delta
+        info.liquidity_net += -liquidity_delta if upper else liquidity_delta
+        if (gross_before == 0) != (info.liquidity_gross == 0):
+            self._flip_tick(tick)
+        if info.liquidity_gross == 0:
+            del self.ticks[tick]
+
+    def modify_position(self, tick_lower: int, tick_upper: int, liquidity_delta: int):
+        if liquidity_delta == 0:
+            return
+        self._update_tick(tick_lower, liquidity_delta, False)
+        self._update_tick(tick_upper, liquidity_delta, True)
+        if tick_lower <= self.tick < tick_upper:
+            self.liquidity += liquidity_delta
+
+    # --- Swap simulation ------------------------------------------------
+
+    def simulate_swap(self, zero_for_one: bool, amount_specified: int,
+                      sqrt_price_limit_x96: int = 0) -> Tuple[int, int]:
+        """
+        UniswapV3Pool.swap without state changes -> (amount0, amount1) pool
+        deltas. Raises LookupError when the swap crosses into a bitmap word
+        outside `word_range`: the ticks there were never loaded.
+        """
+        if amount_specified == 0:
+            raise ValueError("Amount must be non-zero")
+        if sqrt_price_limit_x96 == 0:
+            sqrt_price_limit_x96 = MIN_SQRT_RATIO + 1 if zero_for_one else MAX_SQRT_RATIO - 1
+
+        exact_input = amount_specified > 0
+        remaining = amount_specified
+        calculated = 0
+        sqrt_price = self.sqrt_price_x96
+        tick = self.tick
+        liquidity = self.liquidity
+
+        while remaining != 0 and sqrt_price != sqrt_price_limit_x96:
+            sqrt_start = sqrt_price
+            tick_next, initialized = self.next_initialized_tick_within_one_word(tick, zero_for_one)
+            if not self.tick_loaded(tick_next):
+                raise LookupError("Swap on %s leaves the loaded ticks at tick %d" % (self.address, tick_next))
+            tick_next = max(MIN_TICK, min(MAX_TICK, tick_next))
+            sqrt_next = get_sqrt_ratio_at_tick(tick_next)
+
+            if (sqrt_next < sqrt_price_limit_x96) if zero_for_one else (sqrt_next > sqrt_price_limit_x96):
+                target = sqrt_price_limit_x96
+            else:
+                target = sqrt_next
+
+            sqrt_price, amount_in, amount_out, fee_amount = compute_swap_step(
+                sqrt_price, target, liquidity, remaining, self.fee
+            )
+
+            if exact_input:
+                remaining -= amount_in + fee_amount
+                calculated -= amount_out
+            else:
+                remaining += amount_out
+                calculated += amount_in + fee_amount
+
+            if sqrt_price == sqrt_next:
+                if initialized:
+                    liquidity_net = self.ticks[tick_next].liquidity_net
+                    liquidity += -liquidity_net if zero_for_one else liquidity_net
+                tick = tick_next - 1 if zero_for_one else tick_next
+            elif sqrt_price != sqrt_start:
+                tick = get_tick_at_sqrt_ratio(sqrt_price)
+
+        if zero_for_one == exact_input:
+            return amount_specified - remaining, calculated
+        return calculated, amount_specified - remaining
+
+    def quote_exact_input(self, token_in: str, amount_in: int) -> int:
+        """Output amount for selling `amount_in` of `token_in`, as QuoterV2.quoteExactInputSingle"""
+        zero_for_one = token_in.lower() == self.token0.lower()
+        amount0, amount1 = self.simulate_swap(zero_for_one, amount_in)
+        return -(amount1 if zero_for_one else amount0)
+
+    # --- Serialisation --------------------------------------------------
+
+    def to_dict(self) -> Dict:
+        return {
+            'address': self.address,
+            'token0': self.token0,
+            'token1': self.token1,
+            'fee': self.fee,
+            'tick_spacing': self.tick_spacing,
+            'sqrt_price_x96': str(self.sqrt_price_x96),
+            'tick': self.tick,
+            'liquidity': str(self.liquidity),
+            'ticks': {str(t): [str(i.liquidity_gross), str(i.liquidity_net)] for t, i in self.ticks.items()},
+            'tick_bitmap': {str(w): str(b) for w, b in self.tick_bitmap.items()},
+            'word_range': list(self.word_range) if self.word_range is not None else None
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'V3PoolState':
+        return cls(
+            address=data['address'],
+            token0=data['token0'],
+            token1=data['token1'],
+            fee=data['fee'],
+            tick_spacing=data['tick_spacing'],
+            sqrt_price_x96=int(data['sqrt_price_x96']),
+            tick=data['tick'],
+            liquidity=int(data['liquidity']),
+            ticks={int(t): TickInfo(int(g), int(n)) for t, (g, n) in data['ticks'].items()},
+            tick_bitmap={int(w): int(b) for w, b in data['tick_bitmap'].items()},
+            word_range=tuple(data['word_range']) if data.get('word_range') is not None else None
+        )
+
+
+# --- Event-driven tick cache ---------------------------------------------
+
+UNISWAP_V3_POOL_ABI = [
+    {"inputs": [], "name": "slot0", "outputs": [
+        {"name": "sqrtPriceX96", "type": "uint160"}, {"name": "tick", "type": "int24"},
+        {"name": "observationIndex", "type": "uint16"}, {"name": "observationCardinality", "type": "uint16"},
+        {"name": "observationCardinalityNext", "type": "uint16"}, {"name": "feeProtocol", "type": "uint8"},
+        {"name": "unlocked", "type": "bool"}], "stateMutability": "view", "type": "function"},
+    {"inputs": [], "name": "liquidity", "outputs": [{"name": "", "type": "uint128"}],
+     "stateMutability": "view", "type": "function"},
+    {"inputs": [], "name": "fee", "outputs": [{"name": "", "type": "uint24"}],
+     "stateMutability": "view", "type": "function"},
+    {"inputs": [], "name": "tickSpacing", "outputs": [{"name": "", "type": "int24"}],
+     "stateMutability": "view", "type": "function"},
+    {"inputs": [], "name": "token0", "outputs": [{"name": "", "type": "address"}],
+     "stateMutability": "view", "type": "function"},
+    {"inputs": [], "name": "token1", "outputs": [{"name": "", "type": "address"}],
+     "stateMutability": "view", "type": "function"},
+    {"inputs": [{"name": "wordPosition", "type": "int16"}], "name": "tickBitmap",
+     "outputs": [{"name": "", "type": "uint256"}], "stateMutability": "view", "type": "function"},
+    {"inputs": [{"name": "tick", "type": "int24"}], "name": "ticks", "outputs": [
+        {"name": "liquidityGross", "type": "uint128"}, {"name": "liquidityNet", "type": "int128"},
+        {"name": "feeGrowthOutside0X128", "type": "uint256"}, {"name": "feeGrowthOutside1X128", "type": "uint256"},
+        {"name": "tickCumulativeOutside", "type": "int56"}, {"name": "secondsPerLiquidityOutsideX128", "type": "uint160"},
+        {"name": "secondsOutside", "type": "uint32"}, {"name": "initialized", "type": "bool"}],
+     "stateMutability": "view", "type": "function"}
+]
+
+UNISWAP_V3_FACTORY_ABI = [
+    {"inputs": [{"name": "tokenA", "type": "address"}, {"name": "tokenB", "type": "address"},
+                {"name": "fee", "type": "uint24"}],
+     "name": "getPool", "outputs": [{"name": "pool", "type": "address"}],
+     "stateMutability": "view", "type": "function"}
+]
+
+_EVENT_SIGNATURES = {
+    'Swap': 'Swap(address,address,int256,int256,uint160,uint128,int24)',
+    'Mint': 'Mint(address,address,int24,int24,uint128,uint256,uint256)',
+    'Burn': 'Burn(address,int24,int24,uint128,uint256,uint256)',
+    'Initialize': 'Initialize(uint160,int24)'
+}
+
+
+@lru_cache(maxsize=1)
+def event_topics() -> Dict[bytes, str]:
+    """topic0 -> event name for the pool events the cache follows"""
+    from eth_utils import keccak
+    return {keccak(text=signature): name for name, signature in _EVENT_SIGNATURES.items()}
+
+
+def _to_bytes(value) -> bytes:
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    return bytes.fromhex(value[2:] if value.startswith('0x') else value)
+
+
+def _signed(word: bytes) -> int:
+    value = int.from_bytes(word, 'big')
+    return value - (1 << 256) if value >= 1 << 255 else value
+
+
+def _words(data: bytes) -> List[bytes]:
+    return [data[i:i + 32] for i in range(0, len(data), 32)]
+
+
+class V3PoolCache:
+    """Local tick-data cache for tracked V3 pools, kept current from pool logs"""
+
+    def __init__(self, pools: Optional[Dict[str, V3PoolState]] = None, last_block: int = 0):
+        self.pools: Dict[str, V3PoolState] = {a.lower(): p for a, p in (pools or {}).items()}
+        self.last_block = last_block
+
+    def add_pool(self, pool: V3PoolState):
+        self.pools[pool.address.lower()] = pool
+
+    def get(self, address: str) -> Optional[V3PoolState]:
+        return self.pools.get(address.lower())
+
+    def apply_log(self, log: Dict) -> bool:
+        """Apply one Swap/Mint/Burn/Initialize log; returns False for untracked pools"""
+        pool = self.pools.get(str(log['address']).lower())
+        topics = [_to_bytes(t) for t in log['topics']]
+        if pool is None or not topics:
+            return False
+        name = event_topics().get(topics[0])
+        words = _words(_to_bytes(log['data']))
+
+        if name == 'Swap':
+            pool.sqrt_price_x96 = int.from_bytes(words[2], 'big')
+            pool.liquidity = int.from_bytes(words[3], 'big')
+            pool.tick = _signed(words[4])
+        elif name == 'Mint':
+            # owner, tickLower and tickUpper are indexed; data is sender, amount, amount0, amount1
+            pool.modify_position(_signed(topics[2]), _signed(topics[3]), int.from_bytes(words[1], 'big'))
+        elif name == 'Burn':
+            pool.modify_position(_signed(topics[2]), _signed(topics[3]), -int.from_bytes(words[0], 'big'))
+        elif name == 'Initialize':
+            pool.sqrt_price_x96 = int.from_bytes(words[0], 'big')
+            pool.tick = _signed(words[1])
+        else:
+            return False
+        return True
+
+    def apply_logs(self, logs: List[Dict]):
+        for log in sorted(logs, key=lambda l: (l['blockNumber'], l['logIndex'])):
+            self.apply_log(log)
+
+    def sync(self, w3, to_block: Optional[int] = None) -> int:
+        """Pull and apply pool logs since the last synced block; returns logs applied"""
+        if not self.pools:
+            return 0
+        to_block = to_block if to_block is not None else w3.eth.block_number
+        if to_block <= self.last_block:
+            return 0
+        logs = w3.eth.get_logs({
+            'fromBlock': self.last_block + 1,
+            'toBlock': to_block,
+            'address': [p.address for p in self.pools.values()],
+            'topics': [['0x' + topic.hex() for topic in event_topics()]]
+        })
+        self.apply_logs(logs)
+        self.last_block = to_block
+        return len(logs)
+
+    def save(self, path: str):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'last_block': self.last_block,
+                       'pools': [p.to_dict() for p in self.pools.values()]}, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'V3PoolCache':
+        if not os.path.exists(path):
+            return cls()
+        with open(path) as f:
+            data = json.load(f)
+        pools = {p['address']: V3PoolState.from_dict(p) for p in data['pools']}
+        return cls(pools, data['last_block'])
+
+
+def load_pool_from_chain(w3, address: str, word_radius: int = 4, block_identifier='latest') -> V3PoolState:
+    """Snapshot a pool's slot0, liquidity and initialized ticks within `word_radius` bitmap words"""
+    pool = w3.eth.contract(address=address, abi=UNISWAP_V3_POOL_ABI)
+    call = {'block_identifier': block_identifier}
+    slot0 = pool.functions.slot0().call(**call)
+    state = V3PoolState(
+        address=address,
+        token0=pool.functions.token0().call(**call),
+        token1=pool.functions.token1().call(**call),
+        fee=pool.functions.fee().call(**call),
+        tick_spacing=pool.functions.tickSpacing().call(**call),
+        sqrt_price_x96=slot0[0],
+        tick=slot0[1],
+        liquidity=pool.functions.liquidity().call(**call)
+    )
+
+    center = (state.tick // state.tick_spacing) >> 8
+    state.word_range = (max(center - word_radius, -(1 << 15)), min(center + word_radius, (1 << 15) - 1))
+    for word_pos in range(state.word_range[0], state.word_range[1] + 1):
+        word = pool.functions.tickBitmap(word_pos).call(**call)
+        if not word:
+            continue
+        state.tick_bitmap[word_pos] = word
+        for bit in range(256):
+            if word >> bit & 1:
+                tick = ((word_pos << 8) + bit) * state.tick_spacing
+                info = pool.functions.ticks(tick).call(**call)
+                state.ticks[tick] = TickInfo(info[0], info[1])
+    return state
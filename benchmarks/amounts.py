@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Per-pair amount handling: Decimal/from_wei conversions vs integer base units
+
+Times the amount work a scan does for every quoted pair (size the test
+loan, read the quoted profit, compare it with MIN_PROFIT_USD) both ways:
+
+  decimal   the previous path: Decimal budget, to_wei/from_wei per pair and a
+            Decimal(str(threshold)) per comparison, every token read as 18 decimals
+  integer   automation.amounts: the budget and thresholds in base units,
+            10 ** decimals precomputed per token, one int compare per pair
+
+and the standalone bot's valuation, `profit / 1e18 * price` per route vs an
+integer cross-multiplication against micro-dollar prices. `misjudged`
+counts pairs whose threshold decision differs from the exact one; the
+decimal path gets every 6- and 8-decimal borrowed token wrong.
+
+eth_utils is not needed: from_wei/to_wei are reproduced as it implements them
+(Decimal arithmetic at 999 digits of precision).
+
+    python -m benchmarks.amounts --pairs 500 --rounds 200
+"""
+import argparse
+import decimal
+import json
+import random
+import sys
+import time
+from decimal import Decimal
+from typing import Dict, List, Tuple
+
+from automation.amounts import Amount, TokenScales, parse_units
+
+DECIMALS = (18, 6, 8, 18, 6)
+MIN_PROFIT_USD = 1.0
+ETHER = Decimal(10 ** 18)
+
+
+def from_wei(number: int) -> Decimal:
+    with decimal.localcontext() as context:
+        context.prec = 999
+        return Decimal(number) / ETHER
+
+
+def to_wei(number: Decimal) -> int:
+    with decimal.localcontext() as context:
+        context.prec = 999
+        return int(Decimal(number) * ETHER)
+
+
+def make_pairs(count: int, seed: int) -> List[Tuple[str, int, int]]:
+    """(token_a, decimals, quoted profit in token_a base units) around a $1 threshold"""
+    rng = random.Random(seed)
+    pairs = []
+    for i in range(count):
+        places = DECIMALS[i % len(DECIMALS)]
+        profit = rng.randrange(0, 2 * 10 ** places)
+        pairs.append(('0x%040x' % (i % 50 + 1), places, profit))
+    return pairs
+
+
+def decimal_path(pairs, budget_matic: Decimal) -> List[bool]:
+    decisions = []
+    for _token, _places, profit in pairs:
+        to_wei(budget_matic * Decimal('0.1'))
+        decisions.append(from_wei(profit) >= Decimal(str(MIN_PROFIT_USD)))
+    return decisions
+
+
+def integer_path(pairs, scales: TokenScales, budget: Amount, thresholds: Dict[str, int]) -> List[bool]:
+    decisions = []
+    for token, _places, profit in pairs:
+        scales.convert(budget.raw * 1000 // 10000, budget.decimals, token)
+        threshold = thresholds.get(token)
+        if threshold is None:
+            threshold = thresholds[token] = scales.units(token, MIN_PROFIT_USD)
+        decisions.append(profit >= threshold)
+    return decisions
+
+
+def float_bot_path(pairs, price: float) -> List[bool]:
+    return [(profit / 1e18) * price >= MIN_PROFIT_USD for _token, _places, profit in pairs]
+
+
+def integer_bot_path(pairs, scales: Dict[str, int], price: float) -> List[bool]:
+    min_micros = parse_units(MIN_PROFIT_USD, 6)
+    prices: Dict[str, int] = {}
+    decisions = []
+    for token, _places, profit in pairs:
+        micros = prices.get(token)
+        if micros is None:
+            micros = prices[token] = parse_units(price, 6)
+        decisions.append(profit * micros >= min_micros * scales[token])
+    return decisions
+
+
+def timed(fn, rounds: int, pairs: int) -> Tuple[float, List[bool]]:
+    decisions = fn()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return round((time.perf_counter() - start) / (rounds * pairs) * 1e9, 1), decisions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pairs', type=int, default=500, help='pairs quoted per scan')
+    parser.add_argument('--rounds', type=int, default=200, help='scans timed per path')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    pairs = make_pairs(args.pairs, args.seed)
+    decimals = {token: places for token, places, _profit in pairs}
+    scales = TokenScales(decimals)
+    exact = [profit >= 10 ** places for _token, places, profit in pairs]
+    budget = Amount.of('250.5', 18)
+
+    results = []
+    for name, fn in (
+            ('decimal', lambda: decimal_path(pairs, Decimal('250.5'))),
+            ('integer', lambda: integer_path(pairs, scales, budget, {})),
+            ('bot-float', lambda: float_bot_path(pairs, 1.0)),
+            ('bot-integer', lambda: integer_bot_path(pairs, {t: 10 ** d for t, d in decimals.items()}, 1.0)),
+    ):
+        ns_per_pair, decisions = timed(fn, args.rounds, args.pairs)
+        results.append({
+            'path': name,
+            'ns_per_pair': ns_per_pair,
+            'misjudged': sum(1 for decision, truth in zip(decisions, exact) if decision != truth),
+        })
+    json.dump({'pairs': args.pairs, 'rounds': args.rounds, 'decimals': list(DECIMALS), 'results': results},
+              sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Bot quote overhead: brownie Contract vs the standalone JSON-RPC runner
+
+Deploys FlashloanV3Polygon against mock DEXes on brownie's local development
+chain, then times the same checkArbitrageOpportunities grid through brownie's
+Contract and through automation.standalone_bot. A raw eth_call with
+pre-encoded calldata is the node-side baseline, so `overhead_us` is the
+client-side cost (encoding, transport, decoding) per call. Peak RSS of each
+runtime after start-up is measured in a fresh interpreter.
+
+    python -m benchmarks.bot_quote_overhead --calls 200
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+_RSS_CHILD = {
+    'brownie': 'from brownie import project; project.load("."); from brownie.project import FlashloanV3Polygon',
+    'standalone': 'import automation.standalone_bot, eth_account, eth_abi',
+}
+
+
+def peak_rss_mb(code: str) -> float:
+    script = code + '\nimport resource; print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)'
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True)
+    if result.returncode != 0:
+        return float('nan')
+    return round(int(result.stdout.strip().splitlines()[-1]) / 1024, 1)
+
+
+def deploy(project, accounts):
+    """Two mock DEXes with a WMATIC/USDC spread and FlashloanV3Polygon allowlisting both"""
+    owner = accounts[0]
+    wmatic = project.MockERC20.deploy("Wrapped Matic", "WMATIC", 18, {"from": owner})
+    usdc = project.MockERC20.deploy("USD Coin", "USDC", 6, {"from": owner})
+    routers = []
+    for skew in (100, 105):
+        factory = project.MockUniswapV2Factory.deploy({"from": owner})
+        routers.append(project.MockUniswapV2Router.deploy(factory, {"from": owner}))
+        factory.createPair(wmatic, usdc, {"from": owner})
+        pair = project.MockUniswapV2Pair.at(factory.getPair(wmatic, usdc))
+        wmatic.mint(pair, 10 ** 24, {"from": owner})
+        usdc.mint(pair, 10 ** 12 * skew // 100, {"from": owner})
+        pair.sync({"from": owner})
+    pool = project.MockAavePool.deploy({"from": owner})
+    provider = project.MockPoolAddressesProvider.deploy(pool, {"from": owner})
+    flashloan = project.FlashloanV3Polygon.deploy(provider, routers, {"from": owner})
+    tokens = {'WMATIC': wmatic.address, 'USDC': usdc.address}
+    dexes = {'QUICKSWAP': routers[0].address, 'SUSHISWAP': routers[1].address}
+    return flashloan, tokens, dexes
+
+
+def timed(fn, calls: int) -> dict:
+    fn()  # warm-up: caches, connection pool
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return {'median_us': round(statistics.median(samples) * 1e6, 1),
+            'p90_us': round(sorted(samples)[int(len(samples) * 0.9)] * 1e6, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=200)
+    parser.add_argument('--network', default='development')
+    args = parser.parse_args()
+
+    from brownie import Contract, accounts, network, project, web3
+
+    from automation.jsonrpc import JsonRpcClient, RpcContract, load_artifact_abi
+    from automation.standalone_bot import TRADE_AMOUNTS, build_quote_grid
+
+    p = project.load('.')
+    network.connect(args.network)
+    try:
+        flashloan, tokens, dexes = deploy(p, accounts)
+        grid = build_quote_grid(tokens, dexes, TRADE_AMOUNTS, token_pairs=[('WMATIC', 'USDC')])
+        routes = [(q['token_a'], q['token_b'], q['amount'], q['dex_a'], q['dex_b']) for q in grid]
+
+        brownie_contract = Contract.from_abi("FlashloanV3Polygon", flashloan.address, p.FlashloanV3Polygon.abi)
+        client = JsonRpcClient(web3.provider.endpoint_uri)
+        standalone = RpcContract(client, flashloan.address, load_artifact_abi('FlashloanV3Polygon', 'build/contracts'))
+        calldata = standalone.encode('checkArbitrageOpportunities', routes)
+        assert tuple(map(list, standalone.call('checkArbitrageOpportunities', routes))) == \
+            tuple(map(list, brownie_contract.checkArbitrageOpportunities(routes)))
+
+        raw = timed(lambda: client.request('eth_call', [{'to': flashloan.address, 'data': calldata}, 'latest']),
+                    args.calls)
+        results = {
+            'brownie': timed(lambda: brownie_contract.checkArbitrageOpportunities(routes), args.calls),
+            'standalone': timed(lambda: standalone.call('checkArbitrageOpportunities', routes), args.calls),
+        }
+        for name, result in results.items():
+            result['overhead_us'] = round(result['median_us'] - raw['median_us'], 1)
+            result['peak_rss_mb'] = peak_rss_mb(_RSS_CHILD[name])
+        client.close()
+    finally:
+        network.disconnect()
+
+    print(json.dumps({'calls': args.calls, 'routes_per_call': len(routes), 'raw_eth_call': raw,
+                      'paths': results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
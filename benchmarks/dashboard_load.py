@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Dashboard load test: many concurrent pollers against the served app
+
+Starts `python -m dashboard.server` in a child process, with the simulated
+scanner running and a trade store seeded with history, then runs
+`--clients` keep-alive clients that each request an endpoint back to back
+for `--seconds`. Reported per scenario:
+
+  requests_per_sec    completed responses per second, all clients together
+  p50_ms / p99_ms     request latency as seen by the clients
+  not_modified        share of 304 answers (clients echo the ETag they got)
+  bytes_per_request   body bytes on the wire (gzipped where negotiated)
+
+Scenarios: /api/status with and without If-None-Match, and a history page
+with and without gzip, each against the production server and against
+Flask's development server (`--dev`) for comparison.
+
+    python -m benchmarks.dashboard_load --clients 300 --seconds 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import aiohttp
+
+from automation.trade_store import TradeStore
+from benchmarks.trade_store import make_opportunities
+
+SCENARIOS = [
+    # name, path, send If-None-Match, Accept-Encoding
+    ('status', '/api/status', False, 'identity'),
+    ('status-etag', '/api/status', True, 'identity'),
+    ('history', '/api/history/opportunities?limit=200', False, 'identity'),
+    ('history-gzip', '/api/history/opportunities?limit=200', False, 'gzip'),
+]
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def seed_store(path: str, rows: int):
+    store = TradeStore(path)
+    store.record_opportunities(make_opportunities(rows), block_number=1)
+    store.flush()
+    store.close()
+
+
+def start_server(port: int, store_path: str, threads: int, dev: bool) -> subprocess.Popen:
+    command = [sys.executable, '-m', 'dashboard.server', '--host', '127.0.0.1', '--port', str(port),
+               '--threads', str(threads), '--start']
+    if dev:
+        command.append('--dev')
+    env = dict(os.environ, TRADE_STORE_PATH=store_path, LOG_LEVEL='WARNING')
+    process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return process
+        except OSError:
+            if process.poll() is not None:
+                raise RuntimeError("dashboard server exited with %d" % process.returncode)
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("dashboard server did not start on port %d" % port)
+
+
+async def _client(session, url: str, use_etag: bool, encoding: str, deadline: float, results: Dict):
+    headers = {'Accept-Encoding': encoding}
+    while time.monotonic() < deadline:
+        began = time.perf_counter()
+        try:
+            async with session.get(url, headers=headers) as response:
+                body = await response.read()
+        except aiohttp.ClientError:
+            results['errors'] += 1
+            continue
+        results['latencies'].append(time.perf_counter() - began)
+        results['bytes'] += len(body)
+        if response.status == 304:
+            results['not_modified'] += 1
+        elif response.status != 200:
+            results['errors'] += 1
+        if use_etag and 'ETag' in response.headers:
+            headers['If-None-Match'] = response.headers['ETag']
+
+
+async def load(base_url: str, path: str, use_etag: bool, encoding: str, clients: int, seconds: float) -> Dict:
+    results = {'latencies': [], 'bytes': 0, 'not_modified': 0, 'errors': 0}
+    connector = aiohttp.TCPConnector(limit=clients)
+    # Bodies are counted as received: no transparent gunzip
+    async with aiohttp.ClientSession(connector=connector, auto_decompress=False) as session:
+        start = time.monotonic()
+        await asyncio.gather(*(_client(session, base_url + path, use_etag, encoding, start + seconds, results)
+                               for _ in range(clients)))
+        elapsed = time.monotonic() - start
+    latencies = results['latencies']
+    count = len(latencies)
+    return {
+        'requests': count,
+        'errors': results['errors'],
+        'requests_per_sec': round(count / elapsed),
+        'p50_ms': round(statistics.median(latencies) * 1000, 2) if count else None,
+        'p99_ms': round(_percentile(latencies, 99) * 1000, 2) if count else None,
+        'not_modified': round(results['not_modified'] / count, 3) if count else 0.0,
+        'bytes_per_request': round(results['bytes'] / count) if count else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=300, help='concurrent keep-alive clients')
+    parser.add_argument('--seconds', type=float, default=10.0, help='duration of each scenario')
+    parser.add_argument('--threads', type=int, default=16, help='production server worker threads')
+    parser.add_argument('--rows', type=int, default=2000, help='opportunities seeded into the history')
+    parser.add_argument('--skip-dev', action='store_true', help="don't measure Flask's development server")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        store_path = os.path.join(directory, 'history.db')
+        seed_store(store_path, args.rows)
+        for dev in ((False,) if args.skip_dev else (False, True)):
+            port = _free_port()
+            server = start_server(port, store_path, args.threads, dev)
+            try:
+                for name, path, use_etag, encoding in SCENARIOS:
+                    result = asyncio.run(load('http://127.0.0.1:%d' % port, path, use_etag, encoding,
+                                              args.clients, args.seconds))
+                    results.append({'server': 'dev' if dev else 'waitress', 'scenario': name, **result})
+            finally:
+                server.terminate()
+                server.wait(10)
+    json.dump({'clients': args.clients, 'seconds': args.seconds, 'threads': args.threads, 'results': results},
+              sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
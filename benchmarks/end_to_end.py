@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+End-to-end detection benchmark on synthetic markets
+
+Drives the real detection paths against a mock_rpc server (in its own
+process) serving synthetic pool universes:
+
+  scanner-contract  PolygonArbitrageScanner, one getArbitrageOpportunity eth_call per pair
+  scanner-lens      PolygonArbitrageScanner, one ArbitrageLens.scan eth_call per borrowed token
+  scanner-sharded   PolygonArbitrageScanner, reserve reads + SCAN_WORKERS=1 local quoting
+  bot               the bot's quote grid (StandaloneArbitrageBot, same detection as
+                    scripts/polygon_arbitrage_bot.py), one checkArbitrageOpportunities call
+
+Each (case, pool count) runs in a fresh interpreter and reports scans/sec,
+per-stage latency percentiles, RPC calls per scan and peak RSS. Results are
+saved as JSON; --compare prints the scans/sec ratio against an earlier run.
+
+    python -m benchmarks.end_to_end --pools 10 100 1000 10000 --latency-ms 5
+    python -m benchmarks.end_to_end --compare benchmarks/results/end_to_end_<commit>.json
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+CASES = ['scanner-contract', 'scanner-lens', 'scanner-sharded', 'bot']
+SEED = 7
+
+
+def _serve(conn, pools: int, latency_ms: float, jitter_ms: float, block_time: float):
+    from mock_rpc import Chaos, MockRpcServer, synthetic_chain
+    server = MockRpcServer(synthetic_chain(pools // 2, seed=SEED, block_time=block_time),
+                           Chaos(latency_ms=latency_ms, jitter_ms=jitter_ms, seed=SEED))
+    conn.send(server.url)
+    conn.close()
+    server.serve_forever()
+
+
+def _scanner(case: str, chain, url: str):
+    from automation.arbitrage_scanner import PolygonArbitrageScanner, TokenPair
+
+    os.environ.update({
+        'PRIVATE_KEY': '0x' + '11' * 32,
+        'ALCHEMY_API_URL_MAINNET': url,
+        'REGISTRY_CACHE_FILE': '',
+        'SCAN_WORKERS': '1' if case == 'scanner-sharded' else '0',
+    })
+    scanner = PolygonArbitrageScanner()
+    base = chain.by_symbol['WMATIC']
+    scanner.tokens = [TokenPair(base.address, token.address, base.symbol, token.symbol, base.decimals, token.decimals)
+                      for token in chain.by_symbol.values() if token is not base]
+    # The scanner's lens and sharded paths are written against these two DEX names
+    dex0, dex1 = list(chain.dexes.values())[:2]
+    scanner.dex_configs = {
+        'quickswap': {'router': dex0.router, 'factory': dex0.factory, 'name': 'QuickSwap'},
+        'sushiswap': {'router': dex1.router, 'factory': dex1.factory, 'name': 'SushiSwap'},
+    }
+    scanner.contract_address = chain.arbitrage_address if case == 'scanner-contract' else None
+    scanner.lens_address = chain.lens_address if case == 'scanner-lens' else None
+    loop = asyncio.new_event_loop()
+    return (lambda: loop.run_until_complete(scanner.scan_arbitrage_opportunities())), scanner.close
+
+
+def _bot(chain, url: str):
+    from automation.jsonrpc import JsonRpcClient
+    from automation.standalone_bot import PriceFeed, StandaloneArbitrageBot
+    from automation.tracing import tracer
+
+    class FixedPrices(PriceFeed):
+        def usd(self, symbol):
+            return 1.0
+
+    client = JsonRpcClient(url)
+    dex0, dex1 = list(chain.dexes.values())[:2]
+    bot = StandaloneArbitrageBot(
+        client, chain.arbitrage_address, '0x' + '11' * 32, _quote_abi(), 137,
+        tokens={symbol: token.address for symbol, token in chain.by_symbol.items()},
+        dexes={dex0.name: dex0.router, dex1.name: dex1.router},
+        token_pairs=[('WMATIC', symbol) for symbol in chain.by_symbol if symbol != 'WMATIC'],
+        min_profit_usd=0, prices=FixedPrices()
+    )
+
+    def scan():
+        with tracer.span('quoting'):
+            bot.scan_arbitrage_opportunities()
+
+    return scan, client.close
+
+
+def _quote_abi():
+    route = [{'name': n, 'type': t} for n, t in
+             (('tokenA', 'address'), ('tokenB', 'address'), ('amount', 'uint256'), ('dexA', 'address'), ('dexB', 'address'))]
+    return [{'type': 'function', 'name': 'checkArbitrageOpportunities', 'stateMutability': 'view',
+             'inputs': [{'name': 'requests', 'type': 'tuple[]', 'components': route}],
+             'outputs': [{'name': 'profits', 'type': 'uint256[]'}, {'name': 'profitable', 'type': 'bool[]'}]}]
+
+
+def _rpc_calls(client) -> int:
+    return sum(count for name, count in client.request('mock_stats').items() if not name.startswith('injected_'))
+
+
+def run_worker(case: str, pools: int, scans: int, max_seconds: float, latency_ms: float,
+               jitter_ms: float, block_time: float) -> dict:
+    from automation.jsonrpc import JsonRpcClient
+    from automation.tracing import tracer
+    from mock_rpc import synthetic_chain
+
+    parent, child = multiprocessing.Pipe()
+    server = multiprocessing.Process(target=_serve, args=(child, pools, latency_ms, jitter_ms, block_time), daemon=True)
+    server.start()
+    url = parent.recv()
+    chain = synthetic_chain(pools // 2, seed=SEED, block_time=block_time)  # same seed: same addresses
+    stats_client = JsonRpcClient(url)
+
+    try:
+        scan, close = _bot(chain, url) if case == 'bot' else _scanner(case, chain, url)
+        tracer.enabled = True
+        scan()  # warm-up: pair discovery, worker start-up, connection pool
+        tracer.reset()
+        calls_before = _rpc_calls(stats_client)
+
+        start = time.perf_counter()
+        done = 0
+        while done < scans and (done == 0 or time.perf_counter() - start < max_seconds):
+            with tracer.span('scan'):
+                scan()
+            done += 1
+        elapsed = time.perf_counter() - start
+
+        calls = _rpc_calls(stats_client) - calls_before
+        close()
+    finally:
+        stats_client.close()
+        server.terminate()
+        server.join()
+
+    return {
+        'case': case,
+        'pools': len(chain.pools),
+        'scans': done,
+        'scans_per_sec': round(done / elapsed, 3),
+        'rpc_calls_per_scan': round(calls / done, 1),
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'stages': {s.stage: {'p50_ms': round(s.p50_ms, 3), 'p90_ms': round(s.p90_ms, 3), 'p99_ms': round(s.p99_ms, 3)}
+                   for s in tracer.summary()},
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return 'unknown'
+
+
+def compare(current: dict, baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    old = {(r['case'], r['pools']): r for r in baseline['results'] if 'scans_per_sec' in r}
+    print('%-18s %7s %12s %12s %8s' % ('case', 'pools', 'baseline/s', 'current/s', 'ratio'))
+    for result in current['results']:
+        before = old.get((result['case'], result.get('pools')))
+        if before is None or 'scans_per_sec' not in result:
+            continue
+        ratio = result['scans_per_sec'] / before['scans_per_sec'] if before['scans_per_sec'] else float('inf')
+        print('%-18s %7d %12.3f %12.3f %7.2fx' % (result['case'], result['pools'], before['scans_per_sec'],
+                                                  result['scans_per_sec'], ratio))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cases', nargs='+', choices=CASES, default=CASES)
+    parser.add_argument('--pools', type=int, nargs='+', default=[10, 100, 1000, 10000])
+    parser.add_argument('--scans', type=int, default=20)
+    parser.add_argument('--max-seconds', type=float, default=30.0, help='per case; at least one scan always runs')
+    parser.add_argument('--latency-ms', type=float, default=5.0)
+    parser.add_argument('--jitter-ms', type=float, default=1.0)
+    parser.add_argument('--block-time', type=float, default=2.0)
+    parser.add_argument('--output', help='default: benchmarks/results/end_to_end_<commit>.json')
+    parser.add_argument('--compare', help='earlier results file to compare scans/sec against')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = run_worker(args.cases[0], args.pools[0], args.scans, args.max_seconds,
+                            args.latency_ms, args.jitter_ms, args.block_time)
+        print(json.dumps(result))
+        return
+
+    commit = _git_commit()
+    report = {
+        'commit': commit,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'params': {k: getattr(args, k) for k in ('scans', 'max_seconds', 'latency_ms', 'jitter_ms', 'block_time')},
+        'results': []
+    }
+    for case in args.cases:
+        for pools in args.pools:
+            command = [sys.executable, '-m', 'benchmarks.end_to_end', '--worker', '--cases', case,
+                       '--pools', str(pools), '--scans', str(args.scans), '--max-seconds', str(args.max_seconds),
+                       '--latency-ms', str(args.latency_ms), '--jitter-ms', str(args.jitter_ms),
+                       '--block-time', str(args.block_time)]
+            proc = subprocess.run(command, capture_output=True, text=True)
+            if proc.returncode != 0:
+                error = (proc.stderr.strip().splitlines() or ['exit %d' % proc.returncode])[-1]
+                result = {'case': case, 'pools': pools, 'error': error}
+            else:
+                result = json.loads(proc.stdout.strip().splitlines()[-1])
+            report['results'].append(result)
+            print(json.dumps(result), file=sys.stderr)
+
+    output = args.output or os.path.join('benchmarks', 'results', 'end_to_end_%s.json' % (commit or 'local'))
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print('Saved %s' % output)
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
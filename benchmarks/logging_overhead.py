@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Scan-loop logging overhead benchmark
+
+Replays the scanner's per-pair and per-scan log calls inside an asyncio loop
+with logging disabled, with the old synchronous FileHandler/StreamHandler
+setup and with the queue-backed pipeline, and reports time per scan.
+
+    python -m benchmarks.logging_overhead --pairs 15 --scans 2000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from automation.logging_pipeline import configure_logging, shutdown_logging
+
+logger = logging.getLogger('automation.arbitrage_scanner')
+
+
+async def scan_loop(pairs: int, scans: int, hit_every: int) -> float:
+    """Emit the same log traffic as continuous_scan and return seconds per scan"""
+    start = time.perf_counter()
+    for scan in range(scans):
+        logger.info("Scanning with %s MATIC budget (%s mode)", 123.45, 'Safe')
+        for i in range(pairs):
+            if i % hit_every == 0:
+                logger.info("Found opportunity: %s/%s - Profit: %.4f MATIC (%.2f%%)",
+                            'WMATIC', 'USDC', 1.2345, 0.42)
+            else:
+                logger.debug("Error scanning %s/%s: %s", 'WMATIC', 'USDC', 'execution reverted')
+        logger.info("📊 Scan completed in %.2fs | Scans: %d | Opportunities: %d | "
+                    "Trades: %d | Profit: %.4f MATIC", 0.01, scan, scan, 0, 0.0)
+        await asyncio.sleep(0)
+    return (time.perf_counter() - start) / scans
+
+
+def _reset_root():
+    shutdown_logging()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+
+
+def run_mode(mode: str, pairs: int, scans: int, hit_every: int, log_dir: str) -> float:
+    _reset_root()
+    log_file = os.path.join(log_dir, f'{mode}.log')
+    devnull = open(os.devnull, 'w')
+    original_stderr = sys.stderr
+    sys.stderr = devnull
+    try:
+        if mode == 'off':
+            logging.getLogger().setLevel(logging.CRITICAL)
+        elif mode == 'sync':
+            logging.basicConfig(
+                level=logging.INFO,
+                format='%(asctime)s - %(levelname)s - %(message)s',
+                handlers=[logging.FileHandler(log_file), logging.StreamHandler()]
+            )
+        elif mode in ('queue', 'queue-json'):
+            configure_logging(level='INFO', log_file=log_file, json_lines=(mode == 'queue-json'))
+        per_scan = asyncio.run(scan_loop(pairs, scans, hit_every))
+    finally:
+        _reset_root()
+        sys.stderr = original_stderr
+        devnull.close()
+    return per_scan
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pairs', type=int, default=15)
+    parser.add_argument('--scans', type=int, default=2000)
+    parser.add_argument('--hit-every', type=int, default=5, help='one opportunity log per N pairs')
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as log_dir:
+        for mode in ('off', 'sync', 'queue', 'queue-json'):
+            results[mode] = run_mode(mode, args.pairs, args.scans, args.hit_every, log_dir)
+
+    baseline = results['off']
+    report = {
+        'pairs': args.pairs,
+        'scans': args.scans,
+        'us_per_scan': {mode: round(value * 1e6, 2) for mode, value in results.items()},
+        'overhead_vs_off_us': {mode: round((value - baseline) * 1e6, 2) for mode, value in results.items()}
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
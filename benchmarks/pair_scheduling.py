@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Adaptive pair scheduling on recorded reserves
+
+Replays per-block reserves of every scanned pair and compares how many
+opportunities each scan policy catches per RPC call at the same budget:
+
+  full         every pair every block (the scanner without PAIR_SCAN_BUDGET)
+  round-robin  `budget` calls per block, pairs in rotation
+  adaptive     `budget` calls per block, AdaptivePairScheduler
+
+An opportunity is a (block, pair) whose round trip clears the scanner's
+profit threshold; an episode is a run of consecutive such blocks. A policy
+catches an opportunity when it scans the pair in that block.
+
+Recordings are JSONL: a header with pair and DEX names, then one line per
+block with reserves per pair and DEX, oriented to token_a. Record from any
+RPC endpoint (Polygon, or a `python -m mock_rpc` server), or generate one
+with per-pair volatility and arbitrageurs closing gaps:
+
+    python -m benchmarks.pair_scheduling record --rpc-url $ALCHEMY_API_URL_MAINNET --blocks 500 -o polygon.jsonl
+    python -m benchmarks.pair_scheduling synthetic --pairs 200 --blocks 2000 -o synthetic.jsonl
+    python -m benchmarks.pair_scheduling evaluate synthetic.jsonl --budget 40
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from typing import Dict, List, Sequence, Tuple
+
+from automation.pair_scheduler import AdaptivePairScheduler, price_and_spread
+from automation.sharded_scan import scan_pairs
+
+GET_PAIR = '0xe6a43905'      # getPair(address,address)
+GET_RESERVES = '0x0902f1ac'  # getReserves()
+ZERO = '0x' + '00' * 20
+FEE_BPS = 30
+
+
+# -- recording -------------------------------------------------------------
+
+def _word(address: str) -> str:
+    return address.lower()[2:].rjust(64, '0')
+
+
+def record_rpc(url: str, blocks: int, output: str, poll: float = 0.5):
+    """Sample reserves of the scanner's token pairs on QuickSwap and SushiSwap once per new block"""
+    from automation.arbitrage_scanner import PolygonArbitrageScanner
+    from automation.jsonrpc import JsonRpcClient
+
+    pairs = PolygonArbitrageScanner._load_token_list(None)
+    configs = PolygonArbitrageScanner._load_dex_configs(None)
+    dexes = ['quickswap', 'sushiswap']
+    client = JsonRpcClient(url)
+
+    calls = [('eth_call', [{'to': configs[dex]['factory'], 'data': GET_PAIR + _word(p.token_a) + _word(p.token_b)},
+                           'latest']) for p in pairs for dex in dexes]
+    addresses = ['0x' + result[-40:] if result and len(result) >= 42 else ZERO for result in client.batch(calls)]
+    # getReserves is in token0/token1 order; token0 is the lower address
+    flipped = [p.token_a.lower() > p.token_b.lower() for p in pairs]
+
+    with open(output, 'w') as f:
+        f.write(json.dumps({'pairs': ['%s/%s' % (p.symbol_a, p.symbol_b) for p in pairs], 'dexes': dexes}) + '\n')
+        last = None
+        recorded = 0
+        while recorded < blocks:
+            block = int(client.request('eth_blockNumber'), 16)
+            if block == last:
+                time.sleep(poll)
+                continue
+            last = block
+            live = [(i, a) for i, a in enumerate(addresses) if a != ZERO]
+            results = client.batch(('eth_call', [{'to': a, 'data': GET_RESERVES}, hex(block)]) for _, a in live)
+            flat = [[0, 0] for _ in addresses]
+            for (i, _), data in zip(live, results):
+                if data and len(data) >= 130:
+                    r0, r1 = int(data[2:66], 16), int(data[66:130], 16)
+                    flat[i] = [r1, r0] if flipped[i // len(dexes)] else [r0, r1]
+            reserves = [flat[p * len(dexes):(p + 1) * len(dexes)] for p in range(len(pairs))]
+            f.write(json.dumps({'block': block, 'reserves': reserves}) + '\n')
+            recorded += 1
+    client.close()
+
+
+def record_synthetic(pairs: int, blocks: int, output: str, seed: int, lifetime: int, gap_bps: float):
+    """
+    Mock chain where each pair has its own volatility (log-uniform, so a few
+    hot pairs and a long tail of quiet ones) and a gap wider than `gap_bps`
+    is closed by other arbitrageurs `lifetime` blocks after it opens.
+    """
+    from mock_rpc import synthetic_chain
+
+    chain = synthetic_chain(pairs, seed=seed, volatility=0, block_time=0)
+    rng = random.Random(seed)
+    base = chain.by_symbol['WMATIC'].address
+    tokens = [t for s, t in chain.by_symbol.items() if s != 'WMATIC']
+    dexes = list(chain.dexes)
+    volatility = {t.address: 10 ** rng.uniform(-4.5, -2) for t in tokens}
+    open_since: Dict[str, int] = {}
+
+    def move(chain, block):
+        for token in tokens:
+            for dex in dexes:
+                pool = chain.pool(dex, base, token.address)
+                step = 1 + rng.gauss(0, volatility[token.address])
+                pool.reserve0, pool.reserve1 = max(1, int(pool.reserve0 * step)), max(1, int(pool.reserve1 / step))
+            reserves = [chain.pool(dex, base, token.address).reserves_for(base) for dex in dexes]
+            _, spread = price_and_spread(reserves)
+            if spread is None or spread < gap_bps:
+                open_since.pop(token.address, None)
+            elif block.number - open_since.setdefault(token.address, block.number) >= lifetime:
+                # Someone else took it: realign every DEX to the first one's price
+                reserve_a, reserve_b = reserves[0]
+                for dex in dexes[1:]:
+                    chain.set_reserves(dex, base, token.address, reserve_a, reserve_b)
+                del open_since[token.address]
+
+    chain.on_block(move)
+    with open(output, 'w') as f:
+        f.write(json.dumps({'pairs': ['WMATIC/%s' % t.symbol for t in tokens], 'dexes': dexes}) + '\n')
+        for _ in range(blocks):
+            chain.mine()
+            reserves = [[list(chain.pool(dex, base, t.address).reserves_for(base)) for dex in dexes] for t in tokens]
+            f.write(json.dumps({'block': chain.head, 'reserves': reserves}) + '\n')
+
+
+# -- evaluation ------------------------------------------------------------
+
+class _Reserves:
+    """One block of a recording in the shape scan_pairs reads"""
+
+    def __init__(self, reserves: List[List[List[int]]]):
+        self.reserves = reserves
+        self.dexes = len(reserves[0]) if reserves else 0
+
+    def get(self, pair_index: int, dex_index: int) -> Tuple[int, int]:
+        return tuple(self.reserves[pair_index][dex_index])
+
+
+def load(path: str):
+    with open(path) as f:
+        header = json.loads(f.readline())
+        return header, [json.loads(line) for line in f if line.strip()]
+
+
+def opportunities(blocks, min_profit_bps: int, size_fractions: Sequence[float]) -> List[set]:
+    """Per block, the pairs with at least one profitable round trip"""
+    found = []
+    for entry in blocks:
+        table = _Reserves(entry['reserves'])
+        profitable = set()
+        for p, per_dex in enumerate(entry['reserves']):
+            depth = min((r[0] for r in per_dex if r[0]), default=0)
+            if not depth:
+                continue
+            amounts = [int(depth * fraction) for fraction in size_fractions]
+            if scan_pairs(table, [p], amounts, [FEE_BPS] * table.dexes, min_profit_bps):
+                profitable.add(p)
+        found.append(profitable)
+    return found
+
+
+def episodes(truth: List[set]) -> List[Tuple[int, int, int]]:
+    """(pair, first block index, last block index) of every run of consecutive profitable blocks"""
+    runs, open_runs = [], {}
+    for index, pairs in enumerate(truth + [set()]):
+        for p in list(open_runs):
+            if p not in pairs:
+                runs.append((p, open_runs.pop(p), index - 1))
+        for p in pairs:
+            open_runs.setdefault(p, index)
+    return runs
+
+
+def replay(policy: str, blocks, truth: List[set], pairs: int, dexes: int, budget: int, max_idle: int) -> Dict:
+    scheduler = AdaptivePairScheduler(pairs, budget, dexes, max_idle) if policy == 'adaptive' else None
+    per_block = max(1, budget // dexes)
+    cursor = 0
+    calls = 0
+    scanned: List[set] = []
+    for index, entry in enumerate(blocks):
+        if policy == 'full':
+            chosen = list(range(pairs))
+        elif policy == 'round-robin':
+            chosen = [(cursor + k) % pairs for k in range(min(per_block, pairs))]
+            cursor = (cursor + len(chosen)) % pairs
+        else:
+            chosen = scheduler.select(entry['block'])
+        calls += len(chosen) * dexes
+        scanned.append(set(chosen))
+        if scheduler is not None:
+            for p in chosen:
+                price, spread = price_and_spread([tuple(r) for r in entry['reserves'][p]])
+                scheduler.record(p, p in truth[index], price, spread)
+
+    caught = sum(len(s & t) for s, t in zip(scanned, truth))
+    delays = []
+    for p, first, last in episodes(truth):
+        seen = next((i for i in range(first, last + 1) if p in scanned[i]), None)
+        if seen is not None:
+            delays.append(seen - first)
+    runs = len(episodes(truth))
+    return {
+        'policy': policy,
+        'rpc_calls': calls,
+        'opportunities_caught': caught,
+        'opportunities_per_1k_calls': round(1000 * caught / calls, 3) if calls else 0.0,
+        'episodes_caught': len(delays),
+        'episodes_caught_pct': round(100 * len(delays) / runs, 1) if runs else 0.0,
+        'mean_detection_delay_blocks': round(sum(delays) / len(delays), 2) if delays else None,
+    }
+
+
+def evaluate(path: str, budget: int, max_idle: int, min_profit_bps: int) -> Dict:
+    header, blocks = load(path)
+    pairs, dexes = len(header['pairs']), len(header['dexes'])
+    truth = opportunities(blocks, min_profit_bps, [0.001, 0.005, 0.01])
+    return {
+        'recording': path,
+        'pairs': pairs,
+        'blocks': len(blocks),
+        'budget_calls_per_block': budget,
+        'opportunities': sum(len(t) for t in truth),
+        'episodes': len(episodes(truth)),
+        'results': [replay(policy, blocks, truth, pairs, dexes, budget, max_idle)
+                    for policy in ('full', 'round-robin', 'adaptive')],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    record = commands.add_parser('record', help='sample reserves from an RPC endpoint')
+    record.add_argument('--rpc-url', required=True)
+    record.add_argument('--blocks', type=int, default=300)
+    record.add_argument('-o', '--output', required=True)
+
+    synthetic = commands.add_parser('synthetic', help='generate a recording from a mock chain')
+    synthetic.add_argument('--pairs', type=int, default=200)
+    synthetic.add_argument('--blocks', type=int, default=2000)
+    synthetic.add_argument('--seed', type=int, default=1)
+    synthetic.add_argument('--lifetime', type=int, default=3, help='blocks before a gap is closed by others')
+    synthetic.add_argument('--gap-bps', type=float, default=60.0)
+    synthetic.add_argument('-o', '--output', required=True)
+
+    run = commands.add_parser('evaluate', help='replay a recording under each scan policy')
+    run.add_argument('recording')
+    run.add_argument('--budget', type=int, default=40, help='RPC calls per block (reserve reads)')
+    run.add_argument('--max-idle-blocks', type=int, default=50)
+    run.add_argument('--min-profit-bps', type=int, default=30)
+
+    args = parser.parse_args()
+    if args.command == 'record':
+        record_rpc(args.rpc_url, args.blocks, args.output)
+    elif args.command == 'synthetic':
+        record_synthetic(args.pairs, args.blocks, args.output, args.seed, args.lifetime, args.gap_bps)
+    else:
+        json.dump(evaluate(args.recording, args.budget, args.max_idle_blocks, args.min_profit_bps), sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Scheduler decision-latency benchmark
+
+Feeds synthetic opportunity streams (several sizes per route, overlapping
+pools, new block every scan) into OpportunityScheduler and reports the
+submit + next_batch latency per scan at different stream sizes.
+
+    python -m benchmarks.scheduler_latency --scans 500
+"""
+import argparse
+import json
+import random
+import time
+from dataclasses import dataclass
+
+from automation.scheduler import OpportunityScheduler
+from automation.tracing import _percentile
+
+NATIVE = '0xnative'
+DEXES = ['quickswap', 'sushiswap', 'apeswap', 'dfyn']
+
+
+@dataclass
+class _Pair:
+    token_a: str
+    token_b: str
+
+
+@dataclass
+class _Opportunity:
+    token_pair: _Pair
+    dex_a: str
+    dex_b: str
+    amount_in: int
+    expected_profit: int
+    gas_estimate: int = 200000
+    loan_fee: int = 0
+
+
+def stream(rng: random.Random, size: int, tokens: int):
+    for _ in range(size):
+        dex_a, dex_b = rng.sample(DEXES, 2)
+        yield _Opportunity(
+            token_pair=_Pair(NATIVE, '0xtoken%d' % rng.randrange(tokens)),
+            dex_a=dex_a,
+            dex_b=dex_b,
+            amount_in=rng.choice([10, 100, 1000]) * 10**18,
+            expected_profit=rng.randint(10**15, 5 * 10**18)
+        )
+
+
+def run(size: int, scans: int, max_legs: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    scheduler = OpportunityScheduler(NATIVE, ttl_blocks=2, max_legs=max_legs, gas_buffer_percentage=40)
+    tokens = max(size // 4, 1)
+    latencies = []
+    for block in range(scans):
+        opportunities = list(stream(rng, size, tokens))
+        start = time.perf_counter_ns()
+        scheduler.submit(opportunities, block, 30 * 10**9)
+        scheduler.next_batch(block)
+        latencies.append(time.perf_counter_ns() - start)
+    latencies.sort()
+    return {
+        'p50_us': round(_percentile(latencies, 50) / 1000, 1),
+        'p99_us': round(_percentile(latencies, 99) / 1000, 1),
+        'max_us': round(latencies[-1] / 1000, 1),
+        'queued_at_end': len(scheduler),
+        'stats': scheduler.stats
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--scans', type=int, default=500)
+    parser.add_argument('--max-legs', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=11)
+    args = parser.parse_args()
+
+    report = {
+        'scans': args.scans,
+        'max_legs': args.max_legs,
+        'opportunities_per_scan': {size: run(size, args.scans, args.max_legs, args.seed) for size in args.sizes}
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
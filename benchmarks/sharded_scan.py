@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Sharded scanning scaling benchmark
+
+Seeds a shared reserve table with synthetic V2 pools (one pair per row, one
+pool per DEX, a random spread between DEXes), then times full scans in-process
+and across 1/2/4/8 worker processes. Reserve updates between scans go through
+shared memory, so each scan also rewrites a fraction of the pools.
+
+    python -m benchmarks.sharded_scan --pairs 20000 --scans 10
+"""
+import argparse
+import json
+import os
+import random
+import time
+
+from automation.sharded_scan import ReserveTable, ShardedScanner, scan_pairs
+
+AMOUNTS = [10 * 10 ** 18, 100 * 10 ** 18, 1_000 * 10 ** 18]
+FEE_BPS = 30
+MIN_PROFIT_BPS = 30
+
+
+def synthetic_updates(pairs: int, dexes: int, rng: random.Random):
+    for pair_index in range(pairs):
+        reserve_a = rng.randint(10 ** 22, 10 ** 25)
+        reserve_b = rng.randint(10 ** 22, 10 ** 25)
+        for dex in range(dexes):
+            skew = 10000 + rng.randint(-150, 150)
+            yield pair_index, dex, reserve_a, reserve_b * skew // 10000
+
+
+def churn(pairs: int, dexes: int, fraction: float, rng: random.Random):
+    """A block's worth of reserve changes: `fraction` of pools move by up to 1%"""
+    for _ in range(int(pairs * dexes * fraction)):
+        yield (rng.randrange(pairs), rng.randrange(dexes),
+               rng.randint(10 ** 22, 10 ** 25), rng.randint(10 ** 22, 10 ** 25))
+
+
+def bench_in_process(pairs: int, dexes: int, scans: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    table = ReserveTable(pairs, dexes)
+    try:
+        for update in synthetic_updates(pairs, dexes, rng):
+            table.set(*update)
+        fees = [FEE_BPS] * dexes
+        start = time.perf_counter()
+        for _ in range(scans):
+            for update in churn(pairs, dexes, 0.05, rng):
+                table.set(*update)
+            found = scan_pairs(table, range(pairs), AMOUNTS, fees, MIN_PROFIT_BPS)
+        return {'ms_per_scan': (time.perf_counter() - start) * 1000 / scans, 'candidates': len(found)}
+    finally:
+        table.close()
+
+
+def bench_workers(pairs: int, dexes: int, workers: int, scans: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    with ShardedScanner(pairs, dexes, workers) as scanner:
+        scanner.update_many(synthetic_updates(pairs, dexes, rng))
+        fees = [FEE_BPS] * dexes
+        scanner.scan(AMOUNTS, fees, MIN_PROFIT_BPS)  # warm up worker attach
+
+        update_time = 0.0
+        start = time.perf_counter()
+        for _ in range(scans):
+            update_start = time.perf_counter()
+            scanner.update_many(churn(pairs, dexes, 0.05, rng))
+            update_time += time.perf_counter() - update_start
+            found = scanner.scan(AMOUNTS, fees, MIN_PROFIT_BPS)
+        elapsed = time.perf_counter() - start
+    return {
+        'ms_per_scan': elapsed * 1000 / scans,
+        'update_ms_per_scan': update_time * 1000 / scans,
+        'candidates': len(found)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pairs', type=int, default=20000)
+    parser.add_argument('--dexes', type=int, default=2)
+    parser.add_argument('--scans', type=int, default=10)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    baseline = bench_in_process(args.pairs, args.dexes, args.scans, args.seed)
+    results = {}
+    for workers in args.workers:
+        result = bench_workers(args.pairs, args.dexes, workers, args.scans, args.seed)
+        result['speedup_vs_in_process'] = round(baseline['ms_per_scan'] / result['ms_per_scan'], 2)
+        results[workers] = result
+
+    report = {
+        'pairs': args.pairs,
+        'dexes': args.dexes,
+        'scans': args.scans,
+        'cpus': os.cpu_count(),
+        'in_process': {k: round(v, 2) for k, v in baseline.items()},
+        'workers': {w: {k: round(v, 2) for k, v in r.items()} for w, r in results.items()}
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
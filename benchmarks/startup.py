@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Entry-point startup benchmark
+
+Times cold starts of the scanner and dashboard entry points in fresh
+interpreters: module import, scanner construction (dummy key, RPC URL that is
+never contacted) and the wall time of the whole process. Each case runs
+--runs times and the median is reported.
+
+    python -m benchmarks.startup --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+CASES = {
+    'scanner_import': 'import automation.arbitrage_scanner',
+    'scanner_init': 'from automation.arbitrage_scanner import PolygonArbitrageScanner; PolygonArbitrageScanner()',
+    'dashboard_import': 'import dashboard.app',
+}
+
+_CHILD = '''
+import time
+start = time.perf_counter()
+{code}
+print(time.perf_counter() - start)
+'''
+
+DUMMY_ENV = {
+    'PRIVATE_KEY': '0x' + '11' * 32,
+    'ALCHEMY_API_URL_MAINNET': 'http://127.0.0.1:9',
+    'REGISTRY_CACHE_FILE': '',
+}
+
+
+def run_case(code: str, runs: int) -> dict:
+    env = dict(os.environ, **DUMMY_ENV)
+    in_process, wall = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, '-c', _CHILD.format(code=code)],
+                                capture_output=True, text=True, env=env)
+        elapsed = time.perf_counter() - start
+        if result.returncode != 0:
+            return {'error': result.stderr.strip().splitlines()[-1]}
+        in_process.append(float(result.stdout.strip().splitlines()[-1]))
+        wall.append(elapsed)
+    return {
+        'median_ms': round(statistics.median(in_process) * 1000, 1),
+        'median_wall_ms': round(statistics.median(wall) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--cases', nargs='+', choices=sorted(CASES), default=list(CASES))
+    args = parser.parse_args()
+
+    baseline = run_case('pass', args.runs)
+    report = {
+        'runs': args.runs,
+        'interpreter_wall_ms': baseline['median_wall_ms'],
+        'cases': {name: run_case(CASES[name], args.runs) for name in args.cases}
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
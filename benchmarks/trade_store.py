@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Trade store write benchmark
+
+Pushes opportunity rows into the store the way continuous_scan does (one
+batch of detections per scan, plus a counters update) and reports:
+
+  enqueue      time the scan loop spends handing a scan's rows over (p50/p99)
+  sustained    rows per second the writer thread actually commits
+  dropped      rows lost because the queue was full
+
+The same workload is also written synchronously, one commit per row and one
+commit per scan, to show what the scan loop would pay without the queue.
+
+    python -m benchmarks.trade_store --per-scan 500 --seconds 10
+"""
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from automation.arbitrage_scanner import ArbitrageOpportunity, TokenPair
+from automation.trade_store import SCHEMA, TradeStore, _INSERTS
+
+WMATIC = '0x0d500B1d8E8eF31E21C99d1Db9A6444d3ADf1270'
+
+
+def make_opportunities(count: int) -> List[ArbitrageOpportunity]:
+    opportunities = []
+    for i in range(count):
+        pair = TokenPair(WMATIC, '0x%040x' % (i + 1), 'WMATIC', 'TKN%d' % i, 18, 18)
+        opportunities.append(ArbitrageOpportunity(
+            pair, 'quickswap', 'sushiswap', 10 ** 21 + i, 3 * 10 ** 18 + i, 0.3, 200000, 'balancer', 9 * 10 ** 17
+        ))
+    return opportunities
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run_queued(path: str, opportunities, seconds: float, scan_interval: float, batch_size: int,
+               flush_ms: float) -> Dict:
+    store = TradeStore(path, batch_size=batch_size, flush_interval=flush_ms / 1000)
+    enqueue = []
+    scans = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        began = time.perf_counter()
+        store.record_opportunities(opportunities, scans)
+        store.save_counters({'scan_count': scans, 'opportunities_found': scans * len(opportunities)})
+        enqueue.append(time.perf_counter() - began)
+        scans += 1
+        if scan_interval:
+            time.sleep(max(0.0, scan_interval - (time.perf_counter() - began)))
+    produced = time.perf_counter() - start
+    store.flush()
+    drained = time.perf_counter() - start
+    store.close()
+    written = store.stats['written']
+    return {
+        'mode': 'queued',
+        'scans': scans,
+        'rows_written': written,
+        'rows_dropped': store.stats['dropped'],
+        'commits': store.stats['batches'],
+        'offered_rows_per_sec': round(store.stats['queued'] / produced),
+        'sustained_rows_per_sec': round(written / drained),
+        'enqueue_ms_p50': round(statistics.median(enqueue) * 1000, 3),
+        'enqueue_ms_p99': round(_percentile(enqueue, 99) * 1000, 3),
+    }
+
+
+def run_sync(path: str, opportunities, seconds: float, per_row: bool) -> Dict:
+    connection = sqlite3.connect(path)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    connection.executescript(SCHEMA)
+    rows = [(time.time(), 0, 'WMATIC/%s' % o.token_pair.symbol_b, o.token_pair.token_a, o.token_pair.token_b,
+             o.dex_a, o.dex_b, str(o.amount_in), str(o.expected_profit), o.profit_percentage, o.lender,
+             str(o.loan_fee)) for o in opportunities]
+    per_scan = []
+    written = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        began = time.perf_counter()
+        if per_row:
+            for row in rows:
+                with connection:
+                    connection.execute(_INSERTS['opportunity'], row)
+        else:
+            with connection:
+                connection.executemany(_INSERTS['opportunity'], rows)
+        written += len(rows)
+        per_scan.append(time.perf_counter() - began)
+    elapsed = time.perf_counter() - start
+    connection.close()
+    return {
+        'mode': 'sync-commit-per-row' if per_row else 'sync-commit-per-scan',
+        'scans': len(per_scan),
+        'rows_written': written,
+        'sustained_rows_per_sec': round(written / elapsed),
+        'scan_blocked_ms_p50': round(statistics.median(per_scan) * 1000, 3),
+        'scan_blocked_ms_p99': round(_percentile(per_scan, 99) * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--per-scan', type=int, default=500, help='opportunities detected per scan')
+    parser.add_argument('--seconds', type=float, default=5.0, help='duration of each mode')
+    parser.add_argument('--scan-interval', type=float, default=0.0,
+                        help='seconds between scans (0 = as fast as possible, the saturation rate)')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--flush-ms', type=float, default=250)
+    parser.add_argument('--dir', default=None, help='directory for the database files (default: a temp dir)')
+    args = parser.parse_args()
+
+    opportunities = make_opportunities(args.per_scan)
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        results = [
+            run_queued(os.path.join(directory, 'queued.db'), opportunities, args.seconds, args.scan_interval,
+                       args.batch_size, args.flush_ms),
+            run_sync(os.path.join(directory, 'per_scan.db'), opportunities, args.seconds, per_row=False),
+            run_sync(os.path.join(directory, 'per_row.db'), opportunities, args.seconds, per_row=True),
+        ]
+    json.dump({'per_scan': args.per_scan, 'seconds': args.seconds, 'results': results}, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
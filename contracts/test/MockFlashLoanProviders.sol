@@ -0,0 +1,220 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
+
+interface IBalancerFlashLoanRecipient {
+    function receiveFlashLoan(
+        address[] memory tokens,
+        uint256[] memory amounts,
+        uint256[] memory feeAmounts,
+        bytes memory userData
+    ) external;
+}
+
+interface IAaveFlashLoanReceiver {
+    function executeOperation(
+        address[] calldata assets,
+        uint256[] calldata amounts,
+        uint256[] calldata premiums,
+        address initiator,
+        bytes calldata params
+    ) external returns (bool);
+}
+
+interface IAaveFlashLoanSimpleReceiver {
+    function executeOperation(
+        address asset,
+        uint256 amount,
+        uint256 premium,
+        address initiator,
+        bytes calldata params
+    ) external returns (bool);
+}
+
+/**
+ * Balancer Vault stand-in: lends its own balances and checks they come back
+ * with the configured fee before returning.
+ */
+contract MockBalancerVault {
+    uint256 public flashLoanFeeBps;
+
+    function setFlashLoanFeeBps(uint256 _feeBps) external {
+        flashLoanFeeBps = _feeBps;
+    }
+
+    // The real Vault reads the fee from its ProtocolFeesCollector; the mock is its own collector
+    function getProtocolFeesCollector() external view returns (address) {
+        return address(this);
+    }
+
+    function getFlashLoanFeePercentage() external view returns (uint256) {
+        return flashLoanFeeBps * 1e14;
+    }
+
+    function flashLoan(
+        address recipient,
+        address[] memory tokens,
+        uint256[] memory amounts,
+        bytes memory userData
+    ) external {
+        uint256[] memory feeAmounts = new uint256[](tokens.length);
+        uint256[] memory preBalances = new uint256[](tokens.length);
+
+        for (uint256 i = 0; i < tokens.length; i++) {
+            preBalances[i] = IERC20(tokens[i]).balanceOf(address(this));
+            require(preBalances[i] >= amounts[i], "BAL#528");
+            feeAmounts[i] = (amounts[i] * flashLoanFeeBps) / 10000;
+            IERC20(tokens[i]).transfer(recipient, amounts[i]);
+        }
+
+        IBalancerFlashLoanRecipient(recipient).receiveFlashLoan(tokens, amounts, feeAmounts, userData);
+
+        for (uint256 i = 0; i < tokens.length; i++) {
+            require(
+                IERC20(tokens[i]).balanceOf(address(this)) >= preBalances[i] + feeAmounts[i],
+                "BAL#602"
+            );
+        }
+    }
+}
+
+/**
+ * Aave V3 Pool stand-in supporting `flashLoan` and `flashLoanSimple`; the
+ * receiver must approve amount + premium for the pool to pull back.
+ */
+contract MockAavePool {
+    uint128 public FLASHLOAN_PREMIUM_TOTAL = 5; // 0.05%
+
+    // Same layout as Aave V3 DataTypes.ReserveData; the mock holds liquidity itself
+    struct ReserveData {
+        uint256 configuration;
+        uint128 liquidityIndex;
+        uint128 currentLiquidityRate;
+        uint128 variableBorrowIndex;
+        uint128 currentVariableBorrowRate;
+        uint128 currentStableBorrowRate;
+        uint40 lastUpdateTimestamp;
+        uint16 id;
+        address aTokenAddress;
+        address stableDebtTokenAddress;
+        address variableDebtTokenAddress;
+        address interestRateStrategyAddress;
+        uint128 accruedToTreasury;
+        uint128 unbacked;
+        uint128 isolationModeTotalDebt;
+    }
+
+    function getReserveData(address) external view returns (ReserveData memory data) {
+        data.aTokenAddress = address(this);
+    }
+
+    function setFlashLoanPremium(uint128 _premiumBps) external {
+        FLASHLOAN_PREMIUM_TOTAL = _premiumBps;
+    }
+
+    // Memory arguments: calldata arrays take two stack slots each, too many for this signature
+    function flashLoan(
+        address receiverAddress,
+        address[] memory assets,
+        uint256[] memory amounts,
+        uint256[] memory,
+        address,
+        bytes memory params,
+        uint16
+    ) external {
+        uint256[] memory premiums = new uint256[](assets.length);
+        for (uint256 i = 0; i < assets.length; i++) {
+            premiums[i] = (amounts[i] * FLASHLOAN_PREMIUM_TOTAL) / 10000;
+            IERC20(assets[i]).transfer(receiverAddress, amounts[i]);
+        }
+
+        require(
+            IAaveFlashLoanReceiver(receiverAddress).executeOperation(assets, amounts, premiums, msg.sender, params),
+            "INVALID_FLASHLOAN_EXECUTOR_RETURN"
+        );
+
+        for (uint256 i = 0; i < assets.length; i++) {
+            IERC20(assets[i]).transferFrom(receiverAddress, address(this), amounts[i] + premiums[i]);
+        }
+    }
+
+    function flashLoanSimple(
+        address receiverAddress,
+        address asset,
+        uint256 amount,
+        bytes calldata params,
+        uint16
+    ) external {
+        uint256 premium = (amount * FLASHLOAN_PREMIUM_TOTAL) / 10000;
+        IERC20(asset).transfer(receiverAddress, amount);
+
+        require(
+            IAaveFlashLoanSimpleReceiver(receiverAddress).executeOperation(asset, amount, premium, msg.sender, params),
+            "INVALID_FLASHLOAN_EXECUTOR_RETURN"
+        );
+
+        IERC20(asset).transferFrom(receiverAddress, address(this), amount + premium);
+    }
+}
+
+interface IAaveV1FlashLoanReceiver {
+    function executeOperation(address _reserve, uint256 _amount, uint256 _fee, bytes calldata _params) external;
+}
+
+/**
+ * Aave V1 LendingPool stand-in that is also its own LendingPoolCore: lends
+ * its ERC20 or ETH balance and checks the receiver paid it back with the fee.
+ */
+contract MockLendingPoolV1 {
+    address public constant ETH = 0xEeeeeEeeeEeEeeEeEeEeeEEEeeeeEeeeeeeeEEeE;
+    uint256 public flashLoanFeeBps = 9; // 0.09%
+
+    receive() external payable {}
+
+    function flashLoan(address _receiver, address _reserve, uint256 _amount, bytes calldata _params) external {
+        uint256 balanceBefore = _balance(_reserve);
+        require(balanceBefore >= _amount, "There is not enough liquidity available to borrow");
+        uint256 fee = (_amount * flashLoanFeeBps) / 10000;
+
+        if (_reserve == ETH) {
+            (bool success, ) = _receiver.call{value: _amount}("");
+            require(success, "ETH transfer failed");
+        } else {
+            IERC20(_reserve).transfer(_receiver, _amount);
+        }
+
+        IAaveV1FlashLoanReceiver(_receiver).executeOperation(_reserve, _amount, fee, _params);
+
+        require(_balance(_reserve) == balanceBefore + fee, "The actual balance of the protocol is inconsistent");
+    }
+
+    function _balance(address _reserve) private view returns (uint256) {
+        return _reserve == ETH ? address(this).balance : IERC20(_reserve).balanceOf(address(this));
+    }
+}
+
+/**
+ * Aave addresses provider stand-in covering the lookups each receiver base
+ * makes: `getPool` (V3), `getLendingPool` (V2, V1) and `getLendingPoolCore`
+ * (V1, where the mock pool is its own core).
+ */
+contract MockPoolAddressesProvider {
+    address private pool;
+
+    constructor(address _pool) {
+        pool = _pool;
+    }
+
+    function getPool() external view returns (address) {
+        return pool;
+    }
+
+    function getLendingPool() external view returns (address) {
+        return pool;
+    }
+
+    function getLendingPoolCore() external view returns (address payable) {
+        return payable(pool);
+    }
+}
@@ -0,0 +1,81 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+import "./MockERC20.sol";
+
+interface IUniswapV3PoolMinimal {
+    function token0() external view returns (address);
+    function token1() external view returns (address);
+    function mint(address recipient, int24 tickLower, int24 tickUpper, uint128 amount, bytes calldata data)
+        external returns (uint256 amount0, uint256 amount1);
+    function burn(int24 tickLower, int24 tickUpper, uint128 amount) external returns (uint256 amount0, uint256 amount1);
+    function swap(address recipient, bool zeroForOne, int256 amountSpecified, uint160 sqrtPriceLimitX96, bytes calldata data)
+        external returns (int256 amount0, int256 amount1);
+}
+
+/**
+ * Test helper for real Uniswap V3 pools: provides liquidity, executes swaps
+ * and quotes exact-input swaps the same way the periphery Quoter does (run
+ * the swap, revert from the callback with the output amount).
+ */
+contract V3ReferenceQuoter {
+    uint160 internal constant MIN_SQRT_RATIO = 4295128739;
+    uint160 internal constant MAX_SQRT_RATIO = 1461446703485210103287273052203988822378723970342;
+
+    function mint(address pool, int24 tickLower, int24 tickUpper, uint128 amount) external {
+        IUniswapV3PoolMinimal(pool).mint(address(this), tickLower, tickUpper, amount, "");
+    }
+
+    function burn(address pool, int24 tickLower, int24 tickUpper, uint128 amount) external {
+        IUniswapV3PoolMinimal(pool).burn(tickLower, tickUpper, amount);
+    }
+
+    function swap(address pool, bool zeroForOne, int256 amountSpecified) external {
+        IUniswapV3PoolMinimal(pool).swap(
+            address(this), zeroForOne, amountSpecified, _priceLimit(zeroForOne), abi.encode(false)
+        );
+    }
+
+    function quoteExactInputSingle(address pool, bool zeroForOne, uint256 amountIn) external returns (uint256 amountOut) {
+        try IUniswapV3PoolMinimal(pool).swap(
+            address(this), zeroForOne, int256(amountIn), _priceLimit(zeroForOne), abi.encode(true)
+        ) {
+            revert("Quote did not revert");
+        } catch (bytes memory reason) {
+            if (reason.length != 32) {
+                assembly {
+                    revert(add(reason, 32), mload(reason))
+                }
+            }
+            return abi.decode(reason, (uint256));
+        }
+    }
+
+    function uniswapV3MintCallback(uint256 amount0Owed, uint256 amount1Owed, bytes calldata) external {
+        _pay(IUniswapV3PoolMinimal(msg.sender).token0(), amount0Owed);
+        _pay(IUniswapV3PoolMinimal(msg.sender).token1(), amount1Owed);
+    }
+
+    function uniswapV3SwapCallback(int256 amount0Delta, int256 amount1Delta, bytes calldata data) external {
+        if (abi.decode(data, (bool))) {
+            uint256 amountOut = uint256(-(amount0Delta > 0 ? amount1Delta : amount0Delta));
+            assembly {
+                let ptr := mload(0x40)
+                mstore(ptr, amountOut)
+                revert(ptr, 32)
+            }
+        }
+        if (amount0Delta > 0) _pay(IUniswapV3PoolMinimal(msg.sender).token0(), uint256(amount0Delta));
+        if (amount1Delta > 0) _pay(IUniswapV3PoolMinimal(msg.sender).token1(), uint256(amount1Delta));
+    }
+
+    function _priceLimit(bool zeroForOne) private pure returns (uint160) {
+        return zeroForOne ? MIN_SQRT_RATIO + 1 : MAX_SQRT_RATIO - 1;
+    }
+
+    function _pay(address token, uint256 amount) private {
+        if (amount > 0) {
+            MockERC20(token).transfer(msg.sender, amount);
+        }
+    }
+}
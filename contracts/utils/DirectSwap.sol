@@ -0,0 +1,82 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+interface IUniswapV2Pair {
+    function token0() external view returns (address);
+    function token1() external view returns (address);
+    function getReserves() external view returns (uint112 reserve0, uint112 reserve1, uint32 blockTimestampLast);
+    function swap(uint256 amount0Out, uint256 amount1Out, address to, bytes calldata data) external;
+}
+
+/**
+ * Router-free round trips: tokenA is sent into pairA, pairA pays tokenB
+ * straight into pairB, and pairB pays tokenA back to the caller. Output
+ * amounts are computed off-chain from reserves, so no path arrays, router
+ * approvals or getAmountsOut calls are needed on-chain.
+ *
+ * Legs are tightly packed, 109 bytes each:
+ *
+ *   pairA (20) | pairB (20) | tokenB (20) | amountIn (16) | amountOutA (16) | amountOutB (16) | flags (1)
+ *
+ * flags bit 0: tokenA is token0 of pairA
+ * flags bit 1: tokenB is token0 of pairB
+ */
+library DirectSwap {
+    uint256 internal constant LEG_SIZE = 109;
+
+    struct Leg {
+        address pairA;
+        address pairB;
+        address tokenB;
+        uint256 amountIn;
+        uint256 amountOutA;
+        uint256 amountOutB;
+        uint256 flags;
+    }
+
+    function legCount(bytes memory data) internal pure returns (uint256) {
+        require(data.length > 0 && data.length % LEG_SIZE == 0, "Bad leg data");
+        return data.length / LEG_SIZE;
+    }
+
+    function decodeLeg(bytes memory data, uint256 index) internal pure returns (Leg memory leg) {
+        uint256 offset = index * LEG_SIZE;
+        require(data.length >= offset + LEG_SIZE, "Bad leg data");
+        assembly {
+            let ptr := add(add(data, 32), offset)
+            mstore(leg, shr(96, mload(ptr)))
+            mstore(add(leg, 32), shr(96, mload(add(ptr, 20))))
+            mstore(add(leg, 64), shr(96, mload(add(ptr, 40))))
+            mstore(add(leg, 96), shr(128, mload(add(ptr, 60))))
+            mstore(add(leg, 128), shr(128, mload(add(ptr, 76))))
+            mstore(add(leg, 160), shr(128, mload(add(ptr, 92))))
+            mstore(add(leg, 192), shr(248, mload(add(ptr, 108))))
+        }
+    }
+
+    /**
+     * Run one leg, paying the final tokenA output to `to`. Reverts with the
+     * pair's "K" error if reserves moved against the precomputed amounts.
+     */
+    function execute(address tokenA, Leg memory leg, address to) internal returns (uint256) {
+        _safeTransfer(tokenA, leg.pairA, leg.amountIn);
+
+        (uint256 amount0Out, uint256 amount1Out) = leg.flags & 1 != 0
+            ? (uint256(0), leg.amountOutA)
+            : (leg.amountOutA, uint256(0));
+        IUniswapV2Pair(leg.pairA).swap(amount0Out, amount1Out, leg.pairB, "");
+
+        (amount0Out, amount1Out) = leg.flags & 2 != 0
+            ? (uint256(0), leg.amountOutB)
+            : (leg.amountOutB, uint256(0));
+        IUniswapV2Pair(leg.pairB).swap(amount0Out, amount1Out, to, "");
+
+        return leg.amountOutB;
+    }
+
+    function _safeTransfer(address token, address to, uint256 amount) private {
+        // transfer(address,uint256)
+        (bool success, bytes memory data) = token.call(abi.encodeWithSelector(0xa9059cbb, to, amount));
+        require(success && (data.length == 0 || abi.decode(data, (bool))), "Transfer failed");
+    }
+}
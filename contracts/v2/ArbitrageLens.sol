@@ -0,0 +1,116 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+interface IUniswapV2FactoryLens {
+    function getPair(address tokenA, address tokenB) external view returns (address pair);
+}
+
+interface IUniswapV2PairLens {
+    function token0() external view returns (address);
+    function getReserves() external view returns (uint112 reserve0, uint112 reserve1, uint32 blockTimestampLast);
+}
+
+/**
+ * Stateless, view-only quoting lens. For every token pair it reads the
+ * reserves of that pair on each V2 factory once, then evaluates every
+ * (dexA, dexB, amount) round trip in memory and returns only the profitable
+ * ones as a packed blob, so a full scan costs a single eth_call.
+ *
+ * Each result is 24 bytes, big-endian:
+ *
+ *   pairIndex (2) | dexA (1) | dexB (1) | amountIndex (1) | reserved (3) | profit (16)
+ *
+ * Indices refer to the `tokensA`/`tokensB`, `factories` and `amounts`
+ * arrays passed in.
+ */
+contract ArbitrageLens {
+    uint256 public constant RESULT_SIZE = 24;
+
+    struct Reserves {
+        uint256 reserveA;
+        uint256 reserveB;
+    }
+
+    function _getAmountOut(uint256 amountIn, uint256 reserveIn, uint256 reserveOut, uint256 feeBps)
+        private pure returns (uint256)
+    {
+        if (amountIn == 0 || reserveIn == 0 || reserveOut == 0) {
+            return 0;
+        }
+        uint256 amountInWithFee = amountIn * (10000 - feeBps);
+        return (amountInWithFee * reserveOut) / (reserveIn * 10000 + amountInWithFee);
+    }
+
+    function _loadReserves(address factory, address tokenA, address tokenB)
+        private view returns (Reserves memory r)
+    {
+        address pair = IUniswapV2FactoryLens(factory).getPair(tokenA, tokenB);
+        if (pair == address(0)) {
+            return r;
+        }
+        (uint112 reserve0, uint112 reserve1,) = IUniswapV2PairLens(pair).getReserves();
+        if (IUniswapV2PairLens(pair).token0() == tokenA) {
+            (r.reserveA, r.reserveB) = (reserve0, reserve1);
+        } else {
+            (r.reserveA, r.reserveB) = (reserve1, reserve0);
+        }
+    }
+
+    /**
+     * @param factories V2 factories to read, e.g. [QuickSwap, SushiSwap]
+     * @param feeBps swap fee of each factory in basis points (30 = 0.3%)
+     * @param tokensA borrowed token of each pair
+     * @param tokensB intermediate token of each pair
+     * @param amounts candidate tokenA input sizes, shared by every pair
+     * @param minProfitBps minimum round-trip profit to include a result
+     */
+    function scan(
+        address[] calldata factories,
+        uint256[] calldata feeBps,
+        address[] calldata tokensA,
+        address[] calldata tokensB,
+        uint256[] calldata amounts,
+        uint256 minProfitBps
+    ) external view returns (bytes memory results) {
+        require(factories.length == feeBps.length && factories.length <= 256, "Bad factories");
+        require(tokensA.length == tokensB.length && tokensA.length <= 65536, "Bad pairs");
+        require(amounts.length <= 256, "Bad amounts");
+
+        uint256 maxResults = tokensA.length * factories.length * factories.length * amounts.length;
+        // 8 bytes of slack: each record is written as a full 32-byte word
+        results = new bytes(maxResults * RESULT_SIZE + 8);
+        uint256 count = 0;
+
+        Reserves[] memory reserves = new Reserves[](factories.length);
+        for (uint256 p = 0; p < tokensA.length; p++) {
+            for (uint256 f = 0; f < factories.length; f++) {
+                reserves[f] = _loadReserves(factories[f], tokensA[p], tokensB[p]);
+            }
+
+            for (uint256 a = 0; a < factories.length; a++) {
+                if (reserves[a].reserveA == 0) continue;
+                for (uint256 b = 0; b < factories.length; b++) {
+                    if (a == b || reserves[b].reserveA == 0) continue;
+                    for (uint256 i = 0; i < amounts.length; i++) {
+                        uint256 amountIn = amounts[i];
+                        uint256 amountB = _getAmountOut(amountIn, reserves[a].reserveA, reserves[a].reserveB, feeBps[a]);
+                        uint256 amountOut = _getAmountOut(amountB, reserves[b].reserveB, reserves[b].reserveA, feeBps[b]);
+                        if (amountOut * 10000 <= amountIn * (10000 + minProfitBps)) continue;
+
+                        uint256 profit = amountOut - amountIn;
+                        if (profit > type(uint128).max) profit = type(uint128).max;
+                        uint256 word = (p << 240) | (a << 232) | (b << 224) | (i << 216) | (profit << 64);
+                        assembly {
+                            mstore(add(add(results, 32), mul(count, 24)), word)
+                        }
+                        count++;
+                    }
+                }
+            }
+        }
+
+        assembly {
+            mstore(results, mul(count, 24))
+        }
+    }
+}
@@ -5,7 +5,7 @@ pragma solidity ^0.8.0;
 import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
 import "@openzeppelin/contracts/access/Ownable.sol";
 import "@openzeppelin/contracts/security/ReentrancyGuard.sol";
-import "@openzeppelin/contracts/utils/math/SafeMath.sol";
+import "../utils/DirectSwap.sol";
 
 interface IUniswapV2Router {
     function swapExactTokensForTokens(
@@ -42,13 +42,16 @@ interface IAavePool {
 }
 
 contract PolygonArbitrageEngine is Ownable, ReentrancyGuard {
-    using SafeMath for uint256;
     
-    // DEX Router addresses on Polygon
-    IUniswapV2Router public constant QUICKSWAP = IUniswapV2Router(0xa5E0829CaCEd8fFDD4De3c43696c57F7D7A678ff);
-    IUniswapV2Router public constant SUSHISWAP = IUniswapV2Router(0x1b02dA8Cb0d097eB8D57A175b88c7D8b47997506);
-    IBalancerVault public constant BALANCER = IBalancerVault(0xBA12222222228d8Ba445958a75a0704d566BF2C8);
-    IAavePool public constant AAVE_POOL = IAavePool(0x794a61358D6845594F94dc1DB02A252b5b4814aD);
+    // DEX routers and flash loan providers, fixed at deployment
+    // (Polygon: QuickSwap 0xa5E0829CaCEd8fFDD4De3c43696c57F7D7A678ff,
+    //  SushiSwap 0x1b02dA8Cb0d097eB8D57A175b88c7D8b47997506,
+    //  Balancer Vault 0xBA12222222228d8Ba445958a75a0704d566BF2C8,
+    //  Aave V3 Pool 0x794a61358D6845594F94dc1DB02A252b5b4814aD)
+    IUniswapV2Router public immutable QUICKSWAP;
+    IUniswapV2Router public immutable SUSHISWAP;
+    IBalancerVault public immutable BALANCER;
+    IAavePool public immutable AAVE_POOL;
     
     // Configuration
     uint256 public constant SAFE_MODE_THRESHOLD = 320 * 10**18; // $320 in MATIC
@@ -63,6 +66,16 @@ contract PolygonArbitrageEngine is Ownable, ReentrancyGuard {
     uint256 public totalProfits = 0;
     uint256 public totalTrades = 0;
     
+    // Sender keys allowed to start trades besides the owner, so trades can go
+    // out in parallel on independent nonces
+    mapping(address => bool) public executors;
+    
+    // How the in-flight flash loan's userData should be decoded
+    uint8 private constant MODE_SINGLE = 0;
+    uint8 private constant MODE_BATCH = 1;
+    uint8 private constant MODE_PACKED = 2;
+    uint8 private pendingMode;
+    
     // Wallet allocation percentages
     uint256 public loanBudgetPercentage = 7000; // 70% in safe mode
     uint256 public gasReservePercentage = 3000; // 30% in safe mode
@@ -86,10 +99,35 @@ contract PolygonArbitrageEngine is Ownable, ReentrancyGuard {
     
     event ModeChanged(bool isHighRisk, uint256 timestamp);
     
-    constructor() {
+    event LegSkipped(uint256 indexed index, address indexed tokenA, address indexed tokenB);
+    
+    event BatchExecuted(uint256 legs, uint256 executed, uint256 timestamp);
+    
+    event ExecutorSet(address indexed executor, bool allowed);
+    
+    constructor(
+        address _balancer,
+        address _aavePool,
+        address _quickswap,
+        address _sushiswap
+    ) {
+        BALANCER = IBalancerVault(_balancer);
+        AAVE_POOL = IAavePool(_aavePool);
+        QUICKSWAP = IUniswapV2Router(_quickswap);
+        SUSHISWAP = IUniswapV2Router(_sushiswap);
         charityAddress = 0x000000000000000000000000000000000000dEaD; // Burn address as default
     }
     
+    modifier onlyExecutor() {
+        require(msg.sender == owner() || executors[msg.sender], "Not an executor");
+        _;
+    }
+    
+    function setExecutor(address executor, bool allowed) external onlyOwner {
+        executors[executor] = allowed;
+        emit ExecutorSet(executor, allowed);
+    }
+    
     modifier onlyWhenBalanceSufficient() {
         require(address(this).balance >= MIN_WALLET_BALANCE, "Insufficient wallet balance");
         _;
@@ -112,19 +150,19 @@ contract PolygonArbitrageEngine is Ownable, ReentrancyGuard {
     
     function calculateLoanAmount() public view returns (uint256) {
         uint256 availableBalance = address(this).balance;
-        return availableBalance.mul(loanBudgetPercentage).div(PERCENTAGE_BASE);
+        return availableBalance * loanBudgetPercentage / PERCENTAGE_BASE;
     }
     
     function calculateRequiredSpread(uint256 loanFeeRate, uint256 gasMargin) 
         public pure returns (uint256) {
-        return loanFeeRate.add(gasMargin);
+        return loanFeeRate + gasMargin;
     }
     
     function executeBalancerFlashLoan(
         address[] memory tokens,
         uint256[] memory amounts,
         bytes memory userData
-    ) external onlyOwner onlyWhenBalanceSufficient nonReentrant {
+    ) external onlyExecutor onlyWhenBalanceSufficient nonReentrant {
         updateMode();
         BALANCER.flashLoan(address(this), tokens, amounts, userData);
     }
@@ -133,7 +171,7 @@ contract PolygonArbitrageEngine is Ownable, ReentrancyGuard {
         address[] memory assets,
         uint256[] memory amounts,
         bytes memory params
-    ) external onlyOwner onlyWhenBalanceSufficient nonReentrant {
+    ) external onlyExecutor onlyWhenBalanceSufficient nonReentrant {
         updateMode();
         uint256[] memory modes = new uint256[](assets.length);
         // 0 = no debt (flash loan)
@@ -152,6 +190,64 @@ contract PolygonArbitrageEngine is Ownable, ReentrancyGuard {
         );
     }
     
+    /**
+     * Borrow every asset the legs need in a single Balancer flash loan and run
+     * each leg in turn. `amounts[i]` must cover the sum of `amountIn` of the legs
+     * starting in `tokens[i]`. Unprofitable legs are rolled back individually.
+     */
+    function executeBalancerBatchFlashLoan(
+        address[] memory tokens,
+        uint256[] memory amounts,
+        ArbitrageParams[] memory legs
+    ) external onlyExecutor onlyWhenBalanceSufficient nonReentrant {
+        updateMode();
+        pendingMode = MODE_BATCH;
+        BALANCER.flashLoan(address(this), tokens, amounts, abi.encode(legs));
+        pendingMode = MODE_SINGLE;
+    }
+    
+    /**
+     * Gas-optimized path: borrow `amount` of `token` from Balancer and run
+     * tightly packed legs (see DirectSwap) directly against the V2 pairs,
+     * bypassing the routers. Any losing leg reverts the whole loan.
+     */
+    function executeBalancerFlashLoanPacked(
+        address token,
+        uint256 amount,
+        bytes calldata legs
+    ) external onlyExecutor onlyWhenBalanceSufficient nonReentrant {
+        updateMode();
+        address[] memory tokens = new address[](1);
+        uint256[] memory amounts = new uint256[](1);
+        tokens[0] = token;
+        amounts[0] = amount;
+        
+        pendingMode = MODE_PACKED;
+        BALANCER.flashLoan(address(this), tokens, amounts, legs);
+        pendingMode = MODE_SINGLE;
+    }
+    
+    function executeAaveBatchFlashLoan(
+        address[] memory assets,
+        uint256[] memory amounts,
+        ArbitrageParams[] memory legs
+    ) external onlyExecutor onlyWhenBalanceSufficient nonReentrant {
+        updateMode();
+        uint256[] memory modes = new uint256[](assets.length);
+        
+        pendingMode = MODE_BATCH;
+        AAVE_POOL.flashLoan(
+            address(this),
+            assets,
+            amounts,
+            modes,
+            address(this),
+            abi.encode(legs),
+            0
+        );
+        pendingMode = MODE_SINGLE;
+    }
+    
     function receiveFlashLoan(
         address[] memory tokens,
         uint256[] memory amounts,
@@ -160,102 +256,168 @@ contract PolygonArbitrageEngine is Ownable, ReentrancyGuard {
     ) external {
         require(msg.sender == address(BALANCER), "Invalid flashloan caller");
         
-        ArbitrageParams memory params = abi.decode(userData, (ArbitrageParams));
+        _runArbitrage(tokens[0], userData);
         
-        // Execute arbitrage logic
-        uint256 profit = _executeArbitrage(params);
+        // Repay flash loan
+        for (uint256 i = 0; i < tokens.length; i++) {
+            uint256 amountToRepay = amounts[i] + feeAmounts[i];
+            IERC20(tokens[i]).transfer(address(BALANCER), amountToRepay);
+        }
+    }
+    
+    function executeOperation(
+        address[] calldata assets,
+        uint256[] calldata amounts,
+        uint256[] calldata premiums,
+        address initiator,
+        bytes calldata params
+    ) external returns (bool) {
+        require(msg.sender == address(AAVE_POOL), "Invalid flashloan caller");
+        require(initiator == address(this), "Invalid initiator");
         
+        _runArbitrage(assets[0], params);
+        
+        // Aave pulls the debt after the callback returns
+        for (uint256 i = 0; i < assets.length; i++) {
+            _ensureAllowance(assets[i], address(AAVE_POOL), amounts[i] + premiums[i]);
+        }
+        return true;
+    }
+    
+    /**
+     * Run one batch leg. Only callable by the contract itself so that a
+     * reverting leg unwinds its own swaps without aborting the whole loan.
+     */
+    function executeLeg(ArbitrageParams memory leg) external returns (uint256 profit) {
+        require(msg.sender == address(this), "Only self");
+        profit = _executeArbitrage(leg);
+        require(
+            profit > 0 && profit * PERCENTAGE_BASE >= leg.amountIn * leg.minProfitBps,
+            "Leg not profitable"
+        );
+    }
+    
+    function _runArbitrage(address loanToken, bytes memory userData) internal {
+        uint8 mode = pendingMode;
+        if (mode == MODE_PACKED) {
+            uint256 count = DirectSwap.legCount(userData);
+            for (uint256 i = 0; i < count; ) {
+                DirectSwap.Leg memory leg = DirectSwap.decodeLeg(userData, i);
+                // Pairs and amountOutB come from the caller: only the balance actually gained counts
+                uint256 balanceBefore = IERC20(loanToken).balanceOf(address(this));
+                DirectSwap.execute(loanToken, leg, address(this));
+                uint256 balanceAfter = IERC20(loanToken).balanceOf(address(this));
+                require(balanceAfter > balanceBefore, "Leg not profitable");
+                _recordProfit(loanToken, leg.tokenB, leg.amountIn, balanceAfter - balanceBefore);
+                unchecked { ++i; }
+            }
+        } else if (mode == MODE_BATCH) {
+            ArbitrageParams[] memory legs = abi.decode(userData, (ArbitrageParams[]));
+            uint256 executed = 0;
+            for (uint256 i = 0; i < legs.length; i++) {
+                try this.executeLeg(legs[i]) returns (uint256 profit) {
+                    _recordProfit(legs[i].tokenA, legs[i].tokenB, legs[i].amountIn, profit);
+                    executed++;
+                } catch {
+                    emit LegSkipped(i, legs[i].tokenA, legs[i].tokenB);
+                }
+            }
+            emit BatchExecuted(legs.length, executed, block.timestamp);
+        } else {
+            ArbitrageParams memory params = abi.decode(userData, (ArbitrageParams));
+            uint256 profit = _executeArbitrage(params);
+            require(
+                profit > 0 && profit * PERCENTAGE_BASE >= params.amountIn * params.minProfitBps,
+                "Arbitrage not profitable"
+            );
+            _recordProfit(params.tokenA, params.tokenB, params.amountIn, profit);
+        }
+    }
+    
+    function _recordProfit(address tokenA, address tokenB, uint256 amountIn, uint256 profit) internal {
         // Handle charity donation
         if (charityEnabled && profit > 0) {
-            uint256 charityAmount = profit.mul(CHARITY_PERCENTAGE).div(PERCENTAGE_BASE);
+            uint256 charityAmount = profit * CHARITY_PERCENTAGE / PERCENTAGE_BASE;
             if (charityAmount > 0) {
                 payable(charityAddress).transfer(charityAmount);
-                profit = profit.sub(charityAmount);
+                profit = profit - charityAmount;
             }
         }
         
-        // Repay flash loan
-        for (uint256 i = 0; i < tokens.length; i++) {
-            uint256 amountToRepay = amounts[i].add(feeAmounts[i]);
-            IERC20(tokens[i]).transfer(address(BALANCER), amountToRepay);
-        }
-        
         if (profit > 0) {
-            totalProfits = totalProfits.add(profit);
-            totalTrades = totalTrades.add(1);
+            totalProfits = totalProfits + profit;
+            totalTrades = totalTrades + 1;
             
-            emit ArbitrageExecuted(
-                params.tokenA,
-                params.tokenB,
-                params.amountIn,
-                profit,
-                block.timestamp
-            );
+            emit ArbitrageExecuted(tokenA, tokenB, amountIn, profit, block.timestamp);
         }
     }
     
+    function _router(address dex) internal view returns (IUniswapV2Router) {
+        require(dex == address(QUICKSWAP) || dex == address(SUSHISWAP), "Unknown DEX");
+        return IUniswapV2Router(dex);
+    }
+    
+    // Approve once to the maximum instead of on every swap; OpenZeppelin
+    // tokens skip the allowance write on transferFrom when it is unlimited
+    function _ensureAllowance(address token, address spender, uint256 amount) internal {
+        if (IERC20(token).allowance(address(this), spender) < amount) {
+            IERC20(token).approve(spender, type(uint256).max);
+        }
+    }
+    
+    /**
+     * One-time max approvals of `tokens` to both routers, so that router
+     * swaps skip the approve call entirely.
+     */
+    function approveRouters(address[] calldata tokens) external onlyOwner {
+        for (uint256 i = 0; i < tokens.length; i++) {
+            IERC20(tokens[i]).approve(address(QUICKSWAP), type(uint256).max);
+            IERC20(tokens[i]).approve(address(SUSHISWAP), type(uint256).max);
+        }
+    }
+    
+    /**
+     * Round trip through two allowlisted routers. The profit is the tokenA
+     * balance gained, not what the routers report; a loss returns zero and
+     * callers revert on it.
+     */
     function _executeArbitrage(ArbitrageParams memory params) 
         internal returns (uint256 profit) {
+        uint256 balanceBefore = IERC20(params.tokenA).balanceOf(address(this));
         
         // Step 1: Swap tokenA for tokenB on first DEX
-        address[] memory path1 = new address[](2);
-        path1[0] = params.tokenA;
-        path1[1] = params.tokenB;
-        
-        IERC20(params.tokenA).approve(params.dexA, params.amountIn);
+        address[] memory path = new address[](2);
+        path[0] = params.tokenA;
+        path[1] = params.tokenB;
         
-        uint256[] memory amounts1;
-        if (params.dexA == address(QUICKSWAP)) {
-            amounts1 = QUICKSWAP.swapExactTokensForTokens(
-                params.amountIn,
-                0,
-                path1,
-                address(this),
-                block.timestamp + 300
-            );
-        } else if (params.dexA == address(SUSHISWAP)) {
-            amounts1 = SUSHISWAP.swapExactTokensForTokens(
-                params.amountIn,
-                0,
-                path1,
-                address(this),
-                block.timestamp + 300
-            );
-        }
-        
-        uint256 tokenBReceived = amounts1[1];
+        IUniswapV2Router dexA = _router(params.dexA);
+        _ensureAllowance(params.tokenA, address(dexA), params.amountIn);
+        uint256 tokenBReceived = dexA.swapExactTokensForTokens(
+            params.amountIn,
+            0,
+            path,
+            address(this),
+            block.timestamp
+        )[1];
         
         // Step 2: Swap tokenB back to tokenA on second DEX
-        address[] memory path2 = new address[](2);
-        path2[0] = params.tokenB;
-        path2[1] = params.tokenA;
-        
-        IERC20(params.tokenB).approve(params.dexB, tokenBReceived);
-        
-        uint256[] memory amounts2;
-        if (params.dexB == address(QUICKSWAP)) {
-            amounts2 = QUICKSWAP.swapExactTokensForTokens(
-                tokenBReceived,
-                0,
-                path2,
-                address(this),
-                block.timestamp + 300
-            );
-        } else if (params.dexB == address(SUSHISWAP)) {
-            amounts2 = SUSHISWAP.swapExactTokensForTokens(
-                tokenBReceived,
-                0,
-                path2,
-                address(this),
-                block.timestamp + 300
-            );
-        }
+        path[0] = params.tokenB;
+        path[1] = params.tokenA;
         
-        uint256 tokenAReceived = amounts2[1];
+        IUniswapV2Router dexB = _router(params.dexB);
+        _ensureAllowance(params.tokenB, address(dexB), tokenBReceived);
+        dexB.swapExactTokensForTokens(
+            tokenBReceived,
+            0,
+            path,
+            address(this),
+            block.timestamp
+        );
         
         // Calculate profit
-        if (tokenAReceived > params.amountIn) {
-            profit = tokenAReceived.sub(params.amountIn);
+        uint256 balanceAfter = IERC20(params.tokenA).balanceOf(address(this));
+        if (balanceAfter > balanceBefore) {
+            profit = balanceAfter - balanceBefore;
         }
         
         return profit;
@@ -280,7 +442,7 @@ contract PolygonArbitrageEngine is Ownable, ReentrancyGuard {
         uint256[] memory amounts2 = SUSHISWAP.getAmountsOut(amounts1[1], path2);
         
         if (amounts2[1] > amountIn) {
-            expectedProfit = amounts2[1].sub(amountIn);
+            expectedProfit = amounts2[1] - amountIn;
             isProfitable = true;
         }
         
@@ -299,7 +461,7 @@ contract PolygonArbitrageEngine is Ownable, ReentrancyGuard {
         uint256 balance = address(this).balance;
         require(balance > MIN_WALLET_BALANCE, "Must maintain minimum balance");
         
-        uint256 withdrawable = balance.sub(MIN_WALLET_BALANCE);
+        uint256 withdrawable = balance - MIN_WALLET_BALANCE;
         payable(owner()).transfer(withdrawable);
     }
     
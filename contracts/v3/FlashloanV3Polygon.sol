@@ -6,6 +6,7 @@ import "@aave/core-v3/contracts/flashloan/base/FlashLoanSimpleReceiverBase.sol";
 import "@aave/core-v3/contracts/interfaces/IPoolAddressesProvider.sol";
 import "@aave/core-v3/contracts/dependencies/openzeppelin/contracts/IERC20.sol";
 import "@aave/core-v3/contracts/dependencies/openzeppelin/contracts/SafeERC20.sol";
+import "../utils/DirectSwap.sol";
 
 interface IWETH {
     function deposit() external payable;
@@ -50,12 +51,18 @@ contract FlashloanV3Polygon is FlashLoanSimpleReceiverBase {
     address private constant USDC = 0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174;
     address private constant WETH = 0x7ceB23fD6bC0adD59E62ac25578270cFf1b9f619;
     
-    // DEX Routers on Polygon
+    // Default DEX router on Polygon (QuickSwap)
     address private constant QUICKSWAP_ROUTER = 0xa5E0829CaCEd8fFDD4De3c43696c57F7D7A678ff;
     address private constant UNISWAP_V3_ROUTER = 0xE592427A0AEce92De3Edee1F18E0157C05861564;
     
     IUniswapV2Router private quickswapRouter;
     
+    // V2-compatible routers legs may be routed through
+    mapping(address => bool) public allowedRouters;
+    
+    // Set while a packed (router-free) flash loan is in flight
+    bool private packedPending;
+    
     uint256 private constant MAX_INT = 2**256 - 1;
     uint256 public minProfitBasis = 50; // 0.5% minimum profit
     
@@ -67,17 +74,37 @@ contract FlashloanV3Polygon is FlashLoanSimpleReceiverBase {
         address dexB;
         uint256 expectedProfit;
     }
+    
+    struct QuoteRequest {
+        address tokenA;
+        address tokenB;
+        uint256 amount;
+        address dexA;
+        address dexB;
+    }
+    
+    event RouterAllowed(address indexed router, bool allowed);
 
     modifier onlyOwner() {
         require(msg.sender == owner, "Not owner");
         _;
     }
 
-    constructor(address _addressProvider) 
+    /**
+     * `_routers` are allowlisted at deployment; the first one is used by the
+     * legacy single-DEX `checkArbitrageOpportunity`. Pass an empty array to
+     * default to QuickSwap.
+     */
+    constructor(address _addressProvider, address[] memory _routers) 
         FlashLoanSimpleReceiverBase(IPoolAddressesProvider(_addressProvider)) 
     {
         owner = msg.sender;
-        quickswapRouter = IUniswapV2Router(QUICKSWAP_ROUTER);
+        quickswapRouter = IUniswapV2Router(_routers.length > 0 ? _routers[0] : QUICKSWAP_ROUTER);
+        allowedRouters[address(quickswapRouter)] = true;
+        for (uint256 i = 0; i < _routers.length; i++) {
+            allowedRouters[_routers[i]] = true;
+            emit RouterAllowed(_routers[i], true);
+        }
     }
 
     function executeOperation(
@@ -87,69 +114,79 @@ contract FlashloanV3Polygon is FlashLoanSimpleReceiverBase {
         address initiator,
         bytes calldata params
     ) external override returns (bool) {
-        
-        // Decode arbitrage parameters
-        ArbitrageParams memory arbParams = abi.decode(params, (ArbitrageParams));
+        require(msg.sender == address(POOL), "Invalid flashloan caller");
+        require(initiator == address(this), "Invalid initiator");
         
         uint256 totalDebt = amount + premium;
-        uint256 currentBalance = IERC20(asset).balanceOf(address(this));
-        
-        require(currentBalance >= amount, "FlashLoan failed");
         
-        // Execute arbitrage logic
-        uint256 profit = executeArbitrage(arbParams, amount);
+        if (packedPending) {
+            uint256 count = DirectSwap.legCount(params);
+            for (uint256 i = 0; i < count; ) {
+                DirectSwap.execute(asset, DirectSwap.decodeLeg(params, i), address(this));
+                unchecked { ++i; }
+            }
+        } else {
+            executeArbitrage(abi.decode(params, (ArbitrageParams)), amount);
+        }
         
         // Ensure we have enough to repay loan + premium
-        require(profit > premium, "Arbitrage not profitable");
+        uint256 finalBalance = IERC20(asset).balanceOf(address(this));
+        require(finalBalance > totalDebt, "Arbitrage not profitable");
         
         // Approve pool to pull the owed amount
-        IERC20(asset).approve(address(POOL), totalDebt);
+        _ensureAllowance(asset, address(POOL), totalDebt);
         
         // Transfer remaining profit to owner
-        uint256 remainingProfit = currentBalance - totalDebt;
-        if (remainingProfit > 0) {
-            IERC20(asset).safeTransfer(owner, remainingProfit);
-        }
+        IERC20(asset).safeTransfer(owner, finalBalance - totalDebt);
         
         return true;
     }
 
+    function _router(address dex) private view returns (IUniswapV2Router) {
+        require(allowedRouters[dex], "Router not allowed");
+        return IUniswapV2Router(dex);
+    }
+
+    // Max-approve once instead of approving on every swap
+    function _ensureAllowance(address token, address spender, uint256 amount) private {
+        if (IERC20(token).allowance(address(this), spender) < amount) {
+            IERC20(token).approve(spender, MAX_INT);
+        }
+    }
+
     function executeArbitrage(ArbitrageParams memory params, uint256 loanAmount) 
         private returns (uint256) 
     {
         // Step 1: Swap on DEX A (buy low)
-        IERC20(params.tokenA).approve(params.dexA, loanAmount);
+        IUniswapV2Router dexA = _router(params.dexA);
+        _ensureAllowance(params.tokenA, address(dexA), loanAmount);
         
-        address[] memory pathA = new address[](2);
-        pathA[0] = params.tokenA;
-        pathA[1] = params.tokenB;
+        address[] memory path = new address[](2);
+        path[0] = params.tokenA;
+        path[1] = params.tokenB;
         
-        uint256[] memory amountsA = quickswapRouter.swapExactTokensForTokens(
+        uint256 tokenBReceived = dexA.swapExactTokensForTokens(
             loanAmount,
             0, // Accept any amount of tokenB
-            pathA,
+            path,
             address(this),
-            block.timestamp + 300
-        );
-        
-        uint256 tokenBReceived = amountsA[1];
+            block.timestamp
+        )[1];
         
         // Step 2: Swap on DEX B (sell high)
-        IERC20(params.tokenB).approve(params.dexB, tokenBReceived);
+        IUniswapV2Router dexB = _router(params.dexB);
+        _ensureAllowance(params.tokenB, address(dexB), tokenBReceived);
         
-        address[] memory pathB = new address[](2);
-        pathB[0] = params.tokenB;
-        pathB[1] = params.tokenA;
+        path[0] = params.tokenB;
+        path[1] = params.tokenA;
         
-        uint256[] memory amountsB = quickswapRouter.swapExactTokensForTokens(
+        return dexB.swapExactTokensForTokens(
             tokenBReceived,
             loanAmount, // Must get at least loan amount back
-            pathB,
+            path,
             address(this),
-            block.timestamp + 300
-        );
-        
-        return amountsB[1]; // Final amount of tokenA received
+            block.timestamp
+        )[1]; // Final amount of tokenA received
     }
 
     function startFlashLoanArbitrage(
@@ -164,6 +201,7 @@ contract FlashloanV3Polygon is FlashLoanSimpleReceiverBase {
         
         // Validate profitable opportunity
         require(expectedProfit > (amount * minProfitBasis) / 10000, "Profit too low");
+        require(allowedRouters[dexA] && allowedRouters[dexB], "Router not allowed");
         
         ArbitrageParams memory params = ArbitrageParams({
             tokenA: tokenA,
@@ -179,23 +217,40 @@ contract FlashloanV3Polygon is FlashLoanSimpleReceiverBase {
         POOL.flashLoanSimple(address(this), asset, amount, data, 0);
     }
 
-    function checkArbitrageOpportunity(
+    /**
+     * Router-free variant: `legs` are DirectSwap-packed round trips starting
+     * and ending in `asset`, executed directly against the V2 pairs.
+     */
+    function startFlashLoanArbitragePacked(
+        address asset,
+        uint256 amount,
+        bytes calldata legs
+    ) external onlyOwner {
+        packedPending = true;
+        POOL.flashLoanSimple(address(this), asset, amount, legs, 0);
+        packedPending = false;
+    }
+
+    function _quote(
         address tokenA,
         address tokenB,
-        uint256 amount
-    ) external view returns (uint256 profit, bool profitable) {
+        uint256 amount,
+        address dexA,
+        address dexB
+    ) private view returns (uint256 profit, bool profitable) {
+        if (!allowedRouters[dexA] || !allowedRouters[dexB]) {
+            return (0, false);
+        }
         
-        // Get price from Quickswap
-        address[] memory pathA = new address[](2);
-        pathA[0] = tokenA;
-        pathA[1] = tokenB;
+        address[] memory path = new address[](2);
+        path[0] = tokenA;
+        path[1] = tokenB;
         
-        try quickswapRouter.getAmountsOut(amount, pathA) returns (uint256[] memory amountsA) {
-            address[] memory pathB = new address[](2);
-            pathB[0] = tokenB;
-            pathB[1] = tokenA;
+        try IUniswapV2Router(dexA).getAmountsOut(amount, path) returns (uint256[] memory amountsA) {
+            path[0] = tokenB;
+            path[1] = tokenA;
             
-            try quickswapRouter.getAmountsOut(amountsA[1], pathB) returns (uint256[] memory amountsB) {
+            try IUniswapV2Router(dexB).getAmountsOut(amountsA[1], path) returns (uint256[] memory amountsB) {
                 if (amountsB[1] > amount) {
                     profit = amountsB[1] - amount;
                     profitable = profit > (amount * minProfitBasis) / 10000;
@@ -208,6 +263,37 @@ contract FlashloanV3Polygon is FlashLoanSimpleReceiverBase {
         }
     }
 
+    // Round trip on the default router only; see checkArbitrageOpportunities for cross-DEX quotes
+    function checkArbitrageOpportunity(
+        address tokenA,
+        address tokenB,
+        uint256 amount
+    ) external view returns (uint256 profit, bool profitable) {
+        address router = address(quickswapRouter);
+        return _quote(tokenA, tokenB, amount, router, router);
+    }
+
+    /**
+     * Quote many (tokenA, tokenB, amount, dexA, dexB) round trips in a single
+     * eth_call. Routes that revert or use a non-allowlisted router come back
+     * as (0, false).
+     */
+    function checkArbitrageOpportunities(QuoteRequest[] calldata requests)
+        external view returns (uint256[] memory profits, bool[] memory profitable)
+    {
+        profits = new uint256[](requests.length);
+        profitable = new bool[](requests.length);
+        for (uint256 i = 0; i < requests.length; i++) {
+            QuoteRequest calldata q = requests[i];
+            (profits[i], profitable[i]) = _quote(q.tokenA, q.tokenB, q.amount, q.dexA, q.dexB);
+        }
+    }
+
+    function setRouterAllowed(address router, bool allowed) external onlyOwner {
+        allowedRouters[router] = allowed;
+        emit RouterAllowed(router, allowed);
+    }
+
     function updateMinProfitBasis(uint256 _newMinProfit) external onlyOwner {
         minProfitBasis = _newMinProfit;
     }
@@ -1,9 +1,17 @@
 import os
 import json
-from flask import Flask, render_template, jsonify
+import math
+from flask import Flask, render_template, jsonify, request, Response
 from datetime import datetime
 import threading
 import time
+from functools import lru_cache
+
+from automation.event_indexer import reconcile_trades
+from automation.failures import get_failure_tracker
+from automation.tracing import get_tracer
+from automation.trade_store import get_trade_store
+from dashboard.responses import JsonSnapshot, json_response
 
 app = Flask(__name__)
 
@@ -18,6 +26,11 @@ dashboard_state = {
     'last_scan': None,
     'is_running': False
 }
+# Serialized once per change: polls of /api/status reuse the bytes and ETag
+status = JsonSnapshot(dashboard_state)
+# Stack sampling holds a server worker thread for its whole duration: one request at a time
+MAX_SAMPLE_SECONDS = 15.0
+_sampling = threading.Lock()
 
 @app.route('/')
 def dashboard():
@@ -27,73 +40,205 @@ def dashboard():
 @app.route('/api/status')
 def get_status():
     """API endpoint to get current dashboard status"""
-    return jsonify(dashboard_state)
+    return status.response(request)
 
 @app.route('/api/start', methods=['POST'])
 def start_scanner():
     """Start the arbitrage scanner"""
-    dashboard_state['status'] = 'Running'
-    dashboard_state['is_running'] = True
+    _ensure_background_scanner()
+    status.update(status='Running', is_running=True)
     return jsonify({'success': True, 'message': 'Scanner started'})
 
 @app.route('/api/stop', methods=['POST'])
 def stop_scanner():
     """Stop the arbitrage scanner"""
-    dashboard_state['status'] = 'Stopped'
-    dashboard_state['is_running'] = False
+    status.update(status='Stopped', is_running=False)
     return jsonify({'success': True, 'message': 'Scanner stopped'})
 
+@lru_cache(maxsize=1)
+def _wallet_client():
+    """Web3 client and wallet address, built on first use and reused across requests"""
+    from web3 import Web3
+    from eth_account import Account
+
+    rpc_url = os.getenv('ALCHEMY_API_URL_MAINNET')
+    private_key = os.getenv('PRIVATE_KEY')
+    if not rpc_url or not private_key:
+        return None, None
+    return Web3(Web3.HTTPProvider(rpc_url)), Account.from_key(private_key).address
+
 @app.route('/api/wallet-balance')
 def get_wallet_balance():
     """Get current wallet balance"""
     try:
-        from web3 import Web3
-        from dotenv import load_dotenv
-
-        load_dotenv()
-
-        rpc_url = os.getenv('ALCHEMY_API_URL_MAINNET')
-        if rpc_url:
-            w3 = Web3(Web3.HTTPProvider(rpc_url))
-            if w3.is_connected():
-                # Get wallet address from private key
-                private_key = os.getenv('PRIVATE_KEY')
-                if private_key:
-                    from eth_account import Account
-                    account = Account.from_key(private_key)
-                    balance_wei = w3.eth.get_balance(account.address)
-                    balance_matic = w3.from_wei(balance_wei, 'ether')
-                    dashboard_state['wallet_balance'] = float(balance_matic)
-                    return jsonify({'balance': float(balance_matic), 'currency': 'MATIC'})
+        w3, address = _wallet_client()
+        if w3 is not None and w3.is_connected():
+            balance_wei = w3.eth.get_balance(address)
+            balance_matic = w3.from_wei(balance_wei, 'ether')
+            status.update(wallet_balance=float(balance_matic))
+            return jsonify({'balance': float(balance_matic), 'currency': 'MATIC'})
 
         return jsonify({'balance': 0.0, 'currency': 'MATIC'})
     except Exception as e:
         print(f"Error getting wallet balance: {e}")
         return jsonify({'balance': 0.0, 'currency': 'MATIC', 'error': str(e)})
 
+def _published_report(kind, local):
+    """
+    The scanner's latest `kind` report from the trade store: the scanner
+    usually runs in its own process, where this process's tracer and
+    failure tracker see nothing. Falls back to `local()` until a scanner
+    has published one; a multi-chain run reports per chain.
+    """
+    store = get_trade_store()
+    reports = store.reports(kind) if store is not None else {}
+    if not reports:
+        return {**local(), 'source': 'dashboard'}
+    if list(reports) == ['']:
+        return {**reports[''], 'source': 'scanner'}
+    return {'chains': reports, 'source': 'scanner'}
+
+@app.route('/api/trace/summary')
+def get_trace_summary():
+    """Per-stage latency percentiles collected by the scan tracer, as last published by the scanner"""
+    return jsonify(_published_report('trace', get_tracer().summary_dict))
+
+@app.route('/api/trace/stacks')
+def get_trace_stacks():
+    """
+    Sample stacks for a few seconds and return them in collapsed flamegraph
+    format. Only threads of the dashboard process are sampled, so a scanner
+    shows up here only when it runs in this process; stage timings of a
+    separate scanner process are in /api/trace/summary.
+    """
+    try:
+        seconds = float(request.args.get('seconds', 5))
+        interval_ms = float(request.args.get('interval_ms', 5))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if not (math.isfinite(seconds) and math.isfinite(interval_ms)):
+        return jsonify({'error': 'seconds and interval_ms must be finite'}), 400
+    seconds = min(max(seconds, 0.0), MAX_SAMPLE_SECONDS)
+    interval_ms = max(interval_ms, 1.0)
+    if not _sampling.acquire(blocking=False):
+        return jsonify({'error': 'stacks are already being sampled'}), 429
+    try:
+        stacks = get_tracer().sample_stacks(duration=seconds, interval=interval_ms / 1000)
+    finally:
+        _sampling.release()
+    return Response(stacks, mimetype='text/plain')
+
+@app.route('/api/quarantine')
+def get_quarantine():
+    """Routes negatively cached after reverting and dependencies with an open circuit, as last published by the scanner"""
+    return jsonify(_published_report('quarantine', get_failure_tracker().quarantine))
+
+def _history_query():
+    """Paging and filter arguments shared by the history endpoints"""
+    def number(name, cast):
+        value = request.args.get(name)
+        return cast(value) if value not in (None, '') else None
+
+    return {
+        'limit': number('limit', int) or 50,
+        'before': number('before', int),
+        'pair': request.args.get('pair') or None,
+        'since': number('since', float),
+        'until': number('until', float),
+    }
+
+def _history_store():
+    store = get_trade_store()
+    if store is None:
+        return None, (jsonify({'error': 'trade store disabled (TRADE_STORE_PATH is empty)'}), 404)
+    return store, None
+
+@app.route('/api/history/opportunities')
+def get_opportunity_history():
+    """Stored opportunities, newest first; page with ?before=<next_before>, filter by pair and time"""
+    store, error = _history_store()
+    if error:
+        return error
+    try:
+        return json_response(request, store.opportunities(**_history_query()))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/history/transactions')
+def get_transaction_history():
+    """Submitted transactions with receipt status and realized profit, paginated like opportunities"""
+    store, error = _history_store()
+    if error:
+        return error
+    try:
+        return json_response(request, store.transactions(**_history_query()))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/history/transactions/<tx_hash>')
+def get_transaction(tx_hash):
+    """One transaction with its legs and receipt"""
+    store, error = _history_store()
+    if error:
+        return error
+    transaction = store.transaction(tx_hash)
+    if transaction is None:
+        return jsonify({'error': 'unknown transaction'}), 404
+    return json_response(request, transaction)
+
+@app.route('/api/history/summary')
+def get_history_summary():
+    """Totals over the stored history and the scanner counters saved with it"""
+    store, error = _history_store()
+    if error:
+        return error
+    return json_response(request, {**store.summary(), 'counters': store.counters()})
+
+@app.route('/api/history/pnl')
+def get_realized_pnl():
+    """Realized profit per trade from indexed contract events next to the profit expected when sent"""
+    store, error = _history_store()
+    if error:
+        return error
+    try:
+        before = request.args.get('before_block')
+        return json_response(request, reconcile_trades(store.path, int(request.args.get('limit', 50)),
+                                        int(before) if before else None))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
 def background_scanner():
     """Background scanner simulation"""
     while True:
         if dashboard_state['is_running']:
-            dashboard_state['total_scans'] += 1
-            dashboard_state['last_scan'] = datetime.now().isoformat()
+            status.update(total_scans=dashboard_state['total_scans'] + 1, last_scan=datetime.now().isoformat())
 
             # Simulate finding opportunities (random chance)
             import random
             if random.random() < 0.1:  # 10% chance
-                dashboard_state['opportunities_found'] += 1
+                status.increment('opportunities_found')
 
                 # Simulate executing profitable trades (50% of opportunities)
                 if random.random() < 0.5:
-                    dashboard_state['trades_executed'] += 1
+                    status.increment('trades_executed')
                     profit = random.uniform(0.5, 5.0)  # Random profit between $0.5-$5
-                    dashboard_state['total_profit'] += profit
+                    status.increment('total_profit', profit)
 
         time.sleep(2)  # Scan every 2 seconds
 
-# Start background scanner
-scanner_thread = threading.Thread(target=background_scanner, daemon=True)
-scanner_thread.start()
+# Background scanner, started the first time the scanner is switched on
+scanner_thread = None
+_scanner_thread_lock = threading.Lock()
+
+def _ensure_background_scanner():
+    global scanner_thread
+    with _scanner_thread_lock:
+        if scanner_thread is None:
+            scanner_thread = threading.Thread(target=background_scanner, daemon=True)
+            scanner_thread.start()
 
 if __name__ == '__main__':
+    from dotenv import load_dotenv
+    load_dotenv()
+    # Development server; run_dashboard.py serves the app in production mode
     app.run(host='0.0.0.0', port=3146, debug=False)
\ No newline at end of file
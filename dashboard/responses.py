@@ -0,0 +1,98 @@
+"""
+Cheap responses for the endpoints the dashboard polls.
+
+JsonSnapshot holds a state dict together with its serialized body and ETag,
+rebuilt only when the state changes, so a status poll is a header
+comparison plus a bytes copy instead of a jsonify per request.
+json_response gives any other payload a content ETag. Both answer a
+matching If-None-Match with 304 and gzip bodies of GZIP_MIN_BYTES or more
+for clients that accept it.
+"""
+import gzip
+import hashlib
+import json
+import threading
+from typing import Dict, Optional
+
+from flask import Request, Response
+
+GZIP_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+
+
+def _dumps(payload) -> bytes:
+    # Same key order as jsonify, without its whitespace
+    return json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str).encode()
+
+
+def _etag(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=12).hexdigest()
+
+
+def _respond(request: Request, body: bytes, etag: str, gzipped: Optional[bytes] = None) -> Response:
+    """
+    304 when the client already has `etag`, else the body, gzipped when it is
+    large and accepted. The tag is weak: it names the content, and the plain
+    and gzipped bodies of one payload share it.
+    """
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    elif len(body) >= GZIP_MIN_BYTES and request.accept_encodings['gzip']:
+        response = Response(gzipped or gzip.compress(body, GZIP_LEVEL), mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(body, mimetype='application/json')
+    response.set_etag(etag, weak=True)
+    # Cached, but revalidated on every poll
+    response.headers['Cache-Control'] = 'no-cache'
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def json_response(request: Request, payload) -> Response:
+    """`payload` as JSON with a content ETag, 304 and gzip support"""
+    body = _dumps(payload)
+    return _respond(request, body, _etag(body))
+
+
+class JsonSnapshot:
+    """
+    A state dict whose serialized form is kept current on write. `update`
+    and `increment` are the only writers; readers get the last published
+    (body, etag, gzipped) tuple, swapped in whole so it is never torn.
+    """
+
+    def __init__(self, state: Dict):
+        self.state = state
+        self.version = 0
+        self._lock = threading.Lock()
+        self._publish()
+
+    def _publish(self):
+        body = _dumps(self.state)
+        gzipped = gzip.compress(body, GZIP_LEVEL) if len(body) >= GZIP_MIN_BYTES else None
+        self.version += 1
+        self._current = (body, _etag(body), gzipped)
+
+    def update(self, **changes) -> bool:
+        """Apply `changes`; re-serializes only if a value actually changed"""
+        with self._lock:
+            changed = {key: value for key, value in changes.items() if self.state.get(key) != value}
+            if not changed:
+                return False
+            self.state.update(changed)
+            self._publish()
+            return True
+
+    def increment(self, key: str, amount=1):
+        with self._lock:
+            self.state[key] += amount
+            self._publish()
+
+    @property
+    def etag(self) -> str:
+        return self._current[1]
+
+    def response(self, request: Request) -> Response:
+        body, etag, gzipped = self._current
+        return _respond(request, body, etag, gzipped)
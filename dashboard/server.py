@@ -0,0 +1,68 @@
+"""
+Production server for the dashboard.
+
+Waitress runs the Flask app with an asynchronous I/O loop that accepts and
+buffers every connection, and a pool of worker threads that run requests.
+Several hundred pollers therefore hold idle keep-alive sockets without
+tying up a thread each. Workers are threads in one process, not separate
+processes, because the dashboard state and the background scanner live in
+this process: with separate processes a start in one worker would not show
+in another worker's /api/status.
+
+    python -m dashboard.server --port 3146 --threads 16
+    python -m dashboard.server --dev        # Flask's development server
+"""
+import argparse
+import os
+
+
+def serve(app, host: str = '0.0.0.0', port: int = 3146, threads: int = 16, connection_limit: int = 1000,
+          dev: bool = False):
+    """Serve `app` until interrupted; `dev` falls back to Flask's single-process development server"""
+    if dev:
+        app.run(host=host, port=port, debug=False, threaded=True)
+        return
+    try:
+        from waitress import serve as waitress_serve
+    except ImportError:
+        raise RuntimeError("The production dashboard server needs waitress (pip install waitress); "
+                           "set DASHBOARD_SERVER=dev for Flask's development server")
+    waitress_serve(app, host=host, port=port, threads=threads, connection_limit=connection_limit,
+                   backlog=2048, channel_timeout=30, ident='arbitrage-dashboard')
+
+
+def options_from_env() -> dict:
+    return {
+        'host': os.getenv('DASHBOARD_HOST', '0.0.0.0'),
+        'port': int(os.getenv('DASHBOARD_PORT', '3146')),
+        'threads': int(os.getenv('DASHBOARD_THREADS', '16')),
+        'connection_limit': int(os.getenv('DASHBOARD_CONNECTION_LIMIT', '1000')),
+        'dev': os.getenv('DASHBOARD_SERVER', 'waitress') == 'dev',
+    }
+
+
+def main():
+    defaults = options_from_env()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default=defaults['host'])
+    parser.add_argument('--port', type=int, default=defaults['port'])
+    parser.add_argument('--threads', type=int, default=defaults['threads'], help='request worker threads')
+    parser.add_argument('--connection-limit', type=int, default=defaults['connection_limit'],
+                        help='open connections accepted before new ones wait')
+    parser.add_argument('--dev', action='store_true', default=defaults['dev'],
+                        help="Flask's development server instead of waitress")
+    parser.add_argument('--start', action='store_true', help='switch the simulated scanner on at start-up')
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    from dashboard.app import app, start_scanner
+    if args.start:
+        with app.test_request_context(method='POST'):
+            start_scanner()
+    serve(app, args.host, args.port, args.threads, args.connection_limit, args.dev)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,14 @@
+"""
+Local JSON-RPC stand-in for the Polygon scanner and bot.
+
+A seeded V2 pool model (`MockChain`) behind an HTTP JSON-RPC server
+(`MockRpcServer`) that speaks the subset of the API the scanner and bot use,
+with configurable latency, jitter, error rates and block cadence (`Chaos`).
+"""
+from mock_rpc.chain import MockChain, MockDex, MockPool, MockToken, polygon_chain, synthetic_chain
+from mock_rpc.server import Chaos, MockRpcServer
+
+__all__ = [
+    'Chaos', 'MockChain', 'MockDex', 'MockPool', 'MockRpcServer', 'MockToken',
+    'polygon_chain', 'synthetic_chain',
+]
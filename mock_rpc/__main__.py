@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Run the mock Polygon JSON-RPC server
+
+Serves the scanner's hardcoded token and DEX addresses (or --pools synthetic
+pairs) and prints the addresses to point the scanner or bot at.
+
+    python -m mock_rpc --port 8545 --latency-ms 40 --jitter-ms 15 --error-rate 0.01
+"""
+import argparse
+import json
+
+from mock_rpc.chain import polygon_chain, synthetic_chain
+from mock_rpc.server import Chaos, MockRpcServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8545)
+    parser.add_argument('--pools', type=int, default=0, help='synthetic pairs instead of the scanner token list')
+    parser.add_argument('--dexes', type=int, default=2, help='DEXes per synthetic pair')
+    parser.add_argument('--block-time', type=float, default=2.0)
+    parser.add_argument('--volatility', type=float, default=0.002)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--http-error-rate', type=float, default=0.0)
+    parser.add_argument('--drop-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--chain-id', type=int, default=137, help='distinct ids let several mocks stand in for several chains')
+    args = parser.parse_args()
+
+    chain_args = dict(block_time=args.block_time, volatility=args.volatility, chain_id=args.chain_id)
+    if args.pools:
+        chain = synthetic_chain(args.pools, args.dexes, seed=args.seed, **chain_args)
+    else:
+        chain = polygon_chain(seed=args.seed, **chain_args)
+    chaos = Chaos(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                  http_error_rate=args.http_error_rate, drop_rate=args.drop_rate, seed=args.seed)
+    server = MockRpcServer(chain, chaos, args.host, args.port)
+
+    print(json.dumps({
+        'url': server.url,
+        'chain_id': chain.chain_id,
+        'pools': len(chain.pools),
+        'ARBITRAGE_CONTRACT_ADDRESS': chain.arbitrage_address,
+        'FLASHLOAN_CONTRACT_ADDRESS': chain.arbitrage_address,
+        'LENS_CONTRACT_ADDRESS': chain.lens_address,
+        'dexes': {name: {'factory': d.factory, 'router': d.router} for name, d in chain.dexes.items()}
+    }, indent=2), flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from automation.direct_swap import get_amount_out
+from automation.lens import LensResult, encode_lens_results
+from automation.sharded_scan import scan_pairs
+
+CHAIN_ID = 137
+ZERO_ADDRESS = '0x' + '00' * 20
+
+
+def _address(*parts: str) -> str:
+    """Deterministic pseudo-address for mock contracts"""
+    from eth_utils import keccak, to_checksum_address
+    return to_checksum_address(keccak(text=':'.join(parts))[12:])
+
+
+@dataclass
+class MockToken:
+    symbol: str
+    address: str
+    decimals: int
+    price: float  # in units of the native token
+
+
+@dataclass
+class MockPool:
+    dex: str
+    address: str
+    token0: str
+    token1: str
+    reserve0: int
+    reserve1: int
+    fee_bps: int = 30
+
+    def reserves_for(self, token_in: str) -> Tuple[int, int]:
+        if token_in.lower() == self.token0.lower():
+            return self.reserve0, self.reserve1
+        return self.reserve1, self.reserve0
+
+
+@dataclass
+class MockDex:
+    name: str
+    factory: str
+    router: str
+    fee_bps: int = 30
+
+
+@dataclass
+class SentTransaction:
+    tx_hash: str
+    raw: str
+    block_sent: int
+    block_mined: Optional[int] = None
+
+
+@dataclass
+class Block:
+    number: int
+    timestamp: int
+    base_fee: int
+    transactions: List[str] = field(default_factory=list)
+    logs: List[Dict] = field(default_factory=list)
+
+    @property
+    def hash(self) -> str:
+        return '0x%064x' % (0xb10c << 200 | self.number)
+
+
+class _LensReserves:
+    """Pool reserves in the shape scan_pairs reads, so lens results match the local scanner exactly"""
+
+    def __init__(self, chain: 'MockChain', dexes: Sequence[MockDex], tokens_a: Sequence[str], tokens_b: Sequence[str]):
+        self.chain = chain
+        self.dex_names = [dex.name for dex in dexes]
+        self.dexes = len(dexes)
+        self.tokens_a = tokens_a
+        self.tokens_b = tokens_b
+
+    def get(self, pair_index: int, dex_index: int) -> Tuple[int, int]:
+        token_a = self.tokens_a[pair_index]
+        pool = self.chain.pool(self.dex_names[dex_index], token_a, self.tokens_b[pair_index])
+        return pool.reserves_for(token_a) if pool else (0, 0)
+
+
+class MockChain:
+    """
+    Scriptable V2 pool model behind the mock RPC server.
+
+    Blocks advance on a wall-clock cadence of `block_time` seconds (or by
+    calling `mine()`). Each new block random-walks pool reserves by up to
+    `volatility` (a fraction), runs any hooks registered with `on_block` and
+    records a Sync log per changed pool. Everything is seeded, so two chains
+    built with the same arguments produce the same blocks.
+    """
+
+    def __init__(self, tokens: Sequence[MockToken], dexes: Sequence[MockDex],
+                 pairs: Sequence[Tuple[str, str]], depth: int = 1_000_000 * 10 ** 18,
+                 spread_bps: int = 60, volatility: float = 0.002, block_time: float = 2.0,
+                 start_block: int = 50_000_000, base_fee: int = 30 * 10 ** 9,
+                 seed: int = 1, history: int = 1024, default_balance: int = 1_000 * 10 ** 18,
+                 chain_id: int = CHAIN_ID):
+        self.rng = random.Random(seed)
+        self.chain_id = chain_id
+        self.tokens: Dict[str, MockToken] = {t.address.lower(): t for t in tokens}
+        self.by_symbol: Dict[str, MockToken] = {t.symbol: t for t in tokens}
+        self.dexes: Dict[str, MockDex] = {d.name: d for d in dexes}
+        self.factories = {d.factory.lower(): d for d in dexes}
+        self.routers = {d.router.lower(): d for d in dexes}
+        self.pools: Dict[str, MockPool] = {}
+        self._pool_index: Dict[Tuple[str, str, str], MockPool] = {}
+        self.volatility = volatility
+        self.block_time = block_time
+        self.history = history
+        self.arbitrage_address = _address('mock', 'arbitrage')
+        self.lens_address = _address('mock', 'lens')
+        self.default_balance = default_balance
+        self.balances: Dict[str, int] = {}
+        self.nonces: Dict[str, int] = {}
+        self.sent: Dict[str, SentTransaction] = {}
+        self._hooks: List[Callable[['MockChain', Block], None]] = []
+        self._scripted: set = set()
+        self._lock = threading.RLock()
+        self._clock_start = time.monotonic()
+        self._start_block = start_block
+        self.blocks: Dict[int, Block] = {start_block: Block(start_block, int(time.time()), base_fee)}
+        self.head = start_block
+
+        for symbol_a, symbol_b in pairs:
+            token_a, token_b = self.by_symbol[symbol_a], self.by_symbol[symbol_b]
+            for dex in dexes:
+                skew = 1 + self.rng.uniform(-spread_bps, spread_bps) / 20000
+                amount_a = depth * 10 ** token_a.decimals // 10 ** 18
+                value = amount_a * token_a.price / 10 ** token_a.decimals
+                amount_b = int(value / token_b.price * skew * 10 ** token_b.decimals)
+                self.add_pool(dex.name, token_a.address, token_b.address, amount_a, amount_b)
+
+    # -- model -------------------------------------------------------------
+
+    @staticmethod
+    def _pool_key(dex: str, token_a: str, token_b: str) -> Tuple[str, str, str]:
+        a, b = sorted((token_a.lower(), token_b.lower()))
+        return dex, a, b
+
+    def add_pool(self, dex: str, token_a: str, token_b: str, amount_a: int, amount_b: int) -> MockPool:
+        token0, token1 = sorted((token_a, token_b), key=str.lower)
+        reserve0, reserve1 = (amount_a, amount_b) if token0 == token_a else (amount_b, amount_a)
+        pool = MockPool(dex, _address(dex, token0.lower(), token1.lower()), token0, token1,
+                        reserve0, reserve1, self.dexes[dex].fee_bps)
+        self.pools[pool.address.lower()] = pool
+        self._pool_index[self._pool_key(dex, token_a, token_b)] = pool
+        return pool
+
+    def pool(self, dex: str, token_a: str, token_b: str) -> Optional[MockPool]:
+        return self._pool_index.get(self._pool_key(dex, token_a, token_b))
+
+    def set_reserves(self, dex: str, token_a: str, token_b: str, reserve_a: int, reserve_b: int):
+        """Script a pool's reserves (oriented to token_a); logged as a Sync in the next block"""
+        with self._lock:
+            pool = self.pool(dex, token_a, token_b)
+            self._scripted.add(pool.address.lower())
+            if token_a.lower() == pool.token0.lower():
+                pool.reserve0, pool.reserve1 = reserve_a, reserve_b
+            else:
+                pool.reserve0, pool.reserve1 = reserve_b, reserve_a
+
+    def on_block(self, hook: Callable[['MockChain', Block], None]):
+        """Run `hook(chain, block)` as each new block is produced"""
+        self._hooks.append(hook)
+
+    def amounts_out(self, dex: MockDex, amount_in: int, path: Sequence[str]) -> List[int]:
+        amounts = [amount_in]
+        for token_in, token_out in zip(path, path[1:]):
+            pool = self.pool(dex.name, token_in, token_out)
+            if pool is None:
+                raise LookupError('no pool')
+            amounts.append(get_amount_out(amounts[-1], *pool.reserves_for(token_in), pool.fee_bps))
+        return amounts
+
+    def round_trip(self, token_a: str, token_b: str, amount: int, dex_a: MockDex, dex_b: MockDex) -> int:
+        """Amount of token_a back after token_a -> token_b on dex_a and back on dex_b"""
+        amount_b = self.amounts_out(dex_a, amount, [token_a, token_b])[-1]
+        return self.amounts_out(dex_b, amount_b, [token_b, token_a])[-1]
+
+    def lens_scan(self, factories: Sequence[str], fee_bps: Sequence[int], tokens_a: Sequence[str],
+                  tokens_b: Sequence[str], amounts: Sequence[int], min_profit_bps: int) -> bytes:
+        reserves = _LensReserves(self, [self.factories[f.lower()] for f in factories], tokens_a, tokens_b)
+        candidates = scan_pairs(reserves, range(len(tokens_a)), amounts, fee_bps, min_profit_bps)
+        return encode_lens_results([LensResult(*c) for c in candidates])
+
+    # -- blocks ------------------------------------------------------------
+
+    def mine(self, blocks: int = 1):
+        with self._lock:
+            for _ in range(blocks):
+                self._produce_block()
+
+    def advance(self) -> int:
+        """Produce any blocks due on the wall clock; returns the head"""
+        if self.block_time > 0:
+            due = self._start_block + int((time.monotonic() - self._clock_start) / self.block_time)
+            if due > self.head:
+                with self._lock:
+                    while self.head < due:
+                        self._produce_block()
+        return self.head
+
+    def _produce_block(self):
+        previous = self.blocks[self.head]
+        number = self.head + 1
+        base_fee = max(1, int(previous.base_fee * (1 + self.rng.uniform(-0.125, 0.125))))
+        block = Block(number, previous.timestamp + max(1, int(self.block_time)), base_fee)
+
+        before = {address: (p.reserve0, p.reserve1) for address, p in self.pools.items()}
+        if self.volatility:
+            for pool in self.pools.values():
+                if self.rng.random() < 0.5:
+                    move = 1 + self.rng.uniform(-self.volatility, self.volatility)
+                    pool.reserve0 = max(1, int(pool.reserve0 * move))
+                    pool.reserve1 = max(1, int(pool.reserve1 / move))
+        for hook in self._hooks:
+            hook(self, block)
+
+        for tx in self.sent.values():
+            if tx.block_mined is None:
+                tx.block_mined = number
+                block.transactions.append(tx.tx_hash)
+
+        for address, pool in self.pools.items():
+            if address in self._scripted or before[address] != (pool.reserve0, pool.reserve1):
+                block.logs.append(self._sync_log(pool, block, len(block.logs)))
+        self._scripted.clear()
+
+        self.blocks[number] = block
+        self.head = number
+        self.blocks.pop(number - self.history, None)
+
+    def _sync_log(self, pool: MockPool, block: Block, log_index: int) -> Dict:
+        from eth_abi import encode
+        return {
+            'address': pool.address,
+            'topics': [sync_topic()],
+            'data': '0x' + encode(['uint112', 'uint112'], [pool.reserve0, pool.reserve1]).hex(),
+            'blockNumber': hex(block.number),
+            'blockHash': block.hash,
+            'transactionHash': '0x%064x' % (block.number << 16 | log_index),
+            'transactionIndex': '0x0',
+            'logIndex': hex(log_index),
+            'removed': False
+        }
+
+    def logs(self, from_block: int, to_block: int, addresses: Optional[Sequence[str]] = None,
+             topic0: Optional[Sequence[str]] = None) -> List[Dict]:
+        wanted = {a.lower() for a in addresses} if addresses else None
+        topics = {t.lower() for t in topic0} if topic0 else None
+        result = []
+        for number in range(max(from_block, self._start_block), min(to_block, self.head) + 1):
+            block = self.blocks.get(number)
+            if block is None:
+                continue
+            for log in block.logs:
+                if wanted is not None and log['address'].lower() not in wanted:
+                    continue
+                if topics is not None and log['topics'][0] not in topics:
+                    continue
+                result.append(log)
+        return result
+
+    def send_raw(self, raw: str) -> str:
+        from eth_utils import keccak
+        tx_hash = '0x' + keccak(hexstr=raw).hex()
+        with self._lock:
+            self.sent.setdefault(tx_hash, SentTransaction(tx_hash, raw, self.head))
+        return tx_hash
+
+    def receipt(self, tx_hash: str) -> Optional[Dict]:
+        tx = self.sent.get(tx_hash)
+        if tx is None or tx.block_mined is None:
+            return None
+        block = self.blocks.get(tx.block_mined)
+        return {
+            'transactionHash': tx_hash,
+            'blockNumber': hex(tx.block_mined),
+            'blockHash': block.hash if block else '0x' + '00' * 32,
+            'transactionIndex': '0x0',
+            'status': '0x1',
+            'gasUsed': hex(180_000),
+            'cumulativeGasUsed': hex(180_000),
+            'effectiveGasPrice': hex(block.base_fee if block else 0),
+            'logs': [],
+            'logsBloom': '0x' + '00' * 256,
+            'from': ZERO_ADDRESS,
+            'to': self.arbitrage_address,
+            'contractAddress': None,
+            'type': '0x0'
+        }
+
+
+@lru_cache(maxsize=1)
+def sync_topic() -> str:
+    from eth_utils import keccak
+    return '0x' + keccak(text='Sync(uint112,uint112)').hex()
+
+
+def polygon_chain(**kwargs) -> MockChain:
+    """
+    Mock chain at the addresses PolygonArbitrageScanner has hardcoded
+    (tokens, QuickSwap and SushiSwap factories/routers), one pool per DEX for
+    every token pair it scans.
+    """
+    from automation.arbitrage_scanner import PolygonArbitrageScanner
+
+    pairs = PolygonArbitrageScanner._load_token_list(None)
+    configs = PolygonArbitrageScanner._load_dex_configs(None)
+    prices = {'WMATIC': 1.0, 'USDC': 1.25, 'USDT': 1.25, 'DAI': 1.25, 'WBTC': 50_000.0, 'WETH': 3_000.0}
+
+    tokens = {}
+    for pair in pairs:
+        for address, symbol, decimals in ((pair.token_a, pair.symbol_a, pair.decimals_a),
+                                          (pair.token_b, pair.symbol_b, pair.decimals_b)):
+            tokens[symbol] = MockToken(symbol, address, decimals, prices.get(symbol, 1.0))
+    dexes = [MockDex(name, configs[name]['factory'], configs[name]['router']) for name in ('quickswap', 'sushiswap')]
+    return MockChain(list(tokens.values()), dexes, [(p.symbol_a, p.symbol_b) for p in pairs], **kwargs)
+
+
+def synthetic_chain(pools: int, dexes: int = 2, seed: int = 1, **kwargs) -> MockChain:
+    """`pools` token pairs against a common base token, each listed on `dexes` DEXes"""
+    base = MockToken('WMATIC', _address('token', 'WMATIC'), 18, 1.0)
+    rng = random.Random(seed)
+    tokens = [base] + [MockToken('T%d' % i, _address('token', str(i)), rng.choice([6, 8, 18]),
+                                 10 ** rng.uniform(-2, 4)) for i in range(pools)]
+    mock_dexes = [MockDex('dex%d' % d, _address('factory', str(d)), _address('router', str(d)))
+                  for d in range(dexes)]
+    return MockChain(tokens, mock_dexes, [('WMATIC', t.symbol) for t in tokens[1:]], seed=seed, **kwargs)
@@ -0,0 +1,363 @@
+import json
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from mock_rpc.chain import ZERO_ADDRESS, MockChain
+
+GAS_TIP = 30 * 10 ** 9
+
+
+@dataclass
+class Chaos:
+    """Fault injection applied per HTTP request (latency, drops) or per call (errors)"""
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0       # JSON-RPC -32005 "limit exceeded" replies
+    http_error_rate: float = 0.0  # HTTP 503 with no body
+    drop_rate: float = 0.0        # connection closed without a reply
+    method_latency_ms: Dict[str, float] = field(default_factory=dict)
+    seed: int = 0
+
+
+class RpcError(Exception):
+    def __init__(self, code: int, message: str, data: Any = None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.data = data
+
+
+def _block_number(chain: MockChain, tag) -> int:
+    if tag in (None, 'latest', 'pending', 'safe', 'finalized'):
+        return chain.head
+    if tag == 'earliest':
+        return 0
+    return int(tag, 16) if isinstance(tag, str) else int(tag)
+
+
+# -- eth_call ----------------------------------------------------------------
+
+def _get_pair(chain, to, token_a, token_b):
+    pool = chain.pool(chain.factories[to].name, token_a, token_b)
+    return pool.address if pool else ZERO_ADDRESS
+
+
+def _get_reserves(chain, to):
+    pool = chain.pools[to]
+    return pool.reserve0, pool.reserve1, chain.blocks[chain.head].timestamp % 2 ** 32
+
+
+def _get_amounts_out(chain, to, amount_in, path):
+    return chain.amounts_out(chain.routers[to], amount_in, path)
+
+
+def _get_arbitrage_opportunity(chain, to, token_a, token_b, amount):
+    # Mirrors the deployed contract: QuickSwap leg first, then SushiSwap, 0.5% minimum
+    dexes = list(chain.dexes.values())
+    profit = max(chain.round_trip(token_a, token_b, amount, dexes[0], dexes[1]) - amount, 0)
+    return profit, profit > amount * 50 // 10000
+
+
+def _check_arbitrage_opportunities(chain, to, requests):
+    profits, profitable = [], []
+    for token_a, token_b, amount, dex_a, dex_b in requests:
+        try:
+            out = chain.round_trip(token_a, token_b, amount, chain.routers[dex_a.lower()], chain.routers[dex_b.lower()])
+        except (KeyError, LookupError):
+            out = 0
+        profit = max(out - amount, 0)
+        profits.append(profit)
+        profitable.append(profit > amount * 50 // 10000)
+    return profits, profitable
+
+
+# (contract kind, signature, output types, handler(chain, to, *args))
+_CALLS: List[Tuple[str, str, List[str], Callable]] = [
+    ('factory', 'getPair(address,address)', ['address'], lambda c, to, a, b: (_get_pair(c, to, a, b),)),
+    ('pair', 'getReserves()', ['uint112', 'uint112', 'uint32'], _get_reserves),
+    ('pair', 'token0()', ['address'], lambda c, to: (c.pools[to].token0,)),
+    ('pair', 'token1()', ['address'], lambda c, to: (c.pools[to].token1,)),
+    ('router', 'getAmountsOut(uint256,address[])', ['uint256[]'],
+     lambda c, to, amount, path: (_get_amounts_out(c, to, amount, path),)),
+    ('router', 'factory()', ['address'], lambda c, to: (c.routers[to].factory,)),
+    ('token', 'balanceOf(address)', ['uint256'], lambda c, to, owner: (10 ** 30,)),
+    ('token', 'decimals()', ['uint8'], lambda c, to: (c.tokens[to].decimals,)),
+    ('token', 'symbol()', ['string'], lambda c, to: (c.tokens[to].symbol,)),
+    ('arbitrage', 'getArbitrageOpportunity(address,address,uint256)', ['uint256', 'bool'],
+     _get_arbitrage_opportunity),
+    ('arbitrage', 'checkArbitrageOpportunities((address,address,uint256,address,address)[])',
+     ['uint256[]', 'bool[]'], _check_arbitrage_opportunities),
+    ('lens', 'scan(address[],uint256[],address[],address[],uint256[],uint256)', ['bytes'],
+     lambda c, to, *args: (c.lens_scan(*args),)),
+]
+
+
+@lru_cache(maxsize=1)
+def _call_table() -> Dict[Tuple[str, bytes], Tuple[List[str], List[str], Callable]]:
+    from eth_utils import keccak
+    table = {}
+    for kind, signature, outputs, handler in _CALLS:
+        inputs = signature[signature.index('(') + 1:-1]
+        input_types = _split_types(inputs)
+        table[(kind, keccak(text=signature)[:4])] = (input_types, outputs, handler)
+    return table
+
+
+def _split_types(types: str) -> List[str]:
+    """Split a comma-separated type list, keeping tuple components together"""
+    parts, depth, current = [], 0, ''
+    for char in types:
+        if char == ',' and depth == 0:
+            parts.append(current)
+            current = ''
+            continue
+        depth += char == '('
+        depth -= char == ')'
+        current += char
+    return parts + [current] if current else parts
+
+
+def _contract_kind(chain: MockChain, to: str) -> Optional[str]:
+    if to in chain.pools:
+        return 'pair'
+    if to in chain.factories:
+        return 'factory'
+    if to in chain.routers:
+        return 'router'
+    if to in chain.tokens:
+        return 'token'
+    if to == chain.arbitrage_address.lower():
+        return 'arbitrage'
+    if to == chain.lens_address.lower():
+        return 'lens'
+    return None
+
+
+def eth_call(chain: MockChain, tx: Dict, block=None) -> str:
+    from eth_abi import decode, encode
+    to = (tx.get('to') or '').lower()
+    data = bytes.fromhex((tx.get('data') or tx.get('input') or '0x')[2:])
+    entry = _call_table().get((_contract_kind(chain, to), data[:4]))
+    if entry is None:
+        raise RpcError(-32000, 'execution reverted')
+    input_types, output_types, handler = entry
+    try:
+        args = decode(input_types, data[4:])
+        with chain._lock:
+            result = handler(chain, to, *args)
+    except (KeyError, LookupError, ValueError, ZeroDivisionError):
+        raise RpcError(3, 'execution reverted')
+    return '0x' + encode(output_types, list(result)).hex()
+
+
+# -- everything else ---------------------------------------------------------
+
+def _block(chain: MockChain, tag, full: bool = False) -> Optional[Dict]:
+    block = chain.blocks.get(_block_number(chain, tag))
+    if block is None:
+        return None
+    parent = chain.blocks.get(block.number - 1)
+    return {
+        'number': hex(block.number),
+        'hash': block.hash,
+        'parentHash': parent.hash if parent else '0x' + '00' * 32,
+        'timestamp': hex(block.timestamp),
+        'baseFeePerGas': hex(block.base_fee),
+        'gasLimit': hex(30_000_000),
+        'gasUsed': hex(15_000_000),
+        'miner': ZERO_ADDRESS,
+        'difficulty': '0x1',
+        'totalDifficulty': hex(block.number),
+        'extraData': '0x',
+        'nonce': '0x' + '00' * 8,
+        'mixHash': '0x' + '00' * 32,
+        'sha3Uncles': '0x' + '00' * 32,
+        'logsBloom': '0x' + '00' * 256,
+        'transactionsRoot': '0x' + '00' * 32,
+        'stateRoot': '0x' + '00' * 32,
+        'receiptsRoot': '0x' + '00' * 32,
+        'size': hex(1000),
+        'uncles': [],
+        'transactions': list(block.transactions)
+    }
+
+
+def _fee_history(chain: MockChain, count, newest, percentiles=None) -> Dict:
+    count = int(count, 16) if isinstance(count, str) else int(count)
+    newest = _block_number(chain, newest)
+    oldest = max(newest - count + 1, min(chain.blocks))
+    numbers = range(oldest, newest + 1)
+    base_fees = [chain.blocks[n].base_fee if n in chain.blocks else 0 for n in numbers]
+    return {
+        'oldestBlock': hex(oldest),
+        'baseFeePerGas': [hex(fee) for fee in base_fees] + [hex(base_fees[-1] if base_fees else 0)],
+        'gasUsedRatio': [0.5] * len(base_fees),
+        'reward': [[hex(GAS_TIP * (1 + i)) for i, _ in enumerate(percentiles or [])] for _ in base_fees]
+    }
+
+
+def _get_logs(chain: MockChain, flt: Dict) -> List[Dict]:
+    addresses = flt.get('address')
+    if isinstance(addresses, str):
+        addresses = [addresses]
+    topics = flt.get('topics') or []
+    topic0 = topics[0] if topics else None
+    if isinstance(topic0, str):
+        topic0 = [topic0]
+    return chain.logs(_block_number(chain, flt.get('fromBlock', 'latest')),
+                      _block_number(chain, flt.get('toBlock', 'latest')), addresses, topic0)
+
+
+METHODS: Dict[str, Callable] = {
+    'web3_clientVersion': lambda chain: 'mock-rpc/1.0',
+    'eth_chainId': lambda chain: hex(chain.chain_id),
+    'net_version': lambda chain: str(chain.chain_id),
+    'eth_blockNumber': lambda chain: hex(chain.head),
+    'eth_gasPrice': lambda chain: hex(chain.blocks[chain.head].base_fee + GAS_TIP),
+    'eth_maxPriorityFeePerGas': lambda chain: hex(GAS_TIP),
+    'eth_feeHistory': _fee_history,
+    'eth_getBalance': lambda chain, address, block=None: hex(chain.balances.get(address.lower(), chain.default_balance)),
+    'eth_getTransactionCount': lambda chain, address, block=None: hex(chain.nonces.get(address.lower(), 0)),
+    'eth_estimateGas': lambda chain, tx, block=None: hex(180_000),
+    'eth_getBlockByNumber': _block,
+    'eth_call': eth_call,
+    'eth_getLogs': _get_logs,
+    'eth_sendRawTransaction': lambda chain, raw: chain.send_raw(raw),
+    'eth_getTransactionReceipt': lambda chain, tx_hash: chain.receipt(tx_hash),
+    'eth_getTransactionByHash': lambda chain, tx_hash: None,
+    'eth_newPendingTransactionFilter': lambda chain: '0x1',
+    'eth_newBlockFilter': lambda chain: '0x2',
+    'eth_getFilterChanges': lambda chain, filter_id: [],
+    'eth_uninstallFilter': lambda chain, filter_id: True,
+}
+
+
+class MockRpcServer:
+    """
+    HTTP JSON-RPC server (keep-alive, batch requests) over a MockChain, with
+    Chaos fault injection. `stats` counts calls per method and injected faults.
+    """
+
+    def __init__(self, chain: MockChain, chaos: Optional[Chaos] = None, host: str = '127.0.0.1', port: int = 0):
+        self.chain = chain
+        self.chaos = chaos or Chaos()
+        self.stats: Counter = Counter()
+        self._rng = random.Random(self.chaos.seed)
+        self._rng_lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return 'http://%s:%d' % (host, port)
+
+    def _roll(self) -> float:
+        with self._rng_lock:
+            return self._rng.random()
+
+    def _delay(self, methods: List[str]) -> float:
+        chaos = self.chaos
+        delay = chaos.latency_ms + max((chaos.method_latency_ms.get(m, 0.0) for m in methods), default=0.0)
+        if chaos.jitter_ms:
+            delay += (self._roll() * 2 - 1) * chaos.jitter_ms
+        return max(delay, 0.0) / 1000
+
+    def dispatch(self, request: Dict) -> Dict:
+        method = request.get('method')
+        reply = {'jsonrpc': '2.0', 'id': request.get('id')}
+        if method == 'mock_stats':
+            # Out-of-band counters for benchmarks running the server in another process
+            reply['result'] = dict(self.stats)
+            return reply
+        self.stats[method] += 1
+        if self.chaos.error_rate and self._roll() < self.chaos.error_rate:
+            self.stats['injected_errors'] += 1
+            reply['error'] = {'code': -32005, 'message': 'limit exceeded'}
+            return reply
+        handler = METHODS.get(method)
+        if handler is None:
+            reply['error'] = {'code': -32601, 'message': 'the method %s does not exist' % method}
+            return reply
+        self.chain.advance()
+        try:
+            reply['result'] = handler(self.chain, *request.get('params', []))
+        except RpcError as e:
+            reply['error'] = {'code': e.code, 'message': e.message}
+        except TypeError as e:
+            reply['error'] = {'code': -32602, 'message': 'invalid params: %s' % e}
+        return reply
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                chaos = server.chaos
+                if chaos.drop_rate and server._roll() < chaos.drop_rate:
+                    server.stats['injected_drops'] += 1
+                    self.close_connection = True
+                    return
+                if chaos.http_error_rate and server._roll() < chaos.http_error_rate:
+                    server.stats['injected_http_errors'] += 1
+                    self.send_response(503)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                try:
+                    request = json.loads(body)
+                except ValueError:
+                    request = None
+                calls = request if isinstance(request, list) else [request]
+                if not all(isinstance(call, dict) for call in calls):
+                    reply = {'jsonrpc': '2.0', 'id': None, 'error': {'code': -32700, 'message': 'parse error'}}
+                else:
+                    delay = server._delay([call.get('method') for call in calls])
+                    if delay:
+                        time.sleep(delay)
+                    replies = [server.dispatch(call) for call in calls]
+                    reply = replies if isinstance(request, list) else replies[0]
+
+                payload = json.dumps(reply).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> 'MockRpcServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='mock-rpc', daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def stop(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -8,9 +8,6 @@ import sys
 import subprocess
 import threading
 import time
-from dotenv import load_dotenv
-
-load_dotenv()
 
 def check_requirements():
     """Check if all required environment variables are set"""
@@ -35,17 +32,28 @@ def check_requirements():
 
 def run_dashboard():
     """Run the Flask dashboard"""
+    from dashboard.server import options_from_env, serve
+
+    options = options_from_env()
     print("🚀 Starting Polygon Arbitrage Engine Dashboard...")
-    print("📊 Dashboard will be available at: http://0.0.0.0:3146")
-    print("🔗 Access from browser: http://localhost:3146")
+    print(f"📊 Dashboard will be available at: http://{options['host']}:{options['port']}")
+    print(f"🔗 Access from browser: http://localhost:{options['port']}")
+    if options['dev']:
+        print("⚠️  Development server (DASHBOARD_SERVER=dev)")
+    else:
+        print(f"⚙️  Production server: {options['threads']} worker threads, "
+              f"up to {options['connection_limit']} connections")
     print("\n" + "="*50)
     
     # Import and run the dashboard
     from dashboard.app import app
-    app.run(host='0.0.0.0', port=3146, debug=False)
+    serve(app, **options)
 
 def main():
     """Main application entry point"""
+    from dotenv import load_dotenv
+    load_dotenv()
+
     print("🤖 Polygon Arbitrage Engine")
     print("=" * 40)
     
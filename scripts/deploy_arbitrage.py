@@ -1,10 +1,16 @@
 
-from brownie import PolygonArbitrageEngine, accounts, config, network
+from brownie import ArbitrageLens, PolygonArbitrageEngine, accounts, config, network
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Polygon mainnet flash loan providers and DEX routers
+BALANCER_VAULT = "0xBA12222222228d8Ba445958a75a0704d566BF2C8"
+AAVE_V3_POOL = "0x794a61358D6845594F94dc1DB02A252b5b4814aD"
+QUICKSWAP_ROUTER = "0xa5E0829CaCEd8fFDD4De3c43696c57F7D7A678ff"
+SUSHISWAP_ROUTER = "0x1b02dA8Cb0d097eB8D57A175b88c7D8b47997506"
+
 def main():
     """
     Deploy the PolygonArbitrageEngine contract
@@ -23,6 +29,10 @@ def main():
     # Deploy the contract
     print("Deploying PolygonArbitrageEngine...")
     arbitrage_engine = PolygonArbitrageEngine.deploy(
+        BALANCER_VAULT,
+        AAVE_V3_POOL,
+        QUICKSWAP_ROUTER,
+        SUSHISWAP_ROUTER,
         {"from": acct}
     )
     
@@ -42,9 +52,22 @@ def main():
         acct.transfer(arbitrage_engine.address, funding_amount * 1e18)
         print(f"Contract balance: {arbitrage_engine.balance() / 1e18:.4f} MATIC")
     
+    # Stateless quoting lens used by the scanner for single-call scans
+    print("\nDeploying ArbitrageLens...")
+    lens = ArbitrageLens.deploy({"from": acct})
+    print(f"✅ Lens deployed at: {lens.address}")
+    
+    # Extra sender keys the scanner may trade from in parallel
+    executor_keys = [key.strip() for key in os.getenv('EXECUTOR_PRIVATE_KEYS', '').split(',') if key.strip()]
+    for key in executor_keys:
+        executor = accounts.add(key).address
+        arbitrage_engine.setExecutor(executor, True, {"from": acct})
+        print(f"✅ Executor approved: {executor}")
+    
     print(f"\n🎉 Deployment complete!")
     print(f"📋 Add this to your .env file:")
     print(f"ARBITRAGE_CONTRACT_ADDRESS={arbitrage_engine.address}")
+    print(f"LENS_CONTRACT_ADDRESS={lens.address}")
     
     return arbitrage_engine
 
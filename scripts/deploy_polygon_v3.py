@@ -6,6 +6,12 @@ from brownie.network.gas.strategies import LinearScalingStrategy
 # Polygon Aave V3 Pool Addresses Provider
 POLYGON_AAVE_V3_POOL_ADDRESSES_PROVIDER = "0xa97684ead0e402dC232d5A977953DF7ECBaB3CDb"
 
+# V2-compatible routers the contract may swap through (first one is the default)
+POLYGON_ROUTERS = [
+    "0xa5E0829CaCEd8fFDD4De3c43696c57F7D7A678ff",  # QuickSwap
+    "0x1b02dA8Cb0d097eB8D57A175b88c7D8b47997506",  # SushiSwap
+]
+
 def main():
     """
     Deploy FlashloanV3Polygon contract on Polygon network
@@ -24,6 +30,7 @@ def main():
     # Deploy the contract
     flashloan = FlashloanV3Polygon.deploy(
         POLYGON_AAVE_V3_POOL_ADDRESSES_PROVIDER,
+        POLYGON_ROUTERS,
         {"from": account, "gas_limit": 3000000}
     )
     
@@ -1,4 +1,5 @@
 
+import os
 import time
 import json
 import requests
@@ -7,6 +8,9 @@ from web3 import Web3
 import threading
 from datetime import datetime
 
+from automation.failures import failures
+from automation.standalone_bot import TOKEN_DECIMALS, build_quote_grid
+
 class PolygonArbitrageBot:
     def __init__(self, contract_address, private_key):
         self.contract = Contract.from_abi(
@@ -55,56 +59,57 @@ class PolygonArbitrageBot:
             }
             
             if token_address in token_map:
+                if not failures.allow('coingecko'):
+                    return 0
                 url = f"https://api.coingecko.com/api/v3/simple/price?ids={token_map[token_address]}&vs_currencies=usd"
                 response = requests.get(url, timeout=5)
+                response.raise_for_status()
                 data = response.json()
+                failures.record_success('coingecko')
                 return float(list(data.values())[0]['usd'])
         except Exception as e:
+            failures.record_failure('coingecko', e)
             print(f"Error fetching price for {token_address}: {e}")
         return 0
 
+    def build_quote_grid(self):
+        """Every (pair, amount, dexA, dexB) combination quoted by a scan"""
+        return build_quote_grid(self.tokens, self.dexes, self.trade_amounts, decimals=TOKEN_DECIMALS)
+
     def scan_arbitrage_opportunities(self):
         """Scan for profitable arbitrage opportunities"""
         opportunities = []
+        grid = self.build_quote_grid()
         
-        token_pairs = [
-            ('WMATIC', 'USDC'),
-            ('WMATIC', 'WETH'), 
-            ('USDC', 'WETH'),
-            ('WMATIC', 'DAI'),
-            ('USDC', 'DAI')
-        ]
+        # Quote the whole grid in a single eth_call
+        if not failures.allow('rpc'):
+            print(f"RPC circuit open, skipping scan: {failures.circuit('rpc').last_error}")
+            return opportunities
+        try:
+            profits, profitable = self.contract.checkArbitrageOpportunities(
+                [(q['token_a'], q['token_b'], q['amount'], q['dex_a'], q['dex_b']) for q in grid]
+            )
+        except Exception as e:
+            failures.record_failure('rpc', e)
+            print(f"Error quoting {len(grid)} routes: {e}")
+            return opportunities
+        failures.record_success('rpc')
         
-        for token_a_name, token_b_name in token_pairs:
-            token_a = self.tokens[token_a_name]
-            token_b = self.tokens[token_b_name]
+        for quote, profit, is_profitable in zip(grid, profits, profitable):
+            if not is_profitable:
+                continue
             
-            for amount in self.trade_amounts:
-                try:
-                    # Check arbitrage opportunity
-                    profit, profitable = self.contract.checkArbitrageOpportunity(
-                        token_a, token_b, amount
-                    )
-                    
-                    if profitable:
-                        # Calculate USD value of profit
-                        token_price = self.get_token_price_usd(token_a)
-                        profit_usd = (profit / 1e18) * token_price
-                        
-                        if profit_usd >= self.min_profit_usd:
-                            opportunities.append({
-                                'token_a': token_a,
-                                'token_b': token_b,
-                                'token_a_name': token_a_name,
-                                'token_b_name': token_b_name,
-                                'amount': amount,
-                                'profit': profit,
-                                'profit_usd': profit_usd,
-                                'timestamp': datetime.now()
-                            })
-                            
-                except Exception as e:
-                    print(f"Error checking {token_a_name}/{token_b_name}: {e}")
+            # Calculate USD value of profit
+            token_price = self.get_token_price_usd(quote['token_a'])
+            profit_usd = profit / 10 ** TOKEN_DECIMALS[quote['token_a_name']] * token_price
+            
+            if profit_usd >= self.min_profit_usd:
+                opportunities.append({
+                    **quote,
+                    'profit': profit,
+                    'profit_usd': profit_usd,
+                    'timestamp': datetime.now()
+                })
                     
         return opportunities
 
@@ -112,8 +117,9 @@ class PolygonArbitrageBot:
         """Execute profitable arbitrage trade"""
         try:
             print(f"\n🔥 EXECUTING ARBITRAGE:")
-            print(f"Pair: {opportunity['token_a_name']}/{opportunity['token_b_name']}")
-            print(f"Amount: {opportunity['amount'] / 1e18:.2f}")
+            print(f"Pair: {opportunity['token_a_name']}/{opportunity['token_b_name']} "
+                  f"({opportunity['dex_a_name']} -> {opportunity['dex_b_name']})")
+            print(f"Amount: {opportunity['amount'] / 10 ** TOKEN_DECIMALS[opportunity['token_a_name']]:.2f}")
             print(f"Expected Profit: ${opportunity['profit_usd']:.2f}")
             
             # Check gas price
@@ -128,8 +134,8 @@ class PolygonArbitrageBot:
                 opportunity['amount'],            # amount to borrow
                 opportunity['token_a'],           # tokenA
                 opportunity['token_b'],           # tokenB  
-                self.dexes['QUICKSWAP'],         # dexA
-                self.dexes['SUSHISWAP'],         # dexB
+                opportunity['dex_a'],            # dexA
+                opportunity['dex_b'],            # dexB
                 opportunity['profit'],            # expected profit
                 {"from": self.account, "gas_limit": 314600}
             )
@@ -193,7 +199,8 @@ def main():
     """Main bot execution"""
     
     # Load configuration
-    contract_address = input("Enter FlashloanV3Polygon contract address: ")
+    contract_address = os.getenv("FLASHLOAN_CONTRACT_ADDRESS") or \
+        input("Enter FlashloanV3Polygon contract address: ")
     private_key = config["wallets"]["from_key"]
     
     # Initialize and start bot
@@ -1,4 +1,11 @@
 import pytest
+from brownie import MockUniswapV2Pair
+
+# Shared by the modules that ABI-encode ArbitrageParams: `from conftest import abi_encode`
+try:
+    from eth_abi import encode as abi_encode
+except ImportError:  # eth-abi < 4
+    from eth_abi import encode_abi as abi_encode
 
 
 @pytest.fixture(autouse=True)
@@ -137,3 +144,156 @@ def WBTC(Contract):
 @pytest.fixture(scope="module")
 def ZRX(Contract):
     yield Contract("0xE41d2489571d322189246DaFA5ebDe1F4699F498")
+
+
+# Local-chain fixtures - mock tokens, V2 DEXes and flash loan providers so the
+# Polygon contracts can be exercised without a fork.
+
+
+def seed_pair(factory, token_a, token_b, amount_a, amount_b, owner):
+    """
+    Create (if needed) and fund a mock V2 pair with the given reserves.
+    """
+    pair_address = factory.getPair(token_a, token_b)
+    if pair_address == "0x0000000000000000000000000000000000000000":
+        factory.createPair(token_a, token_b, {"from": owner})
+        pair_address = factory.getPair(token_a, token_b)
+    token_a.mint(pair_address, amount_a, {"from": owner})
+    token_b.mint(pair_address, amount_b, {"from": owner})
+    pair = MockUniswapV2Pair.at(pair_address)
+    pair.sync({"from": owner})
+    return pair
+
+
+@pytest.fixture(scope="module")
+def mock_tokens(MockERC20, accounts):
+    """
+    Yield four mock tokens: an 18-decimal base asset and three quote assets.
+    """
+    yield {
+        "WMATIC": MockERC20.deploy("Wrapped Matic", "WMATIC", 18, {"from": accounts[0]}),
+        "USDC": MockERC20.deploy("USD Coin", "USDC", 6, {"from": accounts[0]}),
+        "WETH": MockERC20.deploy("Wrapped Ether", "WETH", 18, {"from": accounts[0]}),
+        "WBTC": MockERC20.deploy("Wrapped BTC", "WBTC", 8, {"from": accounts[0]}),
+    }
+
+
+@pytest.fixture(scope="module")
+def quickswap(MockUniswapV2Factory, MockUniswapV2Router, accounts):
+    factory = MockUniswapV2Factory.deploy({"from": accounts[0]})
+    router = MockUniswapV2Router.deploy(factory, {"from": accounts[0]})
+    yield factory, router
+
+
+@pytest.fixture(scope="module")
+def sushiswap(MockUniswapV2Factory, MockUniswapV2Router, accounts):
+    factory = MockUniswapV2Factory.deploy({"from": accounts[0]})
+    router = MockUniswapV2Router.deploy(factory, {"from": accounts[0]})
+    yield factory, router
+
+
+@pytest.fixture(scope="module")
+def markets(mock_tokens, quickswap, sushiswap, accounts):
+    """
+    Seed WMATIC/USDC, WMATIC/WETH and WMATIC/WBTC on both DEXes. Each quote
+    asset is ~5% cheaper on SushiSwap, so WMATIC -> X on SushiSwap followed by
+    X -> WMATIC on QuickSwap is profitable.
+    """
+    wmatic = mock_tokens["WMATIC"]
+    depth = 1_000_000 * 10 ** 18
+    pairs = {}
+    for symbol in ("USDC", "WETH", "WBTC"):
+        token = mock_tokens[symbol]
+        quote_depth = 1_000_000 * 10 ** token.decimals()
+        pairs[("quickswap", symbol)] = seed_pair(
+            quickswap[0], wmatic, token, depth, quote_depth, accounts[0]
+        )
+        pairs[("sushiswap", symbol)] = seed_pair(
+            sushiswap[0], wmatic, token, depth, quote_depth * 105 // 100, accounts[0]
+        )
+    yield pairs
+
+
+@pytest.fixture(scope="module")
+def balancer_vault(MockBalancerVault, mock_tokens, accounts):
+    vault = MockBalancerVault.deploy({"from": accounts[0]})
+    for token in mock_tokens.values():
+        token.mint(vault, 10_000_000 * 10 ** token.decimals(), {"from": accounts[0]})
+    yield vault
+
+
+@pytest.fixture(scope="module")
+def aave_pool(MockAavePool, mock_tokens, accounts):
+    pool = MockAavePool.deploy({"from": accounts[0]})
+    for token in mock_tokens.values():
+        token.mint(pool, 10_000_000 * 10 ** token.decimals(), {"from": accounts[0]})
+    yield pool
+
+
+@pytest.fixture(scope="module")
+def arbitrage_engine(PolygonArbitrageEngine, balancer_vault, aave_pool, quickswap, sushiswap, markets, accounts):
+    """
+    Deploy `PolygonArbitrageEngine` against the mock providers and routers and
+    fund it above `MIN_WALLET_BALANCE`.
+    """
+    engine = PolygonArbitrageEngine.deploy(
+        balancer_vault, aave_pool, quickswap[1], sushiswap[1], {"from": accounts[0]}
+    )
+    accounts[0].transfer(engine, "20 ether")
+    yield engine
+
+
+@pytest.fixture(scope="module")
+def flashloan_v3_polygon(FlashloanV3Polygon, MockPoolAddressesProvider, aave_pool, quickswap, sushiswap, markets, accounts):
+    """
+    Deploy `FlashloanV3Polygon` against the mock Aave pool with both mock
+    routers allowlisted.
+    """
+    provider = MockPoolAddressesProvider.deploy(aave_pool, {"from": accounts[0]})
+    yield FlashloanV3Polygon.deploy(
+        provider, [quickswap[1], sushiswap[1]], {"from": accounts[0]}
+    )
+
+
+@pytest.fixture(scope="module")
+def arbitrage_lens(ArbitrageLens, accounts):
+    yield ArbitrageLens.deploy({"from": accounts[0]})
+
+
+@pytest.fixture(scope="module")
+def lending_pool_v1(MockLendingPoolV1, mock_tokens, accounts):
+    pool = MockLendingPoolV1.deploy({"from": accounts[0]})
+    accounts[0].transfer(pool, "10 ether")
+    for token in mock_tokens.values():
+        token.mint(pool, 10_000_000 * 10 ** token.decimals(), {"from": accounts[0]})
+    yield pool
+
+
+@pytest.fixture(scope="module")
+def local_flashloan_v1(FlashloanV1, MockPoolAddressesProvider, lending_pool_v1, accounts):
+    """
+    Deploy `FlashloanV1` against the mock Aave V1 pool instead of the fork.
+    """
+    provider = MockPoolAddressesProvider.deploy(lending_pool_v1, {"from": accounts[0]})
+    yield FlashloanV1.deploy(provider, {"from": accounts[0]})
+
+
+@pytest.fixture(scope="module")
+def aave_pool_v2(MockAavePool, mock_tokens, accounts):
+    """
+    Mock Aave pool charging the V2 flash loan premium of 0.09%.
+    """
+    pool = MockAavePool.deploy({"from": accounts[0]})
+    pool.setFlashLoanPremium(9, {"from": accounts[0]})
+    for token in mock_tokens.values():
+        token.mint(pool, 10_000_000 * 10 ** token.decimals(), {"from": accounts[0]})
+    yield pool
+
+
+@pytest.fixture(scope="module")
+def local_flashloan_v2(FlashloanV2, MockPoolAddressesProvider, aave_pool_v2, accounts):
+    """
+    Deploy `FlashloanV2` against the mock Aave V2 pool instead of the fork.
+    """
+    provider = MockPoolAddressesProvider.deploy(aave_pool_v2, {"from": accounts[0]})
+    yield FlashloanV2.deploy(provider, {"from": accounts[0]})
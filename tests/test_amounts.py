@@ -0,0 +1,82 @@
+# Tests for fixed-point token amounts: exact parsing and formatting, no
+# silent mixing of decimals, and per-token scales so a 6- or 8-decimal
+# token's profit is not read as if it had 18 decimals.
+
+import pytest
+
+from automation.amounts import Amount, NativePrices, TokenScales, format_units, parse_units, rescale
+
+USDC = "0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174"
+WBTC = "0x1BFD67037B42Cf73acF2047067bd4F2C47D9BfD6"
+WMATIC = "0x0d500B1d8E8eF31E21C99d1Db9A6444d3ADf1270"
+
+
+@pytest.mark.parametrize("value, decimals, raw", [
+    ("1.5", 6, 1_500_000),
+    (2, 18, 2 * 10 ** 18),
+    (0.1, 18, 10 ** 17),
+    ("1e-6", 6, 1),
+    ("2.5E3", 0, 2500),
+    ("-0.25", 2, -25),
+    ("1.23456789", 6, 1_234_567),
+    ("1e-9", 6, 0),
+])
+def test_parse_units(value, decimals, raw):
+    assert parse_units(value, decimals) == raw
+
+
+def test_parse_units_rejects_garbage():
+    for value in ("", "abc", "1.2.3", "."):
+        with pytest.raises(ValueError):
+            parse_units(value, 6)
+
+
+def test_format_and_rescale():
+    assert format_units(1_500_000, 6) == "1.5"
+    assert format_units(-1, 18) == "-0.000000000000000001"
+    assert format_units(1_234_567, 6, places=2) == "1.23"
+    assert format_units(42, 0) == "42"
+    assert rescale(10 ** 18, 18, 6) == 10 ** 6
+    assert rescale(123, 6, 8) == 12_300
+    assert rescale(10 ** 12 - 1, 18, 6) == 0
+
+
+def test_amounts_only_mix_with_matching_decimals():
+    budget = Amount.of("250", 18)
+    assert budget.mul_div(80, 100) == Amount.of("200", 18)
+    assert budget - Amount.of("50", 18) > Amount.of("199.99", 18)
+    assert str(budget.rescale(6)) == "250" and budget.rescale(6).raw == 250 * 10 ** 6
+    assert "%.2f" % float(budget // 3) == "83.33"
+    with pytest.raises(ValueError):
+        budget + Amount.of("1", 6)
+    with pytest.raises(ValueError):
+        budget < Amount.of("1", 6)
+    with pytest.raises(TypeError):
+        budget + 1
+    assert Amount(5, 6) != Amount(5, 18)
+    assert not Amount(0, 18)
+
+
+def test_token_scales_value_profits_in_each_tokens_decimals():
+    scales = TokenScales({USDC: 6, WBTC: 8, WMATIC: 18})
+    assert USDC.lower() in scales and WBTC in scales
+    # One whole token is 10**6 base units of USDC and 10**8 of WBTC, not 10**18
+    assert scales.units(USDC, 1.0) == 10 ** 6
+    assert scales.units(WBTC, 1) == 10 ** 8
+    assert scales.units(WBTC, "0.5") == 5 * 10 ** 7
+    assert scales.convert(10 ** 18, 18, USDC) == 10 ** 6
+    assert scales.to_float(WBTC, 150_000_000) == 1.5
+    assert scales.amount(USDC, 2_500_000) == Amount.of("2.5", 6)
+
+
+def test_native_prices_convert_through_pool_reserves():
+    prices = NativePrices(WMATIC)
+    # Pool of 2,000,000 WMATIC against 1,000,000 USDC: 1 USDC = 2 WMATIC
+    prices.set_rate(USDC, 2_000_000 * 10 ** 18, 1_000_000 * 10 ** 6)
+    assert prices.to_native(USDC, 5 * 10 ** 6) == 10 * 10 ** 18
+    assert prices.from_native(USDC, 10 ** 18) == 500_000
+    assert prices.from_native(USDC, 1) == 1  # costs round up
+    assert prices.to_native(WMATIC.lower(), 7) == 7
+    assert prices.to_native(WBTC, 10 ** 8) is None and prices.native_rate(WBTC) is None
+    prices.set_rate(WBTC, 0, 10 ** 8)
+    assert prices.rate(WBTC) is None
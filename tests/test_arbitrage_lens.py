@@ -0,0 +1,85 @@
+# Local-chain tests for ArbitrageLens and the scanner's blob decoder, against
+# the mock V2 markets seeded in `tests/conftest.py`.
+
+import time
+
+from automation.lens import decode_lens_results
+
+AMOUNTS = [100 * 10 ** 18, 1_000 * 10 ** 18, 10_000 * 10 ** 18]
+SYMBOLS = ("USDC", "WETH", "WBTC")
+
+
+def scan_args(mock_tokens, quickswap, sushiswap, min_profit_bps=30):
+    wmatic = mock_tokens["WMATIC"]
+    return (
+        [quickswap[0], sushiswap[0]],
+        [30, 30],
+        [wmatic] * len(SYMBOLS),
+        [mock_tokens[symbol] for symbol in SYMBOLS],
+        AMOUNTS,
+        min_profit_bps,
+    )
+
+
+def router_round_trip(router_a, router_b, token_a, token_b, amount):
+    mid = router_a.getAmountsOut(amount, [token_a, token_b])[1]
+    return router_b.getAmountsOut(mid, [token_b, token_a])[1]
+
+
+def test_lens_matches_router_quotes(arbitrage_lens, mock_tokens, markets, quickswap, sushiswap):
+    """
+    Test every profitable result decodes to the same profit the routers quote,
+    and only SushiSwap -> QuickSwap routes are reported.
+    """
+    blob = arbitrage_lens.scan(*scan_args(mock_tokens, quickswap, sushiswap))
+    results = decode_lens_results(bytes(blob))
+    routers = [quickswap[1], sushiswap[1]]
+
+    assert len(results) == len(SYMBOLS) * len(AMOUNTS)
+    for result in results:
+        assert (result.dex_a, result.dex_b) == (1, 0)
+        amount = AMOUNTS[result.amount_index]
+        token_b = mock_tokens[SYMBOLS[result.pair_index]]
+        amount_out = router_round_trip(
+            routers[result.dex_a], routers[result.dex_b], mock_tokens["WMATIC"], token_b, amount
+        )
+        assert result.profit == amount_out - amount
+
+
+def test_lens_skips_missing_pools(arbitrage_lens, mock_tokens, quickswap, sushiswap):
+    """
+    Test pairs without a pool on a factory produce no results instead of reverting.
+    """
+    blob = arbitrage_lens.scan(
+        [quickswap[0], sushiswap[0]], [30, 30],
+        [mock_tokens["USDC"]], [mock_tokens["WETH"]], AMOUNTS, 0
+    )
+    assert bytes(blob) == b""
+
+
+def test_lens_vs_per_call_quoting(arbitrage_lens, mock_tokens, markets, quickswap, sushiswap):
+    """
+    Benchmark one lens call against quoting every route through the routers.
+    """
+    args = scan_args(mock_tokens, quickswap, sushiswap)
+    routers = [quickswap[1], sushiswap[1]]
+
+    start = time.perf_counter()
+    lens_results = decode_lens_results(bytes(arbitrage_lens.scan(*args)))
+    lens_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    calls = 0
+    per_call_hits = 0
+    for symbol in SYMBOLS:
+        for a, b in ((0, 1), (1, 0)):
+            for amount in AMOUNTS:
+                amount_out = router_round_trip(routers[a], routers[b], mock_tokens["WMATIC"], mock_tokens[symbol], amount)
+                calls += 2
+                per_call_hits += amount_out * 10000 > amount * 10030
+    per_call_time = time.perf_counter() - start
+
+    print(f"lens: 1 eth_call in {lens_time * 1000:.1f}ms | per-call: {calls} eth_calls in "
+          f"{per_call_time * 1000:.1f}ms")
+    assert len(lens_results) == per_call_hits
+    assert lens_time < per_call_time
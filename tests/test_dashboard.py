@@ -0,0 +1,126 @@
+# Tests for the dashboard's polled endpoints: /api/status is served from a
+# snapshot re-serialized only on change, unchanged polls get 304 through
+# ETag/If-None-Match, large history pages are gzipped when accepted, and
+# trace summaries and the quarantine come from the scanner process through
+# the trade store.
+
+import gzip
+import json
+import threading
+
+import pytest
+
+import dashboard.app as dashboard_app
+from automation.failures import FailureTracker
+from automation.tracing import StageTracer
+from automation.trade_store import TradeStore
+from benchmarks.trade_store import make_opportunities
+
+
+@pytest.fixture
+def client():
+    dashboard_app.app.config["TESTING"] = True
+    yield dashboard_app.app.test_client()
+    dashboard_app.status.update(status="Stopped", is_running=False)
+
+
+def test_unchanged_status_poll_is_not_modified(client):
+    first = client.get("/api/status")
+    assert first.status_code == 200 and first.get_json()["status"] == "Stopped"
+    etag = first.headers["ETag"]
+
+    again = client.get("/api/status", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.data == b""
+    assert again.headers["ETag"] == etag
+
+    version = dashboard_app.status.version
+    assert not dashboard_app.status.update(status="Stopped")
+    assert dashboard_app.status.version == version
+
+    dashboard_app.status.update(status="Running", is_running=True)
+    changed = client.get("/api/status", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+    assert changed.get_json()["is_running"] is True
+
+
+def test_history_is_gzipped_and_conditional(client, tmp_path, monkeypatch):
+    store = TradeStore(str(tmp_path / "history.db"))
+    store.record_opportunities(make_opportunities(100), block_number=1)
+    store.flush()
+    monkeypatch.setattr(dashboard_app, "get_trade_store", lambda: store)
+
+    plain = client.get("/api/history/opportunities?limit=100")
+    assert plain.status_code == 200 and "Content-Encoding" not in plain.headers
+    assert len(plain.get_json()["items"]) == 100
+
+    zipped = client.get("/api/history/opportunities?limit=100", headers={"Accept-Encoding": "gzip"})
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert len(zipped.data) < len(plain.data) // 3
+    assert json.loads(gzip.decompress(zipped.data)) == plain.get_json()
+    assert zipped.headers["ETag"] == plain.headers["ETag"]
+
+    cached = client.get("/api/history/opportunities?limit=100",
+                        headers={"If-None-Match": plain.headers["ETag"], "Accept-Encoding": "gzip"})
+    assert cached.status_code == 304
+    store.close()
+
+
+def test_trace_summary_comes_from_the_scanner_process(client, tmp_path, monkeypatch):
+    store = TradeStore(str(tmp_path / "history.db"), flush_interval=0.01)
+    monkeypatch.setattr(dashboard_app, "get_trade_store", lambda: store)
+    # Nothing published yet: the dashboard's own (disabled) tracer answers
+    assert client.get("/api/trace/summary").get_json()["source"] == "dashboard"
+
+    scanner_tracer = StageTracer(enabled=True)  # stands in for the tracer of a scanner process
+    scanner_tracer.record("scan", 2_000_000)
+    store.save_report("trace", scanner_tracer.summary_dict())
+    assert store.flush(timeout=5)
+    summary = client.get("/api/trace/summary").get_json()
+    assert summary["source"] == "scanner" and summary["enabled"] and summary["published_at"]
+    assert [(s["stage"], s["p50_ms"]) for s in summary["stages"]] == [("scan", 2.0)]
+
+    store.save_report("trace", scanner_tracer.summary_dict(), scope="polygon")
+    assert store.flush(timeout=5)
+    assert set(client.get("/api/trace/summary").get_json()["chains"]) == {"", "polygon"}
+    store.close()
+
+
+def test_stack_samples_cover_this_process_only(client):
+    stop = threading.Event()
+
+    def in_process_scan_loop():
+        stop.wait(5)
+
+    thread = threading.Thread(target=in_process_scan_loop, daemon=True)
+    thread.start()
+    try:
+        stacks = client.get("/api/trace/stacks?seconds=0.1&interval_ms=5").get_data(as_text=True)
+    finally:
+        stop.set()
+        thread.join()
+    assert "in_process_scan_loop (test_dashboard.py:" in stacks
+
+
+def test_stack_sampling_rejects_bad_arguments_and_overlap(client):
+    assert client.get("/api/trace/stacks?seconds=abc").status_code == 400
+    assert client.get("/api/trace/stacks?interval_ms=nan").status_code == 400
+
+    with dashboard_app._sampling:
+        assert client.get("/api/trace/stacks?seconds=0.1").status_code == 429
+
+
+def test_quarantine_comes_from_the_scanner_process(client, tmp_path, monkeypatch):
+    store = TradeStore(str(tmp_path / "history.db"), flush_interval=0.01)
+    monkeypatch.setattr(dashboard_app, "get_trade_store", lambda: store)
+    assert client.get("/api/quarantine").get_json()["source"] == "dashboard"
+
+    scanner_failures = FailureTracker()
+    scanner_failures.record_failure("quote", Exception("execution reverted: INSUFFICIENT_LIQUIDITY"),
+                                    key=("quickswap", "WMATIC", "USDC"))
+    store.save_report("quarantine", scanner_failures.quarantine())
+    assert store.flush(timeout=5)
+    report = client.get("/api/quarantine").get_json()
+    assert report["source"] == "scanner"
+    assert [route["key"] for route in report["routes"]] == [["quickswap", "WMATIC", "USDC"]]
+    assert report["stats"]["route_failures"] == 1
+    store.close()
@@ -0,0 +1,131 @@
+# Local-chain tests for the PolygonArbitrageEngine event indexer: chunked
+# concurrent backfill, resuming from the checkpoint, rolling back a reorged
+# block and reconciling realized against expected profit.
+
+import json
+
+import pytest
+from brownie import chain, web3
+from conftest import abi_encode
+
+from automation.arbitrage_scanner import ArbitrageOpportunity, TokenPair
+from automation.event_indexer import EventIndexer, reconcile_trades
+from automation.jsonrpc import JsonRpcClient
+from automation.trade_store import TradeStore
+
+ARBITRAGE_PARAMS = "(address,address,address,address,uint256,uint256)"
+LOAN = 1_000 * 10 ** 18
+
+
+@pytest.fixture
+def client():
+    client = JsonRpcClient(web3.provider.endpoint_uri, pool_size=4)
+    yield client
+    client.close()
+
+
+def trade(accounts, engine, mock_tokens, quickswap, sushiswap, symbol="USDC"):
+    leg = (mock_tokens["WMATIC"].address, mock_tokens[symbol].address,
+           sushiswap[1].address, quickswap[1].address, LOAN, 30)
+    return engine.executeBalancerFlashLoan(
+        [mock_tokens["WMATIC"]], [LOAN], abi_encode([ARBITRAGE_PARAMS], [leg]), {"from": accounts[0]}
+    )
+
+
+def indexed_profits(indexer):
+    return [int(json.loads(args)["profit"]) for (args,) in indexer.db.execute(
+        "SELECT args FROM contract_events WHERE event = 'ArbitrageExecuted' ORDER BY block"
+    )]
+
+
+def test_backfill_in_chunks_matches_contract_totals(
+        accounts, arbitrage_engine, mock_tokens, quickswap, sushiswap, client, tmp_path):
+    for symbol in ("USDC", "WETH", "WBTC"):
+        trade(accounts, arbitrage_engine, mock_tokens, quickswap, sushiswap, symbol)
+        chain.mine(5)
+
+    indexer = EventIndexer(client, arbitrage_engine.address, str(tmp_path / "events.db"),
+                           start_block=arbitrage_engine.tx.block_number, chunk_size=2, workers=3, reorg_window=0)
+    assert indexer.backfill(chain.height) == chain.height
+
+    profits = indexed_profits(indexer)
+    assert len(profits) == arbitrage_engine.totalTrades() == 3
+    assert sum(profits) == arbitrage_engine.totalProfits()
+    assert indexer.stats["requests"] > 3
+    indexer.close()
+
+
+def test_backfill_resumes_from_checkpoint(
+        accounts, arbitrage_engine, mock_tokens, quickswap, sushiswap, client, tmp_path):
+    path = str(tmp_path / "events.db")
+    start = arbitrage_engine.tx.block_number
+    first = trade(accounts, arbitrage_engine, mock_tokens, quickswap, sushiswap)
+    chain.mine(3)
+    trade(accounts, arbitrage_engine, mock_tokens, quickswap, sushiswap, "WETH")
+
+    indexer = EventIndexer(client, arbitrage_engine.address, path, start_block=start, reorg_window=0)
+    indexer.backfill(first.block_number)
+    assert len(indexed_profits(indexer)) == 1
+    indexer.close()
+
+    resumed = EventIndexer(client, arbitrage_engine.address, path, start_block=start, reorg_window=0)
+    assert resumed.checkpoint == first.block_number
+    resumed.backfill(chain.height)
+    assert len(indexed_profits(resumed)) == 2
+    resumed.close()
+
+
+def test_reorged_trade_is_rolled_back(
+        accounts, arbitrage_engine, mock_tokens, quickswap, sushiswap, client, tmp_path):
+    indexer = EventIndexer(client, arbitrage_engine.address, str(tmp_path / "events.db"),
+                           start_block=arbitrage_engine.tx.block_number, reorg_window=8)
+    indexer.poll()
+
+    tx = trade(accounts, arbitrage_engine, mock_tokens, quickswap, sushiswap)
+    indexer.poll()
+    assert len(indexed_profits(indexer)) == 1
+    original_hash = web3.eth.get_block(tx.block_number).hash
+
+    # Replace the trade's block with empty ones: the same heights now have other hashes
+    chain.undo()
+    chain.mine(2)
+    assert web3.eth.get_block(tx.block_number).hash != original_hash
+
+    indexer.poll()
+    assert indexed_profits(indexer) == []
+    assert indexer.stats["reorgs"] == 1 and indexer.stats["rolled_back"] == 1
+    assert indexer.checkpoint == chain.height
+    indexer.close()
+
+
+def test_reconcile_realized_against_expected(
+        accounts, arbitrage_engine, mock_tokens, quickswap, sushiswap, client, tmp_path):
+    path = str(tmp_path / "trades.db")
+    tx = trade(accounts, arbitrage_engine, mock_tokens, quickswap, sushiswap)
+    realized = tx.events["ArbitrageExecuted"]["profit"]
+
+    store = TradeStore(path, flush_interval=0.01)
+    pair = TokenPair(mock_tokens["WMATIC"].address, mock_tokens["USDC"].address, "WMATIC", "USDC", 18, 6)
+    expected = realized * 2
+    store.record_transaction(tx.txid, [ArbitrageOpportunity(pair, "sushiswap", "quickswap", LOAN, expected, 0.3, 200000)])
+    store.record_receipt(tx.txid, {"status": 1, "blockNumber": tx.block_number, "gasUsed": tx.gas_used}, 1,
+                         [(mock_tokens["WMATIC"].address, realized)])
+    store.close()
+
+    indexer = EventIndexer(client, arbitrage_engine.address, path,
+                           start_block=arbitrage_engine.tx.block_number, reorg_window=0)
+    indexer.backfill(chain.height)
+    indexer.close()
+
+    report = reconcile_trades(path)
+    (row,) = report["items"]
+    assert row["tx_hash"] == tx.txid
+    assert row["realized_profit"] == str(realized)
+    assert row["expected_profit"] == str(expected)
+    assert row["difference"] == str(-realized)
+    assert row["realized_pct"] == 50.0
+    wmatic = mock_tokens["WMATIC"].address.lower()
+    assert row["token_a"] == wmatic
+    assert report["totals"]["by_token"] == {wmatic: {"realized_profit": str(realized),
+                                                     "expected_profit_sent": str(expected),
+                                                     "realized_profit_sent": str(realized)}}
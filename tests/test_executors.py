@@ -0,0 +1,161 @@
+# Local-chain tests for parallel execution: owner-approved executor keys, each
+# with its own nonce sequence, land independent trades in the same block; a
+# stuck sender only blocks itself and low senders are topped up by the funder.
+
+import brownie
+import pytest
+from brownie import web3
+from conftest import abi_encode
+
+from automation.executors import SenderPool
+
+ARBITRAGE_PARAMS = "(address,address,address,address,uint256,uint256)"
+LOAN = 1_000 * 10 ** 18
+
+
+@pytest.fixture
+def executors(accounts, arbitrage_engine):
+    senders = [accounts.add() for _ in range(3)]
+    for sender in senders:
+        accounts[0].transfer(sender, "5 ether")
+    for sender in senders[:2]:
+        arbitrage_engine.setExecutor(sender, True, {"from": accounts[0]})
+    yield senders
+
+
+@pytest.fixture
+def manual_mining():
+    """Queue transactions until `mine()` puts everything pending into one block"""
+    web3.provider.make_request("miner_stop", [])
+
+    def mine():
+        web3.provider.make_request("evm_mine", [])
+
+    yield mine
+    web3.provider.make_request("miner_start", [])
+
+
+def engine_contract(arbitrage_engine):
+    return web3.eth.contract(address=arbitrage_engine.address, abi=arbitrage_engine.abi)
+
+
+def send_trade(pool, sender, engine, mock_tokens, quickswap, sushiswap, symbol):
+    leg = (mock_tokens["WMATIC"].address, mock_tokens[symbol].address,
+           sushiswap[1].address, quickswap[1].address, LOAN, 30)
+    call = engine.functions.executeBalancerFlashLoan(
+        [mock_tokens["WMATIC"].address], [LOAN], abi_encode([ARBITRAGE_PARAMS], [leg])
+    )
+    transaction = call.build_transaction({
+        "from": sender.address, "gas": 1_500_000, "gasPrice": web3.eth.gas_price, "nonce": pool.next_nonce(sender),
+    })
+    tx_hash = web3.eth.send_raw_transaction(web3.eth.account.sign_transaction(transaction, sender.key).rawTransaction)
+    pool.broadcast(sender, tx_hash.hex())
+    return tx_hash
+
+
+def test_only_owner_and_executors_can_trade(accounts, arbitrage_engine, executors, mock_tokens):
+    with brownie.reverts("Not an executor"):
+        arbitrage_engine.executeBalancerFlashLoan([mock_tokens["WMATIC"]], [LOAN], b"", {"from": executors[2]})
+    with brownie.reverts("Ownable: caller is not the owner"):
+        arbitrage_engine.setExecutor(executors[2], True, {"from": executors[0]})
+
+    pool = SenderPool(web3, [sender.private_key for sender in executors])
+    assert pool.authorize(engine_contract(arbitrage_engine)) == [executors[2].address]
+    assert [sender.address for sender in pool.senders] == [executors[0].address, executors[1].address]
+
+
+def test_executor_cannot_trade_at_a_loss(accounts, arbitrage_engine, executors, mock_tokens, quickswap, sushiswap):
+    # The contract's own WMATIC could cover a losing round trip; it must revert instead
+    mock_tokens["WMATIC"].mint(arbitrage_engine, 100 * 10 ** 18, {"from": accounts[0]})
+    losing = (mock_tokens["WMATIC"].address, mock_tokens["USDC"].address,
+              quickswap[1].address, sushiswap[1].address, LOAN, 0)
+    with brownie.reverts("Arbitrage not profitable"):
+        arbitrage_engine.executeBalancerFlashLoan(
+            [mock_tokens["WMATIC"]], [LOAN], abi_encode([ARBITRAGE_PARAMS], [losing]), {"from": executors[0]}
+        )
+    assert mock_tokens["WMATIC"].balanceOf(arbitrage_engine) == 100 * 10 ** 18
+
+
+def test_resync_after_nonce_too_low(executors):
+    pool = SenderPool(web3, [executors[0].private_key])
+    pool.refresh()
+    sender = pool.acquire()
+    executors[0].transfer(executors[1], 1)  # uses the nonce behind the pool's back
+    stale = pool.next_nonce(sender)
+
+    # The node rejects `stale` as too low: the pool must not hand it out again
+    pool.resync(sender)
+    pool.release(sender)
+    assert sender.nonce == stale + 1 == web3.eth.get_transaction_count(sender.address)
+    assert pool.stats["resynced"] == 1
+
+
+def test_parallel_senders_land_in_the_same_block(
+        arbitrage_engine, executors, mock_tokens, quickswap, sushiswap, manual_mining):
+    engine = engine_contract(arbitrage_engine)
+    pool = SenderPool(web3, [sender.private_key for sender in executors[:2]])
+    pool.refresh()
+
+    first, second = pool.acquire(), pool.acquire()
+    assert first.address != second.address
+    assert pool.acquire() is None
+
+    hashes = [send_trade(pool, first, engine, mock_tokens, quickswap, sushiswap, "USDC"),
+              send_trade(pool, second, engine, mock_tokens, quickswap, sushiswap, "WETH")]
+    manual_mining()
+    receipts = [web3.eth.wait_for_transaction_receipt(tx_hash) for tx_hash in hashes]
+
+    assert all(receipt.status == 1 for receipt in receipts)
+    assert receipts[0].blockNumber == receipts[1].blockNumber
+    assert arbitrage_engine.totalTrades() == 2
+
+    for sender in (first, second):
+        pool.confirm(sender)
+        pool.release(sender)
+    assert pool.idle() == 2 and first.nonce == 1 and second.nonce == 1
+
+
+def test_stuck_sender_does_not_block_others(
+        arbitrage_engine, executors, mock_tokens, quickswap, sushiswap, manual_mining):
+    engine = engine_contract(arbitrage_engine)
+    pool = SenderPool(web3, [sender.private_key for sender in executors[:2]])
+    pool.refresh()
+
+    stuck = pool.acquire()
+    send_trade(pool, stuck, engine, mock_tokens, quickswap, sushiswap, "USDC")
+    # Receipt wait gave up: the sender keeps its nonce reserved
+    pool.release(stuck)
+    assert stuck.busy and stuck.stalled
+
+    other = pool.acquire()
+    assert other is not None and other.address != stuck.address
+    pool.release(other)
+
+    manual_mining()
+    pool.refresh()
+    assert not stuck.busy and stuck.nonce == 1
+
+
+def test_unused_nonce_is_returned(executors):
+    pool = SenderPool(web3, [executors[0].private_key])
+    pool.refresh()
+    sender = pool.acquire()
+    assert pool.next_nonce(sender) == 0
+    # Gas estimation failed before broadcast
+    pool.release(sender)
+    assert sender.nonce == 0 and not sender.busy
+
+
+def test_rebalance_tops_up_low_senders(accounts, executors):
+    funder = accounts.add()
+    accounts[0].transfer(funder, "20 ether")
+    pool = SenderPool(web3, [sender.private_key for sender in executors], funder_key=funder.private_key,
+                      min_balance=6 * 10 ** 18, target_balance=8 * 10 ** 18, funder_reserve=10 * 10 ** 18)
+    pool.refresh()
+
+    transfers = pool.rebalance()
+    # Each sender needs 3 ether; the 10 above the reserve covers all three
+    assert len(transfers) == 3
+    for sender in executors:
+        assert sender.balance() == 8 * 10 ** 18
+    assert pool.rebalance() == []
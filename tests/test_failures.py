@@ -0,0 +1,118 @@
+# Tests for the failure-tracking layer: dead routes are negatively cached with
+# growing backoff, repeated timeouts open a circuit, and the scanner stops
+# re-quoting a pair with no pool on one of the DEXes.
+
+import asyncio
+
+from automation.arbitrage_scanner import PolygonArbitrageScanner
+from automation.failures import DEAD_ROUTE, TRANSIENT, CircuitBreaker, FailureTracker, classify
+from automation.jsonrpc import JsonRpcError
+from mock_rpc import MockRpcServer, polygon_chain
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_classifies_errors():
+    assert classify(JsonRpcError(3, "execution reverted")) == DEAD_ROUTE
+    assert classify(ValueError("UniswapV2Library: INSUFFICIENT_LIQUIDITY")) == DEAD_ROUTE
+    assert classify(LookupError("no pool on sushiswap")) == DEAD_ROUTE
+    assert classify(TimeoutError("read timed out")) == TRANSIENT
+    assert classify(JsonRpcError(-32005, "limit exceeded")) == TRANSIENT
+    assert classify(ValueError("bad checksum")) not in (DEAD_ROUTE, TRANSIENT)
+
+
+def test_status_codes_only_match_in_http_context():
+    revert = "execution reverted: UniswapV2Library: INSUFFICIENT_LIQUIDITY (pair 0x5029f4a1c3...)"
+    assert classify(ValueError(revert)) == DEAD_ROUTE
+    assert classify(ValueError("amount 4290000 below minimum")) not in (DEAD_ROUTE, TRANSIENT)
+    assert classify(ValueError("503 Server Error: Service Unavailable for url")) == TRANSIENT
+    assert classify(ValueError("HTTP status 429")) == TRANSIENT
+
+    class ClientResponseError(Exception):
+        status = 502
+
+    assert classify(ClientResponseError("upstream")) == TRANSIENT
+
+
+def test_dead_route_backoff_grows_until_success():
+    clock = FakeClock()
+    tracker = FailureTracker(route_backoff=10, max_route_backoff=25, clock=clock)
+    route = ("quickswap", "sushiswap", "0xa", "0xb")
+
+    tracker.record_failure("rpc", LookupError("no pool"), route)
+    assert tracker.route_blocked(route)
+    clock.now += 10
+    assert not tracker.route_blocked(route)
+
+    tracker.record_failure("rpc", LookupError("no pool"), route)
+    clock.now += 19
+    assert tracker.route_blocked(route)
+    assert tracker.quarantine()["routes"][0]["failures"] == 2
+
+    clock.now += 1
+    tracker.record_success("rpc", route)
+    tracker.record_failure("rpc", LookupError("no pool"), route)
+    assert tracker.quarantine()["routes"][0]["retry_in_s"] == 10
+
+
+def test_circuit_opens_and_half_opens():
+    clock = FakeClock()
+    tracker = FailureTracker(failure_threshold=3, reset_timeout=30, clock=clock)
+    for _ in range(3):
+        assert tracker.allow("1inch")
+        tracker.record_failure("1inch", TimeoutError("timed out"))
+
+    assert tracker.circuit("1inch").state == CircuitBreaker.OPEN
+    assert not tracker.allow("1inch")
+    assert [c["name"] for c in tracker.quarantine()["circuits"]] == ["1inch"]
+
+    clock.now += 30
+    assert tracker.allow("1inch")       # one trial call
+    assert not tracker.allow("1inch")   # and only one
+    tracker.record_failure("1inch", TimeoutError("timed out"))
+    clock.now += 30
+    assert not tracker.allow("1inch")   # reopened for twice as long
+    clock.now += 30
+    assert tracker.allow("1inch")
+    tracker.record_success("1inch")
+    assert tracker.circuit("1inch").state == CircuitBreaker.CLOSED
+
+
+def test_scanner_skips_pair_without_pool(monkeypatch):
+    """
+    Test a pair missing on SushiSwap reverts once, is quarantined, and is not
+    quoted again on the next scan while the other pairs still are.
+    """
+    chain = polygon_chain(block_time=0, volatility=0)
+    dead = next(iter(chain.pools.values()))
+    for key, pool in list(chain._pool_index.items()):
+        if pool.dex == "sushiswap" and {pool.token0, pool.token1} == {dead.token0, dead.token1}:
+            del chain._pool_index[key]
+            del chain.pools[pool.address.lower()]
+
+    with MockRpcServer(chain) as server:
+        monkeypatch.setenv("PRIVATE_KEY", "0x" + "11" * 32)
+        monkeypatch.setenv("ALCHEMY_API_URL_MAINNET", server.url)
+        monkeypatch.setenv("REGISTRY_CACHE_FILE", "")
+        monkeypatch.setenv("ARBITRAGE_CONTRACT_ADDRESS", chain.arbitrage_address)
+        scanner = PolygonArbitrageScanner()
+        scanner.failures = FailureTracker()
+        loop = asyncio.new_event_loop()
+
+        # scan_count carries over from earlier scanners through the trade store
+        start = scanner.scan_count
+        loop.run_until_complete(scanner.scan_arbitrage_opportunities())
+        quarantined = scanner.failures.quarantine()["routes"]
+        first_scan = scanner.scan_count - start
+        loop.run_until_complete(scanner.scan_arbitrage_opportunities())
+        scanner.close()
+
+    assert [set(entry["key"][2:]) for entry in quarantined] == [{dead.token0, dead.token1}]
+    assert scanner.scan_count - start - first_scan == first_scan - 1
+    assert scanner.failures.stats["skipped_routes"] == 1
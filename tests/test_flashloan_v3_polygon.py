@@ -0,0 +1,89 @@
+# Local-chain tests for FlashloanV3Polygon against the mock Aave pool and V2
+# DEXes in `contracts/test`.
+
+import brownie
+
+from automation.direct_swap import PairState, pack_leg
+
+LOAN = 1_000 * 10 ** 18
+
+
+def route(mock_tokens, symbol, dex_a, dex_b, amount=LOAN):
+    return (mock_tokens["WMATIC"], mock_tokens[symbol], amount, dex_a[1], dex_b[1])
+
+
+def test_cross_dex_arbitrage(accounts, flashloan_v3_polygon, mock_tokens, quickswap, sushiswap):
+    """
+    Test a SushiSwap -> QuickSwap round trip pays the profit to the owner.
+    """
+    wmatic = mock_tokens["WMATIC"]
+    profit, profitable = flashloan_v3_polygon.checkArbitrageOpportunities(
+        [route(mock_tokens, "USDC", sushiswap, quickswap)]
+    )
+    assert profitable[0]
+
+    balance_before = wmatic.balanceOf(accounts[0])
+    flashloan_v3_polygon.startFlashLoanArbitrage(
+        wmatic, LOAN, wmatic, mock_tokens["USDC"], sushiswap[1], quickswap[1], profit[0],
+        {"from": accounts[0]}
+    )
+
+    premium = LOAN * 5 // 10000
+    assert wmatic.balanceOf(accounts[0]) - balance_before == profit[0] - premium
+
+
+def test_batched_quotes_match_single_dex_quote(flashloan_v3_polygon, mock_tokens, quickswap, sushiswap):
+    """
+    Test the batched view returns one result per route, in order.
+    """
+    routes = [
+        route(mock_tokens, "USDC", quickswap, quickswap),
+        route(mock_tokens, "USDC", sushiswap, quickswap),
+        route(mock_tokens, "WETH", quickswap, sushiswap),
+    ]
+    profits, profitable = flashloan_v3_polygon.checkArbitrageOpportunities(routes)
+
+    single = flashloan_v3_polygon.checkArbitrageOpportunity(mock_tokens["WMATIC"], mock_tokens["USDC"], LOAN)
+    assert (profits[0], profitable[0]) == tuple(single)
+    assert list(profitable) == [False, True, False]
+
+
+def test_unlisted_router_rejected(accounts, flashloan_v3_polygon, mock_tokens, quickswap):
+    """
+    Test routers outside the allowlist are neither quoted nor traded through.
+    """
+    wmatic = mock_tokens["WMATIC"]
+    profits, profitable = flashloan_v3_polygon.checkArbitrageOpportunities(
+        [(wmatic, mock_tokens["USDC"], LOAN, accounts[5], quickswap[1])]
+    )
+    assert (profits[0], profitable[0]) == (0, False)
+
+    with brownie.reverts("Router not allowed"):
+        flashloan_v3_polygon.startFlashLoanArbitrage(
+            wmatic, LOAN, wmatic, mock_tokens["USDC"], accounts[5], quickswap[1], LOAN,
+            {"from": accounts[0]}
+        )
+
+
+def test_packed_gas_vs_router(accounts, flashloan_v3_polygon, mock_tokens, markets, quickswap, sushiswap):
+    """
+    Compare gas for the router path against direct pair swaps.
+    """
+    wmatic, usdc = mock_tokens["WMATIC"], mock_tokens["USDC"]
+    states = {}
+    for dex in ("sushiswap", "quickswap"):
+        pair = markets[(dex, "USDC")]
+        reserve0, reserve1, _ = pair.getReserves()
+        states[dex] = PairState(pair.address, pair.token0(), reserve0, reserve1)
+    packed, amount_out = pack_leg(wmatic.address, usdc.address, states["sushiswap"], states["quickswap"], LOAN)
+
+    packed_gas = flashloan_v3_polygon.startFlashLoanArbitragePacked.estimate_gas(
+        wmatic, LOAN, packed, {"from": accounts[0]}
+    )
+    router_gas = flashloan_v3_polygon.startFlashLoanArbitrage.estimate_gas(
+        wmatic, LOAN, wmatic, usdc, sushiswap[1], quickswap[1], amount_out - LOAN,
+        {"from": accounts[0]}
+    )
+
+    print(f"router: {router_gas:,} gas | direct packed: {packed_gas:,} gas")
+    assert packed_gas < router_gas
@@ -0,0 +1,234 @@
+# Gas regression suite: every flash loan entry point runs on the local chain
+# against the mocks in `contracts/test`, and its gas is checked against the
+# baseline in `tests/gas_snapshot.json`.
+#
+# Record or refresh the baseline after an intended change with
+#
+#     GAS_SNAPSHOT_UPDATE=1 brownie test tests/test_gas_regression.py
+#
+# GAS_SNAPSHOT_TOLERANCE (percent, default 0.5) absorbs small differences
+# between EVM implementations; anything above it fails. While the snapshot is
+# still empty the suite is skipped rather than failed; once a baseline is
+# committed, an entry point without one fails.
+
+import json
+import os
+
+import pytest
+from conftest import abi_encode
+
+from automation.direct_swap import PairState, pack_leg
+
+SNAPSHOT_PATH = os.path.join(os.path.dirname(__file__), "gas_snapshot.json")
+ARBITRAGE_PARAMS = "(address,address,address,address,uint256,uint256)"
+ETH = "0xEeeeeEeeeEeEeeEeEeEeeEEEeeeeEeeeeeeeEEeE"
+LOAN = 1_000 * 10 ** 18
+
+
+class GasSnapshot:
+    def __init__(self, path, update=False, tolerance_pct=0.5):
+        self.path = path
+        self.update = update
+        self.tolerance_pct = tolerance_pct
+        self.measured = {}
+        try:
+            with open(path) as f:
+                self.baseline = json.load(f)
+        except FileNotFoundError:
+            self.baseline = {}
+
+    def check(self, name, tx):
+        gas = tx.gas_used
+        self.measured[name] = gas
+        if self.update:
+            return
+        # A missing entry fails: a skipped check would let the suite pass without comparing anything
+        assert name in self.baseline, f"no gas baseline for {name}; record it with GAS_SNAPSHOT_UPDATE=1"
+        allowed = self.baseline[name] * (1 + self.tolerance_pct / 100)
+        assert gas <= allowed, (
+            f"{name} regressed: {gas:,} gas vs baseline {self.baseline[name]:,} "
+            f"(+{100 * (gas - self.baseline[name]) / self.baseline[name]:.2f}%)"
+        )
+
+    def save(self):
+        if not self.update or not self.measured:
+            return
+        with open(self.path, "w") as f:
+            json.dump(dict(sorted({**self.baseline, **self.measured}.items())), f, indent=2)
+            f.write("\n")
+
+
+@pytest.fixture(scope="module")
+def gas_snapshot(request):
+    snapshot = GasSnapshot(
+        SNAPSHOT_PATH,
+        update=os.getenv("GAS_SNAPSHOT_UPDATE", "").lower() in ("1", "true", "yes"),
+        tolerance_pct=float(os.getenv("GAS_SNAPSHOT_TOLERANCE", "0.5")),
+    )
+    if not snapshot.update and not snapshot.baseline:
+        # Until a first baseline is committed there is nothing to compare; once it is, missing entries fail
+        pytest.skip("no gas baseline recorded yet; record it with GAS_SNAPSHOT_UPDATE=1")
+    yield snapshot
+    snapshot.save()
+
+    reporter = request.config.pluginmanager.get_plugin("terminalreporter")
+    if reporter is not None and snapshot.measured:
+        reporter.write_sep("-", "gas used")
+        for name, gas in sorted(snapshot.measured.items()):
+            reporter.write_line(f"{name}: {gas:,} gas")
+
+
+def make_leg(mock_tokens, symbol, quickswap, sushiswap, amount=LOAN, min_profit_bps=30):
+    return (
+        mock_tokens["WMATIC"].address,
+        mock_tokens[symbol].address,
+        sushiswap[1].address,
+        quickswap[1].address,
+        amount,
+        min_profit_bps,
+    )
+
+
+def pack_usdc_leg(mock_tokens, markets, amount=LOAN):
+    def pair_state(pair):
+        reserve0, reserve1, _ = pair.getReserves()
+        return PairState(pair.address, pair.token0(), reserve0, reserve1)
+
+    return pack_leg(
+        mock_tokens["WMATIC"].address,
+        mock_tokens["USDC"].address,
+        pair_state(markets[("sushiswap", "USDC")]),
+        pair_state(markets[("quickswap", "USDC")]),
+        amount,
+    )
+
+
+# FlashloanV1 / FlashloanV2 - the receivers do no trading, so they are
+# pre-funded with enough to pay the fee, as in the fork tests.
+
+
+def test_flashloan_v1_erc20(accounts, local_flashloan_v1, lending_pool_v1, mock_tokens, gas_snapshot):
+    wmatic = mock_tokens["WMATIC"]
+    wmatic.mint(local_flashloan_v1, 10 ** 16, {"from": accounts[0]})
+    balance_before = wmatic.balanceOf(lending_pool_v1)
+
+    tx = local_flashloan_v1.flashloan(wmatic, {"from": accounts[0]})
+
+    assert wmatic.balanceOf(lending_pool_v1) - balance_before == 10 ** 18 * 9 // 10000
+    gas_snapshot.check("FlashloanV1.flashloan(ERC20)", tx)
+
+
+def test_flashloan_v1_eth(accounts, local_flashloan_v1, lending_pool_v1, gas_snapshot):
+    accounts[0].transfer(local_flashloan_v1, "0.01 ether")
+    balance_before = lending_pool_v1.balance()
+
+    tx = local_flashloan_v1.flashloan(ETH, {"from": accounts[0]})
+
+    assert lending_pool_v1.balance() - balance_before == 10 ** 18 * 9 // 10000
+    gas_snapshot.check("FlashloanV1.flashloan(ETH)", tx)
+
+
+def test_flashloan_v2_single(accounts, local_flashloan_v2, aave_pool_v2, mock_tokens, gas_snapshot):
+    wmatic = mock_tokens["WMATIC"]
+    wmatic.mint(local_flashloan_v2, 10 ** 16, {"from": accounts[0]})
+    balance_before = wmatic.balanceOf(aave_pool_v2)
+
+    tx = local_flashloan_v2.flashloan(wmatic, {"from": accounts[0]})
+
+    assert wmatic.balanceOf(aave_pool_v2) - balance_before == 10 ** 17 * 9 // 10000
+    gas_snapshot.check("FlashloanV2.flashloan(address)", tx)
+
+
+def test_flashloan_v2_multi(accounts, local_flashloan_v2, mock_tokens, gas_snapshot):
+    assets = [mock_tokens["WMATIC"], mock_tokens["WETH"]]
+    for token in assets:
+        token.mint(local_flashloan_v2, 10 ** 16, {"from": accounts[0]})
+
+    tx = local_flashloan_v2.flashloan(assets, [10 ** 18, 10 ** 18], {"from": accounts[0]})
+
+    gas_snapshot.check("FlashloanV2.flashloan(address[],uint256[])", tx)
+
+
+# PolygonArbitrageEngine
+
+
+def test_engine_balancer_flashloan(accounts, arbitrage_engine, mock_tokens, quickswap, sushiswap, gas_snapshot):
+    user_data = abi_encode([ARBITRAGE_PARAMS], [make_leg(mock_tokens, "USDC", quickswap, sushiswap)])
+
+    tx = arbitrage_engine.executeBalancerFlashLoan(
+        [mock_tokens["WMATIC"]], [LOAN], user_data, {"from": accounts[0]}
+    )
+
+    assert arbitrage_engine.totalTrades() == 1
+    gas_snapshot.check("PolygonArbitrageEngine.executeBalancerFlashLoan", tx)
+
+
+def test_engine_aave_flashloan(accounts, arbitrage_engine, mock_tokens, quickswap, sushiswap, gas_snapshot):
+    params = abi_encode([ARBITRAGE_PARAMS], [make_leg(mock_tokens, "USDC", quickswap, sushiswap)])
+
+    tx = arbitrage_engine.executeAaveFlashLoan(
+        [mock_tokens["WMATIC"]], [LOAN], params, {"from": accounts[0]}
+    )
+
+    assert arbitrage_engine.totalTrades() == 1
+    gas_snapshot.check("PolygonArbitrageEngine.executeAaveFlashLoan", tx)
+
+
+def test_engine_balancer_batch(accounts, arbitrage_engine, mock_tokens, quickswap, sushiswap, gas_snapshot):
+    legs = [make_leg(mock_tokens, symbol, quickswap, sushiswap) for symbol in ("USDC", "WETH", "WBTC")]
+
+    tx = arbitrage_engine.executeBalancerBatchFlashLoan(
+        [mock_tokens["WMATIC"]], [len(legs) * LOAN], legs, {"from": accounts[0]}
+    )
+
+    assert tx.events["BatchExecuted"]["executed"] == 3
+    gas_snapshot.check("PolygonArbitrageEngine.executeBalancerBatchFlashLoan[3 legs]", tx)
+
+
+def test_engine_aave_batch(accounts, arbitrage_engine, mock_tokens, quickswap, sushiswap, gas_snapshot):
+    legs = [make_leg(mock_tokens, symbol, quickswap, sushiswap) for symbol in ("USDC", "WETH", "WBTC")]
+
+    tx = arbitrage_engine.executeAaveBatchFlashLoan(
+        [mock_tokens["WMATIC"]], [len(legs) * LOAN], legs, {"from": accounts[0]}
+    )
+
+    assert tx.events["BatchExecuted"]["executed"] == 3
+    gas_snapshot.check("PolygonArbitrageEngine.executeAaveBatchFlashLoan[3 legs]", tx)
+
+
+def test_engine_balancer_packed(accounts, arbitrage_engine, mock_tokens, markets, gas_snapshot):
+    packed, amount_out = pack_usdc_leg(mock_tokens, markets)
+
+    tx = arbitrage_engine.executeBalancerFlashLoanPacked(
+        mock_tokens["WMATIC"], LOAN, packed, {"from": accounts[0]}
+    )
+
+    assert tx.events["ArbitrageExecuted"]["profit"] == amount_out - LOAN
+    gas_snapshot.check("PolygonArbitrageEngine.executeBalancerFlashLoanPacked", tx)
+
+
+# FlashloanV3Polygon
+
+
+def test_v3_polygon_flashloan(accounts, flashloan_v3_polygon, mock_tokens, quickswap, sushiswap, gas_snapshot):
+    wmatic = mock_tokens["WMATIC"]
+    profits, _ = flashloan_v3_polygon.checkArbitrageOpportunities(
+        [(wmatic, mock_tokens["USDC"], LOAN, sushiswap[1], quickswap[1])]
+    )
+
+    tx = flashloan_v3_polygon.startFlashLoanArbitrage(
+        wmatic, LOAN, wmatic, mock_tokens["USDC"], sushiswap[1], quickswap[1], profits[0],
+        {"from": accounts[0]}
+    )
+
+    gas_snapshot.check("FlashloanV3Polygon.startFlashLoanArbitrage", tx)
+
+
+def test_v3_polygon_packed(accounts, flashloan_v3_polygon, mock_tokens, markets, gas_snapshot):
+    packed, _ = pack_usdc_leg(mock_tokens, markets)
+
+    tx = flashloan_v3_polygon.startFlashLoanArbitragePacked(
+        mock_tokens["WMATIC"], LOAN, packed, {"from": accounts[0]}
+    )
+
+    gas_snapshot.check("FlashloanV3Polygon.startFlashLoanArbitragePacked", tx)
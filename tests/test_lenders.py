@@ -0,0 +1,85 @@
+# Local-chain tests for the lender-selection engine against the mock Balancer
+# Vault and Aave Pool from `tests/conftest.py`.
+
+import pytest
+from brownie import chain, web3
+
+from automation.amounts import NativePrices
+from automation.lenders import LENDERS, AaveSource, BalancerSource, LenderSelector
+
+GAS_PRICE = 30 * 10 ** 9
+
+
+@pytest.fixture
+def selector(balancer_vault, aave_pool):
+    selector = LenderSelector({
+        "balancer": BalancerSource(web3, balancer_vault.address),
+        "aave": AaveSource(web3, aave_pool.address),
+    })
+    selector.refresh(chain.height)
+    return selector
+
+
+def test_sources_read_fee_and_liquidity(selector, mock_tokens):
+    wmatic = mock_tokens["WMATIC"].address
+    assert selector.fee_bps("balancer") == 0
+    assert selector.fee_bps("aave") == 5
+    assert selector.liquidity("balancer", wmatic) == 10_000_000 * 10 ** 18
+    assert selector.liquidity("aave", wmatic) == 10_000_000 * 10 ** 18
+
+
+def test_selects_cheapest_lender(selector, balancer_vault, mock_tokens, accounts):
+    """
+    Test the fee-free Balancer loan wins until its fee rises above Aave's
+    premium, and that the switch is only seen after a block refresh.
+    """
+    wmatic = mock_tokens["WMATIC"].address
+    amount = 1_000 * 10 ** 18
+    assert selector.select(wmatic, amount, GAS_PRICE).lender == "balancer"
+
+    balancer_vault.setFlashLoanFeeBps(10, {"from": accounts[0]})
+    assert selector.select(wmatic, amount, GAS_PRICE).lender == "balancer"
+
+    selector.refresh(chain.height)
+    quote = selector.select(wmatic, amount, GAS_PRICE)
+    assert quote.lender == "aave"
+    assert quote.fee == amount * 5 // 10000
+
+
+def test_skips_lenders_without_liquidity(selector, mock_tokens):
+    wmatic = mock_tokens["WMATIC"].address
+    too_big = 20_000_000 * 10 ** 18
+    assert selector.select(wmatic, too_big, GAS_PRICE) is None
+    assert selector.select_batch({wmatic: too_big}, GAS_PRICE) is None
+
+
+def test_packed_loans_only_use_balancer(selector, balancer_vault, mock_tokens, accounts):
+    balancer_vault.setFlashLoanFeeBps(50, {"from": accounts[0]})
+    selector.refresh(chain.height)
+    quote = selector.select(mock_tokens["WMATIC"].address, 10 ** 18, GAS_PRICE, packed=True)
+    assert quote.lender == "balancer"
+
+
+def test_non_native_loans_are_charged_gas_and_batch_fees_in_matic(selector, balancer_vault, mock_tokens, accounts):
+    wmatic, usdc = mock_tokens["WMATIC"].address, mock_tokens["USDC"].address
+    prices = NativePrices(wmatic)
+    prices.set_rate(usdc, 2 * 10 ** 18, 10 ** 6)  # 1 USDC = 2 MATIC
+
+    quote = selector.select(usdc, 1_000 * 10 ** 6, GAS_PRICE, prices.native_rate(usdc))
+    # Lender gas overhead in USDC base units, not dropped
+    assert quote.gas_cost == int(LENDERS[quote.lender].gas_overhead * GAS_PRICE / 2 / 10 ** 12) > 0
+
+    balancer_vault.setFlashLoanFeeBps(10, {"from": accounts[0]})
+    selector.refresh(chain.height)
+    batch = selector.select_batch({wmatic: 1_000 * 10 ** 18, usdc: 1_000 * 10 ** 6}, GAS_PRICE, prices=prices)
+    # 0.05% of 1,000 WMATIC plus 0.05% of 1,000 USDC (0.5 USDC = 1 MATIC), all in MATIC
+    assert batch.lender == "aave"
+    assert batch.fee == 5 * 10 ** 17 + 10 ** 18
+
+    # Without a USDC price neither charging lender can be costed; a free one still can
+    unpriced = NativePrices(wmatic)
+    assert selector.select_batch({wmatic: 1_000 * 10 ** 18, usdc: 1_000 * 10 ** 6}, GAS_PRICE, prices=unpriced) is None
+    balancer_vault.setFlashLoanFeeBps(0, {"from": accounts[0]})
+    selector.refresh(chain.height)
+    batch = selector.select_batch({wmatic: 1_000 * 10 ** 18, usdc: 1_000 * 10 ** 6}, GAS_PRICE, prices=unpriced)
+    assert batch.lender == "balancer" and batch.fee == 0
@@ -0,0 +1,43 @@
+# Tests for the queued logging pipeline: records formatted on the writer
+# thread keep their traceback, including in JSON lines output.
+
+import json
+import logging
+
+from automation.logging_pipeline import configure_logging, shutdown_logging
+
+
+def test_json_lines_keep_exceptions_through_the_queue(tmp_path):
+    log_file = tmp_path / "scanner.log"
+    configure_logging(level="INFO", log_file=str(log_file), json_lines=True, console=False)
+    try:
+        try:
+            raise ValueError("bad quote")
+        except ValueError:
+            logging.getLogger("scanner").exception("quote failed for %s", "WMATIC/USDC")
+        logging.getLogger("scanner").info("next scan")
+    finally:
+        shutdown_logging()
+
+    failed, ok = [json.loads(line) for line in log_file.read_text().splitlines()]
+    assert failed["msg"] == "quote failed for WMATIC/USDC" and failed["level"] == "ERROR"
+    assert "ValueError: bad quote" in failed["exc"] and "Traceback" in failed["exc"]
+    assert "exc" not in ok
+
+
+def test_queue_leaves_exc_info_for_other_handlers(tmp_path):
+    records = []
+    capture = logging.Handler()
+    capture.emit = records.append
+    configure_logging(level="INFO", log_file=str(tmp_path / "scanner.log"), console=False)
+    logging.getLogger().addHandler(capture)
+    try:
+        try:
+            raise ValueError("bad quote")
+        except ValueError:
+            logging.getLogger("scanner").exception("quote failed")
+    finally:
+        logging.getLogger().removeHandler(capture)
+        shutdown_logging()
+
+    assert records[0].exc_info is not None and records[0].exc_info[0] is ValueError
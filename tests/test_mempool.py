@@ -0,0 +1,118 @@
+# Local-chain tests for the pending-state engine: recorded router swaps are fed
+# in as pending transactions, then mined, and the projection is scored against
+# the reserves of the following block.
+
+import pytest
+from brownie import chain
+
+from automation.direct_swap import PairState
+from automation.mempool import PendingStateEngine
+
+DEADLINE = 2 ** 32
+ZERO_HASH = "0x" + "00" * 32
+
+
+def pair_state(pair):
+    reserve0, reserve1, _ = pair.getReserves()
+    return PairState(pair.address, pair.token0(), reserve0, reserve1)
+
+
+def confirmed(markets, mock_tokens):
+    wmatic = mock_tokens["WMATIC"].address
+    return [("quickswap", wmatic, mock_tokens[symbol].address, pair_state(markets[("quickswap", symbol)]))
+            for symbol in ("USDC", "WETH")]
+
+
+def recorded_tx(router, sender, nonce, tx_index, amount_in, amount_out_min, path, gas_price=50 * 10 ** 9):
+    """What eth_getTransactionByHash returns for a pending router call"""
+    return {
+        "hash": "0x%064x" % (tx_index + 1),
+        "from": sender.address,
+        "nonce": nonce,
+        "gasPrice": gas_price,
+        "to": router.address,
+        "value": 0,
+        "input": router.swapExactTokensForTokens.encode_input(
+            amount_in, amount_out_min, [t.address for t in path], sender, DEADLINE
+        ),
+    }
+
+
+@pytest.fixture
+def engine(quickswap, markets, mock_tokens):
+    engine = PendingStateEngine({quickswap[1].address: "quickswap"})
+    engine.on_block(chain.height, confirmed(markets, mock_tokens))
+    return engine
+
+
+@pytest.fixture
+def trader(mock_tokens, quickswap, accounts):
+    for token in mock_tokens.values():
+        token.mint(accounts[1], 10 ** 30, {"from": accounts[0]})
+        token.approve(quickswap[1], 2 ** 256 - 1, {"from": accounts[1]})
+    return accounts[1]
+
+
+def test_projection_matches_next_block(engine, quickswap, markets, mock_tokens, trader):
+    """
+    Test a single-hop and a two-hop pending swap are projected exactly, and
+    the accuracy report scores the prediction against the mined block.
+    """
+    router = quickswap[1]
+    wmatic, usdc, weth = mock_tokens["WMATIC"], mock_tokens["USDC"], mock_tokens["WETH"]
+    pending = [
+        recorded_tx(router, trader, 2, 0, 5_000 * 10 ** 18, 0, [wmatic, usdc]),
+        recorded_tx(router, trader, 3, 1, 2_000 * 10 ** 6, 0, [usdc, wmatic, weth]),
+    ]
+    assert all(engine.on_pending(tx) for tx in pending)
+
+    projected = {symbol: engine.projected("quickswap", wmatic.address, mock_tokens[symbol].address)
+                 for symbol in ("USDC", "WETH")}
+
+    router.swapExactTokensForTokens(5_000 * 10 ** 18, 0, [wmatic, usdc], trader, DEADLINE, {"from": trader})
+    router.swapExactTokensForTokens(2_000 * 10 ** 6, 0, [usdc, wmatic, weth], trader, DEADLINE, {"from": trader})
+
+    actual = {symbol: pair_state(markets[("quickswap", symbol)]) for symbol in ("USDC", "WETH")}
+    assert projected == actual
+
+    engine.on_block(chain.height, confirmed(markets, mock_tokens), [tx["hash"] for tx in pending])
+    report = engine.accuracy.as_dict()
+    assert report["pools_evaluated"] == 2
+    assert report["mean_predicted_error"] == 0
+    assert report["mean_naive_error"] > 0
+    assert engine.pending == {}
+
+
+def test_skips_swaps_that_would_revert(engine, quickswap, mock_tokens, trader):
+    router = quickswap[1]
+    wmatic, usdc = mock_tokens["WMATIC"], mock_tokens["USDC"]
+    before = engine.projected("quickswap", wmatic.address, usdc.address)
+
+    # amountOutMin far above what the pool can pay: the router would revert
+    assert engine.on_pending(recorded_tx(router, trader, 0, 0, 10 ** 18, 10 ** 30, [wmatic, usdc]))
+    assert engine.projected("quickswap", wmatic.address, usdc.address) == before
+
+
+def test_ignores_unknown_routers_and_calls(engine, sushiswap, quickswap, mock_tokens, trader):
+    wmatic, usdc = mock_tokens["WMATIC"], mock_tokens["USDC"]
+    assert not engine.on_pending(recorded_tx(sushiswap[1], trader, 0, 0, 10 ** 18, 0, [wmatic, usdc]))
+    transfer = {"hash": ZERO_HASH, "from": trader.address, "nonce": 0, "gasPrice": 1,
+                "to": quickswap[1].address, "value": 0, "input": "0xa9059cbb" + "00" * 64}
+    assert not engine.on_pending(transfer)
+
+
+def test_drops_replaced_and_stale_swaps(engine, quickswap, mock_tokens, trader):
+    router = quickswap[1]
+    wmatic, usdc = mock_tokens["WMATIC"], mock_tokens["USDC"]
+    for index, nonce in enumerate((5, 6)):
+        assert engine.on_pending(recorded_tx(router, trader, nonce, index, 10 ** 18, 0, [wmatic, usdc]))
+
+    # Another transaction of the sender's mined nonce 5: the first swap can no longer be mined
+    start = engine.block_number
+    engine.on_block(start + 1, [], [ZERO_HASH], {trader.address.lower(): 5})
+    assert [swap.nonce for swap in engine.pending.values()] == [6]
+
+    engine.on_block(start + engine.max_age_blocks, [])
+    assert len(engine.pending) == 1
+    engine.on_block(start + engine.max_age_blocks + 1, [])
+    assert engine.pending == {}
@@ -0,0 +1,132 @@
+# Tests for the mock JSON-RPC stand-in: the scanner reads the scripted pool
+# model through it, and latency, errors, drops and block cadence are injected
+# as configured.
+
+import time
+
+import pytest
+
+from automation.arbitrage_scanner import PolygonArbitrageScanner
+from automation.jsonrpc import JsonRpcClient, JsonRpcError
+from mock_rpc import Chaos, MockRpcServer, polygon_chain, synthetic_chain
+from mock_rpc.chain import sync_topic
+
+WMATIC = "0x0d500B1d8E8eF31E21C99d1Db9A6444d3ADf1270"
+USDC = "0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174"
+
+
+@pytest.fixture
+def mock_chain():
+    return polygon_chain(block_time=0, volatility=0)
+
+
+@pytest.fixture
+def scanner_for(monkeypatch):
+    scanners = []
+
+    def make(server, **env):
+        monkeypatch.setenv("PRIVATE_KEY", "0x" + "11" * 32)
+        monkeypatch.setenv("ALCHEMY_API_URL_MAINNET", server.url)
+        monkeypatch.setenv("REGISTRY_CACHE_FILE", "")
+        for key, value in env.items():
+            monkeypatch.setenv(key, value)
+        scanner = PolygonArbitrageScanner()
+        scanners.append(scanner)
+        return scanner
+
+    yield make
+    for scanner in scanners:
+        scanner.close()
+
+
+def test_scanner_reads_scripted_reserves(mock_chain, scanner_for):
+    with MockRpcServer(mock_chain) as server:
+        scanner = scanner_for(server)
+        state = scanner._load_pair_state("quickswap", WMATIC, USDC)
+        pool = mock_chain.pool("quickswap", WMATIC, USDC)
+        assert (state.address, state.reserve0, state.reserve1) == (pool.address, pool.reserve0, pool.reserve1)
+
+        mock_chain.set_reserves("quickswap", WMATIC, USDC, 10 ** 24, 2 * 10 ** 12)
+        mock_chain.mine()
+        assert scanner._load_pair_state("quickswap", WMATIC, USDC).reserves_for(WMATIC) == (10 ** 24, 2 * 10 ** 12)
+
+        logs = scanner.w3.eth.get_logs({"fromBlock": mock_chain.head, "toBlock": mock_chain.head,
+                                        "address": pool.address, "topics": [sync_topic()]})
+        assert len(logs) == 1
+
+
+def test_lens_scan_finds_scripted_spread(mock_chain, scanner_for):
+    """
+    Test a 5% price gap scripted between the two DEXes is reported by the
+    scanner's lens path, and only for that pair.
+    """
+    quick = mock_chain.pool("quickswap", WMATIC, USDC)
+    reserve_wmatic, reserve_usdc = quick.reserves_for(WMATIC)
+    mock_chain.set_reserves("sushiswap", WMATIC, USDC, reserve_wmatic, reserve_usdc * 105 // 100)
+    for pool in mock_chain.pools.values():
+        if pool is not quick and pool.dex == "quickswap":
+            sushi = mock_chain.pool("sushiswap", pool.token0, pool.token1)
+            sushi.reserve0, sushi.reserve1 = pool.reserve0, pool.reserve1
+
+    with MockRpcServer(mock_chain) as server:
+        scanner = scanner_for(server, LENS_CONTRACT_ADDRESS=mock_chain.lens_address, MIN_PROFIT_PERCENTAGE="0.1")
+        scanner.min_profit_usd = 0
+        opportunities = scanner._scan_with_lens(scanner.calculate_loan_budget()[0])
+
+    assert opportunities
+    assert {(o.token_pair.symbol_a, o.token_pair.symbol_b) for o in opportunities} == {("WMATIC", "USDC")}
+    assert {(o.dex_a, o.dex_b) for o in opportunities} == {("sushiswap", "quickswap")}
+
+
+def test_injects_latency_and_errors():
+    chain = synthetic_chain(4, block_time=0)
+    with MockRpcServer(chain, Chaos(latency_ms=40, method_latency_ms={"eth_call": 60})) as server:
+        client = JsonRpcClient(server.url)
+        start = time.perf_counter()
+        client.request("eth_blockNumber")
+        assert 0.04 <= time.perf_counter() - start < 0.5
+        client.close()
+
+    with MockRpcServer(chain, Chaos(error_rate=1.0)) as server:
+        client = JsonRpcClient(server.url)
+        with pytest.raises(JsonRpcError) as excinfo:
+            client.request("eth_blockNumber")
+        assert excinfo.value.code == -32005
+        assert server.stats["injected_errors"] == 1
+        client.close()
+
+    with MockRpcServer(chain, Chaos(drop_rate=1.0)) as server:
+        client = JsonRpcClient(server.url)
+        with pytest.raises(ConnectionError):
+            client.request("eth_blockNumber")
+        client.close()
+
+
+def test_block_cadence_moves_reserves():
+    chain = synthetic_chain(8, block_time=0.05, volatility=0.01, seed=3)
+    start_block = chain.head
+    with MockRpcServer(chain) as server:
+        client = JsonRpcClient(server.url)
+        time.sleep(0.3)
+        head = int(client.request("eth_blockNumber"), 16)
+        logs = client.request("eth_getLogs", [{"fromBlock": hex(start_block + 1), "toBlock": hex(head)}])
+        client.close()
+
+    assert head >= start_block + 4
+    assert logs and all(log["topics"] == [sync_topic()] for log in logs)
+
+
+def test_profit_threshold_is_valued_in_matic(mock_chain, scanner_for):
+    """
+    Test MIN_PROFIT_USD, counted in MATIC, becomes each token's base units
+    at its pool price, and tokens without a price pass no threshold.
+    """
+    with MockRpcServer(mock_chain) as server:
+        scanner = scanner_for(server)
+        scanner.min_profit_usd = 2
+        scanner._refresh_native_prices(scanner.w3.eth.block_number)
+        reserve_wmatic, reserve_usdc = mock_chain.pool("quickswap", WMATIC, USDC).reserves_for(WMATIC)
+
+        assert scanner._min_profit(WMATIC) == 2 * 10 ** 18
+        assert scanner._min_profit(USDC) == -(-2 * 10 ** 18 * reserve_usdc // reserve_wmatic)
+        assert scanner._min_profit("0x" + "99" * 20) is None
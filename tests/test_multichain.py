@@ -0,0 +1,111 @@
+# Tests for scanning several chains from one event loop: each chain runs on
+# its own cadence and executor, so a slow or failing chain never holds up
+# another, and per-chain settings come from the chains file.
+
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from automation.arbitrage_scanner import PolygonArbitrageScanner
+from automation.chains import ChainConfig, MultiChainScanner, load_chains
+from mock_rpc import Chaos, MockRpcServer, polygon_chain
+
+
+class StandInScanner:
+    """Blocks a worker thread of its own for `scan_seconds` per scan, like a scanner waiting on RPC"""
+
+    def __init__(self, name, scan_seconds, scan_interval, fail=False):
+        self.chain = SimpleNamespace(name=name, scan_interval=scan_interval)
+        self.scan_seconds = scan_seconds
+        self.fail = fail
+        self.block = 0
+        self.executor = ThreadPoolExecutor(2)
+
+    def _scan(self):
+        time.sleep(self.scan_seconds)
+        if self.fail:
+            raise ConnectionError("rpc down")
+        self.block += 1
+        return self.block
+
+    async def scan_once(self):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self._scan)
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        self.executor.shutdown()
+
+
+def test_slow_chain_does_not_delay_fast_chain():
+    fast = StandInScanner("fast", scan_seconds=0.01, scan_interval=0.05)
+    slow = StandInScanner("slow", scan_seconds=0.5, scan_interval=0.05)
+    broken = StandInScanner("broken", scan_seconds=0.01, scan_interval=0.05, fail=True)
+    runner = MultiChainScanner([fast, slow, broken], error_backoff=0.1)
+
+    asyncio.run(runner.run(duration=1.2))
+    runner.close()
+
+    assert runner.stats["fast"]["cycles"] >= 15
+    assert runner.stats["fast"]["max_gap_s"] < 0.2
+    assert 1 <= runner.stats["slow"]["cycles"] <= 3
+    assert runner.stats["broken"]["errors"] >= 5 and runner.stats["broken"]["cycles"] == 0
+    assert runner.stats["fast"]["blocks"] == runner.stats["fast"]["cycles"]
+
+
+def test_load_chains_file(tmp_path, monkeypatch):
+    monkeypatch.setenv("POLYGON_RPC", "http://polygon.example")
+    monkeypatch.delenv("MUMBAI_CONTRACT", raising=False)
+    path = tmp_path / "chains.json"
+    path.write_text(json.dumps({"chains": [
+        {"name": "polygon", "chain_id": 137, "rpc_urls": "${POLYGON_RPC}, http://backup.example"},
+        {"name": "mumbai", "chain_id": 80001, "rpc_urls": ["http://mumbai.example"],
+         "contract_address": "${MUMBAI_CONTRACT}", "scan_interval": 5, "max_tasks": 2},
+    ]}))
+
+    polygon, mumbai = load_chains(str(path))
+    assert polygon.rpc_urls == ["http://polygon.example", "http://backup.example"]
+    assert (mumbai.chain_id, mumbai.scan_interval, mumbai.max_tasks) == (80001, 5, 2)
+    assert mumbai.contract_address is None
+
+    path.write_text(json.dumps([{"name": "polygon", "chain_id": 137, "rpc_urls": [], "rpc": "typo"}]))
+    with pytest.raises(ValueError):
+        load_chains(str(path))
+
+
+def test_two_mock_chains_scanned_at_their_own_cadence(monkeypatch):
+    monkeypatch.setenv("PRIVATE_KEY", "0x" + "11" * 32)
+    monkeypatch.setenv("TRADE_STORE_PATH", "")
+    # Only the scan loops are under test: nothing clears a 50% threshold, so nothing trades
+    monkeypatch.setenv("MIN_PROFIT_PERCENTAGE", "50")
+    # 20 blocks a second against a chain whose node answers quotes in 300ms and mines every 0.5s
+    fast_chain = polygon_chain(block_time=0.05, volatility=0, chain_id=137)
+    slow_chain = polygon_chain(block_time=0.5, volatility=0, chain_id=80001, seed=2)
+
+    with MockRpcServer(fast_chain) as fast_server, \
+            MockRpcServer(slow_chain, Chaos(method_latency_ms={"eth_call": 300})) as slow_server:
+        scanners = [
+            PolygonArbitrageScanner(ChainConfig("polygon", 137, [fast_server.url], lens_address=fast_chain.lens_address,
+                                                scan_interval=0.05, registry_file="")),
+            PolygonArbitrageScanner(ChainConfig("mumbai", 80001, [slow_server.url], lens_address=slow_chain.lens_address,
+                                                scan_interval=0.05, max_tasks=2, registry_file="")),
+        ]
+        runner = MultiChainScanner(scanners)
+        try:
+            asyncio.run(runner.run(duration=2.0))
+            assert [scanner.w3.eth.chain_id for scanner in scanners] == [137, 80001]
+        finally:
+            runner.close()
+
+    fast, slow = runner.stats["polygon"], runner.stats["mumbai"]
+    assert fast["errors"] == slow["errors"] == 0
+    assert fast["cycles"] > 3 * slow["cycles"] > 0
+    assert fast["blocks"] > slow["blocks"]
+    # The slow chain's 300ms quotes never stall the fast chain's loop
+    assert fast["max_gap_s"] < slow["max_cycle_s"]
+    assert scanners[0].failures is not scanners[1].failures
@@ -0,0 +1,54 @@
+# Tests for adaptive per-pair scan scheduling: the per-block budget, hot pairs
+# rescanned every block, and cold pairs still rescanned within the idle bound.
+
+from automation.pair_scheduler import AdaptivePairScheduler, price_and_spread
+
+
+def test_budget_is_per_block():
+    scheduler = AdaptivePairScheduler(pairs=10, budget=6, cost_per_pair=2)
+
+    first = scheduler.select(100)
+    assert len(first) == 3
+    # A second scan in the same block only gets what is left, i.e. nothing
+    assert scheduler.select(100) == []
+    second = scheduler.select(101)
+    assert len(second) == 3 and not set(first) & set(second)
+
+
+def test_hot_pairs_every_block_cold_pairs_within_idle_bound():
+    """
+    Test a pair that keeps producing opportunities is scanned every block
+    while the quiet ones share the rest of the budget and none waits longer
+    than `max_idle_blocks`.
+    """
+    scheduler = AdaptivePairScheduler(pairs=20, budget=4, max_idle_blocks=10)
+    last_scanned = {}
+    gaps = []
+    for block in range(200):
+        for pair_index in scheduler.select(block):
+            if pair_index in last_scanned:
+                gaps.append((pair_index, block - last_scanned[pair_index]))
+            last_scanned[pair_index] = block
+            scheduler.record(pair_index, hit=pair_index == 7, spread_bps=50 if pair_index == 7 else 1)
+
+    assert all(gap == 1 for pair_index, gap in gaps[-50:] if pair_index == 7)
+    assert max(gap for pair_index, gap in gaps if pair_index != 7) <= 10
+    assert scheduler.summary(top=1)[0]["pair_index"] == 7
+
+
+def test_volatility_raises_priority():
+    scheduler = AdaptivePairScheduler(pairs=2, budget=2)
+    for block, (price_0, price_1) in enumerate([(1.0, 1.0), (1.0, 1.02), (1.0, 0.99), (1.0, 1.03)]):
+        scheduler.select(block)
+        scheduler.record(0, hit=False, price=price_0)
+        scheduler.record(1, hit=False, price=price_1)
+
+    assert scheduler.activity[0].volatility_bps == 0
+    assert scheduler.priority(1) > scheduler.priority(0)
+
+
+def test_price_and_spread():
+    price, spread = price_and_spread([(1000, 2000), (1000, 2020), (0, 0)])
+    assert price == 2.01
+    assert round(spread) == 100
+    assert price_and_spread([(0, 0)]) == (None, None)
@@ -0,0 +1,145 @@
+# Local-chain tests for PolygonArbitrageEngine against the mock DEXes and flash
+# loan providers in `contracts/test`. See the `markets` fixture for the seeded
+# price discrepancy.
+
+from conftest import abi_encode
+
+from automation.direct_swap import PairState, pack_leg
+
+ARBITRAGE_PARAMS = "(address,address,address,address,uint256,uint256)"
+LOAN = 1_000 * 10 ** 18
+
+
+def make_leg(mock_tokens, symbol, quickswap, sushiswap, amount=LOAN, min_profit_bps=30):
+    return (
+        mock_tokens["WMATIC"].address,
+        mock_tokens[symbol].address,
+        sushiswap[1].address,
+        quickswap[1].address,
+        amount,
+        min_profit_bps,
+    )
+
+
+def pair_state(pair):
+    reserve0, reserve1, _ = pair.getReserves()
+    return PairState(pair.address, pair.token0(), reserve0, reserve1)
+
+
+def pack_usdc_leg(mock_tokens, markets, amount=LOAN):
+    return pack_leg(
+        mock_tokens["WMATIC"].address,
+        mock_tokens["USDC"].address,
+        pair_state(markets[("sushiswap", "USDC")]),
+        pair_state(markets[("quickswap", "USDC")]),
+        amount,
+    )
+
+
+def test_single_balancer_flashloan(accounts, arbitrage_engine, mock_tokens, quickswap, sushiswap):
+    """
+    Test a single-leg Balancer flash loan lands a profit.
+    """
+    leg = make_leg(mock_tokens, "USDC", quickswap, sushiswap)
+    user_data = abi_encode([ARBITRAGE_PARAMS], [leg])
+
+    tx = arbitrage_engine.executeBalancerFlashLoan(
+        [mock_tokens["WMATIC"]], [LOAN], user_data, {"from": accounts[0]}
+    )
+
+    assert arbitrage_engine.totalTrades() == 1
+    assert tx.events["ArbitrageExecuted"]["profit"] > 0
+
+
+def test_batch_skips_unprofitable_leg(accounts, arbitrage_engine, mock_tokens, quickswap, sushiswap):
+    """
+    Test that a losing leg is rolled back while the rest of the batch executes.
+    """
+    good = make_leg(mock_tokens, "USDC", quickswap, sushiswap)
+    # Same route in reverse loses the spread twice
+    bad = make_leg(mock_tokens, "WETH", sushiswap, quickswap)
+
+    tx = arbitrage_engine.executeBalancerBatchFlashLoan(
+        [mock_tokens["WMATIC"]], [2 * LOAN], [good, bad], {"from": accounts[0]}
+    )
+
+    assert tx.events["BatchExecuted"]["executed"] == 1
+    assert tx.events["LegSkipped"]["index"] == 1
+    assert arbitrage_engine.totalTrades() == 1
+
+
+def test_batch_aave_flashloan(accounts, arbitrage_engine, mock_tokens, quickswap, sushiswap):
+    """
+    Test a batch through the Aave pool, which charges a premium on the loan.
+    """
+    legs = [make_leg(mock_tokens, symbol, quickswap, sushiswap) for symbol in ("USDC", "WETH")]
+
+    tx = arbitrage_engine.executeAaveBatchFlashLoan(
+        [mock_tokens["WMATIC"]], [2 * LOAN], legs, {"from": accounts[0]}
+    )
+
+    assert tx.events["BatchExecuted"]["executed"] == 2
+
+
+def test_batch_gas_vs_single_loans(accounts, arbitrage_engine, mock_tokens, quickswap, sushiswap):
+    """
+    Compare gas for three separate flash loans against one batched loan.
+    """
+    legs = [make_leg(mock_tokens, symbol, quickswap, sushiswap) for symbol in ("USDC", "WETH", "WBTC")]
+    wmatic = mock_tokens["WMATIC"]
+
+    # Estimate against the untouched pools; the estimate is an upper bound on gas used
+    batch_gas = arbitrage_engine.executeBalancerBatchFlashLoan.estimate_gas(
+        [wmatic], [len(legs) * LOAN], legs, {"from": accounts[0]}
+    )
+
+    single_gas = 0
+    for leg in legs:
+        tx = arbitrage_engine.executeBalancerFlashLoan(
+            [wmatic], [LOAN], abi_encode([ARBITRAGE_PARAMS], [leg]), {"from": accounts[0]}
+        )
+        single_gas += tx.gas_used
+
+    print(f"3 single flash loans: {single_gas:,} gas | 1 batch of 3 legs: {batch_gas:,} gas "
+          f"({100 * (single_gas - batch_gas) / single_gas:.1f}% saved)")
+    assert arbitrage_engine.totalTrades() == 3
+    assert batch_gas < single_gas
+
+
+def test_packed_flashloan(accounts, arbitrage_engine, mock_tokens, markets):
+    """
+    Test the router-free path realises exactly the precomputed output.
+    """
+    packed, amount_out = pack_usdc_leg(mock_tokens, markets)
+
+    tx = arbitrage_engine.executeBalancerFlashLoanPacked(
+        mock_tokens["WMATIC"], LOAN, packed, {"from": accounts[0]}
+    )
+
+    assert tx.events["ArbitrageExecuted"]["profit"] == amount_out - LOAN
+
+
+def test_packed_gas_vs_router(accounts, arbitrage_engine, mock_tokens, markets, quickswap, sushiswap):
+    """
+    Compare gas per arbitrage for the router path (cold and with one-time
+    approvals) against direct pair swaps with packed calldata.
+    """
+    wmatic, usdc = mock_tokens["WMATIC"], mock_tokens["USDC"]
+    packed, _ = pack_usdc_leg(mock_tokens, markets)
+    user_data = abi_encode([ARBITRAGE_PARAMS], [make_leg(mock_tokens, "USDC", quickswap, sushiswap)])
+
+    packed_gas = arbitrage_engine.executeBalancerFlashLoanPacked.estimate_gas(
+        wmatic, LOAN, packed, {"from": accounts[0]}
+    )
+    router_cold_gas = arbitrage_engine.executeBalancerFlashLoan.estimate_gas(
+        [wmatic], [LOAN], user_data, {"from": accounts[0]}
+    )
+    arbitrage_engine.approveRouters([wmatic, usdc], {"from": accounts[0]})
+    router_warm_gas = arbitrage_engine.executeBalancerFlashLoan.estimate_gas(
+        [wmatic], [LOAN], user_data, {"from": accounts[0]}
+    )
+
+    print(f"router (first trade): {router_cold_gas:,} gas | router (max approvals): "
+          f"{router_warm_gas:,} gas | direct packed: {packed_gas:,} gas")
+    assert router_warm_gas < router_cold_gas
+    assert packed_gas < router_warm_gas
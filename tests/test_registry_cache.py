@@ -0,0 +1,29 @@
+# Tests for the on-disk pair registry used to skip factory lookups on restart.
+
+from automation.registry_cache import RegistryCache
+
+WMATIC = "0x0d500B1d8E8eF31E21C99d1Db9A6444d3ADf1270"
+USDC = "0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174"
+PAIR = "0x6e7a5FAFcec6BB1e78bAE2A1F0B612012BF14827"
+
+
+def test_round_trip_is_keyed_by_chain(tmp_path):
+    path = str(tmp_path / "registry.json")
+    registry = RegistryCache(path, 137)
+    registry.set_pair("quickswap", WMATIC, USDC, PAIR, WMATIC)
+    registry.save()
+
+    assert RegistryCache(path, 137).get_pair("quickswap", WMATIC.lower(), USDC) == (PAIR, WMATIC)
+    assert RegistryCache(path, 1).get_pair("quickswap", WMATIC, USDC) is None
+
+    # A second chain is added without dropping the first
+    other = RegistryCache(path, 1)
+    other.set_pair("sushiswap", WMATIC, USDC, PAIR, USDC)
+    other.save()
+    assert len(RegistryCache(path, 137)) == 1
+
+
+def test_corrupt_file_starts_empty(tmp_path):
+    path = tmp_path / "registry.json"
+    path.write_text("{not json")
+    assert len(RegistryCache(str(path), 137)) == 0
@@ -0,0 +1,162 @@
+# Tests for the RPC endpoint pool against local stand-in JSON-RPC servers with
+# injected latency, failures and lagging heads.
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from automation.jsonrpc import JsonRpcError
+from automation.rpc_pool import RpcPool, nonce_too_low
+
+
+class StandInNode:
+    """Answers eth_blockNumber with `head`, everything else with its own name"""
+
+    def __init__(self, name, head=100, delay=0.0):
+        self.name = name
+        self.head = head
+        self.delay = delay
+        self.fail = False
+        self.calls = []
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                node.calls.append(request["method"])
+                if node.fail:
+                    self.send_response(503)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                time.sleep(node.delay)
+                body = json.dumps(node.reply(request)).encode()
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = "http://127.0.0.1:%d" % self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def reply(self, request):
+        if request["method"] == "eth_blockNumber":
+            return {"jsonrpc": "2.0", "id": request["id"], "result": hex(self.head)}
+        if request["method"] == "eth_sendRawTransaction" and self.name == "known":
+            return {"jsonrpc": "2.0", "id": request["id"], "error": {"code": -32000, "message": "already known"}}
+        if request["method"] == "eth_sendRawTransaction" and self.name == "stale":
+            return {"jsonrpc": "2.0", "id": request["id"], "error": {"code": -32000, "message": "nonce too low"}}
+        if request["method"] == "eth_call" and request["params"][0] == "revert":
+            return {"jsonrpc": "2.0", "id": request["id"], "error": {"code": 3, "message": "execution reverted"}}
+        return {"jsonrpc": "2.0", "id": request["id"], "result": self.name}
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def nodes():
+    started = []
+
+    def start(*specs):
+        started.extend(StandInNode(*spec) for spec in specs)
+        return started
+
+    yield start
+    for node in started:
+        node.close()
+
+
+@pytest.fixture
+def pool_for():
+    pools = []
+
+    def make(nodes, **kwargs):
+        pool = RpcPool([node.url for node in nodes], **kwargs)
+        pool.probe()
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        pool.close()
+
+
+def test_routes_to_fastest_in_sync_endpoint(nodes, pool_for):
+    """
+    Test the fastest endpoint is skipped while its head lags, and used again
+    once it catches up.
+    """
+    slow, fast = nodes(("slow", 100, 0.03), ("fast", 97, 0.0))
+    pool = pool_for([slow, fast], max_lag_blocks=2, hedge_after=1.0)
+    assert pool.request("eth_chainId") == "slow"
+
+    fast.head = 100
+    pool.probe()
+    assert pool.request("eth_chainId") == "fast"
+
+
+def test_hedges_slow_primary(nodes, pool_for):
+    primary, backup = nodes(("primary", 100, 0.0), ("backup", 100, 0.02))
+    pool = pool_for([primary, backup], hedge_after=0.05)
+    primary.delay = 0.5  # degraded after the probe ranked it first
+
+    start = time.perf_counter()
+    assert pool.request("eth_gasPrice") == "backup"
+    assert time.perf_counter() - start < 0.4
+    assert pool.stats["hedged"] == 1 and pool.stats["hedge_wins"] == 1
+
+
+def test_fails_over_and_cools_down(nodes, pool_for):
+    first, second = nodes(("first", 100, 0.0), ("second", 100, 0.01))
+    pool = pool_for([first, second], failure_cooldown=60)
+    first.fail = True
+
+    assert pool.request("eth_gasPrice") == "second"
+    assert pool.stats["failovers"] == 1
+    # The failed endpoint sits out its cooldown instead of being tried first
+    first.calls.clear()
+    assert pool.request("eth_gasPrice") == "second"
+    assert first.calls == []
+
+
+def test_node_errors_are_not_retried(nodes, pool_for):
+    first, second = nodes(("first", 100, 0.0), ("second", 100, 0.01))
+    pool = pool_for([first, second])
+    with pytest.raises(JsonRpcError, match="execution reverted"):
+        pool.request("eth_call", ["revert", "latest"])
+    assert "eth_call" not in second.calls
+
+
+def test_broadcasts_to_every_endpoint(nodes, pool_for):
+    known, fresh, down = nodes(("known", 100, 0.0), ("fresh", 100, 0.02), ("down", 100, 0.0))
+    down.fail = True
+    pool = pool_for([known, fresh, down])
+
+    assert pool.request("eth_sendRawTransaction", ["0x1234"]) == "fresh"
+    time.sleep(0.05)
+    assert all("eth_sendRawTransaction" in node.calls for node in (known, fresh, down))
+
+
+def test_stale_nonce_is_raised_not_taken_as_sent(nodes, pool_for):
+    """
+    Test "nonce too low" fails the broadcast, ahead of an unreachable
+    endpoint's error, so the sender's nonce gets resynced.
+    """
+    down, stale = nodes(("down", 100, 0.0), ("stale", 100, 0.02))
+    down.fail = True
+    pool = pool_for([down, stale])
+    with pytest.raises(JsonRpcError, match="nonce too low") as raised:
+        pool.request("eth_sendRawTransaction", ["0x1234"])
+    assert nonce_too_low(raised.value)
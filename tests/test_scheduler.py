@@ -0,0 +1,125 @@
+# Tests for the opportunity scheduler on synthetic opportunity streams: net
+# profit scoring, route deduplication, pool-conflict resolution and block
+# deadlines.
+
+from automation.amounts import NativePrices
+from automation.arbitrage_scanner import ArbitrageOpportunity, TokenPair
+from automation.scheduler import OpportunityScheduler, max_weight_disjoint
+
+WMATIC = "0x0d500B1d8E8eF31E21C99d1Db9A6444d3ADf1270"
+USDC = "0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174"
+WETH = "0x7ceB23fD6bC0adD59E62ac25578270cFf1b9f619"
+USDT = "0xc2132D05D31c914a87C6611C10748AEb04B58e8F"
+GAS_PRICE = 30 * 10 ** 9
+ETHER = 10 ** 18
+
+
+def opportunity(token_b, dex_a, dex_b, profit, amount_in=100 * ETHER, gas=200000):
+    pair = TokenPair(WMATIC, token_b, "WMATIC", "X", 18, 18)
+    return ArbitrageOpportunity(
+        token_pair=pair,
+        dex_a=dex_a,
+        dex_b=dex_b,
+        amount_in=amount_in,
+        expected_profit=profit,
+        profit_percentage=profit * 100 / amount_in,
+        gas_estimate=gas,
+    )
+
+
+def usdc_opportunity(token_b, profit, amount_in=1_000 * 10 ** 6, gas=200000):
+    return ArbitrageOpportunity(
+        token_pair=TokenPair(USDC, token_b, "USDC", "X", 6, 18),
+        dex_a="quickswap",
+        dex_b="sushiswap",
+        amount_in=amount_in,
+        expected_profit=profit,
+        profit_percentage=profit * 100 / amount_in,
+        gas_estimate=gas,
+    )
+
+
+def test_ranks_by_net_profit_not_percentage():
+    """
+    Test a large trade with a thin margin beats a small one with a high
+    percentage, and a trade that does not cover gas is never queued.
+    """
+    scheduler = OpportunityScheduler(WMATIC, max_legs=1)
+    small = opportunity(USDC, "quickswap", "sushiswap", ETHER // 2, amount_in=10 * ETHER)
+    large = opportunity(WETH, "quickswap", "sushiswap", 3 * ETHER, amount_in=1_000 * ETHER)
+    dust = opportunity(WETH, "sushiswap", "quickswap", 10 ** 15)
+
+    assert scheduler.submit([small, large, dust], 100, GAS_PRICE) == 2
+    assert scheduler.stats["unprofitable"] == 1
+    assert scheduler.next_batch(100) == [large]
+    assert scheduler.next_batch(100) == [small]
+
+
+def test_deduplicates_routes_across_sizes_and_scans():
+    scheduler = OpportunityScheduler(WMATIC)
+    sizes = [opportunity(USDC, "sushiswap", "quickswap", p * ETHER) for p in (1, 3, 2)]
+    scheduler.submit(sizes, 100, GAS_PRICE)
+    scheduler.submit([opportunity(USDC, "sushiswap", "quickswap", ETHER)], 100, GAS_PRICE)
+
+    assert len(scheduler) == 1
+    assert scheduler.stats["duplicates"] == 2
+    assert scheduler.next_batch(100) == [sizes[1]]
+
+
+def test_resolves_pool_conflicts_with_max_weight_set():
+    """
+    Test the scheduler prefers two disjoint routes worth 14 over a single
+    route worth 10 that conflicts with both.
+    """
+    scheduler = OpportunityScheduler(WMATIC, max_legs=3, max_candidates=8)
+    best_single = opportunity(USDC, "quickswap", "sushiswap", 10 * ETHER)
+    left = opportunity(USDC, "quickswap", "apeswap", 7 * ETHER)
+    right = opportunity(USDC, "sushiswap", "dfyn", 7 * ETHER)
+    scheduler.submit([best_single, left, right], 100, GAS_PRICE)
+
+    batch = scheduler.next_batch(100)
+    assert {id(o) for o in batch} == {id(left), id(right)}
+    # The losing route stays queued for the next decision
+    assert scheduler.next_batch(100) == [best_single]
+
+
+def test_drops_opportunities_past_their_deadline():
+    scheduler = OpportunityScheduler(WMATIC, ttl_blocks=2)
+    scheduler.submit([opportunity(USDC, "quickswap", "sushiswap", ETHER)], 100, GAS_PRICE)
+    scheduler.submit([opportunity(WETH, "quickswap", "sushiswap", ETHER)], 102, GAS_PRICE)
+
+    batch = scheduler.next_batch(103)
+    assert [o.token_pair.token_b for o in batch] == [WETH]
+    assert scheduler.stats["expired"] == 1
+    assert len(scheduler) == 0
+
+
+def test_max_weight_disjoint_respects_limit():
+    scheduler = OpportunityScheduler(WMATIC, max_legs=2)
+    stream = [opportunity(token, a, b, p * ETHER)
+              for token, a, b, p in ((USDC, "q", "s", 5), (WETH, "q", "s", 4), (USDT, "q", "s", 3))]
+    scheduler.submit(stream, 1, GAS_PRICE)
+    entries = list(scheduler._live.values())
+    assert sum(e.net_profit for e in max_weight_disjoint(entries, 2)) == \
+        sum(sorted((e.net_profit for e in entries), reverse=True)[:2])
+
+
+def test_scores_every_token_in_matic_after_gas():
+    """
+    Test a 6-decimal USDC profit is valued at its MATIC price, gas
+    included, instead of being compared in raw base units with WMATIC.
+    """
+    prices = NativePrices(WMATIC)
+    prices.set_rate(USDC, 2 * ETHER, 10 ** 6)  # 1 USDC = 2 MATIC
+    scheduler = OpportunityScheduler(WMATIC, max_legs=1, prices=prices)
+    gas = 200000 * GAS_PRICE
+
+    usdc = usdc_opportunity(WETH, 2 * 10 ** 6)   # 2 USDC = 4 MATIC
+    wmatic = opportunity(WETH, "sushiswap", "quickswap", 3 * ETHER)
+    unpriced = opportunity(USDT, "quickswap", "sushiswap", 5 * ETHER)
+    unpriced.token_pair = TokenPair(USDT, WETH, "USDT", "WETH", 6, 18)
+
+    assert scheduler.net_profit(usdc, GAS_PRICE) == 4 * ETHER - gas
+    assert scheduler.net_profit(unpriced, GAS_PRICE) == 0
+    assert scheduler.submit([usdc, wmatic, unpriced], 100, GAS_PRICE) == 2
+    assert scheduler.next_batch(100) == [usdc]
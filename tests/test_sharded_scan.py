@@ -0,0 +1,60 @@
+# Tests for the process-sharded scanner: worker results must match a single
+# in-process pass over the same shared reserve table.
+
+import random
+
+from automation.sharded_scan import ReserveTable, ShardedScanner, scan_pairs
+
+AMOUNTS = [10 ** 18, 100 * 10 ** 18, 1_000 * 10 ** 18]
+PAIRS = 50
+
+
+def seed(scanner, rng):
+    for pair_index in range(PAIRS):
+        reserve_a = rng.randint(10 ** 22, 10 ** 24)
+        reserve_b = rng.randint(10 ** 22, 10 ** 24)
+        scanner.update(pair_index, 0, reserve_a, reserve_b)
+        scanner.update(pair_index, 1, reserve_a, reserve_b * rng.choice([100, 102, 105]) // 100)
+    # A pair that only exists on one DEX is never quoted
+    scanner.update(PAIRS - 1, 1, 0, 0)
+
+
+def test_reserve_table_round_trip():
+    table = ReserveTable(2, 2)
+    try:
+        table.set(1, 1, 2 ** 112 - 1, 12345)
+        assert table.get(1, 1) == (2 ** 112 - 1, 12345)
+        assert table.get(0, 0) == (0, 0)
+    finally:
+        table.close()
+
+
+def test_workers_match_in_process_scan():
+    with ShardedScanner(PAIRS, 2, workers=3) as scanner:
+        seed(scanner, random.Random(3))
+        expected = scan_pairs(scanner.table, range(PAIRS), AMOUNTS, [30, 30], 30)
+        candidates = scanner.scan(AMOUNTS, [30, 30], 30)
+
+        assert sorted(candidates) == sorted(expected)
+        assert [c.profit for c in candidates] == sorted((c.profit for c in expected), reverse=True)
+        assert all(c.pair_index != PAIRS - 1 for c in candidates)
+
+        # Updates written after the workers started are visible to the next scan
+        scanner.update(0, 1, 10 ** 23, 2 * 10 ** 23)
+        scanner.update(0, 0, 10 ** 23, 10 ** 23)
+        assert any(c.pair_index == 0 and (c.dex_a, c.dex_b) == (1, 0)
+                   for c in scanner.scan(AMOUNTS, [30, 30], 30))
+
+
+def test_per_pair_amounts():
+    with ShardedScanner(PAIRS, 2, workers=3) as scanner:
+        seed(scanner, random.Random(3))
+        # A 6-decimal token_a sized in its own units next to 18-decimal pairs; pairs without sizes are skipped
+        amounts = {p: AMOUNTS for p in range(0, PAIRS, 2)}
+        amounts[2] = [amount // 10 ** 12 for amount in AMOUNTS]
+        candidates = scanner.scan(amounts, [30, 30], 30)
+
+        assert candidates and all(c.pair_index % 2 == 0 for c in candidates)
+        expected = scan_pairs(scanner.table, range(PAIRS), amounts, [30, 30], 30)
+        assert sorted(candidates) == sorted(expected)
+        assert all(c.profit < amounts[2][c.amount_index] for c in candidates if c.pair_index == 2)
@@ -0,0 +1,72 @@
+# Local-chain tests for the brownie-free bot runner: quotes over plain JSON-RPC
+# must match brownie's Contract, and a signed trade must settle like one sent
+# through brownie.
+
+import json
+
+import pytest
+from brownie import chain, web3
+
+from automation.jsonrpc import JsonRpcClient, RpcContract, load_artifact_abi
+from automation.standalone_bot import PriceFeed, StandaloneArbitrageBot, build_quote_grid
+
+LOAN = 1_000 * 10 ** 18
+
+
+class FixedPrices(PriceFeed):
+    def usd(self, symbol):
+        return 1.0
+
+
+@pytest.fixture
+def client():
+    client = JsonRpcClient(web3.provider.endpoint_uri, pool_size=2)
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def build_dir(FlashloanV3Polygon, tmp_path):
+    (tmp_path / "FlashloanV3Polygon.json").write_text(json.dumps({"abi": FlashloanV3Polygon.abi}))
+    return str(tmp_path)
+
+
+def test_quotes_match_brownie(client, build_dir, flashloan_v3_polygon, mock_tokens, quickswap, sushiswap):
+    tokens = {symbol: token.address for symbol, token in mock_tokens.items()}
+    dexes = {"QUICKSWAP": quickswap[1].address, "SUSHISWAP": sushiswap[1].address}
+    grid = build_quote_grid(tokens, dexes, [LOAN], [("WMATIC", "USDC"), ("WMATIC", "WETH")])
+    routes = [(q["token_a"], q["token_b"], q["amount"], q["dex_a"], q["dex_b"]) for q in grid]
+
+    contract = RpcContract(client, flashloan_v3_polygon.address, load_artifact_abi("FlashloanV3Polygon", build_dir))
+    profits, profitable = contract.call("checkArbitrageOpportunities", routes)
+    expected = flashloan_v3_polygon.checkArbitrageOpportunities(routes)
+
+    assert list(profits) == list(expected[0])
+    assert list(profitable) == list(expected[1])
+    assert any(profitable)
+
+
+def test_runs_trade_without_brownie(client, build_dir, FlashloanV3Polygon, MockPoolAddressesProvider,
+                                    aave_pool, quickswap, sushiswap, markets, mock_tokens, accounts):
+    """
+    Test the runner quotes the grid, signs locally and settles the best
+    route, paying the profit minus the Aave premium to its own account.
+    """
+    owner = accounts.add()
+    accounts[0].transfer(owner, "10 ether")
+    provider = MockPoolAddressesProvider.deploy(aave_pool, {"from": owner})
+    flashloan = FlashloanV3Polygon.deploy(provider, [quickswap[1], sushiswap[1]], {"from": owner})
+
+    bot = StandaloneArbitrageBot(
+        client, flashloan.address, owner.private_key, load_artifact_abi("FlashloanV3Polygon", build_dir), chain.id,
+        tokens={symbol: token.address for symbol, token in mock_tokens.items()},
+        dexes={"QUICKSWAP": quickswap[1].address, "SUSHISWAP": sushiswap[1].address},
+        trade_amounts=[LOAN], token_pairs=[("WMATIC", "USDC")], min_profit_usd=0, prices=FixedPrices()
+    )
+    opportunities = bot.scan_arbitrage_opportunities()
+    best = max(opportunities, key=lambda o: o["profit_usd"])
+    assert (best["dex_a_name"], best["dex_b_name"]) == ("SUSHISWAP", "QUICKSWAP")
+
+    wmatic = mock_tokens["WMATIC"]
+    assert bot.run_once()
+    assert wmatic.balanceOf(owner) == best["profit"] - LOAN * 5 // 10000
@@ -0,0 +1,112 @@
+# Tests for the SQLite trade store: rows written from the scan loop land in
+# the database in the background, history pages newest first, transactions
+# join their legs and receipt, profits are totalled per token, and a full
+# queue drops rows instead of blocking.
+
+import time
+
+from automation.arbitrage_scanner import ArbitrageOpportunity, TokenPair
+from automation.trade_store import TradeStore
+
+WMATIC = "0x0d500B1d8E8eF31E21C99d1Db9A6444d3ADf1270"
+USDC = "0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174"
+WETH = "0x7ceB23fD6bC0adD59E62ac25578270cFf1b9f619"
+
+
+def opportunity(symbol="USDC", token=USDC, profit=3 * 10 ** 18):
+    pair = TokenPair(WMATIC, token, "WMATIC", symbol, 18, 6)
+    # Wei amounts beyond 2**63 must survive the round trip exactly
+    return ArbitrageOpportunity(pair, "quickswap", "sushiswap", 10 ** 22, profit, 0.3, 200000)
+
+
+def test_opportunities_page_newest_first(tmp_path):
+    store = TradeStore(str(tmp_path / "trades.db"), flush_interval=0.01)
+    for block in range(5):
+        store.record_opportunities([opportunity(), opportunity("WETH", WETH)], block)
+    assert store.flush(timeout=5)
+
+    first = store.opportunities(limit=4)
+    assert [row["block"] for row in first["items"]] == [4, 4, 3, 3]
+    assert first["items"][0]["amount_in"] == str(10 ** 22)
+    second = store.opportunities(limit=4, before=first["next_before"])
+    assert [row["block"] for row in second["items"]] == [2, 2, 1, 1]
+    last = store.opportunities(limit=4, before=second["next_before"])
+    assert len(last["items"]) == 2 and last["next_before"] is None
+
+    weth = store.opportunities(pair="WMATIC/WETH")
+    assert len(weth["items"]) == 5
+    assert store.opportunities(since=time.time() + 60)["items"] == []
+    store.close()
+
+
+def test_transactions_join_legs_and_receipts(tmp_path):
+    store = TradeStore(str(tmp_path / "trades.db"), flush_interval=0.01)
+    batch = [opportunity(), opportunity("WETH", WETH, profit=2 * 10 ** 18)]
+    store.record_transaction("0xaa", batch, "batch", "aave", 30 * 10 ** 9)
+    store.record_receipt("0xaa", {"status": 1, "blockNumber": 100, "gasUsed": 410000}, 2,
+                         [(WMATIC, 3 * 10 ** 18), (WMATIC, 10 ** 18)])
+    store.record_transaction("0xbb", [opportunity()], "single", "balancer", 30 * 10 ** 9)
+    store.record_transaction("0xcc", [opportunity()], "single", "balancer", 30 * 10 ** 9)
+    store.record_receipt("0xcc", {"status": 0, "blockNumber": 101, "gasUsed": 90000}, 0)
+    assert store.flush(timeout=5)
+
+    assert [row["tx_hash"] for row in store.transactions()["items"]] == ["0xcc", "0xbb", "0xaa"]
+    assert [row["tx_hash"] for row in store.transactions(pair="WMATIC/WETH")["items"]] == ["0xaa"]
+
+    detail = store.transaction("0xaa")
+    assert detail["status"] == 1 and detail["realized_profit"] == str(4 * 10 ** 18)
+    assert [leg["pair"] for leg in detail["legs"]] == ["WMATIC/USDC", "WMATIC/WETH"]
+    assert detail["token_a"] == WMATIC.lower() and detail["realized_profits"] == {WMATIC.lower(): str(4 * 10 ** 18)}
+    assert store.transaction("0xbb")["status"] is None
+    assert store.transaction("0xdd") is None
+
+    summary = store.summary()
+    assert (summary["succeeded"], summary["failed"], summary["pending"]) == (1, 1, 1)
+    assert summary["profit_by_token"] == {
+        WMATIC.lower(): {"expected_profit": str(5 * 10 ** 18), "realized_profit": str(4 * 10 ** 18)}}
+    store.close()
+
+
+def test_profits_in_different_tokens_are_not_added(tmp_path):
+    store = TradeStore(str(tmp_path / "trades.db"), flush_interval=0.01)
+    usdc_first = ArbitrageOpportunity(TokenPair(USDC, WMATIC, "USDC", "WMATIC", 6, 18), "quickswap", "sushiswap",
+                                      10 ** 10, 2 * 10 ** 6, 0.3, 200000)
+    store.record_transaction("0xaa", [opportunity(), usdc_first], "batch", "balancer", 30 * 10 ** 9)
+    store.record_receipt("0xaa", {"status": 1, "blockNumber": 100, "gasUsed": 410000}, 2,
+                         [(WMATIC, 10 ** 18), (USDC, 10 ** 6)])
+    assert store.flush(timeout=5)
+
+    detail = store.transaction("0xaa")
+    assert detail["token_a"] is None and detail["realized_profit"] is None
+    assert [leg["token_a"] for leg in detail["legs"]] == [WMATIC.lower(), USDC.lower()]
+    assert store.summary()["profit_by_token"] == {
+        USDC.lower(): {"expected_profit": str(2 * 10 ** 6), "realized_profit": str(10 ** 6)},
+        WMATIC.lower(): {"expected_profit": str(3 * 10 ** 18), "realized_profit": str(10 ** 18)},
+    }
+    store.close()
+
+
+def test_counters_survive_reopening(tmp_path):
+    path = str(tmp_path / "trades.db")
+    store = TradeStore(path, flush_interval=0.01)
+    store.save_counters({"scan_count": 10, "total_profit": 1.5})
+    store.save_counters({"scan_count": 12})
+    store.close()
+
+    reopened = TradeStore(path)
+    assert reopened.counters() == {"scan_count": 12.0, "total_profit": 1.5}
+    reopened.close()
+
+
+def test_full_queue_drops_without_blocking(tmp_path):
+    store = TradeStore(str(tmp_path / "trades.db"), flush_interval=0.01, max_queue=1)
+    # Stop the writer so nothing drains the queue, then fill it
+    store.close()
+    store._closed = False
+    store.save_counters({"scan_count": 1})
+
+    start = time.perf_counter()
+    for _ in range(100):
+        store.record_opportunities([opportunity(), opportunity()])
+    assert time.perf_counter() - start < 0.5
+    assert store.stats["dropped"] == 200